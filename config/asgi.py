@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_asgi_application()
+
+if getattr(settings, "USUARIOS_DISPONIBLE_PRECARGAR", True):
+    from usuarios.disponibilidad import precargar
+
+    precargar()
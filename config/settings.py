@@ -11,15 +11,22 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
 from pathlib import Path
-from dotenv import load_dotenv
 import os
 
 from datetime import timedelta
 
+from core.db import opciones_conexion, replicas_desde_entorno
+
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
-load_dotenv(BASE_DIR / ".env")
+
+# El .env es para desarrollo: en los contenedores las variables ya vienen del
+# entorno y así un worker no importa python-dotenv ni lee el fichero.
+if (BASE_DIR / ".env").is_file():
+    from dotenv import load_dotenv
+
+    load_dotenv(BASE_DIR / ".env")
 
 
 # Quick-start development settings - unsuitable for production
@@ -48,22 +55,36 @@ INSTALLED_APPS = [
     "usuarios.apps.UsuariosConfig",
     "reservas",
     "eventos",
+    "sala_espera",
     # Third-party apps
     "rest_framework",
     "rest_framework_simplejwt",
 ]
 
 MIDDLEWARE = [
+    "core.instrumentacion.InstrumentacionMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "sala_espera.middleware.SalaEsperaMiddleware",
+    "core.replicas.ReplicasMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
+    "usuarios.middleware.HashingSaturadoMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
-ROOT_URLCONF = "config.urls"
+# Con API_ASYNC los endpoints de token, registro y detalle de usuario se
+# sirven con vistas asíncronas (usuarios.views_async). Activar sólo al
+# desplegar con un servidor ASGI (uvicorn config.asgi:application).
+API_ASYNC = os.getenv("API_ASYNC", "False").lower() in ("true", "1", "t")
+
+ROOT_URLCONF = "config.urls_asgi" if API_ASYNC else "config.urls"
+
+# Presupuesto de arranque de un worker (import de config.wsgi), en ms, que
+# comprueban ``manage.py perfil_arranque --presupuesto`` y los tests.
+ARRANQUE_PRESUPUESTO_MS = int(os.getenv("ARRANQUE_PRESUPUESTO_MS", 1500))
 
 TEMPLATES = [
     {
@@ -86,6 +107,9 @@ WSGI_APPLICATION = "config.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
+# Pool de conexiones, conexiones persistentes y statement_timeout se
+# configuran con DB_POOL* / DB_CONN_MAX_AGE / DB_STATEMENT_TIMEOUT (core.db).
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -94,15 +118,95 @@ DATABASES = {
         "PASSWORD": os.getenv("DB_PASSWORD"),
         "HOST": os.getenv("DB_HOST"),
         "PORT": os.getenv("DB_PORT"),
+        **opciones_conexion(),
     }
 }
 
+# Réplicas de lectura (DB_REPLICAS="host1,host2:5433"): las lecturas de las
+# peticiones GET van a una réplica salvo tras una escritura del mismo
+# cliente o si la réplica acumula retraso (core.replicas).
+DATABASES.update(replicas_desde_entorno(DATABASES["default"]))
+DATABASE_ROUTERS = ["core.replicas.RouterReplicas"]
+REPLICAS_RETRASO_MAXIMO = float(os.getenv("DB_REPLICAS_RETRASO_MAXIMO", 5))
+REPLICAS_INTERVALO_COMPROBACION = 5
+REPLICAS_VENTANA_PRIMARIA = int(os.getenv("DB_REPLICAS_VENTANA_PRIMARIA", 10))
+
+# Los índices con INCLUDE (usuarios_activo_fecha_idx) son para PostgreSQL; en
+# SQLite (tests, benchmarks locales) se crean sin las columnas incluidas.
+SILENCED_SYSTEM_CHECKS = ["models.W040"]
+
+
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+# Sin REDIS_URL cada proceso usa su propia caché en memoria (desarrollo).
+
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+
+# Almacén de sesiones (core.sesiones); todos escriben sólo si la sesión
+# cambia. "cache" lee de la caché y escribe en ella y en la BD: sólo con
+# Redis, porque la caché en memoria no se comparte entre procesos. "cookie"
+# guarda la sesión firmada en el navegador (sin lecturas ni escrituras).
+_SESIONES_DISPONIBLES = {
+    "db": "core.sesiones.db",
+    "cache": "core.sesiones.cached_db",
+    "cookie": "core.sesiones.signed_cookies",
+}
+SESSION_ENGINE = _SESIONES_DISPONIBLES[
+    os.getenv("SESIONES", "cache" if os.getenv("REDIS_URL") else "db")
+]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
 AUTH_USER_MODEL = "usuarios.Usuario"
 
+# El primer hasher es el preferido: los hashes con otro esquema (p. ej. los
+# PBKDF2 anteriores) se regeneran con él en el siguiente login correcto.
+_PASSWORD_HASHERS_DISPONIBLES = {
+    "scrypt": "usuarios.hashers.ConfigurableScryptPasswordHasher",
+    "argon2": "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "pbkdf2": "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+}
+_PASSWORD_HASHER = os.getenv("PASSWORD_HASHER", "scrypt")
+
+PASSWORD_HASHERS = [
+    _PASSWORD_HASHERS_DISPONIBLES[_PASSWORD_HASHER],
+    *(
+        hasher
+        for nombre, hasher in _PASSWORD_HASHERS_DISPONIBLES.items()
+        if nombre != _PASSWORD_HASHER
+    ),
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+]
+
+PASSWORD_SCRYPT = {
+    "N": int(os.getenv("PASSWORD_SCRYPT_N", 2**14)),
+    "R": int(os.getenv("PASSWORD_SCRYPT_R", 8)),
+    "P": int(os.getenv("PASSWORD_SCRYPT_P", 1)),
+}
+
+# Pool de procesos para hashear/verificar contraseñas (usuarios.hashing).
+PASSWORD_HASHING = {
+    "WORKERS": int(os.getenv("PASSWORD_HASH_WORKERS", 0)),
+    "MAX_QUEUE": int(os.getenv("PASSWORD_HASH_MAX_QUEUE", 64)),
+    "TIMEOUT": float(os.getenv("PASSWORD_HASH_TIMEOUT", 10)),
+    "RETRY_AFTER": int(os.getenv("PASSWORD_HASH_RETRY_AFTER", 2)),
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -139,14 +243,29 @@ STATIC_URL = "static/"
 # Django REST Framework Configuration
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "usuarios.authentication.StatelessJWTAuthentication",
     ),
     # opcional: permisos por defecto
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    # El JSONRenderer de core cronometra el render para Server-Timing.
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
 }
 
+# Instrumentación por petición (core.instrumentacion): fracción de peticiones
+# con medición de SQL/secciones y cabecera Server-Timing (todas con DEBUG),
+# y repeticiones de una misma SQL que cuentan como posible N+1.
+INSTRUMENTACION_MUESTREO = float(os.getenv("INSTRUMENTACION_MUESTREO", 0.01))
+INSTRUMENTACION_UMBRAL_REPETIDAS = 5
+INSTRUMENTACION_SERVER_TIMING = True
+# Si se define, /metrics exige "Authorization: Bearer <METRICAS_TOKEN>"; si
+# no, sólo responde a peticiones locales (sin proxy) o de usuarios staff.
+METRICAS_TOKEN = os.getenv("METRICAS_TOKEN") or None
+
 # JWT Configuration
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=15),
@@ -156,4 +275,98 @@ SIMPLE_JWT = {
     "ALGORITHM": "HS256",
     "SIGNING_KEY": os.getenv("JWT_SIGNING_KEY", SECRET_KEY),
     "AUTH_HEADER_TYPES": ("Bearer",),
+    "TOKEN_USER_CLASS": "usuarios.authentication.UsuarioToken",
+    # Revocación por jti sin la app token_blacklist (usuarios.revocacion).
+    "TOKEN_REFRESH_SERIALIZER": "usuarios.serializers.RefreshRotativoSerializer",
+}
+
+# Máximo de asientos por compra (reservas.serializers.ReservaCreateSerializer).
+RESERVAS_MAX_POR_COMPRA = int(os.getenv("RESERVAS_MAX_POR_COMPRA", 10))
+
+# Minutos que se mantienen retenidos los asientos mientras se completa el pago.
+RESERVAS_RETENCION_MINUTOS = int(os.getenv("RESERVAS_RETENCION_MINUTOS", 10))
+
+# Caché donde se guarda el conjunto de usuarios revocados (usuarios.revocacion).
+USUARIOS_REVOCACION_CACHE = "default"
+# Refresh tokens revocados que cada proceso recuerda en memoria.
+USUARIOS_REVOCACION_MEMORIA = int(os.getenv("USUARIOS_REVOCACION_MEMORIA", 100_000))
+
+# Caché del detalle de usuario (usuarios.cache_perfil): alias compartido
+# (None = sólo en proceso), entradas del LRU local y TTL en segundos.
+USUARIOS_PERFIL_CACHE = "default"
+USUARIOS_PERFIL_LRU = int(os.getenv("USUARIOS_PERFIL_LRU", 1024))
+USUARIOS_PERFIL_TTL = int(os.getenv("USUARIOS_PERFIL_TTL", 300))
+
+# Filtro de Bloom de /api/usuarios/disponible/ (usuarios.disponibilidad):
+# usuarios previstos, tasa de falsos positivos, fichero para arrancar en
+# caliente (None = se reconstruye en cada proceso), segundos entre
+# sincronizaciones con los usuarios nuevos, margen en segundos para las altas
+# que se confirman tarde y si el worker carga el fichero al arrancar
+# (wsgi/asgi; sin fichero no hace nada).
+USUARIOS_DISPONIBLE_CAPACIDAD = int(
+    os.getenv("USUARIOS_DISPONIBLE_CAPACIDAD", 1_000_000)
+)
+USUARIOS_DISPONIBLE_ERROR = 0.001
+USUARIOS_DISPONIBLE_FICHERO = os.getenv("USUARIOS_DISPONIBLE_FICHERO") or None
+USUARIOS_DISPONIBLE_REFRESCO = 30
+USUARIOS_DISPONIBLE_SOLAPE = 300
+USUARIOS_DISPONIBLE_PRECARGAR = os.getenv(
+    "USUARIOS_DISPONIBLE_PRECARGAR", "True"
+).lower() in ("true", "1", "t")
+
+# Usuarios por petición en las operaciones masivas (usuarios.lotes).
+USUARIOS_LOTE_MAXIMO = int(os.getenv("USUARIOS_LOTE_MAXIMO", 1000))
+
+# Sala de espera virtual (sala_espera): en picos de demanda sólo se deja
+# reservar a quien presenta un ticket admitido. TASA son tickets admitidos
+# por segundo y evento; RAFAGA los que entran sin esperar al abrir la cola;
+# TTL_EVENTOS, segundos que cada proceso recuerda los eventos en venta.
+SALA_ESPERA = {
+    "ACTIVA": os.getenv("SALA_ESPERA_ACTIVA", "False").lower() in ("true", "1", "t"),
+    "BACKEND": (
+        "sala_espera.backends.CacheBackend"
+        if os.getenv("REDIS_URL")
+        else "sala_espera.backends.MemoriaBackend"
+    ),
+    "OPCIONES": {"alias": "default"} if os.getenv("REDIS_URL") else {},
+    "TASA": int(os.getenv("SALA_ESPERA_TASA", 50)),
+    "RAFAGA": int(os.getenv("SALA_ESPERA_RAFAGA", 100)),
+    "TTL_TICKET": 3600,
+    "TTL_EVENTOS": 30,
+    "RUTAS_PROTEGIDAS": [("POST", r"^/api/reservas/$")],
+}
+
+# Límite de peticiones de login y registro (core.limitador), por IP, por
+# username y por ruta, con tasas "N/periodo" como las de DRF. Con Redis los
+# contadores se comparten entre workers; sin él, cada proceso lleva los suyos.
+LIMITES = {
+    "ACTIVO": os.getenv("LIMITES_ACTIVO", "False").lower() in ("true", "1", "t"),
+    "BACKEND": (
+        "core.limitador.CacheBackend"
+        if os.getenv("REDIS_URL")
+        else "core.limitador.MemoriaBackend"
+    ),
+    "OPCIONES": {"alias": "default"} if os.getenv("REDIS_URL") else {"shards": 16},
+    "REGLAS": {
+        "login": {
+            "ip": os.getenv("LIMITE_LOGIN_IP", "30/min"),
+            "username": os.getenv("LIMITE_LOGIN_USERNAME", "10/min"),
+            "ruta": os.getenv("LIMITE_LOGIN_RUTA", "3000/min"),
+        },
+        "registro": {
+            "ip": os.getenv("LIMITE_REGISTRO_IP", "20/hour"),
+            "ruta": os.getenv("LIMITE_REGISTRO_RUTA", "600/min"),
+        },
+    },
+}
+
+# Caché de la portada y de los fragmentos HTML (core.cache_html). Los
+# fragmentos son frescos TTL segundos y se sirven obsoletos OBSOLETA segundos
+# más mientras una sola petición los recalcula. La página anónima también, o
+# hasta que empieza el primer evento que lista; además se recalcula al cambiar
+# eventos y con `manage.py precalcular_paginas`.
+CACHE_HTML = {
+    "CACHE": "default",
+    "TTL": int(os.getenv("CACHE_HTML_TTL", 60)),
+    "OBSOLETA": int(os.getenv("CACHE_HTML_OBSOLETA", 300)),
 }
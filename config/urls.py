@@ -16,26 +16,14 @@ Including another URLconf
 """
 
 from django.contrib import admin
-from django.urls import path, include
-from rest_framework.routers import DefaultRouter
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
-)
+from django.urls import include, path
 
-from usuarios.views_api import UsuarioViewSet, CustomTokenObtainPairView
-from core.views import home
-
-router = DefaultRouter()
-router.register(r"usuarios", UsuarioViewSet)
+from core.views import home, metricas
 
 urlpatterns = [
     path("", home, name="home"),
     path("admin/", admin.site.urls),
+    path("metrics", metricas, name="metricas"),
     path("user/", include("usuarios.urls")),
-    # API routes
-    path("api/", include(router.urls)),
-    # JWT Auth
-    path("api/token/", CustomTokenObtainPairView.as_view(), name="token_obtain_pair"),
-    path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("api/", include("config.urls_api")),
 ]
@@ -0,0 +1,25 @@
+"""
+Rutas de la API (``/api/``), incluidas desde ``config.urls``.
+"""
+
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+from rest_framework_simplejwt.views import TokenRefreshView
+
+from eventos.views import EventoViewSet
+from reservas.views import ReservaViewSet, SeccionViewSet
+from usuarios.views_api import CustomTokenObtainPairView, UsuarioViewSet
+
+router = DefaultRouter()
+router.register(r"usuarios", UsuarioViewSet)
+router.register(r"eventos", EventoViewSet)
+router.register(r"secciones", SeccionViewSet)
+router.register(r"reservas", ReservaViewSet)
+
+urlpatterns = [
+    path("sala-espera/", include("sala_espera.urls")),
+    path("", include(router.urls)),
+    # JWT Auth
+    path("token/", CustomTokenObtainPairView.as_view(), name="token_obtain_pair"),
+    path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+]
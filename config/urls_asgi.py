@@ -0,0 +1,11 @@
+"""
+URLs para despliegues ASGI (``API_ASYNC=True``): los endpoints más llamados
+se resuelven con las vistas asíncronas de ``usuarios.views_async`` y el
+resto con las mismas rutas de ``config.urls``.
+"""
+
+from django.urls import include, path
+
+from .urls import urlpatterns as urlpatterns_sync
+
+urlpatterns = [path("api/", include("usuarios.urls_async")), *urlpatterns_sync]
@@ -0,0 +1,122 @@
+"""
+Coste de arranque de un proceso (``manage.py perfil_arranque``).
+
+Cada medición lanza un intérprete nuevo con ``python -X importtime`` que hace
+lo mismo que un worker al arrancar (``OBJETIVOS``) y devuelve:
+
+- ``segundos``: tiempo de pared del proceso hijo completo, intérprete
+  incluido; es lo que tarda un worker nuevo en estar listo.
+- ``modulos``: ``(modulo, propio_us, acumulado_us, profundidad)`` por cada
+  importación, tal como los escribe ``-X importtime``.
+
+``agrupar()`` suma el tiempo propio por paquete de primer nivel (una app de
+``INSTALLED_APPS`` o una dependencia), de modo que se ve qué app o
+librería se lleva el arranque.
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict, namedtuple
+
+from django.conf import settings
+
+Importacion = namedtuple("Importacion", "modulo propio_us acumulado_us profundidad")
+Medicion = namedtuple("Medicion", "segundos modulos")
+
+OBJETIVOS = {
+    # Carga de settings y ``AppConfig.ready()`` (lo común a todo proceso).
+    "setup": "import django; django.setup()",
+    # Arranque de un worker: setup más la pila de middleware.
+    "wsgi": "import config.wsgi",
+    "asgi": "import config.asgi",
+    # Primera petición (``/``): importa el URLconf completo.
+    "rutas": (
+        "import config.wsgi; from django.urls import get_resolver; "
+        "get_resolver().resolve('/')"
+    ),
+    # Todas las URLs resueltas (lo que hace el primer ``reverse()``).
+    "completo": (
+        "import config.wsgi; from django.urls import get_resolver; "
+        "get_resolver().reverse_dict"
+    ),
+}
+
+
+def _entorno():
+    """Entorno del hijo: mismos settings y mismo ``sys.path`` que este proceso."""
+    entorno = dict(os.environ)
+    entorno["DJANGO_SETTINGS_MODULE"] = settings.SETTINGS_MODULE
+    entorno["PYTHONPATH"] = os.pathsep.join(p for p in sys.path if p)
+    # Se mide el arranque, no la base de datos de turno.
+    entorno["USUARIOS_DISPONIBLE_PRECARGAR"] = "False"
+    return entorno
+
+
+def parsear_importtime(salida):
+    """Filas de ``-X importtime`` (stderr) como ``Importacion``."""
+    filas = []
+    for linea in salida.splitlines():
+        if not linea.startswith("import time:"):
+            continue
+        partes = linea[len("import time:") :].split("|")
+        if len(partes) != 3 or not partes[0].strip().isdigit():
+            # La cabecera "self [us] | cumulative | imported package".
+            continue
+        nombre = partes[2].rstrip()
+        filas.append(
+            Importacion(
+                nombre.strip(),
+                int(partes[0]),
+                int(partes[1]),
+                (len(nombre) - len(nombre.lstrip())) // 2,
+            )
+        )
+    return filas
+
+
+def medir(objetivo, importtime=True):
+    """Arranca un proceso que ejecuta ``OBJETIVOS[objetivo]`` y lo mide."""
+    comando = [sys.executable]
+    if importtime:
+        comando += ["-X", "importtime"]
+    comando += ["-c", OBJETIVOS[objetivo]]
+    inicio = time.perf_counter()
+    resultado = subprocess.run(
+        comando, env=_entorno(), capture_output=True, text=True, check=False
+    )
+    segundos = time.perf_counter() - inicio
+    if resultado.returncode:
+        raise RuntimeError(
+            f"El arranque '{objetivo}' falló:\n{resultado.stderr[-2000:]}"
+        )
+    modulos = parsear_importtime(resultado.stderr) if importtime else []
+    return Medicion(segundos, modulos)
+
+
+def medir_arranque(objetivo, repeticiones=5):
+    """
+    Mediana del tiempo de pared de ``repeticiones`` arranques, sin
+    ``-X importtime`` (que añade su propio coste), más una medición con él.
+    """
+    # El primero compila o lee los .pyc y calienta la caché del sistema de
+    # ficheros: no es un arranque representativo.
+    medir(objetivo, importtime=False)
+    tiempos = [medir(objetivo, importtime=False).segundos for _ in range(repeticiones)]
+    return statistics.median(tiempos), medir(objetivo).modulos
+
+
+def agrupar(modulos):
+    """
+    ``{paquete: propio_us}`` ordenado de mayor a menor. La biblioteca
+    estándar se suma bajo ``(stdlib)``.
+    """
+    totales = defaultdict(int)
+    for importacion in modulos:
+        paquete = importacion.modulo.split(".")[0]
+        if paquete in sys.stdlib_module_names:
+            paquete = "(stdlib)"
+        totales[paquete] += importacion.propio_us
+    return dict(sorted(totales.items(), key=lambda par: par[1], reverse=True))
@@ -0,0 +1,86 @@
+"""
+Utilidades compartidas por los comandos ``bench_*`` del proyecto.
+
+Los benchmarks trabajan contra la base de datos configurada y siembran sus
+datos dentro de una transacción que se deshace al terminar (``revertir``),
+de modo que pueden ejecutarse sobre una base de desarrollo sin ensuciarla.
+"""
+
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+
+def percentil(muestras, p):
+    """Percentil ``p`` (0-100) por interpolación lineal."""
+    if not muestras:
+        return 0.0
+    ordenadas = sorted(muestras)
+    k = (len(ordenadas) - 1) * p / 100
+    inferior = int(k)
+    superior = min(inferior + 1, len(ordenadas) - 1)
+    return ordenadas[inferior] + (ordenadas[superior] - ordenadas[inferior]) * (
+        k - inferior
+    )
+
+
+def resumir(muestras):
+    """Resumen en milisegundos de una lista de duraciones en segundos."""
+    ms = [m * 1000 for m in muestras]
+    return {
+        "n": len(ms),
+        "min_ms": round(min(ms), 3) if ms else 0.0,
+        "media_ms": round(statistics.fmean(ms), 3) if ms else 0.0,
+        "p50_ms": round(percentil(ms, 50), 3),
+        "p95_ms": round(percentil(ms, 95), 3),
+        "p99_ms": round(percentil(ms, 99), 3),
+        "max_ms": round(max(ms), 3) if ms else 0.0,
+    }
+
+
+def cronometrar(funcion, repeticiones=5, calentamiento=1):
+    """Ejecuta ``funcion`` y devuelve la duración (s) de cada repetición."""
+    for _ in range(calentamiento):
+        funcion()
+    muestras = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        muestras.append(time.perf_counter() - inicio)
+    return muestras
+
+
+@contextmanager
+def revertir(using=None):
+    """Ejecuta el bloque en una transacción que se deshace al salir."""
+    with transaction.atomic(using=using):
+        yield
+        transaction.set_rollback(True, using=using)
+
+
+def sembrar_usuarios(n, prefijo="bench", lote=5000, password=None):
+    """
+    Crea ``n`` usuarios con ``bulk_create``. Sin ``password`` se guarda una
+    contraseña inutilizable, que no cuesta ningún hash.
+    """
+    from usuarios.models import Usuario
+
+    encoded = make_password(password)
+    creados = 0
+    while creados < n:
+        fin = min(creados + lote, n)
+        Usuario.objects.bulk_create(
+            Usuario(
+                username=f"{prefijo}{i}",
+                email=f"{prefijo}{i}@bench.local",
+                nombre="Bench",
+                apellido=str(i),
+                password=encoded,
+            )
+            for i in range(creados, fin)
+        )
+        creados = fin
+    return creados
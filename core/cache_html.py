@@ -0,0 +1,409 @@
+"""
+Caché de páginas y fragmentos HTML.
+
+- ``pagina_anonima(nombre, grupos)``: decorador de vista. A un visitante sin
+  cookie de sesión ni de mensajes se le sirve la página ya renderizada sin
+  tocar la sesión, el usuario ni la base de datos. Con cualquiera de las dos
+  cookies la vista se ejecuta normalmente (sus fragmentos siguen cacheados).
+- ``{% fragmento nombre variante... depende grupo... %}`` (librería
+  ``cache_html``): cachea un trozo de plantilla por cada combinación de
+  variantes, p. ej. anónimo/autenticado o ``user.pk``.
+
+Cada entrada depende de unos *grupos* (``"eventos"``, ``"usuario:<pk>"``)
+con una generación (un token aleatorio) en la caché compartida. Se guarda
+junto a las generaciones con las que se calculó, y deja de ser fresca cuando
+alguna cambia o pasa su TTL. ``invalidar_html`` renueva las generaciones al
+confirmar la transacción; se llama desde las señales de ``Evento`` y
+``Usuario``. Las escrituras que no emiten señales (``bulk_create``,
+``QuerySet.update()``) deben llamarla a mano.
+
+Protección frente a estampidas:
+
+- Una entrada obsoleta la recalcula sólo quien consigue el cerrojo
+  (``cache.add``); el resto sirve la copia obsoleta mientras tanto.
+- Sin copia, quien no consigue el cerrojo espera hasta ``ESPERA`` segundos a
+  que aparezca antes de calcularla por su cuenta.
+
+Las páginas anónimas son frescas ``TTL`` segundos, o menos si la vista marca
+con ``caducar`` cuándo deja de valer lo que muestra (el primer evento que
+lista empieza y sale de la lista). Al invalidar sus grupos se recalculan en
+el propio proceso que escribió, con el cerrojo cogido antes de cambiar la
+generación, de modo que ninguna petición anónima las encuentra obsoletas sin
+que otro las esté recalculando. ``manage.py precalcular_paginas`` las
+calcula tras un despliegue. Sólo una caché vacía hace que una petición
+anónima llegue a la base de datos.
+"""
+
+import functools
+import hashlib
+import logging
+import math
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.http import HttpRequest, HttpResponse
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
+
+from core.metrics import registro
+from core.replicas import en_primaria
+
+logger = logging.getLogger(__name__)
+
+CONFIG_POR_DEFECTO = {
+    "CACHE": "default",
+    "PREFIJO": "html:",
+    # Segundos que un fragmento es fresco y, después, que se sigue sirviendo
+    # obsoleto mientras una sola petición lo recalcula.
+    "TTL": 60,
+    "OBSOLETA": 300,
+    # Espera máxima (s) por una entrada que otra petición está calculando y
+    # duración del cerrojo de cálculo.
+    "ESPERA": 2.0,
+    "BLOQUEO": 30,
+    # Recalcular las páginas anónimas al invalidar sus grupos.
+    "PRECALCULAR": True,
+}
+
+# Como las versiones de ``usuarios.cache_perfil``: perder una generación sólo
+# obliga a recalcular las entradas que dependen de ella.
+TTL_GRUPO = 24 * 3600
+
+CONSULTAS = registro.counter(
+    "cache_html_total",
+    "Lecturas de páginas y fragmentos HTML por resultado de la caché.",
+    etiquetas=("resultado",),
+)
+
+# Páginas anónimas registradas con ``pagina_anonima``, por nombre.
+PAGINAS = {}
+
+
+def configuracion():
+    config = dict(CONFIG_POR_DEFECTO)
+    config.update(getattr(settings, "CACHE_HTML", {}))
+    return config
+
+
+def grupo_usuario(pk):
+    """Grupo de las entradas con datos de un usuario."""
+    return f"usuario:{pk}"
+
+
+class CacheHtml:
+    def __init__(
+        self,
+        alias="default",
+        prefijo="html:",
+        ttl=60,
+        obsoleta=300,
+        espera=2.0,
+        bloqueo=30,
+        precalcular=True,
+    ):
+        self.alias = alias
+        self.prefijo = prefijo
+        self.ttl = ttl
+        self.obsoleta = obsoleta
+        self.espera = espera
+        self.bloqueo = bloqueo
+        self.precalcular = precalcular
+
+    @classmethod
+    def desde_settings(cls):
+        config = configuracion()
+        return cls(
+            config["CACHE"],
+            config["PREFIJO"],
+            config["TTL"],
+            config["OBSOLETA"],
+            config["ESPERA"],
+            config["BLOQUEO"],
+            config["PRECALCULAR"],
+        )
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _clave_grupo(self, grupo):
+        return f"{self.prefijo}grupo:{grupo}"
+
+    def _clave_bloqueo(self, clave):
+        return f"{clave}:bloqueo"
+
+    # -- Lectura ------------------------------------------------------------
+
+    def obtener(self, clave, generar, grupos=(), ttl=False):
+        """
+        Valor cacheado bajo ``clave``. ``generar()`` lo calcula en un fallo;
+        si devuelve ``None`` no se guarda nada. ``ttl=None`` no caduca por
+        tiempo; por defecto, el ``TTL`` de la configuración. Si ``ttl`` es
+        una función, se llama tras ``generar()``.
+        """
+        clave = f"{self.prefijo}{clave}"
+        ttl = self.ttl if ttl is False else ttl
+        cache = self.cache
+        claves_grupo = [self._clave_grupo(grupo) for grupo in grupos]
+        # Entrada y generaciones en un solo viaje a la caché.
+        leido = cache.get_many([clave, *claves_grupo])
+        generaciones = tuple(leido.get(c) for c in claves_grupo)
+
+        entrada = leido.get(clave)
+        if entrada is not None:
+            valor, fresca_hasta, vigentes = entrada
+            if vigentes == generaciones and (
+                fresca_hasta is None or time.time() < fresca_hasta
+            ):
+                CONSULTAS.inc(resultado="fresca")
+                return valor
+            if not cache.add(self._clave_bloqueo(clave), 1, self.bloqueo):
+                CONSULTAS.inc(resultado="obsoleta")
+                return valor
+            CONSULTAS.inc(resultado="recalculada")
+            return self._generar(clave, generar, generaciones, ttl, bloqueada=True)
+
+        if cache.add(self._clave_bloqueo(clave), 1, self.bloqueo):
+            CONSULTAS.inc(resultado="fallo")
+            return self._generar(clave, generar, generaciones, ttl, bloqueada=True)
+
+        limite = time.monotonic() + self.espera
+        while time.monotonic() < limite:
+            time.sleep(0.02)
+            entrada = cache.get(clave)
+            if entrada is not None:
+                CONSULTAS.inc(resultado="esperada")
+                return entrada[0]
+        # Quien la calculaba tarda demasiado o ha fallado.
+        CONSULTAS.inc(resultado="fallo")
+        return self._generar(clave, generar, generaciones, ttl, bloqueada=False)
+
+    def _generar(self, clave, generar, generaciones, ttl, bloqueada):
+        try:
+            # De la primaria: una réplica retrasada guardaría datos viejos con
+            # las generaciones nuevas.
+            with en_primaria():
+                valor = generar()
+                if callable(ttl):
+                    ttl = ttl()
+            if valor is not None:
+                if ttl is None:
+                    fresca_hasta, timeout = None, None
+                else:
+                    fresca_hasta, timeout = time.time() + ttl, ttl + self.obsoleta
+                self.cache.set(clave, (valor, fresca_hasta, generaciones), timeout)
+            return valor
+        finally:
+            if bloqueada:
+                self.cache.delete(self._clave_bloqueo(clave))
+
+    # -- Invalidación -------------------------------------------------------
+
+    def invalidar(self, grupos):
+        """
+        Renueva la generación de ``grupos`` y recalcula las páginas anónimas
+        que dependen de ellos.
+        """
+        grupos = set(grupos)
+        paginas = (
+            [p for p in PAGINAS.values() if grupos & set(p.grupos)]
+            if self.precalcular
+            else []
+        )
+        cache = self.cache
+        # El cerrojo antes que la generación: las peticiones que vean la
+        # página obsoleta la sirven tal cual en vez de recalcularla.
+        bloqueadas = [
+            p
+            for p in paginas
+            if cache.add(
+                self._clave_bloqueo(f"{self.prefijo}{p.clave}"), 1, self.bloqueo
+            )
+        ]
+        cache.set_many(
+            {self._clave_grupo(grupo): uuid.uuid4().hex for grupo in grupos},
+            TTL_GRUPO,
+        )
+        for pagina in bloqueadas:
+            try:
+                self.precalcular_pagina(pagina, bloqueada=True)
+            except Exception:
+                logger.exception("No se pudo precalcular la página %s", pagina.nombre)
+
+    def precalcular_pagina(self, pagina, bloqueada=False):
+        """Renderiza ``pagina`` para un visitante anónimo y la guarda."""
+        clave = f"{self.prefijo}{pagina.clave}"
+        if not bloqueada and not self.cache.add(
+            self._clave_bloqueo(clave), 1, self.bloqueo
+        ):
+            return None
+        claves_grupo = [self._clave_grupo(grupo) for grupo in pagina.grupos]
+        leido = self.cache.get_many(claves_grupo)
+        generaciones = tuple(leido.get(c) for c in claves_grupo)
+        request = peticion_anonima(pagina.ruta())
+        return self._generar(
+            clave,
+            lambda: pagina.renderizar(request),
+            generaciones,
+            lambda: pagina.frescura(request, self.ttl),
+            bloqueada=True,
+        )
+
+
+_cache = None
+_lock = threading.Lock()
+
+
+def cache_html():
+    global _cache
+    with _lock:
+        if _cache is None:
+            _cache = CacheHtml.desde_settings()
+        return _cache
+
+
+def invalidar_html(*grupos):
+    """
+    Invalida las entradas que dependen de ``grupos`` al confirmar la
+    transacción: antes, una lectura concurrente aún vería los datos viejos.
+    """
+    if not grupos:
+        return
+    cache = cache_html()
+    transaction.on_commit(lambda: cache.invalidar(grupos))
+
+
+def _reiniciar(*, setting, **kwargs):
+    global _cache
+    if setting == "CACHE_HTML":
+        _cache = None
+
+
+setting_changed.connect(_reiniciar)
+
+
+# -- Páginas anónimas ------------------------------------------------------
+
+
+def sin_estado(request):
+    """
+    ``True`` si la petición es de un visitante sin sesión ni mensajes: su
+    página es la misma para todos y servirla no necesita la sesión.
+    """
+    return (
+        request.method in ("GET", "HEAD")
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and CookieStorage.cookie_name not in request.COOKIES
+    )
+
+
+def peticion_anonima(ruta):
+    """``GET ruta`` de un visitante anónimo, para precalcular fuera de una petición."""
+    request = HttpRequest()
+    request.method = "GET"
+    request.path = request.path_info = ruta
+    request.user = AnonymousUser()
+    return request
+
+
+def caducar(request, momento):
+    """
+    La página anónima que se renderiza para ``request`` deja de ser fresca en
+    ``momento`` (un ``datetime`` o ``None``), si es antes de su ``TTL``.
+    Puede ser una función: sólo se llama si la página se guarda.
+    """
+    request.__dict__.setdefault("_caducidades_cache_html", []).append(momento)
+
+
+class Pagina:
+    def __init__(self, nombre, vista, grupos):
+        self.nombre = nombre
+        self.vista = vista
+        self.grupos = tuple(grupos)
+
+    @property
+    def clave(self):
+        return f"pagina:{self.nombre}"
+
+    def ruta(self):
+        return reverse(self.nombre)
+
+    def renderizar(self, request, *args, **kwargs):
+        """
+        ``(contenido, content_type)`` de la respuesta de la vista, o ``None``
+        si no se puede compartir (no es un 200 o deja cookies).
+        """
+        respuesta = self.vista(request, *args, **kwargs)
+        request._respuesta_cache_html = respuesta
+        if (
+            respuesta.status_code != 200
+            or respuesta.streaming
+            or respuesta.cookies
+            or request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+        ):
+            return None
+        return respuesta.content, respuesta["Content-Type"]
+
+    def frescura(self, request, ttl):
+        """Segundos que es fresca la página renderizada para ``request``."""
+        for momento in getattr(request, "_caducidades_cache_html", ()):
+            if callable(momento):
+                momento = momento()
+            if momento is not None:
+                restante = math.ceil(momento.timestamp() - time.time())
+                # Al menos un segundo: una página ya caducada no se recalcula
+                # en cada petición.
+                ttl = max(1, restante if ttl is None else min(ttl, restante))
+        return ttl
+
+
+def pagina_anonima(nombre, grupos=()):
+    """
+    Sirve la vista cacheada a los visitantes ``sin_estado``. ``nombre`` es el
+    nombre de su URL (se usa para precalcularla) y ``grupos`` los de los datos
+    que muestra. Es fresca ``TTL`` segundos o hasta lo marcado con
+    ``caducar``; después se sirve obsoleta mientras una petición la recalcula.
+    """
+
+    def decorador(vista):
+        pagina = Pagina(nombre, vista, grupos)
+        PAGINAS[nombre] = pagina
+
+        @functools.wraps(vista)
+        def envoltorio(request, *args, **kwargs):
+            if not sin_estado(request):
+                return vista(request, *args, **kwargs)
+            cache = cache_html()
+            valor = cache.obtener(
+                pagina.clave,
+                lambda: pagina.renderizar(request, *args, **kwargs),
+                pagina.grupos,
+                ttl=lambda: pagina.frescura(request, cache.ttl),
+            )
+            # Recién calculada (o no compartible): la respuesta de la vista.
+            respuesta = getattr(request, "_respuesta_cache_html", None)
+            if respuesta is not None:
+                return respuesta
+            contenido, content_type = valor
+            respuesta = HttpResponse(contenido, content_type=content_type)
+            patch_vary_headers(respuesta, ("Cookie",))
+            return respuesta
+
+        return envoltorio
+
+    return decorador
+
+
+def clave_fragmento(nombre, variantes):
+    """Clave de un fragmento; las variantes van resumidas, como en ``{% cache %}``."""
+    resumen = hashlib.md5(
+        ":".join(str(v) for v in variantes).encode(), usedforsecurity=False
+    ).hexdigest()
+    return f"fragmento:{nombre}:{resumen}"
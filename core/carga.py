@@ -0,0 +1,243 @@
+"""
+Generador de carga para los benchmarks de la API (``bench_api``).
+
+Una ``Peticion`` se atiende con uno de dos clientes, que devuelven
+``(segundos, estado, consultas)``:
+
+- ``ClienteEnProceso``: el ``Client`` de pruebas de Django, un cliente por
+  hilo, sin red. Cuenta las consultas de la petición con un
+  ``execute_wrapper`` en cada conexión (``core.instrumentacion.Muestra``).
+- ``ClienteHTTP``: una conexión HTTP/1.1 keep-alive por hilo contra un
+  servidor real. Las consultas se leen de la cabecera ``Server-Timing``,
+  que el servidor sólo envía en las peticiones muestreadas: arrancarlo con
+  ``INSTRUMENTACION_MUESTREO=1`` (o ``DEBUG``) para tenerlas siempre.
+
+``ejecutar()`` reparte las peticiones entre N hilos y ``comparar()`` busca
+regresiones frente a una línea base guardada.
+"""
+
+import http.client
+import re
+import statistics
+import threading
+import time
+from collections import Counter, namedtuple
+from contextlib import ExitStack
+from urllib.parse import urlsplit
+
+from django.db import connections
+from django.test import Client
+
+from core.benchmark import resumir
+from core.instrumentacion import Muestra
+
+Peticion = namedtuple("Peticion", "metodo ruta cabeceras cuerpo")
+
+# Métricas de latencia comparadas con la línea base. p99 se informa pero no se
+# compara: con pocos cientos de peticiones es demasiado ruidoso.
+LATENCIAS = ("p50_ms", "p95_ms")
+# Margen absoluto de consultas por petición: con concurrencia, dos hilos
+# pueden fallar a la vez en la misma entrada de una caché.
+MARGEN_CONSULTAS = 0.05
+
+_CONSULTAS = re.compile(r'desc="(\d+) consultas"')
+
+
+class ClienteEnProceso:
+    def __init__(self):
+        self._local = threading.local()
+
+    def _client(self):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = Client(raise_request_exception=False)
+        return client
+
+    def __call__(self, peticion):
+        client = self._client()
+        # Sin estado entre peticiones, como el cliente HTTP.
+        client.cookies.clear()
+        muestra = Muestra()
+        with ExitStack() as wrappers:
+            for conexion in connections.all():
+                wrappers.enter_context(conexion.execute_wrapper(muestra))
+            inicio = time.perf_counter()
+            response = client.generic(
+                peticion.metodo,
+                peticion.ruta,
+                peticion.cuerpo,
+                content_type="application/json",
+                headers=peticion.cabeceras,
+            )
+            segundos = time.perf_counter() - inicio
+        return segundos, response.status_code, muestra.consultas
+
+
+class ClienteHTTP:
+    def __init__(self, url, timeout=30):
+        partes = urlsplit(url)
+        if partes.scheme != "http" or not partes.hostname:
+            raise ValueError(
+                f"URL no soportada: {url!r} (se espera http://host:puerto)"
+            )
+        self.host = partes.hostname
+        self.puerto = partes.port or 80
+        self.prefijo = partes.path.rstrip("/")
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _conexion(self):
+        conexion = getattr(self._local, "conexion", None)
+        if conexion is None:
+            conexion = self._local.conexion = http.client.HTTPConnection(
+                self.host, self.puerto, timeout=self.timeout
+            )
+        return conexion
+
+    def __call__(self, peticion):
+        cabeceras = {"Content-Type": "application/json", **peticion.cabeceras}
+        inicio = time.perf_counter()
+        try:
+            conexion = self._conexion()
+            conexion.request(
+                peticion.metodo,
+                self.prefijo + peticion.ruta,
+                body=peticion.cuerpo,
+                headers=cabeceras,
+            )
+            response = conexion.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            # Estado 0: la conexión falló. Se abre otra en la siguiente.
+            self.cerrar()
+            return time.perf_counter() - inicio, 0, None
+        segundos = time.perf_counter() - inicio
+        if response.will_close:
+            self.cerrar()
+        encontrado = _CONSULTAS.search(response.getheader("Server-Timing") or "")
+        consultas = int(encontrado.group(1)) if encontrado else None
+        return segundos, response.status, consultas
+
+    def cerrar(self):
+        conexion = getattr(self._local, "conexion", None)
+        if conexion is not None:
+            conexion.close()
+            self._local.conexion = None
+
+
+def _resumen(resultados, segundos):
+    estados = Counter(estado for _, estado, _ in resultados)
+    consultas = [c for _, _, c in resultados if c is not None]
+    return {
+        "peticiones": len(resultados),
+        "peticiones_por_segundo": round(len(resultados) / segundos, 1)
+        if segundos
+        else 0.0,
+        "errores": sum(n for estado, n in estados.items() if not 200 <= estado < 400),
+        "estados": {str(estado): n for estado, n in sorted(estados.items())},
+        **resumir([s for s, _, _ in resultados]),
+        "consultas_por_peticion": round(statistics.fmean(consultas), 2)
+        if consultas
+        else None,
+    }
+
+
+def ejecutar(generar, atender, peticiones, concurrencia=1, calentamiento=0):
+    """
+    Atiende ``calentamiento`` peticiones sin medirlas y luego ``peticiones``
+    con ``concurrencia`` hilos. ``generar()`` construye cada ``Peticion``
+    fuera del tiempo medido. Con concurrencia 1 se usa el hilo actual (y su
+    conexión a la BD, necesario dentro de un ``TestCase``).
+    """
+    for _ in range(calentamiento):
+        atender(generar())
+
+    pendientes = peticiones
+    lock = threading.Lock()
+    resultados = []
+
+    def trabajar():
+        nonlocal pendientes
+        while True:
+            with lock:
+                if pendientes <= 0:
+                    return
+                pendientes -= 1
+                peticion = generar()
+            resultado = atender(peticion)
+            with lock:
+                resultados.append(resultado)
+
+    def trabajar_y_cerrar():
+        try:
+            trabajar()
+        finally:
+            cerrar = getattr(atender, "cerrar", None)
+            if cerrar is not None:
+                cerrar()
+            connections.close_all()
+
+    inicio = time.perf_counter()
+    if concurrencia <= 1:
+        trabajar()
+    else:
+        hilos = [
+            threading.Thread(target=trabajar_y_cerrar) for _ in range(concurrencia)
+        ]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+    return _resumen(resultados, time.perf_counter() - inicio)
+
+
+def comparar(actual, base, tolerancia=0.25, solo_consultas=False):
+    """
+    Regresiones de ``actual`` frente a ``base`` (ambos con la forma que
+    produce ``bench_api``), como lista de mensajes:
+
+    - Más consultas por petición o una fracción de errores mayor: siempre.
+    - Latencias (p50/p95) más de ``tolerancia`` por encima, o throughput más
+      de ``tolerancia`` por debajo, salvo con ``solo_consultas`` (las
+      latencias dependen de la máquina; las consultas no).
+    """
+    regresiones = []
+    referencia = base.get("escenarios", {})
+    for nombre, medido in actual["escenarios"].items():
+        ref = referencia.get(nombre)
+        if ref is None:
+            continue
+        if (
+            medido["consultas_por_peticion"] is not None
+            and ref.get("consultas_por_peticion") is not None
+            and medido["consultas_por_peticion"]
+            > ref["consultas_por_peticion"] + MARGEN_CONSULTAS
+        ):
+            regresiones.append(
+                f"{nombre}: consultas por petición "
+                f"{ref['consultas_por_peticion']} -> {medido['consultas_por_peticion']}"
+            )
+        errores = medido["errores"] / max(medido["peticiones"], 1)
+        errores_ref = ref.get("errores", 0) / max(ref.get("peticiones", 1), 1)
+        if errores > errores_ref:
+            regresiones.append(
+                f"{nombre}: errores {errores_ref:.1%} -> {errores:.1%} "
+                f"(estados {medido['estados']})"
+            )
+        if solo_consultas:
+            continue
+        for metrica in LATENCIAS:
+            if ref.get(metrica) and medido[metrica] > ref[metrica] * (1 + tolerancia):
+                regresiones.append(
+                    f"{nombre}: {metrica} {ref[metrica]} -> {medido[metrica]} "
+                    f"(+{medido[metrica] / ref[metrica] - 1:.0%})"
+                )
+        throughput = ref.get("peticiones_por_segundo")
+        if throughput and medido["peticiones_por_segundo"] < throughput / (
+            1 + tolerancia
+        ):
+            regresiones.append(
+                f"{nombre}: peticiones/s {throughput} -> "
+                f"{medido['peticiones_por_segundo']}"
+            )
+    return regresiones
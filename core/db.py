@@ -0,0 +1,161 @@
+"""
+Conexiones a PostgreSQL configuradas por variables de entorno.
+
+``opciones_conexion()`` devuelve las claves de ``DATABASES["default"]`` que
+controlan la vida de las conexiones (se mezclan con las ``DB_*`` en
+``settings.py``):
+
+- ``DB_POOL=True``: pool nativo de psycopg 3 (``psycopg_pool``) por proceso,
+  con ``DB_POOL_MIN_SIZE``/``DB_POOL_MAX_SIZE`` conexiones, una espera máxima
+  de ``DB_POOL_TIMEOUT`` segundos por conexión y reciclado por inactividad
+  (``DB_POOL_MAX_IDLE``) y edad (``DB_POOL_MAX_LIFETIME``). El pool comprueba
+  cada conexión antes de prestarla.
+- Sin pool: conexiones persistentes (``DB_CONN_MAX_AGE`` segundos) con
+  ``CONN_HEALTH_CHECKS``.
+- ``DB_STATEMENT_TIMEOUT`` (ms, 0 = sin límite) se fija al abrir la conexión
+  con ``-c statement_timeout``; ``DB_CONNECT_TIMEOUT`` limita la apertura.
+
+``replicas_desde_entorno()`` añade las réplicas de lectura de ``DB_REPLICAS``
+(ver ``core.replicas``).
+
+El módulo se importa desde ``settings.py``: no debe importar ``django.db`` a
+nivel de módulo.
+"""
+
+import copy
+import os
+
+from core.metrics import registro
+
+
+def _bool(valor):
+    return str(valor).lower() in ("true", "1", "t")
+
+
+def opciones_conexion(entorno=None):
+    entorno = os.environ if entorno is None else entorno
+    opciones = {}
+
+    statement_timeout = int(entorno.get("DB_STATEMENT_TIMEOUT", 0))
+    if statement_timeout:
+        opciones["options"] = f"-c statement_timeout={statement_timeout}"
+    connect_timeout = int(entorno.get("DB_CONNECT_TIMEOUT", 0))
+    if connect_timeout:
+        opciones["connect_timeout"] = connect_timeout
+
+    if not _bool(entorno.get("DB_POOL", "False")):
+        return {
+            "CONN_MAX_AGE": int(entorno.get("DB_CONN_MAX_AGE", 60)),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": opciones,
+        }
+
+    pool = {
+        "min_size": int(entorno.get("DB_POOL_MIN_SIZE", 2)),
+        "max_size": int(entorno.get("DB_POOL_MAX_SIZE", 10)),
+        "timeout": float(entorno.get("DB_POOL_TIMEOUT", 10)),
+        "max_idle": float(entorno.get("DB_POOL_MAX_IDLE", 600)),
+        "max_lifetime": float(entorno.get("DB_POOL_MAX_LIFETIME", 3600)),
+        "name": entorno.get("DB_POOL_NAME", "default"),
+    }
+    try:
+        from psycopg_pool import ConnectionPool
+    except ImportError:
+        # Django avisará al abrir la primera conexión.
+        pass
+    else:
+        pool["check"] = ConnectionPool.check_connection
+    opciones["pool"] = pool
+    # Django exige CONN_MAX_AGE = 0 con pool: cerrar es devolver al pool.
+    return {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False, "OPTIONS": opciones}
+
+
+def replicas_desde_entorno(primaria, entorno=None):
+    """
+    Alias ``replica1``, ``replica2``... de ``DB_REPLICAS="host1,host2:5433"``,
+    con la configuración de ``primaria`` y el host/puerto de cada réplica.
+    En los tests son espejos (``MIRROR``) de ``default``.
+    """
+    entorno = os.environ if entorno is None else entorno
+    replicas = {}
+    hosts = [h.strip() for h in entorno.get("DB_REPLICAS", "").split(",") if h.strip()]
+    for numero, host in enumerate(hosts, start=1):
+        host, _, puerto = host.partition(":")
+        replicas[f"replica{numero}"] = {
+            **copy.deepcopy(primaria),
+            "HOST": host,
+            "PORT": puerto or primaria.get("PORT"),
+            "TEST": {"MIRROR": "default"},
+        }
+    return replicas
+
+
+# -- Métricas --------------------------------------------------------------
+
+
+def pool_de(alias="default"):
+    """Pool de psycopg de ``alias`` si ya existe (no lo crea)."""
+    from django.db import connections
+
+    pools = getattr(type(connections[alias]), "_connection_pools", {})
+    return pools.get(alias)
+
+
+def estadisticas_pool(alias="default"):
+    """``get_stats()`` del pool de ``alias``; vacío sin pool."""
+    pool = pool_de(alias)
+    return pool.get_stats() if pool is not None else {}
+
+
+def _saturacion(alias):
+    stats = estadisticas_pool(alias)
+    if not stats.get("pool_max"):
+        return 0.0
+    en_uso = stats["pool_size"] - stats["pool_available"]
+    return round(en_uso / stats["pool_max"], 3)
+
+
+# métrica -> (clave de get_stats(), ayuda)
+METRICAS_POOL = {
+    "db_pool_conexiones": ("pool_size", "Conexiones abiertas en el pool."),
+    "db_pool_disponibles": ("pool_available", "Conexiones libres en el pool."),
+    "db_pool_esperando": (
+        "requests_waiting",
+        "Peticiones esperando ahora una conexión.",
+    ),
+    "db_pool_peticiones": (
+        "requests_num",
+        "Conexiones prestadas por el pool (acumulado).",
+    ),
+    "db_pool_peticiones_encoladas": (
+        "requests_queued",
+        "Peticiones que tuvieron que esperar una conexión (acumulado).",
+    ),
+    "db_pool_espera_ms": (
+        "requests_wait_ms",
+        "Milisegundos esperando conexiones del pool (acumulado).",
+    ),
+    "db_pool_timeouts": (
+        "requests_errors",
+        "Peticiones que agotaron DB_POOL_TIMEOUT (acumulado).",
+    ),
+    "db_pool_conexion_ms": (
+        "connections_ms",
+        "Milisegundos abriendo conexiones nuevas (acumulado).",
+    ),
+}
+
+
+def registrar_metricas_pool(alias="default"):
+    """Publica las estadísticas del pool como gauges de ``core.metrics``."""
+    for nombre, (clave, ayuda) in METRICAS_POOL.items():
+        registro.gauge(
+            nombre,
+            ayuda,
+            funcion=lambda clave=clave: estadisticas_pool(alias).get(clave, 0),
+        )
+    registro.gauge(
+        "db_pool_saturacion",
+        "Fracción de DB_POOL_MAX_SIZE en uso.",
+        funcion=lambda: _saturacion(alias),
+    )
@@ -0,0 +1,84 @@
+"""
+Exportación en streaming a CSV o JSONL.
+
+Las filas se leen con ``QuerySet.iterator(chunk_size=...)`` (cursor de
+servidor en PostgreSQL) y se codifican a medida que se envían, agrupadas en
+bloques de ``chunk_size`` filas. Ni la consulta ni la respuesta llegan a
+estar enteras en memoria: el consumo es constante sea cual sea el tamaño de
+la tabla.
+"""
+
+import csv
+import io
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+FORMATOS = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson",
+}
+
+CHUNK_SIZE = 2000
+
+
+def _bloques(filas, tamano):
+    bloque = []
+    for fila in filas:
+        bloque.append(fila)
+        if len(bloque) >= tamano:
+            yield bloque
+            bloque = []
+    if bloque:
+        yield bloque
+
+
+def codificar_csv(columnas, filas, chunk_size=CHUNK_SIZE):
+    """Genera el CSV (cabecera incluida) de ``filas`` (diccionarios)."""
+    buffer = io.StringIO()
+    escritor = csv.DictWriter(buffer, fieldnames=columnas, extrasaction="ignore")
+    escritor.writeheader()
+    for bloque in _bloques(filas, chunk_size):
+        escritor.writerows(bloque)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def codificar_jsonl(filas, chunk_size=CHUNK_SIZE):
+    """Genera una línea JSON por fila."""
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for bloque in _bloques(filas, chunk_size):
+        yield "".join(encoder.encode(fila) + "\n" for fila in bloque)
+
+
+def codificar(formato, columnas, filas, chunk_size=CHUNK_SIZE):
+    if formato == "csv":
+        return codificar_csv(columnas, filas, chunk_size)
+    return codificar_jsonl(filas, chunk_size)
+
+
+def respuesta_streaming(formato, columnas, filas, nombre, chunk_size=CHUNK_SIZE):
+    """``StreamingHttpResponse`` con la descarga de ``filas``."""
+    response = StreamingHttpResponse(
+        codificar(formato, columnas, filas, chunk_size),
+        content_type=FORMATOS[formato],
+    )
+    response["Content-Disposition"] = f'attachment; filename="{nombre}.{formato}"'
+    return response
+
+
+def volcar(salida, formato, columnas, filas, chunk_size=CHUNK_SIZE):
+    """Escribe la exportación en ``salida`` y devuelve el número de filas."""
+    contador = {"filas": 0}
+
+    def contar(filas):
+        for fila in filas:
+            contador["filas"] += 1
+            yield fila
+
+    for bloque in codificar(formato, columnas, contar(filas), chunk_size):
+        salida.write(bloque)
+    return contador["filas"]
@@ -0,0 +1,213 @@
+"""
+Instrumentación de rendimiento por petición.
+
+``InstrumentacionMiddleware`` (el primero de ``MIDDLEWARE``) registra en
+``core.metrics`` para cada vista (``resolver_match.view_name``):
+
+- Siempre: peticiones por estado y el histograma de latencia. Cuesta dos
+  ``perf_counter`` y dos incrementos, así que no se muestrea.
+- En una fracción ``INSTRUMENTACION_MUESTREO`` de las peticiones (todas con
+  ``DEBUG``): número de consultas y tiempo de SQL medidos con un
+  ``execute_wrapper`` en cada conexión, tiempo de serialización y render
+  (``seccion()``) y detección de N+1, es decir, la misma SQL ejecutada
+  ``INSTRUMENTACION_UMBRAL_REPETIDAS`` veces o más en la petición. Estas
+  peticiones llevan además la cabecera ``Server-Timing`` con el desglose.
+
+Las métricas se publican en ``/metrics`` (``core.views.metricas``) en el
+formato de texto de Prometheus.
+"""
+
+import contextvars
+import logging
+import random
+import time
+from collections import Counter
+from contextlib import ExitStack, nullcontext
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+from core.metrics import registro
+
+logger = logging.getLogger(__name__)
+
+PETICIONES = registro.counter(
+    "http_peticiones_total",
+    "Peticiones atendidas por vista, método y estado.",
+    etiquetas=("vista", "metodo", "estado"),
+)
+DURACION = registro.histogram(
+    "http_duracion_segundos",
+    "Latencia de las peticiones por vista.",
+    etiquetas=("vista",),
+)
+CONSULTAS = registro.histogram(
+    "http_consultas",
+    "Consultas SQL por petición (muestreado).",
+    etiquetas=("vista",),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+SQL = registro.histogram(
+    "http_sql_segundos",
+    "Tiempo total en SQL por petición (muestreado).",
+    etiquetas=("vista",),
+)
+SECCIONES = registro.histogram(
+    "http_seccion_segundos",
+    "Tiempo por sección de la petición: serialización, render... (muestreado).",
+    etiquetas=("vista", "seccion"),
+)
+REPETIDAS = registro.counter(
+    "http_consultas_repetidas_total",
+    "Peticiones muestreadas con una SQL repetida (posible N+1).",
+    etiquetas=("vista",),
+)
+
+SIN_RUTA = "<sin_ruta>"
+
+_muestra = contextvars.ContextVar("instrumentacion_muestra", default=None)
+
+
+def _config():
+    return {
+        "muestreo": getattr(settings, "INSTRUMENTACION_MUESTREO", 0.01),
+        "umbral": getattr(settings, "INSTRUMENTACION_UMBRAL_REPETIDAS", 5),
+        "server_timing": getattr(settings, "INSTRUMENTACION_SERVER_TIMING", True),
+    }
+
+
+class Muestra:
+    """Lo medido en una petición muestreada."""
+
+    def __init__(self):
+        self.consultas = 0
+        self.sql = 0.0
+        self.sentencias = Counter()
+        self.secciones = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        # execute_wrapper de Django: envuelve cada consulta de la conexión.
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql += time.perf_counter() - inicio
+            self.consultas += 1
+            self.sentencias[sql] += 1
+
+    def anotar(self, nombre, segundos):
+        self.secciones[nombre] = self.secciones.get(nombre, 0.0) + segundos
+
+    def repetidas(self, umbral):
+        return [(sql, n) for sql, n in self.sentencias.items() if n >= umbral]
+
+
+class _Seccion:
+    __slots__ = ("inicio", "muestra", "nombre")
+
+    def __init__(self, muestra, nombre):
+        self.muestra = muestra
+        self.nombre = nombre
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.muestra.anotar(self.nombre, time.perf_counter() - self.inicio)
+
+
+def seccion(nombre):
+    """Cronometra el bloque como ``nombre`` si la petición está muestreada."""
+    muestra = _muestra.get()
+    if muestra is None:
+        return nullcontext()
+    return _Seccion(muestra, nombre)
+
+
+def _vista(request):
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match is not None else SIN_RUTA
+
+
+def _server_timing(muestra, total):
+    partes = [
+        f'db;dur={muestra.sql * 1000:.2f};desc="{muestra.consultas} consultas"',
+        *(
+            f"{nombre};dur={segundos * 1000:.2f}"
+            for nombre, segundos in muestra.secciones.items()
+        ),
+        f"total;dur={total * 1000:.2f}",
+    ]
+    return ", ".join(partes)
+
+
+class InstrumentacionMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.asincrono = iscoroutinefunction(get_response)
+        if self.asincrono:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.asincrono:
+            return self.__acall__(request)
+        inicio = time.perf_counter()
+        muestra, token, wrappers = self._empezar()
+        try:
+            response = self.get_response(request)
+        finally:
+            self._terminar(token, wrappers)
+        self._registrar(request, response, muestra, time.perf_counter() - inicio)
+        return response
+
+    async def __acall__(self, request):
+        inicio = time.perf_counter()
+        muestra, token, wrappers = self._empezar()
+        try:
+            response = await self.get_response(request)
+        finally:
+            self._terminar(token, wrappers)
+        self._registrar(request, response, muestra, time.perf_counter() - inicio)
+        return response
+
+    def _empezar(self):
+        config = _config()
+        if settings.DEBUG or random.random() < config["muestreo"]:
+            muestra = Muestra()
+            wrappers = ExitStack()
+            for conexion in connections.all():
+                wrappers.enter_context(conexion.execute_wrapper(muestra))
+            return muestra, _muestra.set(muestra), wrappers
+        return None, None, None
+
+    @staticmethod
+    def _terminar(token, wrappers):
+        if token is not None:
+            _muestra.reset(token)
+            wrappers.close()
+
+    def _registrar(self, request, response, muestra, total):
+        vista = _vista(request)
+        PETICIONES.inc(vista=vista, metodo=request.method, estado=response.status_code)
+        DURACION.observe(total, vista=vista)
+        if muestra is None:
+            return
+
+        config = _config()
+        CONSULTAS.observe(muestra.consultas, vista=vista)
+        SQL.observe(muestra.sql, vista=vista)
+        for nombre, segundos in muestra.secciones.items():
+            SECCIONES.observe(segundos, vista=vista, seccion=nombre)
+        repetidas = muestra.repetidas(config["umbral"])
+        if repetidas:
+            REPETIDAS.inc(vista=vista)
+            sql, veces = max(repetidas, key=lambda par: par[1])
+            logger.warning(
+                "Posible N+1 en %s: %d ejecuciones de %s", vista, veces, sql[:300]
+            )
+        if config["server_timing"]:
+            response["Server-Timing"] = _server_timing(muestra, total)
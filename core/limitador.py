@@ -0,0 +1,356 @@
+"""
+Límite de peticiones por IP, por username y por ruta.
+
+Cada ámbito (``login``, ``registro``...) tiene reglas en ``LIMITES["REGLAS"]``
+con el formato de DRF (``"5/min"``) para las claves:
+
+- ``ip``: la IP del cliente (``BaseThrottle.get_ident``, respeta
+  ``NUM_PROXIES``).
+- ``username``: el username enviado, en minúsculas. Frena el relleno de
+  credenciales contra una cuenta desde muchas IPs.
+- ``ruta``: todas las peticiones del ámbito, como techo global.
+
+El algoritmo es una ventana deslizante aproximada: un contador por ventana
+fija y la estimación ``previa * (1 - transcurrido / ventana) + actual``.
+Sólo necesita incrementos atómicos con caducidad, así que funciona igual con
+el backend en proceso (``MemoriaBackend``, un diccionario repartido en shards
+con un lock cada uno) que con una caché compartida (``CacheBackend``, Redis
+en producción). Las peticiones rechazadas también cuentan: quien insiste
+sigue bloqueado.
+
+La comprobación no toca la base de datos ni calcula hashes, así que un pico
+de bots se rechaza antes de gastar CPU en contraseñas. Se aplica con
+``LimiteThrottle`` en las vistas DRF y con el decorador ``limitar`` en las
+vistas Django.
+"""
+
+import functools
+import hashlib
+import math
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.http import HttpResponse
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import ParseError
+from rest_framework.throttling import BaseThrottle
+
+from core.metrics import registro
+
+CONFIG_POR_DEFECTO = {
+    "ACTIVO": False,
+    "BACKEND": "core.limitador.MemoriaBackend",
+    "OPCIONES": {},
+    "PREFIJO": "limite:",
+    "REGLAS": {},
+}
+
+PERIODOS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+RECHAZOS = registro.counter(
+    "limite_rechazos_total",
+    "Peticiones rechazadas por el limitador, por ámbito y clave.",
+    etiquetas=("ambito", "clave"),
+)
+
+
+def configuracion():
+    config = dict(CONFIG_POR_DEFECTO)
+    config.update(getattr(settings, "LIMITES", {}))
+    return config
+
+
+def parsear_tasa(tasa):
+    """``"5/min"`` -> ``(5, 60)``."""
+    numero, periodo = tasa.split("/")
+    return int(numero), PERIODOS[periodo[0]]
+
+
+# -- Backends --------------------------------------------------------------
+
+
+class MemoriaBackend:
+    """
+    Contadores en proceso repartidos en ``shards`` diccionarios, cada uno con
+    su lock: hilos que limitan claves distintas casi nunca se esperan. Las
+    entradas caducadas de un shard se barren como mucho una vez por
+    ``purga`` segundos.
+    """
+
+    def __init__(self, shards=16, purga=60, **opciones):
+        self._shards = [{} for _ in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self._purgas = [0.0] * shards
+        self.purga = purga
+
+    def _shard(self, clave):
+        return hash(clave) % len(self._shards)
+
+    def incr(self, clave, ttl):
+        i = self._shard(clave)
+        datos = self._shards[i]
+        ahora = time.monotonic()
+        with self._locks[i]:
+            entrada = datos.get(clave)
+            if entrada is not None and entrada[1] > ahora:
+                entrada[0] += 1
+                return entrada[0]
+            if ahora >= self._purgas[i]:
+                self._purgas[i] = ahora + self.purga
+                for vieja in [k for k, (_, caduca) in datos.items() if caduca <= ahora]:
+                    del datos[vieja]
+            datos[clave] = [1, ahora + ttl]
+            return 1
+
+    def get(self, clave):
+        entrada = self._shards[self._shard(clave)].get(clave)
+        if entrada is None or entrada[1] <= time.monotonic():
+            return 0
+        return entrada[0]
+
+    async def aincr(self, clave, ttl):
+        return self.incr(clave, ttl)
+
+    async def aget(self, clave):
+        return self.get(clave)
+
+    def limpiar(self):
+        for i, datos in enumerate(self._shards):
+            with self._locks[i]:
+                datos.clear()
+
+
+class CacheBackend:
+    """Contadores en un alias de ``CACHES``; compartidos con Redis."""
+
+    def __init__(self, alias="default", **opciones):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def incr(self, clave, ttl):
+        # add + incr: ambos atómicos en Redis, así que no se pierde ninguna.
+        if self.cache.add(clave, 1, timeout=ttl):
+            return 1
+        try:
+            return self.cache.incr(clave)
+        except ValueError:
+            # La clave caducó entre add e incr.
+            self.cache.add(clave, 0, timeout=ttl)
+            return self.cache.incr(clave)
+
+    def get(self, clave):
+        return self.cache.get(clave, 0)
+
+    async def aincr(self, clave, ttl):
+        if await self.cache.aadd(clave, 1, timeout=ttl):
+            return 1
+        try:
+            return await self.cache.aincr(clave)
+        except ValueError:
+            await self.cache.aadd(clave, 0, timeout=ttl)
+            return await self.cache.aincr(clave)
+
+    async def aget(self, clave):
+        return await self.cache.aget(clave, 0)
+
+
+# -- Limitador -------------------------------------------------------------
+
+
+class Limitador:
+    def __init__(self, backend, reglas, prefijo="limite:"):
+        self.backend = backend
+        self.prefijo = prefijo
+        self.reglas = {
+            ambito: [(clave, *parsear_tasa(tasa)) for clave, tasa in tasas.items()]
+            for ambito, tasas in reglas.items()
+        }
+
+    @classmethod
+    def desde_settings(cls):
+        config = configuracion()
+        backend = import_string(config["BACKEND"])(**config["OPCIONES"])
+        return cls(backend, config["REGLAS"], prefijo=config["PREFIJO"])
+
+    def _contadores(self, ambito, ip, username):
+        """``(clave, limite, ventana, transcurrido, clave_actual, clave_previa)``."""
+        valores = {"ip": ip, "username": username, "ruta": ""}
+        ahora = time.time()
+        for clave, limite, ventana in self.reglas.get(ambito, ()):
+            valor = valores[clave]
+            if valor is None or (clave != "ruta" and not valor):
+                continue
+            if clave == "username":
+                valor = hashlib.blake2b(
+                    valor.strip().lower().encode(), digest_size=8
+                ).hexdigest()
+            n, transcurrido = divmod(ahora, ventana)
+            base = f"{self.prefijo}{ambito}:{clave}:{valor}:{ventana}:"
+            yield (
+                clave,
+                limite,
+                ventana,
+                transcurrido,
+                f"{base}{int(n)}",
+                f"{base}{int(n) - 1}",
+            )
+
+    @staticmethod
+    def _espera(limite, ventana, transcurrido, actual, previa):
+        """Segundos hasta que la estimación vuelva a caber en ``limite``."""
+        estimada = previa * (1 - transcurrido / ventana) + actual
+        if estimada <= limite:
+            return None
+        if actual > limite:
+            # Hasta que la ventana actual pase a ser la previa y se diluya.
+            segundos = ventana - transcurrido + ventana * (1 - limite / actual)
+        else:
+            segundos = ventana * (1 - (limite - actual) / previa) - transcurrido
+        return max(1, math.ceil(segundos))
+
+    def comprobar(self, ambito, ip=None, username=None):
+        """
+        Cuenta la petición y devuelve ``None`` si se admite o los segundos que
+        hay que esperar si alguna regla del ámbito se ha superado.
+        """
+        esperas = []
+        for clave, limite, ventana, transcurrido, actual, previa in self._contadores(
+            ambito, ip, username
+        ):
+            espera = self._espera(
+                limite,
+                ventana,
+                transcurrido,
+                self.backend.incr(actual, 2 * ventana),
+                self.backend.get(previa),
+            )
+            if espera is not None:
+                RECHAZOS.inc(ambito=ambito, clave=clave)
+                esperas.append(espera)
+        return max(esperas) if esperas else None
+
+    async def acomprobar(self, ambito, ip=None, username=None):
+        esperas = []
+        for clave, limite, ventana, transcurrido, actual, previa in self._contadores(
+            ambito, ip, username
+        ):
+            espera = self._espera(
+                limite,
+                ventana,
+                transcurrido,
+                await self.backend.aincr(actual, 2 * ventana),
+                await self.backend.aget(previa),
+            )
+            if espera is not None:
+                RECHAZOS.inc(ambito=ambito, clave=clave)
+                esperas.append(espera)
+        return max(esperas) if esperas else None
+
+
+_limitador = None
+
+
+def limitador():
+    """``Limitador`` del proceso, o ``None`` con ``LIMITES["ACTIVO"] = False``."""
+    global _limitador
+    if _limitador is None:
+        if not configuracion()["ACTIVO"]:
+            return None
+        _limitador = Limitador.desde_settings()
+    return _limitador
+
+
+def _reiniciar(*, setting, **kwargs):
+    global _limitador
+    if setting == "LIMITES":
+        _limitador = None
+
+
+setting_changed.connect(_reiniciar)
+
+
+# -- Integración -----------------------------------------------------------
+
+ip_de = BaseThrottle().get_ident
+
+
+class LimiteThrottle(BaseThrottle):
+    """
+    Throttle de DRF para el ámbito ``limite_ambito`` de la vista. El username
+    se toma del campo ``username`` del cuerpo, si lo hay.
+    """
+
+    def allow_request(self, request, view):
+        limites = limitador()
+        if limites is None:
+            return True
+        try:
+            username = request.data.get("username")
+        except (AttributeError, ParseError):
+            # La vista devolverá el error de parseo.
+            username = None
+        self.espera = limites.comprobar(
+            view.limite_ambito,
+            ip=self.get_ident(request),
+            username=username if isinstance(username, str) else None,
+        )
+        return self.espera is None
+
+    def wait(self):
+        return self.espera
+
+
+def respuesta_limite(espera):
+    response = HttpResponse(
+        "Demasiadas peticiones, inténtalo de nuevo más tarde.", status=429
+    )
+    response["Retry-After"] = str(espera)
+    return response
+
+
+def limitar(ambito, metodos=("POST",)):
+    """
+    Decorador de vistas Django (síncronas o asíncronas): responde 429 con
+    ``Retry-After`` cuando ``ambito`` se supera. Sólo cuenta los ``metodos``
+    indicados; el username sale del campo ``username`` del formulario.
+    """
+
+    def decorador(vista):
+        if iscoroutinefunction(vista):
+
+            @functools.wraps(vista)
+            async def envoltorio(request, *args, **kwargs):
+                limites = limitador()
+                if limites is not None and request.method in metodos:
+                    espera = await limites.acomprobar(
+                        ambito,
+                        ip=ip_de(request),
+                        username=request.POST.get("username"),
+                    )
+                    if espera is not None:
+                        return respuesta_limite(espera)
+                return await vista(request, *args, **kwargs)
+
+        else:
+
+            @functools.wraps(vista)
+            def envoltorio(request, *args, **kwargs):
+                limites = limitador()
+                if limites is not None and request.method in metodos:
+                    espera = limites.comprobar(
+                        ambito, ip=ip_de(request), username=request.POST.get("username")
+                    )
+                    if espera is not None:
+                        return respuesta_limite(espera)
+                return vista(request, *args, **kwargs)
+
+        return envoltorio
+
+    return decorador
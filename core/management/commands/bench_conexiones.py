@@ -0,0 +1,117 @@
+import copy
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.utils import ConnectionHandler
+
+from core.benchmark import resumir
+
+ALIAS = "bench_conexiones"
+
+MODOS = ("nueva", "persistente", "pool")
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide la latencia (p50/p95/p99) de peticiones que abren una conexión, "
+        "ejecutan una consulta y la liberan como al final de una petición "
+        "HTTP, sin persistencia, con CONN_MAX_AGE y con el pool de psycopg. "
+        "Requiere PostgreSQL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--modos", nargs="+", choices=MODOS, default=list(MODOS))
+        parser.add_argument("--peticiones", type=int, default=2000)
+        parser.add_argument("--hilos", type=int, default=16)
+        parser.add_argument(
+            "--pool-max", type=int, default=None, help="Por defecto, --hilos."
+        )
+        parser.add_argument("--sql", default="SELECT 1")
+        parser.add_argument("--json", action="store_true", help="Salida en JSON.")
+
+    def handle(self, *args, **options):
+        base = connections["default"].settings_dict
+        if connections["default"].vendor != "postgresql":
+            raise CommandError("bench_conexiones necesita PostgreSQL.")
+
+        resultados = []
+        for modo in options["modos"]:
+            handler = ConnectionHandler({ALIAS: self._settings(base, modo, options)})
+            try:
+                resultados.append(self._medir(modo, handler, options))
+            finally:
+                conexion = handler[ALIAS]
+                if modo == "pool" and conexion.pool:
+                    conexion.close_pool()
+                handler.close_all()
+
+        if options["json"]:
+            self.stdout.write(json.dumps(resultados, indent=2))
+            return
+        self.stdout.write(
+            f"peticiones={options['peticiones']} hilos={options['hilos']} "
+            f"sql={options['sql']!r}"
+        )
+        for r in resultados:
+            self.stdout.write(
+                f"{r['modo']:>12}: {r['peticiones_por_segundo']:>8} req/s  "
+                f"p50 {r['p50_ms']:>8} ms  p95 {r['p95_ms']:>8} ms  "
+                f"p99 {r['p99_ms']:>8} ms  conexiones abiertas {r['conexiones']}"
+            )
+
+    @staticmethod
+    def _settings(base, modo, options):
+        settings = copy.deepcopy(base)
+        settings["OPTIONS"].pop("pool", None)
+        settings["CONN_HEALTH_CHECKS"] = modo == "persistente"
+        settings["CONN_MAX_AGE"] = 600 if modo == "persistente" else 0
+        if modo == "pool":
+            tamano = options["pool_max"] or options["hilos"]
+            settings["OPTIONS"]["pool"] = {
+                "min_size": tamano,
+                "max_size": tamano,
+                "name": ALIAS,
+            }
+        return settings
+
+    def _medir(self, modo, handler, options):
+        abiertas = []
+
+        def peticion():
+            conexion = handler[ALIAS]
+            inicio = time.perf_counter()
+            if conexion.connection is None:
+                abiertas.append(1)
+            with conexion.cursor() as cursor:
+                cursor.execute(options["sql"])
+                cursor.fetchall()
+            # Lo mismo que hace request_finished al terminar cada petición.
+            conexion.close_if_unusable_or_obsolete()
+            return time.perf_counter() - inicio
+
+        def cerrar():
+            handler[ALIAS].close()
+
+        with ThreadPoolExecutor(max_workers=options["hilos"]) as executor:
+            # Calentamiento: abre el pool y las conexiones persistentes.
+            list(executor.map(lambda _: peticion(), range(options["hilos"])))
+            abiertas.clear()
+            inicio = time.perf_counter()
+            muestras = list(
+                executor.map(lambda _: peticion(), range(options["peticiones"]))
+            )
+            segundos = time.perf_counter() - inicio
+            list(executor.map(lambda _: cerrar(), range(options["hilos"])))
+
+        pool = handler[ALIAS].pool if modo == "pool" else None
+        return {
+            "modo": modo,
+            "peticiones_por_segundo": round(len(muestras) / segundos, 1),
+            "conexiones": (
+                pool.get_stats().get("connections_num", 0) if pool else len(abiertas)
+            ),
+            **resumir(muestras),
+        }
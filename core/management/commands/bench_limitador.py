@@ -0,0 +1,151 @@
+import json
+import random
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+
+from core.benchmark import resumir
+from core.limitador import CacheBackend, Limitador, LimiteThrottle, MemoriaBackend
+
+REGLAS = {
+    "login": {"ip": "30/min", "username": "10/min", "ruta": "1000000/min"},
+}
+
+
+class _Vista:
+    limite_ambito = "login"
+
+
+class Command(BaseCommand):
+    help = (
+        "Coste por petición del limitador (core.limitador): N hilos comprueban "
+        "IPs y usernames aleatorios con el backend en memoria (1 o N shards) y "
+        "con el de caché, y además el throttle de DRF completo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hilos", type=int, nargs="+", default=[1, 8])
+        parser.add_argument(
+            "--peticiones", type=int, default=100_000, help="Por configuración."
+        )
+        parser.add_argument("--shards", type=int, nargs="+", default=[1, 16])
+        parser.add_argument(
+            "--clientes", type=int, default=10_000, help="IPs/usernames distintos."
+        )
+        parser.add_argument("--json", action="store_true", help="Salida en JSON.")
+
+    def handle(self, *args, **options):
+        backends = [
+            (f"memoria/{shards}", lambda shards=shards: MemoriaBackend(shards=shards))
+            for shards in options["shards"]
+        ]
+        backends.append(("cache", CacheBackend))
+
+        resultados = []
+        for nombre, crear in backends:
+            for hilos in options["hilos"]:
+                limitador = Limitador(crear(), REGLAS, prefijo="bench_limite:")
+                resultados.append(
+                    {
+                        "backend": nombre,
+                        "hilos": hilos,
+                        **self._medir(
+                            lambda ip, username, limitador=limitador: (
+                                limitador.comprobar("login", ip=ip, username=username)
+                            ),
+                            hilos,
+                            options,
+                        ),
+                    }
+                )
+        resultados.append(
+            {"backend": "throttle-drf/16", "hilos": 1, **self._throttle(options)}
+        )
+
+        if options["json"]:
+            self.stdout.write(json.dumps(resultados, indent=2))
+            return
+        for r in resultados:
+            self.stdout.write(
+                f"{r['backend']:>16} hilos={r['hilos']:>3}  "
+                f"{r['comprobaciones_por_segundo']:>10.0f} comp/s  "
+                f"p50={r['p50_ms'] * 1000:.1f}µs  p99={r['p99_ms'] * 1000:.1f}µs  "
+                f"rechazadas={r['rechazadas']}"
+            )
+
+    def _medir(self, comprobar, hilos, options, preparar=None):
+        por_hilo = options["peticiones"] // hilos
+        clientes = options["clientes"]
+        latencias = []
+        rechazadas = [0]
+        lock = threading.Lock()
+        barrera = threading.Barrier(hilos)
+
+        def trabajar(semilla):
+            azar = random.Random(semilla)
+            propias, rechazos = [], 0
+            barrera.wait()
+            for _ in range(por_hilo):
+                n = azar.randrange(clientes)
+                args = (f"10.{n >> 16}.{(n >> 8) & 255}.{n & 255}", f"u{n}")
+                if preparar is not None:
+                    args = (preparar(*args),)
+                inicio = time.perf_counter()
+                if comprobar(*args):
+                    rechazos += 1
+                propias.append(time.perf_counter() - inicio)
+            with lock:
+                latencias.extend(propias)
+                rechazadas[0] += rechazos
+
+        trabajadores = [
+            threading.Thread(target=trabajar, args=(i,)) for i in range(hilos)
+        ]
+        inicio = time.perf_counter()
+        for hilo in trabajadores:
+            hilo.start()
+        for hilo in trabajadores:
+            hilo.join()
+        segundos = time.perf_counter() - inicio
+        return {
+            "comprobaciones_por_segundo": round(len(latencias) / segundos, 1),
+            "rechazadas": rechazadas[0],
+            **resumir(latencias),
+        }
+
+    def _throttle(self, options):
+        """El camino completo de una vista DRF: parsear el cuerpo y comprobar."""
+        throttle = LimiteThrottle()
+        vista = _Vista()
+        factory = RequestFactory()
+
+        def preparar(ip, username):
+            return Request(
+                factory.post(
+                    "/api/token/",
+                    {"username": username, "password": "x"},
+                    content_type="application/json",
+                    REMOTE_ADDR=ip,
+                ),
+                parsers=[JSONParser()],
+            )
+
+        limites = {
+            "ACTIVO": True,
+            "BACKEND": "core.limitador.MemoriaBackend",
+            "OPCIONES": {"shards": 16},
+            "PREFIJO": "bench_limite:",
+            "REGLAS": REGLAS,
+        }
+        with override_settings(LIMITES=limites):
+            return self._medir(
+                lambda request: not throttle.allow_request(request, vista),
+                1,
+                options,
+                preparar=preparar,
+            )
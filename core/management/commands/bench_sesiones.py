@@ -0,0 +1,117 @@
+import json
+import time
+
+from django.conf import settings
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+from core.benchmark import resumir, revertir
+
+ALMACENES = {
+    # Línea base: el almacén de Django sin ``core.sesiones``.
+    "django-db": "django.contrib.sessions.backends.db",
+    "db": "core.sesiones.db",
+    "cache": "core.sesiones.cached_db",
+    "cookie": "core.sesiones.signed_cookies",
+}
+
+# Lo que hace la vista con la sesión en cada petición.
+ESCENARIOS = {
+    # Sólo la lee, como ``request.user`` en cualquier página.
+    "lectura": lambda sesion: sesion.get("_auth_user_id"),
+    # Asigna el valor que ya tenía (el idioma, la última página...).
+    "reescritura": lambda sesion: sesion.__setitem__("ultima", "/"),
+    # Cambia un valor en cada petición.
+    "escritura": lambda sesion: sesion.__setitem__(
+        "visitas", sesion.get("visitas", 0) + 1
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Coste de la sesión por petición con cada almacén (SessionMiddleware "
+        "y una vista que lee, reescribe o cambia la sesión): latencia, "
+        "consultas y cookies Set-Cookie por petición."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--almacenes", choices=list(ALMACENES), nargs="+", default=list(ALMACENES)
+        )
+        parser.add_argument(
+            "--escenarios",
+            choices=list(ESCENARIOS),
+            nargs="+",
+            default=list(ESCENARIOS),
+        )
+        parser.add_argument("--peticiones", type=int, default=2000)
+        parser.add_argument("--json", action="store_true", help="Salida en JSON.")
+
+    def handle(self, *args, **options):
+        resultados = []
+        for almacen in options["almacenes"]:
+            for escenario in options["escenarios"]:
+                with override_settings(SESSION_ENGINE=ALMACENES[almacen]):
+                    resultados.append(
+                        {
+                            "almacen": almacen,
+                            "escenario": escenario,
+                            **self._medir(ESCENARIOS[escenario], options["peticiones"]),
+                        }
+                    )
+
+        if options["json"]:
+            self.stdout.write(json.dumps(resultados, indent=2))
+            return
+        for r in resultados:
+            self.stdout.write(
+                f"{r['almacen']:>10} {r['escenario']:>12}  "
+                f"p50={r['p50_ms'] * 1000:>6.1f}µs  p99={r['p99_ms'] * 1000:>7.1f}µs  "
+                f"consultas/pet={r['consultas_por_peticion']:.2f}  "
+                f"cookies/pet={r['cookies_por_peticion']:.2f}"
+            )
+
+    def _medir(self, usar, peticiones):
+        def vista(request):
+            usar(request.session)
+            return HttpResponse()
+
+        def iniciar(request):
+            request.session["_auth_user_id"] = "1"
+            request.session["ultima"] = "/"
+            return HttpResponse()
+
+        factory = RequestFactory()
+        nombre = settings.SESSION_COOKIE_NAME
+        latencias, cookies, consultas = [], 0, [0]
+
+        def contar(execute, sql, params, many, context):
+            consultas[0] += 1
+            return execute(sql, params, many, context)
+
+        with revertir():
+            # El login: una sesión con datos y su cookie, como en un navegador.
+            cookie = SessionMiddleware(iniciar)(factory.get("/")).cookies[nombre].value
+            middleware = SessionMiddleware(vista)
+            with connection.execute_wrapper(contar):
+                for _ in range(peticiones):
+                    request = factory.get("/")
+                    request.COOKIES[nombre] = cookie
+                    inicio = time.perf_counter()
+                    response = middleware(request)
+                    latencias.append(time.perf_counter() - inicio)
+                    if nombre in response.cookies:
+                        cookies += 1
+                        cookie = response.cookies[nombre].value
+            # La caché no se deshace con la transacción.
+            request.session.delete()
+        return {
+            "consultas_por_peticion": round(consultas[0] / peticiones, 2),
+            "cookies_por_peticion": round(cookies / peticiones, 2),
+            **resumir(latencias),
+        }
@@ -0,0 +1,79 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.arranque import OBJETIVOS, agrupar, medir_arranque
+
+
+class Command(BaseCommand):
+    help = (
+        "Tiempo de arranque de un proceso nuevo (setup, worker WSGI/ASGI, "
+        "primera petición o URLs completas) y desglose por app/paquete con "
+        "python -X importtime. Con --presupuesto falla si la mediana lo supera."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--objetivo", choices=list(OBJETIVOS), nargs="+", default=["wsgi"]
+        )
+        parser.add_argument("--repeticiones", type=int, default=5)
+        parser.add_argument(
+            "--top", type=int, default=15, help="Módulos más lentos a listar."
+        )
+        parser.add_argument(
+            "--presupuesto",
+            type=float,
+            nargs="?",
+            const=settings.ARRANQUE_PRESUPUESTO_MS,
+            help="Mediana máxima en ms (sin valor: ARRANQUE_PRESUPUESTO_MS).",
+        )
+        parser.add_argument("--json", action="store_true", help="Salida en JSON.")
+
+    def handle(self, *args, **options):
+        resultados = []
+        for objetivo in options["objetivo"]:
+            mediana, modulos = medir_arranque(objetivo, options["repeticiones"])
+            lentos = sorted(modulos, key=lambda m: m.acumulado_us, reverse=True)
+            resultados.append(
+                {
+                    "objetivo": objetivo,
+                    "mediana_ms": round(mediana * 1000, 1),
+                    "modulos": len(modulos),
+                    "por_paquete_ms": {
+                        paquete: round(us / 1000, 1)
+                        for paquete, us in agrupar(modulos).items()
+                    },
+                    "mas_lentos_ms": {
+                        m.modulo: round(m.acumulado_us / 1000, 1)
+                        for m in lentos[: options["top"]]
+                    },
+                }
+            )
+
+        if options["json"]:
+            self.stdout.write(json.dumps(resultados, indent=2))
+        else:
+            for r in resultados:
+                self.stdout.write(
+                    f"{r['objetivo']}: {r['mediana_ms']:.0f} ms "
+                    f"({r['modulos']} módulos importados)"
+                )
+                self.stdout.write("  por paquete (tiempo propio):")
+                for paquete, ms in list(r["por_paquete_ms"].items())[: options["top"]]:
+                    self.stdout.write(f"    {ms:>8.1f} ms  {paquete}")
+                self.stdout.write("  módulos más lentos (acumulado):")
+                for modulo, ms in r["mas_lentos_ms"].items():
+                    self.stdout.write(f"    {ms:>8.1f} ms  {modulo}")
+
+        presupuesto = options["presupuesto"]
+        if presupuesto is not None:
+            excedidos = [r for r in resultados if r["mediana_ms"] > presupuesto]
+            if excedidos:
+                raise CommandError(
+                    "Arranque por encima del presupuesto de "
+                    f"{presupuesto:.0f} ms: "
+                    + ", ".join(
+                        f"{r['objetivo']} {r['mediana_ms']:.0f} ms" for r in excedidos
+                    )
+                )
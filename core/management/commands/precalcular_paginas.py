@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import get_resolver
+
+from core.cache_html import PAGINAS, cache_html
+
+
+class Command(BaseCommand):
+    help = (
+        "Renderiza y guarda en la caché las páginas anónimas (la portada), "
+        "para que ninguna visita anónima tenga que calcularlas. Tras cada "
+        "despliegue."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "paginas", nargs="*", help="Nombres de URL (por defecto, todas)."
+        )
+
+    def handle(self, *args, **options):
+        # Importa todas las vistas, con lo que quedan registradas sus páginas.
+        get_resolver().reverse_dict  # noqa: B018
+        nombres = options["paginas"] or sorted(PAGINAS)
+        desconocidas = set(nombres) - set(PAGINAS)
+        if desconocidas:
+            raise CommandError(
+                "Páginas no registradas: " + ", ".join(sorted(desconocidas))
+            )
+        cache = cache_html()
+        for nombre in nombres:
+            inicio = time.perf_counter()
+            if cache.precalcular_pagina(PAGINAS[nombre]) is None:
+                self.stdout.write(
+                    f"{nombre}: omitida (otro proceso la calcula o no se puede compartir)"
+                )
+                continue
+            self.stdout.write(
+                f"{nombre}: {(time.perf_counter() - inicio) * 1000:.1f} ms"
+            )
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.sesiones import purgar_todas
+
+
+class Command(BaseCommand):
+    help = (
+        "Borra por lotes las sesiones caducadas de django_session (ver "
+        "core.sesiones). Cada lote es un DELETE corto por clave primaria, así "
+        "que no bloquea la tabla. Pensado para ejecutarse periódicamente."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=5000)
+        parser.add_argument(
+            "--pausa", type=float, default=0.0, help="Segundos entre lotes."
+        )
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        total = purgar_todas(lote=options["lote"], pausa=options["pausa"])
+        self.stdout.write(
+            f"{total} sesiones caducadas purgadas en "
+            f"{time.perf_counter() - inicio:.1f} s."
+        )
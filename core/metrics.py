@@ -0,0 +1,218 @@
+"""
+Registro de métricas en proceso con exportación en formato de texto de
+Prometheus.
+
+Cada subsistema declara sus métricas a nivel de módulo::
+
+    from core.metrics import registro
+
+    RECHAZOS = registro.counter("hashing_rechazos_total", "Peticiones rechazadas.")
+    RECHAZOS.inc()
+
+Las etiquetas se pasan como argumentos con nombre (``inc(vista="login")``) y
+deben coincidir con las declaradas al crear la métrica.
+"""
+
+import threading
+
+BUCKETS_POR_DEFECTO = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def _formatear_etiquetas(nombres, valores, extra=()):
+    pares = [*zip(nombres, valores), *extra]
+    if not pares:
+        return ""
+    cuerpo = ",".join(
+        '{}="{}"'.format(
+            k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        for k, v in pares
+    )
+    return "{" + cuerpo + "}"
+
+
+def _formatear_valor(valor):
+    if valor == float("inf"):
+        return "+Inf"
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return repr(valor) if isinstance(valor, float) else str(valor)
+
+
+class Metrica:
+    tipo = "untyped"
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._lock = threading.Lock()
+        self._valores = {}
+
+    def _clave(self, etiquetas):
+        if set(etiquetas) != set(self.etiquetas):
+            raise ValueError(
+                f"{self.nombre}: se esperaban las etiquetas {self.etiquetas}, "
+                f"se recibieron {tuple(etiquetas)}"
+            )
+        return tuple(etiquetas[nombre] for nombre in self.etiquetas)
+
+    def reiniciar(self):
+        with self._lock:
+            self._valores.clear()
+
+    def muestras(self):
+        """Lista de ``(sufijo, etiquetas_extra, valores_etiquetas, valor)``."""
+        with self._lock:
+            return [((), (), clave, valor) for clave, valor in self._valores.items()]
+
+    def exportar(self):
+        lineas = [
+            f"# HELP {self.nombre} {self.ayuda}",
+            f"# TYPE {self.nombre} {self.tipo}",
+        ]
+        for sufijo, extra, clave, valor in self.muestras():
+            nombre = self.nombre + "".join(sufijo)
+            etiquetas = _formatear_etiquetas(self.etiquetas, clave, extra)
+            lineas.append(f"{nombre}{etiquetas} {_formatear_valor(valor)}")
+        return "\n".join(lineas)
+
+
+class Counter(Metrica):
+    tipo = "counter"
+
+    def inc(self, cantidad=1, **etiquetas):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0) + cantidad
+
+    def valor(self, **etiquetas):
+        with self._lock:
+            return self._valores.get(self._clave(etiquetas), 0)
+
+
+class Gauge(Metrica):
+    tipo = "gauge"
+
+    def __init__(self, nombre, ayuda, etiquetas=(), funcion=None):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.funcion = funcion
+
+    def set(self, valor, **etiquetas):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = valor
+
+    def inc(self, cantidad=1, **etiquetas):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0) + cantidad
+
+    def dec(self, cantidad=1, **etiquetas):
+        self.inc(-cantidad, **etiquetas)
+
+    def valor(self, **etiquetas):
+        if self.funcion is not None:
+            return self.funcion()
+        with self._lock:
+            return self._valores.get(self._clave(etiquetas), 0)
+
+    def muestras(self):
+        if self.funcion is not None:
+            # Gauge calculado en el momento de exportar (p. ej. un pool).
+            return [((), (), (), self.funcion())]
+        return super().muestras()
+
+
+class Histogram(Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nombre, ayuda, etiquetas=(), buckets=BUCKETS_POR_DEFECTO):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, valor, **etiquetas):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            serie = self._valores.get(clave)
+            if serie is None:
+                serie = self._valores[clave] = [[0] * len(self.buckets), 0, 0.0]
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    serie[0][i] += 1
+                    break
+            serie[1] += 1
+            serie[2] += valor
+
+    def contar(self, **etiquetas):
+        with self._lock:
+            serie = self._valores.get(self._clave(etiquetas))
+            return serie[1] if serie else 0
+
+    def muestras(self):
+        with self._lock:
+            series = [
+                (clave, list(cubos), n, suma)
+                for clave, (cubos, n, suma) in self._valores.items()
+            ]
+        muestras = []
+        for clave, cubos, n, suma in series:
+            acumulado = 0
+            for limite, cantidad in zip(self.buckets, cubos):
+                acumulado += cantidad
+                le = (("le", _formatear_valor(float(limite))),)
+                muestras.append((("_bucket",), le, clave, acumulado))
+            muestras.append((("_bucket",), (("le", "+Inf"),), clave, n))
+            muestras.append((("_count",), (), clave, n))
+            muestras.append((("_sum",), (), clave, suma))
+        return muestras
+
+
+class Registro:
+    """Colección de métricas con nombre único."""
+
+    def __init__(self):
+        self._metricas = {}
+        self._lock = threading.Lock()
+
+    def _obtener(self, clase, nombre, *args, **kwargs):
+        with self._lock:
+            metrica = self._metricas.get(nombre)
+            if metrica is None:
+                metrica = self._metricas[nombre] = clase(nombre, *args, **kwargs)
+            elif not isinstance(metrica, clase):
+                raise ValueError(f"La métrica {nombre} ya existe con otro tipo.")
+            return metrica
+
+    def counter(self, nombre, ayuda, etiquetas=()):
+        return self._obtener(Counter, nombre, ayuda, etiquetas)
+
+    def gauge(self, nombre, ayuda, etiquetas=(), funcion=None):
+        return self._obtener(Gauge, nombre, ayuda, etiquetas, funcion=funcion)
+
+    def histogram(self, nombre, ayuda, etiquetas=(), buckets=BUCKETS_POR_DEFECTO):
+        return self._obtener(Histogram, nombre, ayuda, etiquetas, buckets=buckets)
+
+    def get(self, nombre):
+        return self._metricas.get(nombre)
+
+    def exportar(self):
+        """Todas las métricas en formato de texto de Prometheus."""
+        with self._lock:
+            metricas = list(self._metricas.values())
+        return "\n".join(m.exportar() for m in metricas) + "\n"
+
+
+registro = Registro()
@@ -0,0 +1,173 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginación por cursor (keyset) sobre una ordenación compuesta y estable.
+
+    A diferencia de ``CursorPagination`` de DRF, que sólo usa el primer campo
+    de la ordenación y resuelve empates con un offset, aquí el cursor guarda
+    los valores de *todas* las columnas de ``ordering`` y la página siguiente
+    se obtiene con un ``WHERE (a, b) < (x, y)`` expandido. Con un índice
+    compuesto sobre las mismas columnas, la página N cuesta lo mismo que la 1.
+    """
+
+    ordering = ("-id",)
+    page_size = 50
+    max_page_size = 500
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Cursor inválido."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        posicion, reverso = self.decode_cursor(queryset.model, request)
+
+        orden = self.ordering
+        if reverso:
+            orden = tuple(self._invertir(campo) for campo in orden)
+
+        queryset = queryset.order_by(*orden)
+        if posicion is not None:
+            queryset = queryset.filter(self._filtro_posterior(orden, posicion))
+
+        resultados = list(queryset[: self.page_size + 1])
+        hay_mas = len(resultados) > self.page_size
+        resultados = resultados[: self.page_size]
+
+        if reverso:
+            resultados.reverse()
+            self.has_next = posicion is not None
+            self.has_previous = hay_mas
+        else:
+            self.has_next = hay_mas
+            self.has_previous = posicion is not None
+
+        self.page = resultados
+        return resultados
+
+    def get_page_size(self, request):
+        valor = request.query_params.get(self.page_size_query_param)
+        if valor is None:
+            return self.page_size
+        try:
+            page_size = int(valor)
+        except ValueError:
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverso=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverso=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    # -- Cursor -----------------------------------------------------------
+
+    def encode_cursor(self, item, reverso):
+        valores = [self._valor_cursor(item, campo) for campo in self.ordering]
+        payload = json.dumps({"p": valores, "r": int(reverso)}, separators=(",", ":"))
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, model, request):
+        """Devuelve ``(valores, reverso)`` o ``(None, False)`` sin cursor."""
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            crudos = payload["p"]
+            reverso = bool(payload.get("r", 0))
+            if len(crudos) != len(self.ordering):
+                raise ValueError
+            valores = [
+                model._meta.get_field(campo.lstrip("-")).to_python(valor)
+                for campo, valor in zip(self.ordering, crudos)
+            ]
+        except (
+            binascii.Error,
+            DjangoValidationError,
+            KeyError,
+            TypeError,
+            ValueError,
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+        return valores, reverso
+
+    def _valor_cursor(self, item, campo):
+        nombre = campo.lstrip("-")
+        valor = item[nombre] if isinstance(item, dict) else getattr(item, nombre)
+        if hasattr(valor, "isoformat"):
+            return valor.isoformat()
+        if isinstance(valor, (int, float, str)) or valor is None:
+            return valor
+        return str(valor)
+
+    # -- Filtro keyset ----------------------------------------------------
+
+    @staticmethod
+    def _invertir(campo):
+        return campo[1:] if campo.startswith("-") else f"-{campo}"
+
+    @staticmethod
+    def _filtro_posterior(orden, valores):
+        """
+        Expande ``(a, b, c) > (x, y, z)`` respetando la dirección de cada campo:
+        ``a >= x AND (a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z))``.
+
+        El ``a >= x`` inicial es redundante, pero el planificador no saca una
+        condición de índice de una disyunción: sin él, la página N recorre el
+        índice desde el principio filtrando las filas de las páginas previas.
+        """
+        filtro = Q()
+        iguales = {}
+        for campo, valor in zip(orden, valores):
+            nombre = campo.lstrip("-")
+            operador = "lt" if campo.startswith("-") else "gt"
+            filtro |= Q(**iguales, **{f"{nombre}__{operador}": valor})
+            iguales[nombre] = valor
+        if len(orden) > 1:
+            primero = orden[0]
+            operador = "lte" if primero.startswith("-") else "gte"
+            filtro &= Q(**{f"{primero.lstrip('-')}__{operador}": valores[0]})
+        return filtro
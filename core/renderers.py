@@ -0,0 +1,11 @@
+from rest_framework import renderers
+
+from .instrumentacion import seccion
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """``JSONRenderer`` de DRF que cronometra el render (``Server-Timing``)."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with seccion("render"):
+            return super().render(data, accepted_media_type, renderer_context)
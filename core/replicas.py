@@ -0,0 +1,262 @@
+"""
+Lecturas en réplicas de PostgreSQL.
+
+``RouterReplicas`` manda a una réplica las lecturas de las peticiones
+``GET``/``HEAD``/``OPTIONS`` (listados y detalles de la API, catálogo de
+eventos) y todo lo demás a ``default``:
+
+- Sólo se usan réplicas dentro de una petición marcada por
+  ``ReplicasMiddleware``. Comandos, tareas y shell leen siempre de la
+  primaria.
+- Una escritura (``db_for_write``) fija la primaria para el resto de la
+  petición y, durante ``REPLICAS_VENTANA_PRIMARIA`` segundos, para las
+  siguientes peticiones del mismo cliente (cookie ``primaria_hasta`` o, en la
+  API, su cabecera ``Authorization``): quien acaba de escribir lee lo que ha
+  escrito aunque la réplica vaya con retraso.
+- Dentro de una transacción abierta en la primaria se lee de la primaria,
+  que es la que ve lo escrito en ella (también en los ``TestCase``).
+- Guarda de retraso: cada ``REPLICAS_INTERVALO_COMPROBACION`` segundos se
+  mide el retraso de cada réplica; las que superan
+  ``REPLICAS_RETRASO_MAXIMO`` segundos o no responden dejan de usarse hasta
+  la siguiente comprobación.
+
+Las réplicas son los alias de ``REPLICAS`` (por defecto, todos los de
+``DATABASES`` menos ``default``; ver ``core.db.replicas_desde_entorno``).
+"""
+
+import contextvars
+import hashlib
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.db import DatabaseError, connections
+
+from core.metrics import registro
+
+PRIMARIA = "default"
+COOKIE = "primaria_hasta"
+METODOS_SEGUROS = ("GET", "HEAD", "OPTIONS")
+
+LECTURAS = registro.counter(
+    "db_lecturas_total",
+    "Lecturas enrutadas por alias de base de datos.",
+    etiquetas=("alias",),
+)
+RETRASO = registro.gauge(
+    "db_replica_retraso_segundos",
+    "Último retraso medido de cada réplica (-1 si no responde).",
+    etiquetas=("alias",),
+)
+
+SQL_RETRASO_POSTGRESQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+"""
+
+
+def _config():
+    replicas = getattr(settings, "REPLICAS", None)
+    if replicas is None:
+        replicas = [alias for alias in settings.DATABASES if alias != PRIMARIA]
+    return {
+        "replicas": list(replicas),
+        "retraso_maximo": getattr(settings, "REPLICAS_RETRASO_MAXIMO", 5),
+        "intervalo": getattr(settings, "REPLICAS_INTERVALO_COMPROBACION", 5),
+        "ventana": getattr(settings, "REPLICAS_VENTANA_PRIMARIA", 10),
+    }
+
+
+# Estado de la petición en curso: None fuera de una petición.
+_peticion = contextvars.ContextVar("replicas_peticion", default=None)
+
+
+class EstadoPeticion:
+    __slots__ = ("escrito", "lectura_en_replica")
+
+    def __init__(self, lectura_en_replica):
+        self.lectura_en_replica = lectura_en_replica
+        self.escrito = False
+
+
+@contextmanager
+def en_primaria():
+    """
+    Fuerza la primaria para las lecturas del bloque. Lo usan las cargas de
+    las cachés (``usuarios.cache_perfil``, ``core.cache_html``): una réplica
+    retrasada dejaría datos viejos guardados bajo la versión nueva.
+    """
+    anterior = _peticion.get()
+    estado = EstadoPeticion(lectura_en_replica=False)
+    token = _peticion.set(estado)
+    try:
+        yield
+    finally:
+        _peticion.reset(token)
+        # Una escritura dentro del bloque también fija la petición.
+        if anterior is not None and estado.escrito:
+            anterior.escrito = True
+
+
+class GuardaRetraso:
+    """Réplicas utilizables según su último retraso medido."""
+
+    def __init__(self, replicas, retraso_maximo, intervalo):
+        self.replicas = replicas
+        self.retraso_maximo = retraso_maximo
+        self.intervalo = intervalo
+        self._sanas = list(replicas)
+        self._comprobado = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def medir(alias):
+        """Retraso en segundos de la réplica ``alias``; ``None`` si falla."""
+        conexion = connections[alias]
+        if conexion.vendor != "postgresql":
+            return 0.0
+        try:
+            with conexion.cursor() as cursor:
+                cursor.execute(SQL_RETRASO_POSTGRESQL)
+                return float(cursor.fetchone()[0])
+        except DatabaseError:
+            return None
+
+    def sanas(self):
+        ahora = time.monotonic()
+        if ahora - self._comprobado >= self.intervalo and self._lock.acquire(
+            blocking=False
+        ):
+            # Un solo hilo comprueba; el resto sigue con la lista anterior.
+            try:
+                self._comprobado = ahora
+                sanas = []
+                for alias in self.replicas:
+                    retraso = self.medir(alias)
+                    RETRASO.set(-1 if retraso is None else retraso, alias=alias)
+                    if retraso is not None and retraso <= self.retraso_maximo:
+                        sanas.append(alias)
+                self._sanas = sanas
+            finally:
+                self._lock.release()
+        return self._sanas
+
+
+_guarda = None
+
+
+def guarda():
+    global _guarda
+    if _guarda is None:
+        config = _config()
+        _guarda = GuardaRetraso(
+            config["replicas"], config["retraso_maximo"], config["intervalo"]
+        )
+    return _guarda
+
+
+class RouterReplicas:
+    def db_for_read(self, model, **hints):
+        estado = _peticion.get()
+        alias = PRIMARIA
+        if (
+            estado is not None
+            and estado.lectura_en_replica
+            and not estado.escrito
+            and not connections[PRIMARIA].in_atomic_block
+        ):
+            sanas = guarda().sanas()
+            if sanas:
+                alias = random.choice(sanas)
+        LECTURAS.inc(alias=alias)
+        return alias
+
+    def db_for_write(self, model, **hints):
+        estado = _peticion.get()
+        if estado is not None:
+            estado.escrito = True
+        return PRIMARIA
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplicas y primaria tienen los mismos datos.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Las réplicas reciben el esquema por replicación.
+        return db not in guarda().replicas
+
+
+def _clave_cliente(request):
+    autorizacion = request.META.get("HTTP_AUTHORIZATION")
+    if not autorizacion:
+        return None
+    return "replicas:primaria:" + hashlib.sha256(autorizacion.encode()).hexdigest()
+
+
+class ReplicasMiddleware:
+    """Marca las peticiones cuyas lecturas pueden ir a una réplica."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = _config()
+        if not config["replicas"]:
+            return self.get_response(request)
+
+        estado = EstadoPeticion(
+            lectura_en_replica=request.method in METODOS_SEGUROS
+            and not self._escritura_reciente(request)
+        )
+        token = _peticion.set(estado)
+        try:
+            response = self.get_response(request)
+        finally:
+            _peticion.reset(token)
+
+        if estado.escrito:
+            self._recordar_escritura(request, response, config["ventana"])
+        return response
+
+    @staticmethod
+    def _escritura_reciente(request):
+        hasta = request.COOKIES.get(COOKIE)
+        if hasta:
+            try:
+                if float(hasta) > time.time():
+                    return True
+            except ValueError:
+                pass
+        clave = _clave_cliente(request)
+        return clave is not None and cache.get(clave) is not None
+
+    @staticmethod
+    def _recordar_escritura(request, response, ventana):
+        response.set_cookie(
+            COOKIE,
+            str(time.time() + ventana),
+            max_age=ventana,
+            httponly=True,
+            samesite="Lax",
+        )
+        clave = _clave_cliente(request)
+        if clave is not None:
+            cache.set(clave, 1, ventana)
+
+
+def _reiniciar(*, setting, **kwargs):
+    global _guarda
+    if setting in ("DATABASES", "REPLICAS") or setting.startswith("REPLICAS_"):
+        _guarda = None
+
+
+setting_changed.connect(_reiniciar)
@@ -0,0 +1,108 @@
+"""
+Almacenes de sesión (``SESSION_ENGINE``) que sólo escriben si la sesión
+cambia de verdad.
+
+- ``core.sesiones.db``: la tabla ``django_session``, como el de Django.
+- ``core.sesiones.cached_db``: lectura de la caché compartida y escritura en
+  la base de datos y en la caché (*write-through*). Sólo tiene sentido con
+  Redis: con la caché en memoria cada proceso vería su propia copia.
+- ``core.sesiones.signed_cookies``: la sesión entera en una cookie firmada;
+  no hay nada que leer ni escribir en el servidor, pero tampoco se puede
+  revocar una cookie robada hasta que caduque.
+
+Django guarda la sesión (y reenvía la cookie) siempre que algo asigna una
+clave, aunque sea con el mismo valor. Aquí ``modified`` sólo es cierto si la
+clave o los datos serializados difieren de los cargados, y ``save()`` no
+repite una escritura idéntica a la anterior (``cycle_key()`` en el login ya
+guarda la sesión con la clave nueva).
+
+Las sesiones caducadas de la tabla se borran por lotes con
+``manage.py purgar_sesiones`` (o ``clearsessions``, que usa el mismo
+``purgar_sesiones``).
+"""
+
+import time
+
+from django.contrib.sessions.models import Session
+from django.utils import timezone
+
+
+class SoloSiCambiaMixin:
+    # (clave, datos serializados) tal como se cargaron y tal como se
+    # guardaron por última vez. ``None``: sesión nueva, sin cargar.
+    _cargada = None
+    _guardada = None
+    _modificada = False
+
+    @property
+    def modified(self):
+        return self._modificada and (
+            self._cargada is None or self._estado() != self._cargada
+        )
+
+    @modified.setter
+    def modified(self, valor):
+        self._modificada = valor
+
+    def _estado(self):
+        # ``_session_cache`` directamente: ``_session`` marca la sesión como
+        # leída (y la respuesta como ``Vary: Cookie``).
+        datos = getattr(self, "_session_cache", {})
+        return self._session_key, self.serializer().dumps(datos)
+
+    def _recordar(self, datos):
+        self._cargada = self._guardada = (
+            self._session_key,
+            self.serializer().dumps(datos),
+        )
+        return datos
+
+    def load(self):
+        return self._recordar(super().load())
+
+    async def aload(self):
+        return self._recordar(await super().aload())
+
+    def save(self, must_create=False):
+        if not must_create and self._estado() == self._guardada:
+            return
+        super().save(must_create)
+        self._guardada = self._estado()
+
+    async def asave(self, must_create=False):
+        if not must_create and self._estado() == self._guardada:
+            return
+        await super().asave(must_create)
+        self._guardada = self._estado()
+
+
+def purgar_sesiones(lote=5000, ahora=None):
+    """Borra hasta ``lote`` sesiones caducadas y devuelve cuántas."""
+    ahora = ahora or timezone.now()
+    claves = list(
+        Session.objects.filter(expire_date__lt=ahora).values_list(
+            "session_key", flat=True
+        )[:lote]
+    )
+    if not claves:
+        return 0
+    borradas, _ = Session.objects.filter(session_key__in=claves).delete()
+    return borradas
+
+
+def purgar_todas(lote=5000, pausa=0.0):
+    """
+    ``purgar_sesiones`` hasta borrar todas las caducadas al empezar (las que
+    caducan durante la purga quedan para la siguiente). Cada lote es una
+    transacción corta; ``pausa`` (s) deja respirar a la base de datos entre
+    lotes. Devuelve el total.
+    """
+    ahora = timezone.now()
+    total = 0
+    while True:
+        borradas = purgar_sesiones(lote, ahora)
+        total += borradas
+        if borradas < lote:
+            return total
+        if pausa:
+            time.sleep(pausa)
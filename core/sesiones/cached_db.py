@@ -0,0 +1,9 @@
+from django.contrib.sessions.backends import cached_db
+
+from . import SoloSiCambiaMixin, purgar_todas
+
+
+class SessionStore(SoloSiCambiaMixin, cached_db.SessionStore):
+    @classmethod
+    def clear_expired(cls):
+        purgar_todas()
@@ -0,0 +1,9 @@
+from django.contrib.sessions.backends import db
+
+from . import SoloSiCambiaMixin, purgar_todas
+
+
+class SessionStore(SoloSiCambiaMixin, db.SessionStore):
+    @classmethod
+    def clear_expired(cls):
+        purgar_todas()
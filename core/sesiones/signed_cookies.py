@@ -0,0 +1,9 @@
+from django.contrib.sessions.backends import signed_cookies
+
+from . import SoloSiCambiaMixin
+
+
+class SessionStore(SoloSiCambiaMixin, signed_cookies.SessionStore):
+    def cycle_key(self):
+        # Cookie nueva aunque los datos no cambien (login del mismo usuario).
+        signed_cookies.SessionStore.save(self)
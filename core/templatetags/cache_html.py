@@ -0,0 +1,55 @@
+"""
+``{% fragmento nombre variante... depende grupo... %}...{% endfragmento %}``
+
+Como ``{% cache %}``, pero con la caché de ``core.cache_html``: el fragmento
+se invalida con sus grupos y se recalcula una sola vez aunque lo pidan muchas
+peticiones a la vez. Un grupo puede ser una lista de grupos.
+
+    {% fragmento "home:destacados" user.is_authenticated depende "eventos" %}
+"""
+
+from django import template
+
+from core.cache_html import cache_html, clave_fragmento
+
+register = template.Library()
+
+
+class FragmentoNode(template.Node):
+    def __init__(self, nodelist, nombre, variantes, grupos):
+        self.nodelist = nodelist
+        self.nombre = nombre
+        self.variantes = variantes
+        self.grupos = grupos
+
+    def render(self, context):
+        grupos = []
+        for expresion in self.grupos:
+            valor = expresion.resolve(context)
+            grupos.extend(valor if isinstance(valor, (list, tuple)) else [valor])
+        clave = clave_fragmento(
+            self.nombre.resolve(context),
+            [variante.resolve(context) for variante in self.variantes],
+        )
+        return cache_html().obtener(
+            clave, lambda: self.nodelist.render(context), grupos
+        )
+
+
+@register.tag("fragmento")
+def do_fragmento(parser, token):
+    nodelist = parser.parse(("endfragmento",))
+    parser.delete_first_token()
+    bits = token.split_contents()[1:]
+    if not bits or bits[0] == "depende":
+        raise template.TemplateSyntaxError("'fragmento' necesita un nombre.")
+    grupos = []
+    if "depende" in bits:
+        posicion = bits.index("depende")
+        bits, grupos = bits[:posicion], bits[posicion + 1 :]
+    return FragmentoNode(
+        nodelist,
+        parser.compile_filter(bits[0]),
+        [parser.compile_filter(bit) for bit in bits[1:]],
+        [parser.compile_filter(bit) for bit in grupos],
+    )
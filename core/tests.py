@@ -1,3 +1,708 @@
-from django.test import TestCase
+import io
+import threading
+import time
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connections
+from django.http import HttpResponse, JsonResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import path, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.arranque import agrupar, medir_arranque, parsear_importtime
+from core.cache_html import CacheHtml, cache_html
+from core.db import opciones_conexion, replicas_desde_entorno
+from core.instrumentacion import CONSULTAS, PETICIONES, REPETIDAS
+from core.limitador import CacheBackend, Limitador, MemoriaBackend, parsear_tasa
+from core.metrics import registro
+from core.replicas import COOKIE, GuardaRetraso, ReplicasMiddleware, RouterReplicas
+from core.sesiones import purgar_todas
+from core.sesiones.db import SessionStore
+from eventos.models import Evento
+from usuarios.cache_perfil import CachePerfil
+from usuarios.models import Usuario
+
+
+class OpcionesConexionTests(SimpleTestCase):
+    def test_sin_pool_conexiones_persistentes(self):
+        opciones = opciones_conexion({"DB_CONN_MAX_AGE": "120"})
+
+        self.assertEqual(opciones["CONN_MAX_AGE"], 120)
+        self.assertTrue(opciones["CONN_HEALTH_CHECKS"])
+        self.assertEqual(opciones["OPTIONS"], {})
+
+    def test_pool_desde_el_entorno(self):
+        opciones = opciones_conexion(
+            {
+                "DB_POOL": "true",
+                "DB_POOL_MIN_SIZE": "4",
+                "DB_POOL_MAX_SIZE": "20",
+                "DB_POOL_TIMEOUT": "2.5",
+                "DB_STATEMENT_TIMEOUT": "3000",
+            }
+        )
+        pool = opciones["OPTIONS"]["pool"]
+
+        # Django rechaza CONN_MAX_AGE distinto de 0 con pool.
+        self.assertEqual(opciones["CONN_MAX_AGE"], 0)
+        self.assertEqual((pool["min_size"], pool["max_size"]), (4, 20))
+        self.assertEqual(pool["timeout"], 2.5)
+        self.assertTrue(callable(pool["check"]))
+        self.assertEqual(opciones["OPTIONS"]["options"], "-c statement_timeout=3000")
+
+    def test_replicas_desde_el_entorno(self):
+        primaria = {"NAME": "reservas", "HOST": "db", "PORT": "5432", "OPTIONS": {}}
+
+        replicas = replicas_desde_entorno(primaria, {"DB_REPLICAS": "r1, r2:5433"})
+
+        self.assertEqual(list(replicas), ["replica1", "replica2"])
+        self.assertEqual(
+            (replicas["replica2"]["HOST"], replicas["replica2"]["PORT"]), ("r2", "5433")
+        )
+        self.assertEqual(replicas["replica1"]["PORT"], "5432")
+        self.assertEqual(replicas["replica1"]["TEST"], {"MIRROR": "default"})
+
+
+class MetricasPoolTests(TestCase):
+    def test_gauges_exportados_sin_pool(self):
+        texto = registro.exportar()
+
+        self.assertIn("db_pool_esperando 0", texto)
+        self.assertIn("db_pool_saturacion 0", texto)
+        self.assertIn("# TYPE db_pool_espera_ms gauge", texto)
+
+    def test_bench_conexiones_exige_postgresql(self):
+        with self.assertRaises(CommandError):
+            call_command("bench_conexiones", peticiones=1)
+
+
+@override_settings(
+    REPLICAS=["replica1", "replica2"],
+    REPLICAS_RETRASO_MAXIMO=5,
+    REPLICAS_INTERVALO_COMPROBACION=0,
+)
+class RouterReplicasTests(SimpleTestCase):
+    def setUp(self):
+        self.router = RouterReplicas()
+        medir = mock.patch.object(GuardaRetraso, "medir", return_value=0.0)
+        self.medir = medir.start()
+        self.addCleanup(medir.stop)
+
+    def _peticion(self, vista, metodo="GET", **extra):
+        request = getattr(RequestFactory(), metodo.lower())("/api/usuarios/", **extra)
+        return ReplicasMiddleware(vista)(request)
+
+    def test_fuera_de_una_peticion_lee_de_la_primaria(self):
+        self.assertEqual(self.router.db_for_read(Usuario), "default")
+
+    def test_get_lee_de_una_replica_y_escribir_la_fija_en_la_primaria(self):
+        alias = []
+
+        def vista(request):
+            alias.append(self.router.db_for_read(Usuario))
+            self.router.db_for_write(Usuario)
+            alias.append(self.router.db_for_read(Usuario))
+            return HttpResponse()
+
+        response = self._peticion(vista)
+
+        self.assertIn(alias[0], ("replica1", "replica2"))
+        self.assertEqual(alias[1], "default")
+        self.assertIn(COOKIE, response.cookies)
+
+    def test_post_y_lectura_tras_escritura_van_a_la_primaria(self):
+        alias = []
+
+        def vista(request):
+            alias.append(self.router.db_for_read(Usuario))
+            return HttpResponse()
+
+        self._peticion(vista, "POST")
+        request = RequestFactory().get("/api/usuarios/")
+        request.COOKIES[COOKIE] = str(time.time() + 10)
+        ReplicasMiddleware(vista)(request)
+
+        self.assertEqual(alias, ["default", "default"])
+
+    def test_ventana_por_cabecera_authorization(self):
+        alias = []
+
+        def escribir(request):
+            self.router.db_for_write(Usuario)
+            return HttpResponse()
+
+        def leer(request):
+            alias.append(self.router.db_for_read(Usuario))
+            return HttpResponse()
+
+        cache.clear()
+        self._peticion(escribir, "POST", HTTP_AUTHORIZATION="Bearer a")
+        self._peticion(leer, HTTP_AUTHORIZATION="Bearer a")
+        self._peticion(leer, HTTP_AUTHORIZATION="Bearer b")
+
+        self.assertEqual(alias[0], "default")
+        self.assertNotEqual(alias[1], "default")
+
+    def test_guarda_de_retraso(self):
+        alias = []
+
+        def vista(request):
+            alias.append(self.router.db_for_read(Usuario))
+            return HttpResponse()
+
+        # replica1 va 30 s por detrás y replica2 no responde.
+        self.medir.side_effect = lambda nombre: 30.0 if nombre == "replica1" else None
+        self._peticion(vista)
+        self.medir.side_effect = lambda nombre: 30.0 if nombre == "replica1" else 0.1
+        self._peticion(vista)
+
+        self.assertEqual(alias, ["default", "replica2"])
+
+    def test_las_cargas_de_las_caches_leen_de_la_primaria(self):
+        alias = []
+
+        def leer():
+            alias.append(self.router.db_for_read(Usuario))
+
+        def cargar():
+            leer()
+            return 1, {}
+
+        def generar():
+            leer()
+            self.router.db_for_write(Usuario)
+            return "html"
+
+        def vista(request):
+            leer()
+            CachePerfil(alias=None).obtener("u", cargar)
+            CacheHtml(alias="default").obtener("replicas", generar)
+            leer()
+            return HttpResponse()
+
+        cache.clear()
+        self._peticion(vista)
+
+        self.assertIn(alias[0], ("replica1", "replica2"))
+        # La escritura dentro de la carga también fija la petición.
+        self.assertEqual(alias[1:], ["default", "default", "default"])
+
+    def test_las_replicas_no_se_migran(self):
+        self.assertFalse(self.router.allow_migrate("replica1", "usuarios"))
+        self.assertTrue(self.router.allow_migrate("default", "usuarios"))
+
+
+@skipUnless(
+    any(alias != "default" for alias in settings.DATABASES),
+    "Configura una réplica (DB_REPLICAS) para probar el enrutado de extremo a extremo.",
+)
+class ReplicasExtremoAExtremoTests(TransactionTestCase):
+    # TransactionTestCase: la réplica (TEST MIRROR) es otra conexión y sólo ve
+    # datos confirmados.
+    databases = "__all__"
+
+    def test_listado_en_la_replica_y_escrituras_en_la_primaria(self):
+        replica = next(alias for alias in settings.DATABASES if alias != "default")
+        usuario = Usuario.objects.create(username="lector", email="lector@mail.com")
+        client = APIClient()
+        client.force_authenticate(user=usuario)
+
+        with override_settings(REPLICAS=[replica]):
+            with CaptureQueriesContext(connections[replica]) as en_replica:
+                listado = client.get(reverse("usuario-list"))
+            with CaptureQueriesContext(connections[replica]) as tras_escribir:
+                client.patch(
+                    reverse("usuario-detail", kwargs={"uuid": usuario.uuid}),
+                    {"nombre": "Ana"},
+                    format="json",
+                )
+                client.get(reverse("usuario-list"))
+
+        self.assertEqual(listado.status_code, 200)
+        self.assertTrue(en_replica.captured_queries)
+        # La cookie de la escritura deja al cliente en la primaria.
+        self.assertFalse(tras_escribir.captured_queries)
+
+
+def vista_n_mas_1(request):
+    nombres = [u.username for u in Usuario.objects.all()[:1]]
+    for _ in range(6):
+        Usuario.objects.filter(username="nadie").exists()
+    return JsonResponse({"usuarios": nombres})
+
+
+urlpatterns = [path("n1/", vista_n_mas_1, name="n1")]
+
+
+class InstrumentacionTests(TestCase):
+    def setUp(self):
+        self.usuario = Usuario.objects.create(username="medido", email="m@mail.com")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.usuario)
+
+    @override_settings(INSTRUMENTACION_MUESTREO=1)
+    def test_peticion_muestreada(self):
+        antes = CONSULTAS.contar(vista="usuario-list")
+
+        response = self.client.get(reverse("usuario-list"))
+
+        self.assertEqual(response.status_code, 200)
+        timing = response["Server-Timing"]
+        self.assertRegex(timing, r'^db;dur=[\d.]+;desc="\d+ consultas"')
+        self.assertIn("serializacion;dur=", timing)
+        self.assertIn("render;dur=", timing)
+        self.assertIn("total;dur=", timing)
+        self.assertEqual(CONSULTAS.contar(vista="usuario-list"), antes + 1)
+
+    @override_settings(INSTRUMENTACION_MUESTREO=0)
+    def test_sin_muestreo_solo_contadores(self):
+        antes = PETICIONES.valor(vista="usuario-list", metodo="GET", estado=200)
+
+        response = self.client.get(reverse("usuario-list"))
+
+        self.assertNotIn("Server-Timing", response)
+        self.assertEqual(
+            PETICIONES.valor(vista="usuario-list", metodo="GET", estado=200),
+            antes + 1,
+        )
+
+    @override_settings(INSTRUMENTACION_MUESTREO=1, ROOT_URLCONF="core.tests")
+    def test_deteccion_de_n_mas_1(self):
+        antes = REPETIDAS.valor(vista="n1")
+
+        with self.assertLogs("core.instrumentacion", "WARNING") as logs:
+            response = self.client.get("/n1/")
+
+        self.assertIn('desc="7 consultas"', response["Server-Timing"])
+        self.assertEqual(REPETIDAS.valor(vista="n1"), antes + 1)
+        self.assertIn("6 ejecuciones", logs.output[0])
+
+    @override_settings(INSTRUMENTACION_MUESTREO=1, ROOT_URLCONF="config.urls_asgi")
+    async def test_vistas_asincronas(self):
+        response = await self.async_client.get(
+            reverse("usuario-disponible"), {"username": "libre"}
+        )
+
+        self.assertIn("total;dur=", response["Server-Timing"])
+
+    def test_endpoint_metrics(self):
+        self.client.get(reverse("usuario-list"))
+
+        response = self.client.get("/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        self.assertIn("http_duracion_segundos_bucket", response.content.decode())
+
+    @override_settings(METRICAS_TOKEN=None)
+    def test_endpoint_metrics_sin_token_solo_local_o_staff(self):
+        # El cliente de pruebas llega desde 127.0.0.1.
+        self.assertEqual(self.client.get("/metrics").status_code, 200)
+        self.assertEqual(
+            self.client.get("/metrics", REMOTE_ADDR="203.0.113.7").status_code, 403
+        )
+        # Lo reenviado por un proxy local tampoco cuenta como local.
+        self.assertEqual(
+            self.client.get(
+                "/metrics", headers={"X-Forwarded-For": "203.0.113.7"}
+            ).status_code,
+            403,
+        )
+
+        staff = Usuario.objects.create(
+            username="staff", email="staff@mail.com", is_staff=True
+        )
+        self.client.force_login(staff)
+        response = self.client.get("/metrics", REMOTE_ADDR="203.0.113.7")
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICAS_TOKEN="secreto")
+    def test_endpoint_metrics_con_token(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 401)
+        response = self.client.get(
+            "/metrics", headers={"Authorization": "Bearer secreto"}
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+class LimitadorTests(SimpleTestCase):
+    def _limitador(self, backend=None, **reglas):
+        return Limitador(backend or MemoriaBackend(shards=4), {"login": reglas})
+
+    def test_parsear_tasa(self):
+        self.assertEqual(parsear_tasa("5/min"), (5, 60))
+        self.assertEqual(parsear_tasa("100/hour"), (100, 3600))
+
+    @mock.patch("core.limitador.time.time", return_value=6000.0)
+    def test_ventana_deslizante(self, reloj):
+        limitador = self._limitador(ip="3/min")
+
+        admitidas = [limitador.comprobar("login", ip="1.1.1.1") for _ in range(4)]
+        # Otra IP lleva su propio contador.
+        otra = limitador.comprobar("login", ip="2.2.2.2")
+        # A mitad de la ventana siguiente aún pesa la mitad de la anterior (4).
+        reloj.return_value = 6090.0
+        a_mitad = [limitador.comprobar("login", ip="1.1.1.1") for _ in range(2)]
+        reloj.return_value = 6170.0
+        despues = limitador.comprobar("login", ip="1.1.1.1")
+
+        self.assertEqual(admitidas[:3], [None, None, None])
+        self.assertEqual(admitidas[3], 75)
+        self.assertIsNone(otra)
+        self.assertEqual(a_mitad, [None, 15])
+        self.assertIsNone(despues)
+
+    def test_username_sin_distinguir_mayusculas_y_ruta_global(self):
+        limitador = self._limitador(username="2/min", ruta="4/min")
+
+        esperas = [
+            limitador.comprobar("login", ip=f"10.0.0.{i}", username=nombre)
+            for i, nombre in enumerate(["Ana", "ana ", "ANA", "luis", "pepe"])
+        ]
+
+        self.assertEqual(esperas[:2], [None, None])
+        self.assertIsNotNone(esperas[2])
+        self.assertIsNone(esperas[3])
+        # Quinta petición del ámbito: supera el techo de la ruta.
+        self.assertIsNotNone(esperas[4])
+        self.assertIsNone(limitador.comprobar("registro", ip="10.0.0.1"))
+
+    def test_backend_de_cache(self):
+        cache.clear()
+        limitador = self._limitador(CacheBackend(), ip="2/min")
+
+        esperas = [limitador.comprobar("login", ip="3.3.3.3") for _ in range(3)]
+
+        self.assertEqual(esperas[:2], [None, None])
+        self.assertIsNotNone(esperas[2])
+
+    def test_memoria_purga_las_entradas_caducadas(self):
+        backend = MemoriaBackend(shards=1, purga=0)
+        backend.incr("vieja", ttl=-1)
+        backend.incr("nueva", ttl=60)
+
+        self.assertEqual(backend.get("vieja"), 0)
+        self.assertEqual(list(backend._shards[0]), ["nueva"])
+
+
+class ArranqueTests(SimpleTestCase):
+    """Arranque de un worker en un proceso nuevo (``core.arranque``)."""
+
+    def test_parsear_importtime(self):
+        salida = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |     json.decoder\n"
+            "import time:       300 |        420 |   json\n"
+            "import time:      1000 |       1420 | usuarios.models\n"
+        )
+
+        filas = parsear_importtime(salida)
+
+        self.assertEqual(
+            [(f.modulo, f.propio_us, f.profundidad) for f in filas],
+            [("json.decoder", 120, 2), ("json", 300, 1), ("usuarios.models", 1000, 0)],
+        )
+        self.assertEqual(agrupar(filas), {"usuarios": 1000, "(stdlib)": 420})
+
+    def test_presupuesto_de_arranque(self):
+        mediana, modulos = medir_arranque("wsgi", repeticiones=3)
+
+        self.assertTrue(modulos)
+        self.assertLess(
+            mediana * 1000,
+            settings.ARRANQUE_PRESUPUESTO_MS,
+            "El worker tarda más en arrancar que ARRANQUE_PRESUPUESTO_MS; "
+            "mira el desglose de manage.py perfil_arranque.",
+        )
+
+    def test_comando_falla_sobre_el_presupuesto(self):
+        with self.assertRaisesMessage(CommandError, "presupuesto"):
+            call_command(
+                "perfil_arranque",
+                "--objetivo",
+                "setup",
+                "--repeticiones",
+                "1",
+                "--presupuesto",
+                "1",
+                stdout=io.StringIO(),
+            )
+
+
+class CacheHtmlTests(TestCase):
+    """Portada y fragmentos cacheados (``core.cache_html``)."""
+
+    def setUp(self):
+        cache.clear()
+        self.organizador = Usuario.objects.create(
+            username="organiza", email="org@mail.com", tipo_usuario="organizador"
+        )
+        self.evento = self._crear_evento("Concierto de apertura")
+
+    def _crear_evento(self, nombre):
+        inicio = timezone.now() + timedelta(days=1)
+        return Evento.objects.create(
+            nombre=nombre,
+            categoria="concierto",
+            recinto="Estadio",
+            ciudad="Madrid",
+            fecha_inicio=inicio,
+            fecha_fin=inicio + timedelta(hours=2),
+            capacidad=1000,
+            organizador=self.organizador,
+        )
+
+    def test_portada_anonima_sin_consultas(self):
+        primera = self.client.get(reverse("home"))
+        with self.assertNumQueries(0):
+            segunda = self.client.get(reverse("home"))
+
+        self.assertContains(segunda, "Concierto de apertura")
+        self.assertContains(segunda, "Inicia sesión para reservar")
+        self.assertEqual(segunda.content, primera.content)
+        self.assertIn("Cookie", segunda["Vary"])
+
+    def test_precalculada_y_recalculada_al_cambiar_eventos(self):
+        call_command("precalcular_paginas", stdout=io.StringIO())
+        with self.assertNumQueries(0):
+            self.client.get(reverse("home"))
+
+        # El proceso que escribe recalcula la portada al confirmar.
+        with self.captureOnCommitCallbacks(execute=True):
+            self._crear_evento("Festival de otoño")
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("home"))
+
+        self.assertContains(response, "Festival de otoño")
+
+    def test_portada_caduca_y_se_sirve_obsoleta_mientras_se_recalcula(self):
+        with mock.patch("core.cache_html.time.time", return_value=1000.0) as reloj:
+            self.client.get(reverse("home"))
+            # Sin señales: sólo el tiempo la vuelve obsoleta.
+            Evento.objects.filter(pk=self.evento.pk).update(nombre="Concierto final")
+
+            reloj.return_value = 1061.0
+            # Otra petición la está recalculando: se sirve la copia obsoleta.
+            cache.add("html:pagina:home:bloqueo", 1)
+            with self.assertNumQueries(0):
+                response = self.client.get(reverse("home"))
+            self.assertContains(response, "Concierto de apertura")
+
+            cache.delete("html:pagina:home:bloqueo")
+            response = self.client.get(reverse("home"))
+        self.assertContains(response, "Concierto final")
+
+    def test_portada_fresca_hasta_el_primer_evento_listado(self):
+        self.evento.fecha_inicio = timezone.now() + timedelta(seconds=30)
+        self.evento.save()
+        self.client.get(reverse("home"))
+
+        _, fresca_hasta, _ = cache.get("html:pagina:home")
+        self.assertAlmostEqual(
+            fresca_hasta, self.evento.fecha_inicio.timestamp(), delta=2
+        )
+
+    def test_con_sesion_se_ejecuta_la_vista(self):
+        self.client.get(reverse("home"))
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = "caducada"
+
+        with CaptureQueriesContext(connections["default"]) as ctx:
+            response = self.client.get(reverse("home"))
+
+        # La vista lee la sesión, pero los eventos salen del fragmento.
+        self.assertFalse([q for q in ctx.captured_queries if '"eventos"' in q["sql"]])
+        self.assertContains(response, "Concierto de apertura")
+
+    def test_panel_por_usuario_invalidado_al_cambiarlo(self):
+        self.client.force_login(self.organizador)
+        response = self.client.get(reverse("home"))
+        self.assertContains(response, "Tus próximos eventos")
+        # Variante autenticada del fragmento de eventos.
+        self.assertContains(response, "Capacidad: 1000")
+
+        # El login (last_login) no invalida el panel.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.organizador.save(update_fields=["last_login"])
+        with CaptureQueriesContext(connections["default"]) as ctx:
+            self.client.get(reverse("home"))
+        self.assertFalse([q for q in ctx.captured_queries if '"eventos"' in q["sql"]])
+
+        self.organizador.tipo_usuario = "cliente"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.organizador.save()
+        response = self.client.get(reverse("home"))
+        self.assertNotContains(response, "Tus próximos eventos")
+
+    def test_un_solo_calculo_con_la_entrada_obsoleta(self):
+        html = CacheHtml(ttl=60)
+        llamadas = []
+
+        def generar():
+            llamadas.append(1)
+            return f"v{len(llamadas)}"
+
+        self.assertEqual(html.obtener("f", generar, ["g"]), "v1")
+        html.invalidar(["g"])
+        # Otra petición la está recalculando: se sirve la copia obsoleta.
+        cache.add("html:f:bloqueo", 1)
+        self.assertEqual(html.obtener("f", generar, ["g"]), "v1")
+        cache.delete("html:f:bloqueo")
+        self.assertEqual(html.obtener("f", generar, ["g"]), "v2")
+        self.assertEqual(html.obtener("f", generar, ["g"]), "v2")
+        self.assertEqual(len(llamadas), 2)
+
+    def test_estampida_en_frio(self):
+        html = CacheHtml(espera=5)
+        llamadas = []
+        resultados = []
+
+        def generar():
+            llamadas.append(1)
+            time.sleep(0.1)
+            return "portada"
+
+        def pedir():
+            resultados.append(html.obtener("frio", generar))
+
+        hilos = [threading.Thread(target=pedir) for _ in range(8)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(len(llamadas), 1)
+        self.assertEqual(resultados, ["portada"] * 8)
+
+    def test_caducidad_por_tiempo(self):
+        html = CacheHtml(ttl=60)
+        with mock.patch("core.cache_html.time.time", return_value=1000.0) as reloj:
+            self.assertEqual(html.obtener("t", lambda: "viejo"), "viejo")
+            reloj.return_value = 1061.0
+            self.assertEqual(html.obtener("t", lambda: "nuevo"), "nuevo")
+        self.assertIs(cache_html(), cache_html())
+
+
+ALMACENES = (
+    "core.sesiones.db",
+    "core.sesiones.cached_db",
+    "core.sesiones.signed_cookies",
+)
+
+
+class SesionesTests(TestCase):
+    """Almacenes de sesión de ``core.sesiones`` y su purga."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_mensajes_de_las_vistas_con_cada_almacen(self):
+        for almacen in ALMACENES:
+            with (
+                self.subTest(almacen=almacen),
+                override_settings(SESSION_ENGINE=almacen),
+            ):
+                self.client.cookies.clear()
+                nombre = "sesion" + almacen.rsplit(".", 1)[-1].replace("_", "")
+                response = self.client.post(
+                    reverse("register"),
+                    {
+                        "username": nombre,
+                        "email": f"{nombre}@mail.com",
+                        "password": "Clave-segura-123",
+                        "confirm_password": "Clave-segura-123",
+                    },
+                    follow=True,
+                )
+                self.assertContains(response, "Registro exitoso")
+
+                response = self.client.post(
+                    reverse("login"),
+                    {"username": nombre, "password": "Clave-segura-123"},
+                    follow=True,
+                )
+                self.assertContains(response, f"Bienvenido, {nombre}!")
+                self.assertEqual(response.context["user"].username, nombre)
+
+                response = self.client.get(reverse("logout"), follow=True)
+                self.assertContains(response, "Has cerrado sesión correctamente.")
+                self.assertFalse(response.context["user"].is_authenticated)
+
+    def test_solo_escribe_si_cambia(self):
+        sesion = SessionStore()
+        sesion["carrito"] = [1, 2]
+        sesion.save()
+
+        misma = SessionStore(sesion.session_key)
+        misma["carrito"] = [1, 2]
+        self.assertFalse(misma.modified)
+        with self.assertNumQueries(0):
+            misma.save()
+
+        misma["carrito"].append(3)
+        misma.modified = True
+        self.assertTrue(misma.modified)
+        with CaptureQueriesContext(connections["default"]) as ctx:
+            misma.save()
+        self.assertTrue(ctx.captured_queries)
+        self.assertEqual(SessionStore(sesion.session_key)["carrito"], [1, 2, 3])
+
+    def test_sin_cambios_no_se_reenvia_la_cookie(self):
+        def vista(request):
+            request.session["tema"] = "claro"
+            return HttpResponse()
+
+        factory = RequestFactory()
+        for almacen in ALMACENES:
+            with (
+                self.subTest(almacen=almacen),
+                override_settings(SESSION_ENGINE=almacen),
+            ):
+                middleware = SessionMiddleware(vista)
+                primera = middleware(factory.get("/"))
+                cookie = primera.cookies[settings.SESSION_COOKIE_NAME].value
+
+                request = factory.get("/")
+                request.COOKIES[settings.SESSION_COOKIE_NAME] = cookie
+                segunda = middleware(request)
+
+                self.assertNotIn(settings.SESSION_COOKIE_NAME, segunda.cookies)
+
+    def test_purga_por_lotes(self):
+        ahora = timezone.now()
+        Session.objects.bulk_create(
+            Session(
+                session_key=f"clave{i:04d}",
+                session_data="",
+                expire_date=ahora + timedelta(days=-1 if i < 12 else 1),
+            )
+            for i in range(15)
+        )
+
+        self.assertEqual(purgar_todas(lote=5), 12)
+        self.assertEqual(Session.objects.count(), 3)
+
+        Session.objects.filter(session_key="clave0012").update(
+            expire_date=ahora - timedelta(days=1)
+        )
+        salida = io.StringIO()
+        call_command("purgar_sesiones", "--lote", "2", stdout=salida)
+        self.assertIn("1 sesiones caducadas purgadas", salida.getvalue())
+        # ``clearsessions`` usa la misma purga.
+        Session.objects.update(expire_date=ahora - timedelta(days=1))
+        with override_settings(SESSION_ENGINE="core.sesiones.db"):
+            call_command("clearsessions")
+        self.assertFalse(Session.objects.exists())
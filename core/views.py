@@ -1,5 +1,70 @@
+import hmac
+import ipaddress
+
+from django.conf import settings
+from django.http import HttpResponse
 from django.shortcuts import render
+from django.utils import timezone
+
+from eventos.models import Evento
+
+from .cache_html import caducar, grupo_usuario, pagina_anonima
+from .metrics import registro
+
+# Próximos eventos que se listan en la portada.
+DESTACADOS = 6
 
 
+@pagina_anonima("home", grupos=("eventos",))
 def home(request):
-    return render(request, "core/home.html")
+    """
+    Portada. Los querysets son perezosos: sólo se evalúan si el fragmento
+    que los usa no está en la caché.
+    """
+    proximos = Evento.objects.filter(is_active=True, fecha_inicio__gte=timezone.now())
+    # La lista cambia cuando empieza el primero de los eventos que muestra.
+    caducar(
+        request,
+        lambda: (
+            proximos.order_by("fecha_inicio")
+            .values_list("fecha_inicio", flat=True)
+            .first()
+        ),
+    )
+    contexto = {"destacados": proximos.order_by("fecha_inicio", "id")[:DESTACADOS]}
+    usuario = request.user
+    if usuario.is_authenticated:
+        contexto["grupo_usuario"] = grupo_usuario(usuario.pk)
+        contexto["mis_eventos"] = proximos.filter(organizador=usuario).order_by(
+            "fecha_inicio", "id"
+        )[:DESTACADOS]
+    return render(request, "core/home.html", contexto)
+
+
+def _local(request):
+    """Petición hecha desde la propia máquina y no reenviada por un proxy."""
+    if "X-Forwarded-For" in request.headers:
+        return False
+    try:
+        return ipaddress.ip_address(request.META.get("REMOTE_ADDR", "")).is_loopback
+    except ValueError:
+        return False
+
+
+def metricas(request):
+    """
+    Métricas en formato de texto de Prometheus. Con ``METRICAS_TOKEN`` hay
+    que enviarlo como ``Authorization: Bearer <token>``; sin él sólo se
+    sirven a peticiones locales (loopback, sin proxy) o de staff.
+    """
+    token = getattr(settings, "METRICAS_TOKEN", None)
+    if token:
+        if not hmac.compare_digest(
+            request.headers.get("Authorization", ""), f"Bearer {token}"
+        ):
+            return HttpResponse(status=401)
+    elif not (_local(request) or request.user.is_staff):
+        return HttpResponse(status=403)
+    return HttpResponse(
+        registro.exportar(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
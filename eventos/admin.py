@@ -1,3 +1,22 @@
 from django.contrib import admin
+from .models import Evento
 
-# Register your models here.
+
+@admin.register(Evento)
+class EventoAdmin(admin.ModelAdmin):
+    list_display = (
+        "nombre",
+        "categoria",
+        "ciudad",
+        "recinto",
+        "fecha_inicio",
+        "capacidad",
+        "organizador",
+        "is_active",
+    )
+    list_filter = ("categoria", "ciudad", "is_active")
+    search_fields = ("nombre", "recinto", "ciudad")
+    date_hierarchy = "fecha_inicio"
+    list_select_related = ("organizador",)
+    raw_id_fields = ("organizador",)
+    readonly_fields = ("uuid", "fecha_creacion")
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class EventosConfig(AppConfig):
     name = 'eventos'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,45 @@
+# Generated by Django 6.0 on 2026-10-18 13:12
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Evento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('nombre', models.CharField(max_length=200)),
+                ('descripcion', models.TextField(blank=True)),
+                ('categoria', models.CharField(choices=[('concierto', 'Concierto'), ('deporte', 'Deporte'), ('teatro', 'Teatro'), ('conferencia', 'Conferencia'), ('festival', 'Festival'), ('otro', 'Otro')], max_length=20)),
+                ('recinto', models.CharField(max_length=200)),
+                ('ciudad', models.CharField(max_length=100)),
+                ('direccion', models.CharField(blank=True, max_length=255)),
+                ('fecha_inicio', models.DateTimeField()),
+                ('fecha_fin', models.DateTimeField()),
+                ('capacidad', models.PositiveIntegerField()),
+                ('is_active', models.BooleanField(default=True)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('organizador', models.ForeignKey(limit_choices_to={'tipo_usuario': 'organizador'}, on_delete=django.db.models.deletion.PROTECT, related_name='eventos_organizados', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Evento',
+                'verbose_name_plural': 'Eventos',
+                'db_table': 'eventos',
+                'ordering': ['fecha_inicio', 'id'],
+                'indexes': [models.Index(fields=['fecha_inicio', 'id'], name='eventos_fecha_id_idx'), models.Index(fields=['categoria', 'fecha_inicio', 'id'], name='eventos_cat_fecha_idx'), models.Index(fields=['ciudad', 'fecha_inicio', 'id'], name='eventos_ciudad_fecha_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(('fecha_fin__gte', models.F('fecha_inicio'))), name='eventos_fecha_fin_posterior')],
+            },
+        ),
+    ]
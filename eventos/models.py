@@ -1,3 +1,79 @@
+import uuid
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import models
 
-# Create your models here.
+
+class Evento(models.Model):
+    CATEGORIA_CHOICES = [
+        ("concierto", "Concierto"),
+        ("deporte", "Deporte"),
+        ("teatro", "Teatro"),
+        ("conferencia", "Conferencia"),
+        ("festival", "Festival"),
+        ("otro", "Otro"),
+    ]
+
+    uuid = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+
+    nombre = models.CharField(max_length=200)
+    descripcion = models.TextField(blank=True)
+    categoria = models.CharField(max_length=20, choices=CATEGORIA_CHOICES)
+
+    recinto = models.CharField(max_length=200)
+    ciudad = models.CharField(max_length=100)
+    direccion = models.CharField(max_length=255, blank=True)
+
+    fecha_inicio = models.DateTimeField()
+    fecha_fin = models.DateTimeField()
+
+    capacidad = models.PositiveIntegerField()
+
+    organizador = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.PROTECT,
+        related_name="eventos_organizados",
+        limit_choices_to={"tipo_usuario": "organizador"},
+    )
+
+    is_active = models.BooleanField(default=True)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "eventos"
+        verbose_name = "Evento"
+        verbose_name_plural = "Eventos"
+        ordering = ["fecha_inicio", "id"]
+        indexes = [
+            # Uno por cada filtro del catálogo; todos terminan en la ordenación
+            # de la paginación keyset (fecha_inicio, id).
+            models.Index(fields=["fecha_inicio", "id"], name="eventos_fecha_id_idx"),
+            models.Index(
+                fields=["categoria", "fecha_inicio", "id"],
+                name="eventos_cat_fecha_idx",
+            ),
+            models.Index(
+                fields=["ciudad", "fecha_inicio", "id"],
+                name="eventos_ciudad_fecha_idx",
+            ),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(fecha_fin__gte=models.F("fecha_inicio")),
+                name="eventos_fecha_fin_posterior",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.nombre} ({self.ciudad}, {self.fecha_inicio:%Y-%m-%d})"
+
+    def clean(self):
+        super().clean()
+        if self.fecha_inicio and self.fecha_fin and self.fecha_fin < self.fecha_inicio:
+            raise ValidationError(
+                {"fecha_fin": "La fecha de fin no puede ser anterior al inicio."}
+            )
+        if self.organizador_id and self.organizador.tipo_usuario != "organizador":
+            raise ValidationError(
+                {"organizador": "El organizador debe ser un usuario organizador."}
+            )
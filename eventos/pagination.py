@@ -0,0 +1,10 @@
+from core.pagination import KeysetPagination
+
+
+class EventoCursorPagination(KeysetPagination):
+    """
+    Paginación del catálogo por (fecha_inicio, id): la columna final de todos
+    los índices compuestos de ``Evento``.
+    """
+
+    ordering = ("fecha_inicio", "id")
@@ -0,0 +1,25 @@
+from rest_framework import permissions
+
+from usuarios.authentication import obtener_usuario
+
+
+class IsOrganizadorOrReadOnly(permissions.BasePermission):
+    """
+    Lectura pública del catálogo. Sólo los organizadores pueden publicar
+    eventos; modificarlos o cancelarlos queda para su organizador o el staff.
+    """
+
+    def has_permission(self, request, view):
+        if request.method in permissions.SAFE_METHODS:
+            return True
+        if not request.user or not request.user.is_authenticated:
+            return False
+        if view.action == "create":
+            return obtener_usuario(request.user).tipo_usuario == "organizador"
+        return True
+
+    def has_object_permission(self, request, view, obj):
+        if request.method in permissions.SAFE_METHODS:
+            return True
+        user = obtener_usuario(request.user)
+        return obj.organizador_id == user.pk or user.is_staff
@@ -0,0 +1,46 @@
+from rest_framework import serializers
+from usuarios.models import Usuario
+from .models import Evento
+
+
+class OrganizadorSerializer(serializers.ModelSerializer):
+    """Datos públicos del organizador incluidos en cada evento."""
+
+    full_name = serializers.ReadOnlyField()
+
+    class Meta:
+        model = Usuario
+        fields = ["uuid", "username", "full_name"]
+
+
+class EventoSerializer(serializers.ModelSerializer):
+    """Serializer del catálogo de eventos."""
+
+    organizador = OrganizadorSerializer(read_only=True)
+
+    class Meta:
+        model = Evento
+        fields = [
+            "uuid",
+            "nombre",
+            "descripcion",
+            "categoria",
+            "recinto",
+            "ciudad",
+            "direccion",
+            "fecha_inicio",
+            "fecha_fin",
+            "capacidad",
+            "organizador",
+            "fecha_creacion",
+        ]
+        read_only_fields = ["uuid", "fecha_creacion"]
+
+    def validate(self, attrs):
+        inicio = attrs.get("fecha_inicio", getattr(self.instance, "fecha_inicio", None))
+        fin = attrs.get("fecha_fin", getattr(self.instance, "fecha_fin", None))
+        if inicio and fin and fin < inicio:
+            raise serializers.ValidationError(
+                {"fecha_fin": "La fecha de fin no puede ser anterior al inicio."}
+            )
+        return attrs
@@ -0,0 +1,13 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.cache_html import invalidar_html
+
+from .models import Evento
+
+
+@receiver(post_save, sender=Evento, dispatch_uid="eventos_invalidar_html_save")
+@receiver(post_delete, sender=Evento, dispatch_uid="eventos_invalidar_html_delete")
+def invalidar_html_eventos(sender, instance, **kwargs):
+    """La portada y sus fragmentos listan los próximos eventos."""
+    invalidar_html("eventos")
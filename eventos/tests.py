@@ -1,3 +1,132 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from usuarios.models import Usuario
+
+from .models import Evento
+
+
+def crear_eventos(organizador, n, **extra):
+    inicio = timezone.now() + timedelta(days=1)
+    datos = {
+        "categoria": "concierto",
+        "recinto": "Estadio",
+        "ciudad": "Madrid",
+        "capacidad": 1000,
+    }
+    datos.update(extra)
+    return Evento.objects.bulk_create(
+        Evento(
+            nombre=f"Evento {i}",
+            fecha_inicio=inicio + timedelta(hours=i),
+            fecha_fin=inicio + timedelta(hours=i + 2),
+            organizador=organizador,
+            **datos,
+        )
+        for i in range(n)
+    )
+
+
+class EventoAPITests(APITestCase):
+    def setUp(self):
+        self.organizador = Usuario.objects.create(
+            username="organiza", email="org@mail.com", tipo_usuario="organizador"
+        )
+        self.cliente = Usuario.objects.create(username="cliente", email="c@mail.com")
+        self.url = reverse("evento-list")
+
+    def test_list_is_public_and_paginated(self):
+        crear_eventos(self.organizador, 5)
+
+        response = self.client.get(f"{self.url}?page_size=2")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIsNotNone(response.data["next"])
+        primero = response.data["results"][0]
+        self.assertEqual(primero["nombre"], "Evento 0")
+        self.assertEqual(primero["organizador"]["username"], "organiza")
+
+    def test_list_query_count_is_constant(self):
+        """Regresión N+1: el número de consultas no depende del tamaño de página."""
+
+        def consultas(n):
+            Evento.objects.all().delete()
+            crear_eventos(self.organizador, n)
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(f"{self.url}?page_size={n}")
+            self.assertEqual(len(response.data["results"]), n)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(consultas(2), 1)
+        self.assertEqual(consultas(40), 1)
+
+    def test_filters(self):
+        crear_eventos(self.organizador, 3)
+        crear_eventos(self.organizador, 2, categoria="teatro", ciudad="Sevilla")
+
+        por_categoria = self.client.get(f"{self.url}?categoria=teatro")
+        por_ciudad = self.client.get(f"{self.url}?ciudad=Madrid")
+        hasta = (timezone.now() + timedelta(days=1, minutes=30)).isoformat()
+        por_fecha = self.client.get(self.url, {"hasta": hasta})
+
+        self.assertEqual(len(por_categoria.data["results"]), 2)
+        self.assertEqual(len(por_ciudad.data["results"]), 3)
+        self.assertEqual(len(por_fecha.data["results"]), 2)
+
+    def test_invalid_date_filter(self):
+        response = self.client.get(f"{self.url}?desde=ayer")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def _datos_evento(self):
+        inicio = timezone.now() + timedelta(days=10)
+        return {
+            "nombre": "Festival",
+            "categoria": "festival",
+            "recinto": "Parque",
+            "ciudad": "Bilbao",
+            "fecha_inicio": inicio.isoformat(),
+            "fecha_fin": (inicio + timedelta(days=2)).isoformat(),
+            "capacidad": 50000,
+        }
+
+    def test_organizador_can_create(self):
+        self.client.force_authenticate(user=self.organizador)
+        response = self.client.post(self.url, self._datos_evento(), format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        evento = Evento.objects.get(uuid=response.data["uuid"])
+        self.assertEqual(evento.organizador, self.organizador)
+
+    def test_cliente_cannot_create(self):
+        self.client.force_authenticate(user=self.cliente)
+        response = self.client.post(self.url, self._datos_evento(), format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_fecha_fin_before_inicio_rejected(self):
+        datos = self._datos_evento()
+        datos["fecha_fin"], datos["fecha_inicio"] = (
+            datos["fecha_inicio"],
+            datos["fecha_fin"],
+        )
+        self.client.force_authenticate(user=self.organizador)
+        response = self.client.post(self.url, datos, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_destroy_cancels_event(self):
+        (evento,) = crear_eventos(self.organizador, 1)
+        self.client.force_authenticate(user=self.organizador)
+
+        response = self.client.delete(
+            reverse("evento-detail", kwargs={"uuid": evento.uuid})
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        evento.refresh_from_db()
+        self.assertFalse(evento.is_active)
+        self.assertEqual(len(self.client.get(self.url).data["results"]), 0)
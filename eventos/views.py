@@ -1,3 +1,58 @@
-from django.shortcuts import render
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import viewsets
+from rest_framework.exceptions import ValidationError
+from .models import Evento
+from .pagination import EventoCursorPagination
+from .permissions import IsOrganizadorOrReadOnly
+from .serializers import EventoSerializer
 
-# Create your views here.
+
+class EventoViewSet(viewsets.ModelViewSet):
+    """
+    API endpoint del catálogo de eventos.
+
+    Filtros: ``?categoria=``, ``?ciudad=``, ``?desde=`` y ``?hasta=`` (sobre
+    ``fecha_inicio``, en formato ISO). Cada combinación de filtro más la
+    ordenación keyset está cubierta por un índice compuesto.
+    """
+
+    queryset = Evento.objects.select_related("organizador")
+    serializer_class = EventoSerializer
+    permission_classes = [IsOrganizadorOrReadOnly]
+    pagination_class = EventoCursorPagination
+    lookup_field = "uuid"
+
+    def get_queryset(self):
+        queryset = super().get_queryset().filter(is_active=True)
+        if self.action != "list":
+            return queryset
+
+        params = self.request.query_params
+        if categoria := params.get("categoria"):
+            queryset = queryset.filter(categoria=categoria)
+        if ciudad := params.get("ciudad"):
+            queryset = queryset.filter(ciudad=ciudad)
+        if desde := params.get("desde"):
+            queryset = queryset.filter(
+                fecha_inicio__gte=self._parse_fecha("desde", desde)
+            )
+        if hasta := params.get("hasta"):
+            queryset = queryset.filter(
+                fecha_inicio__lte=self._parse_fecha("hasta", hasta)
+            )
+        return queryset
+
+    @staticmethod
+    def _parse_fecha(nombre, valor):
+        fecha = parse_datetime(valor) or parse_date(valor)
+        if fecha is None:
+            raise ValidationError({nombre: "Fecha no válida, usa formato ISO 8601."})
+        return fecha
+
+    def perform_create(self, serializer):
+        serializer.save(organizador_id=self.request.user.pk)
+
+    def perform_destroy(self, instance):
+        """Cancela el evento sin borrarlo."""
+        instance.is_active = False
+        instance.save(update_fields=["is_active"])
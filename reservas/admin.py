@@ -1,3 +1,46 @@
 from django.contrib import admin
+from .models import ContadorAsientos, Reserva, Seccion
+from .services import inicializar_contadores
 
-# Register your models here.
+
+class ContadorAsientosInline(admin.TabularInline):
+    model = ContadorAsientos
+    extra = 0
+    readonly_fields = ("shard", "disponibles")
+    can_delete = False
+
+
+@admin.register(Seccion)
+class SeccionAdmin(admin.ModelAdmin):
+    list_display = ("nombre", "evento", "capacidad", "num_shards")
+    list_select_related = ("evento",)
+    raw_id_fields = ("evento",)
+    search_fields = ("nombre", "evento__nombre")
+    inlines = [ContadorAsientosInline]
+
+    def get_readonly_fields(self, request, obj=None):
+        # El inventario ya repartido en shards no se redimensiona desde aquí.
+        if obj is not None:
+            return ("capacidad", "num_shards")
+        return ()
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if not change:
+            inicializar_contadores(obj)
+
+
+@admin.register(Reserva)
+class ReservaAdmin(admin.ModelAdmin):
+    list_display = (
+        "uuid",
+        "usuario",
+        "seccion",
+        "cantidad",
+        "estado",
+        "fecha_creacion",
+    )
+    list_filter = ("estado",)
+    list_select_related = ("usuario", "seccion")
+    raw_id_fields = ("usuario", "seccion")
+    readonly_fields = ("uuid", "asignacion", "fecha_creacion")
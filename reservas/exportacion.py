@@ -0,0 +1,53 @@
+from django.db.models import F
+
+from .models import Reserva
+
+COLUMNAS = [
+    "uuid",
+    "usuario",
+    "seccion",
+    "evento",
+    "cantidad",
+    "estado",
+    "expira_en",
+    "fecha_creacion",
+]
+
+
+def queryset_exportacion(estado=None, evento=None):
+    queryset = Reserva.objects.order_by("-fecha_creacion", "-id")
+    if estado:
+        queryset = queryset.filter(estado=estado)
+    if evento:
+        queryset = queryset.filter(seccion__evento__uuid=evento)
+    return queryset
+
+
+def filas_reservas(queryset, chunk_size=2000):
+    """
+    ``(columnas, filas)`` de la exportación de reservas: las relaciones se
+    exportan por uuid, resueltas en la misma consulta.
+    """
+    filas = queryset.values(
+        "uuid",
+        "cantidad",
+        "estado",
+        "expira_en",
+        "fecha_creacion",
+        usuario_uuid=F("usuario__uuid"),
+        seccion_uuid=F("seccion__uuid"),
+        evento=F("seccion__evento__uuid"),
+    ).iterator(chunk_size=chunk_size)
+    return COLUMNAS, (
+        {
+            "uuid": str(fila["uuid"]),
+            "usuario": str(fila["usuario_uuid"]),
+            "seccion": str(fila["seccion_uuid"]),
+            "evento": str(fila["evento"]),
+            "cantidad": fila["cantidad"],
+            "estado": fila["estado"],
+            "expira_en": fila["expira_en"] and fila["expira_en"].isoformat(),
+            "fecha_creacion": fila["fecha_creacion"].isoformat(),
+        }
+        for fila in filas
+    )
@@ -0,0 +1,122 @@
+import json
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+from django.utils import timezone
+
+from core.benchmark import resumir
+from eventos.models import Evento
+from reservas.models import ContadorAsientos, Reserva
+from reservas.services import AsientosAgotados, crear_seccion, reservar_asientos
+from usuarios.models import Usuario
+
+
+class Command(BaseCommand):
+    help = (
+        "Prueba de estrés del inventario: N hilos compran en la misma sección "
+        "hasta agotarla. Comprueba que no hay sobreventa e informa del "
+        "rendimiento. Los datos creados se borran al terminar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hilos", type=int, default=32)
+        parser.add_argument("--capacidad", type=int, default=20_000)
+        parser.add_argument("--shards", type=int, nargs="+", default=[1, 4, 16])
+        parser.add_argument("--cantidad", type=int, default=2)
+        parser.add_argument("--json", action="store_true", help="Salida en JSON.")
+
+    def handle(self, *args, **options):
+        sufijo = uuid.uuid4().hex[:8]
+        organizador = Usuario.objects.create(
+            username=f"bench{sufijo}",
+            email=f"bench{sufijo}@bench.local",
+            tipo_usuario="organizador",
+        )
+        inicio = timezone.now() + timedelta(days=1)
+        evento = Evento.objects.create(
+            nombre="Benchmark",
+            categoria="otro",
+            recinto="Bench",
+            ciudad="Bench",
+            fecha_inicio=inicio,
+            fecha_fin=inicio,
+            capacidad=options["capacidad"],
+            organizador=organizador,
+        )
+
+        resultados = []
+        try:
+            for shards in options["shards"]:
+                seccion = crear_seccion(
+                    evento, f"shards-{shards}", options["capacidad"], shards
+                )
+                resultados.append(self._ejecutar(seccion, organizador, options))
+        finally:
+            Reserva.objects.filter(seccion__evento=evento).delete()
+            evento.delete()
+            organizador.delete()
+
+        if options["json"]:
+            self.stdout.write(json.dumps(resultados, indent=2))
+            return
+        for r in resultados:
+            self.stdout.write(
+                f"shards={r['shards']:>3}  {r['reservas_por_segundo']:>8.0f} res/s  "
+                f"p50={r['latencia']['p50_ms']:.2f}ms  "
+                f"p99={r['latencia']['p99_ms']:.2f}ms  "
+                f"reintentos={r['reintentos']}  sobreventa={r['sobreventa']}"
+            )
+
+    def _ejecutar(self, seccion, usuario, options):
+        cantidad = options["cantidad"]
+        latencias = []
+        reintentos = [0]
+        vendidos = [0]
+        lock = threading.Lock()
+        barrera = threading.Barrier(options["hilos"])
+
+        def comprar():
+            barrera.wait()
+            try:
+                while True:
+                    t0 = time.perf_counter()
+                    try:
+                        reservar_asientos(usuario.pk, seccion, cantidad)
+                    except AsientosAgotados:
+                        return
+                    except OperationalError:
+                        with lock:
+                            reintentos[0] += 1
+                        continue
+                    with lock:
+                        latencias.append(time.perf_counter() - t0)
+                        vendidos[0] += cantidad
+            finally:
+                connection.close()
+
+        hilos = [threading.Thread(target=comprar) for _ in range(options["hilos"])]
+        t0 = time.perf_counter()
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        duracion = time.perf_counter() - t0
+
+        restantes = seccion.disponibles()
+        negativos = ContadorAsientos.objects.filter(
+            seccion=seccion, disponibles__lt=0
+        ).exists()
+        return {
+            "shards": seccion.num_shards,
+            "hilos": options["hilos"],
+            "vendidos": vendidos[0],
+            "restantes": restantes,
+            "sobreventa": negativos or vendidos[0] + restantes != seccion.capacidad,
+            "reservas_por_segundo": round(len(latencias) / duracion, 1),
+            "reintentos": reintentos[0],
+            "latencia": resumir(latencias),
+        }
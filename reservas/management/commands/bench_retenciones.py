@@ -0,0 +1,155 @@
+import json
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+from django.utils import timezone
+
+from core.benchmark import resumir
+from eventos.models import Evento
+from reservas.models import ContadorAsientos, Reserva, Seccion
+from reservas.services import liberar_retenciones_expiradas, repartir
+from usuarios.models import Usuario
+
+
+class Command(BaseCommand):
+    help = (
+        "Siembra N retenciones caducadas y mide cuánto tardan M barredores "
+        "concurrentes en liberarlas. Los datos creados se borran al terminar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--retenciones", type=int, default=1_000_000)
+        parser.add_argument("--lote", type=int, default=1000)
+        parser.add_argument("--barredores", type=int, default=4)
+        parser.add_argument("--shards", type=int, default=16)
+        parser.add_argument("--json", action="store_true", help="Salida en JSON.")
+
+    def handle(self, *args, **options):
+        n = options["retenciones"]
+        sufijo = uuid.uuid4().hex[:8]
+        usuario = Usuario.objects.create(
+            username=f"bench{sufijo}",
+            email=f"bench{sufijo}@bench.local",
+            tipo_usuario="organizador",
+        )
+        ahora = timezone.now()
+        evento = Evento.objects.create(
+            nombre="Benchmark",
+            categoria="otro",
+            recinto="Bench",
+            ciudad="Bench",
+            fecha_inicio=ahora,
+            fecha_fin=ahora,
+            capacidad=n,
+            organizador=usuario,
+        )
+        seccion = Seccion.objects.create(
+            evento=evento, nombre="bench", capacidad=n, num_shards=options["shards"]
+        )
+        # Todo el aforo está retenido: los contadores empiezan a cero.
+        ContadorAsientos.objects.bulk_create(
+            ContadorAsientos(seccion=seccion, shard=shard, disponibles=0)
+            for shard in range(options["shards"])
+        )
+
+        try:
+            t0 = time.perf_counter()
+            self._sembrar(seccion, usuario, n, options["shards"], ahora)
+            siembra = time.perf_counter() - t0
+            resultado = self._barrer(seccion, options)
+            resultado["siembra_s"] = round(siembra, 2)
+        finally:
+            self._limpiar(seccion, evento, usuario)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(resultado, indent=2))
+            return
+        self.stdout.write(
+            f"{resultado['liberadas']} retenciones en {resultado['duracion_s']}s "
+            f"({resultado['retenciones_por_segundo']:.0f}/s) con "
+            f"{resultado['barredores']} barredores; lote p50="
+            f"{resultado['lote']['p50_ms']:.1f}ms p99={resultado['lote']['p99_ms']:.1f}ms; "
+            f"inventario correcto={resultado['inventario_correcto']}"
+        )
+
+    def _sembrar(self, seccion, usuario, n, shards, ahora, tamano=10_000):
+        creadas = 0
+        while creadas < n:
+            fin = min(creadas + tamano, n)
+            Reserva.objects.bulk_create(
+                Reserva(
+                    usuario=usuario,
+                    seccion=seccion,
+                    cantidad=1,
+                    asignacion={str(i % shards): 1},
+                    estado="retenida",
+                    expira_en=ahora - timedelta(seconds=(n - i) % 3600),
+                )
+                for i in range(creadas, fin)
+            )
+            creadas = fin
+            self.stderr.write(f"\rsembradas {creadas}/{n}", ending="")
+        self.stderr.write("")
+
+    def _barrer(self, seccion, options):
+        lotes = []
+        liberadas = [0]
+        lock = threading.Lock()
+
+        def barredor():
+            try:
+                while True:
+                    t0 = time.perf_counter()
+                    try:
+                        resultado = liberar_retenciones_expiradas(options["lote"])
+                    except OperationalError:
+                        # SQLite: la base entera está bloqueada por otro barredor.
+                        continue
+                    if not resultado["reservas"]:
+                        return
+                    with lock:
+                        lotes.append(time.perf_counter() - t0)
+                        liberadas[0] += resultado["reservas"]
+            finally:
+                connection.close()
+
+        hilos = [
+            threading.Thread(target=barredor) for _ in range(options["barredores"])
+        ]
+        t0 = time.perf_counter()
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        duracion = time.perf_counter() - t0
+
+        esperado = repartir(seccion.capacidad, seccion.num_shards)
+        reales = list(
+            seccion.contadores.order_by("shard").values_list("disponibles", flat=True)
+        )
+        return {
+            "retenciones": seccion.capacidad,
+            "liberadas": liberadas[0],
+            "barredores": options["barredores"],
+            "duracion_s": round(duracion, 2),
+            "retenciones_por_segundo": round(liberadas[0] / duracion, 1),
+            "lote": resumir(lotes),
+            "inventario_correcto": reales == esperado,
+        }
+
+    def _limpiar(self, seccion, evento, usuario, tamano=50_000):
+        while True:
+            ids = list(
+                Reserva.objects.filter(seccion=seccion).values_list("id", flat=True)[
+                    :tamano
+                ]
+            )
+            if not ids:
+                break
+            Reserva.objects.filter(id__in=ids).delete()
+        evento.delete()
+        usuario.delete()
@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reservas.services import liberar_retenciones_expiradas
+
+
+class Command(BaseCommand):
+    help = (
+        "Devuelve al inventario las retenciones caducadas, por lotes. Con "
+        "--loop se queda en ejecución; pueden lanzarse varias instancias en "
+        "paralelo (SKIP LOCKED)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=500)
+        parser.add_argument("--loop", action="store_true", help="Barrer continuamente.")
+        parser.add_argument(
+            "--intervalo",
+            type=float,
+            default=1.0,
+            help="Segundos de espera cuando no quedan retenciones caducadas.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            total = 0
+            while True:
+                resultado = liberar_retenciones_expiradas(lote=options["lote"])
+                if not resultado["reservas"]:
+                    break
+                total += resultado["reservas"]
+                if options["verbosity"] >= 2:
+                    self.stdout.write(
+                        f"lote: {resultado['reservas']} retenciones, "
+                        f"{resultado['asientos']} asientos, "
+                        f"retraso {resultado['retraso']:.1f}s"
+                    )
+                if resultado["reservas"] < options["lote"]:
+                    break
+
+            if total or options["verbosity"] >= 2:
+                self.stdout.write(f"{total} retenciones liberadas.")
+            if not options["loop"]:
+                return
+            time.sleep(options["intervalo"])
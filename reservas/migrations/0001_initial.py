@@ -0,0 +1,85 @@
+# Generated by Django 6.0 on 2026-10-18 13:14
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('eventos', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Seccion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('nombre', models.CharField(max_length=100)),
+                ('capacidad', models.PositiveIntegerField()),
+                ('num_shards', models.PositiveSmallIntegerField(default=1)),
+                ('evento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='secciones', to='eventos.evento')),
+            ],
+            options={
+                'verbose_name': 'Sección',
+                'verbose_name_plural': 'Secciones',
+                'db_table': 'secciones',
+                'ordering': ['evento', 'nombre'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Reserva',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('cantidad', models.PositiveIntegerField()),
+                ('asignacion', models.JSONField(default=dict)),
+                ('estado', models.CharField(choices=[('confirmada', 'Confirmada'), ('cancelada', 'Cancelada')], default='confirmada', max_length=20)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='reservas', to=settings.AUTH_USER_MODEL)),
+                ('seccion', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='reservas', to='reservas.seccion')),
+            ],
+            options={
+                'verbose_name': 'Reserva',
+                'verbose_name_plural': 'Reservas',
+                'db_table': 'reservas',
+                'ordering': ['-fecha_creacion', '-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ContadorAsientos',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('disponibles', models.PositiveIntegerField()),
+                ('seccion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='contadores', to='reservas.seccion')),
+            ],
+            options={
+                'verbose_name': 'Contador de asientos',
+                'verbose_name_plural': 'Contadores de asientos',
+                'db_table': 'contadores_asientos',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='seccion',
+            constraint=models.UniqueConstraint(fields=('evento', 'nombre'), name='secciones_evento_nombre_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='seccion',
+            constraint=models.CheckConstraint(condition=models.Q(('num_shards__gte', 1)), name='secciones_num_shards_min'),
+        ),
+        migrations.AddIndex(
+            model_name='reserva',
+            index=models.Index(fields=['usuario', '-fecha_creacion', '-id'], name='reservas_usuario_fecha_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='contadorasientos',
+            constraint=models.UniqueConstraint(fields=('seccion', 'shard'), name='contadores_seccion_shard_uniq'),
+        ),
+    ]
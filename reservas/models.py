@@ -1,3 +1,116 @@
+import uuid
+from django.conf import settings
 from django.db import models
+from django.db.models import Sum
 
-# Create your models here.
+
+class Seccion(models.Model):
+    """
+    Zona de un evento con su propio aforo. El inventario disponible no se
+    guarda aquí sino repartido en ``num_shards`` filas de ``ContadorAsientos``,
+    para que compradores concurrentes no se serialicen sobre un único bloqueo.
+    """
+
+    uuid = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    evento = models.ForeignKey(
+        "eventos.Evento", on_delete=models.CASCADE, related_name="secciones"
+    )
+    nombre = models.CharField(max_length=100)
+    capacidad = models.PositiveIntegerField()
+    num_shards = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        db_table = "secciones"
+        verbose_name = "Sección"
+        verbose_name_plural = "Secciones"
+        ordering = ["evento", "nombre"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["evento", "nombre"], name="secciones_evento_nombre_uniq"
+            ),
+            models.CheckConstraint(
+                condition=models.Q(num_shards__gte=1), name="secciones_num_shards_min"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.nombre} - {self.evento.nombre}"
+
+    def disponibles(self):
+        """Asientos libres sumando todos los sub-contadores."""
+        total = self.contadores.aggregate(total=Sum("disponibles"))["total"]
+        return total or 0
+
+
+class ContadorAsientos(models.Model):
+    """Sub-contador (shard) de asientos disponibles de una sección."""
+
+    seccion = models.ForeignKey(
+        Seccion, on_delete=models.CASCADE, related_name="contadores"
+    )
+    shard = models.PositiveSmallIntegerField()
+    # PositiveIntegerField añade un CHECK (disponibles >= 0) en la base de datos:
+    # una segunda barrera contra la sobreventa además del UPDATE condicional.
+    disponibles = models.PositiveIntegerField()
+
+    class Meta:
+        db_table = "contadores_asientos"
+        verbose_name = "Contador de asientos"
+        verbose_name_plural = "Contadores de asientos"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["seccion", "shard"], name="contadores_seccion_shard_uniq"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.seccion_id}#{self.shard}: {self.disponibles}"
+
+
+class Reserva(models.Model):
+    ESTADO_CHOICES = [
+        ("retenida", "Retenida"),
+        ("confirmada", "Confirmada"),
+        ("cancelada", "Cancelada"),
+        ("expirada", "Expirada"),
+    ]
+
+    uuid = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.PROTECT, related_name="reservas"
+    )
+    seccion = models.ForeignKey(
+        Seccion, on_delete=models.PROTECT, related_name="reservas"
+    )
+    cantidad = models.PositiveIntegerField()
+    # Asientos descontados de cada shard ({"<shard>": cantidad}), necesario
+    # para devolverlos al mismo contador al cancelar.
+    asignacion = models.JSONField(default=dict)
+    estado = models.CharField(
+        max_length=20, choices=ESTADO_CHOICES, default="confirmada"
+    )
+    # Sólo las reservas retenidas (hold mientras se paga) tienen caducidad.
+    expira_en = models.DateTimeField(blank=True, null=True)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "reservas"
+        verbose_name = "Reserva"
+        verbose_name_plural = "Reservas"
+        ordering = ["-fecha_creacion", "-id"]
+        indexes = [
+            models.Index(
+                fields=["usuario", "-fecha_creacion", "-id"],
+                name="reservas_usuario_fecha_idx",
+            ),
+            # Índice parcial del barrido de retenciones: sólo contiene las
+            # retenidas, así que no crece con el histórico de reservas.
+            models.Index(
+                fields=["expira_en"],
+                condition=models.Q(estado="retenida"),
+                name="reservas_retenida_expira_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.cantidad} x {self.seccion_id} ({self.estado})"
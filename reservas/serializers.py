@@ -0,0 +1,59 @@
+from django.conf import settings
+from rest_framework import serializers
+from .models import Reserva, Seccion
+
+
+class SeccionSerializer(serializers.ModelSerializer):
+    """Sección de un evento con los asientos libres en este momento."""
+
+    evento = serializers.SlugRelatedField(slug_field="uuid", read_only=True)
+    disponibles = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Seccion
+        fields = ["uuid", "evento", "nombre", "capacidad", "disponibles"]
+
+
+class ReservaSerializer(serializers.ModelSerializer):
+    """Serializer de lectura de reservas."""
+
+    seccion = serializers.SlugRelatedField(slug_field="uuid", read_only=True)
+
+    class Meta:
+        model = Reserva
+        fields = [
+            "uuid",
+            "seccion",
+            "cantidad",
+            "estado",
+            "expira_en",
+            "fecha_creacion",
+        ]
+        read_only_fields = fields
+
+
+class ReservaCreateSerializer(serializers.ModelSerializer):
+    """Datos de entrada para reservar asientos de una sección."""
+
+    seccion = serializers.SlugRelatedField(
+        slug_field="uuid",
+        queryset=Seccion.objects.select_related("evento"),
+    )
+    cantidad = serializers.IntegerField(min_value=1)
+
+    class Meta:
+        model = Reserva
+        fields = ["seccion", "cantidad"]
+
+    def validate_cantidad(self, value):
+        maximo = getattr(settings, "RESERVAS_MAX_POR_COMPRA", 10)
+        if value > maximo:
+            raise serializers.ValidationError(
+                f"No se pueden reservar más de {maximo} asientos por compra."
+            )
+        return value
+
+    def validate_seccion(self, value):
+        if not value.evento.is_active:
+            raise serializers.ValidationError("El evento no está disponible.")
+        return value
@@ -0,0 +1,254 @@
+"""
+Motor de inventario de asientos.
+
+Reservar N asientos es un único ``UPDATE`` condicional sobre un sub-contador::
+
+    UPDATE contadores_asientos
+       SET disponibles = disponibles - N
+     WHERE seccion_id = ? AND shard = ? AND disponibles >= N
+
+Si afecta a una fila, los asientos son nuestros; si no, ese shard no tiene
+suficientes y se prueba otro. No hay lectura previa ni ``SELECT FOR UPDATE``
+en el camino habitual, así que no existe ventana para vender dos veces el
+mismo asiento, y cada comprador sólo bloquea la fila de un shard elegido al
+azar durante su (corta) transacción.
+
+Las retenciones (``estado="retenida"``) apartan asientos mientras el
+comprador paga; ``liberar_retenciones_expiradas`` devuelve al inventario las
+que caducan, por lotes y con ``SELECT ... FOR UPDATE SKIP LOCKED`` para que
+varios barredores trabajen en paralelo sin pisarse.
+"""
+
+import random
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from core.metrics import registro
+
+from .models import ContadorAsientos, Reserva, Seccion
+
+RETENCIONES_LIBERADAS = registro.counter(
+    "reservas_retenciones_liberadas_total", "Retenciones caducadas liberadas."
+)
+ASIENTOS_LIBERADOS = registro.counter(
+    "reservas_asientos_liberados_total",
+    "Asientos devueltos al inventario por retenciones caducadas.",
+)
+RETRASO_BARRIDO = registro.gauge(
+    "reservas_barrido_retraso_segundos",
+    "Retraso del último lote del barredor respecto a now() (retención más antigua).",
+)
+DURACION_LOTE = registro.histogram(
+    "reservas_barrido_lote_segundos", "Duración de cada lote del barredor."
+)
+
+
+class AsientosAgotados(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "No quedan suficientes asientos disponibles en la sección."
+    default_code = "asientos_agotados"
+
+
+class RetencionExpirada(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "La retención ha caducado y los asientos se han liberado."
+    default_code = "retencion_expirada"
+
+
+def repartir(total, partes):
+    """Reparte ``total`` en ``partes`` enteros lo más iguales posible."""
+    base, resto = divmod(total, partes)
+    return [base + (1 if i < resto else 0) for i in range(partes)]
+
+
+def inicializar_contadores(seccion):
+    """Crea los sub-contadores de una sección con su capacidad repartida."""
+    ContadorAsientos.objects.bulk_create(
+        ContadorAsientos(seccion=seccion, shard=shard, disponibles=disponibles)
+        for shard, disponibles in enumerate(
+            repartir(seccion.capacidad, seccion.num_shards)
+        )
+    )
+
+
+@transaction.atomic
+def crear_seccion(evento, nombre, capacidad, num_shards=1):
+    seccion = Seccion.objects.create(
+        evento=evento, nombre=nombre, capacidad=capacidad, num_shards=num_shards
+    )
+    inicializar_contadores(seccion)
+    return seccion
+
+
+def _descontar(seccion_id, shard, cantidad):
+    return ContadorAsientos.objects.filter(
+        seccion_id=seccion_id, shard=shard, disponibles__gte=cantidad
+    ).update(disponibles=F("disponibles") - cantidad)
+
+
+def descontar_asientos(seccion, cantidad):
+    """
+    Descuenta ``cantidad`` asientos de los contadores de ``seccion`` y
+    devuelve la asignación por shard. Debe llamarse dentro de una transacción.
+    """
+    shards = list(range(seccion.num_shards))
+    random.shuffle(shards)
+    for shard in shards:
+        if _descontar(seccion.pk, shard, cantidad):
+            return {str(shard): cantidad}
+    return _descontar_repartido(seccion, cantidad)
+
+
+def _descontar_repartido(seccion, cantidad):
+    """
+    Camino lento, cerca del agotamiento: ningún shard tiene ``cantidad``
+    asientos por sí solo. Se bloquean los shards con saldo en orden fijo
+    (sin riesgo de interbloqueo) y se reparte la compra entre ellos.
+    """
+    contadores = list(
+        ContadorAsientos.objects.select_for_update()
+        .filter(seccion_id=seccion.pk, disponibles__gt=0)
+        .order_by("shard")
+        .values_list("shard", "disponibles")
+    )
+    if sum(disponibles for _, disponibles in contadores) < cantidad:
+        raise AsientosAgotados()
+
+    asignacion = {}
+    pendiente = cantidad
+    for shard, disponibles in contadores:
+        tomar = min(disponibles, pendiente)
+        _descontar(seccion.pk, shard, tomar)
+        asignacion[str(shard)] = tomar
+        pendiente -= tomar
+        if not pendiente:
+            break
+    return asignacion
+
+
+def devolver_asientos(seccion_id, asignacion):
+    for shard, cantidad in asignacion.items():
+        ContadorAsientos.objects.filter(seccion_id=seccion_id, shard=int(shard)).update(
+            disponibles=F("disponibles") + cantidad
+        )
+
+
+def duracion_retencion():
+    return timedelta(minutes=getattr(settings, "RESERVAS_RETENCION_MINUTOS", 10))
+
+
+@transaction.atomic
+def reservar_asientos(usuario_id, seccion, cantidad):
+    """Reserva ``cantidad`` asientos de ``seccion`` o lanza ``AsientosAgotados``."""
+    if cantidad <= 0:
+        raise ValueError("La cantidad debe ser positiva.")
+    asignacion = descontar_asientos(seccion, cantidad)
+    return Reserva.objects.create(
+        usuario_id=usuario_id,
+        seccion=seccion,
+        cantidad=cantidad,
+        asignacion=asignacion,
+    )
+
+
+@transaction.atomic
+def retener_asientos(usuario_id, seccion, cantidad, duracion=None):
+    """
+    Aparta ``cantidad`` asientos durante ``duracion`` (por defecto
+    ``RESERVAS_RETENCION_MINUTOS``) mientras el comprador paga.
+    """
+    if cantidad <= 0:
+        raise ValueError("La cantidad debe ser positiva.")
+    asignacion = descontar_asientos(seccion, cantidad)
+    return Reserva.objects.create(
+        usuario_id=usuario_id,
+        seccion=seccion,
+        cantidad=cantidad,
+        asignacion=asignacion,
+        estado="retenida",
+        expira_en=timezone.now() + (duracion or duracion_retencion()),
+    )
+
+
+def confirmar_reserva(reserva):
+    """
+    Convierte una retención vigente en reserva confirmada. El ``UPDATE``
+    condicional compite limpiamente con el barredor: si éste la ha liberado
+    antes, no se confirma nada y se lanza ``RetencionExpirada``.
+    """
+    actualizadas = Reserva.objects.filter(
+        pk=reserva.pk, estado="retenida", expira_en__gt=timezone.now()
+    ).update(estado="confirmada", expira_en=None)
+    if not actualizadas:
+        raise RetencionExpirada()
+    reserva.estado = "confirmada"
+    reserva.expira_en = None
+    return reserva
+
+
+@transaction.atomic
+def cancelar_reserva(reserva):
+    """Cancela una reserva o retención y devuelve sus asientos al inventario."""
+    actualizadas = Reserva.objects.filter(
+        pk=reserva.pk, estado__in=["retenida", "confirmada"]
+    ).update(estado="cancelada", expira_en=None)
+    if actualizadas:
+        devolver_asientos(reserva.seccion_id, reserva.asignacion)
+        reserva.estado = "cancelada"
+        reserva.expira_en = None
+    return bool(actualizadas)
+
+
+def liberar_retenciones_expiradas(lote=500, ahora=None):
+    """
+    Libera un lote de hasta ``lote`` retenciones caducadas y devuelve
+    ``{"reservas", "asientos", "retraso"}``, donde ``retraso`` son los
+    segundos que llevaba caducada la más antigua del lote.
+
+    Las filas se toman con ``FOR UPDATE SKIP LOCKED`` recorriendo el índice
+    parcial ``reservas_retenida_expira_idx``: cada barredor concurrente se
+    lleva un lote distinto y nunca espera a otro. Los contadores se
+    actualizan agregados por shard y en orden fijo, con un ``UPDATE`` por
+    contador afectado en lugar de uno por retención.
+    """
+    ahora = ahora or timezone.now()
+    inicio = time.perf_counter()
+    with transaction.atomic():
+        filas = list(
+            Reserva.objects.select_for_update(skip_locked=True)
+            .filter(estado="retenida", expira_en__lte=ahora)
+            .order_by("expira_en")
+            .values_list("id", "seccion_id", "asignacion", "expira_en")[:lote]
+        )
+        if not filas:
+            RETRASO_BARRIDO.set(0)
+            return {"reservas": 0, "asientos": 0, "retraso": 0.0}
+
+        Reserva.objects.filter(id__in=[fila[0] for fila in filas]).update(
+            estado="expirada", expira_en=None
+        )
+
+        por_contador = Counter()
+        for _, seccion_id, asignacion, _ in filas:
+            for shard, cantidad in asignacion.items():
+                por_contador[(seccion_id, int(shard))] += cantidad
+        for (seccion_id, shard), cantidad in sorted(por_contador.items()):
+            ContadorAsientos.objects.filter(seccion_id=seccion_id, shard=shard).update(
+                disponibles=F("disponibles") + cantidad
+            )
+
+    asientos = sum(por_contador.values())
+    retraso = (ahora - filas[0][3]).total_seconds()
+    RETENCIONES_LIBERADAS.inc(len(filas))
+    ASIENTOS_LIBERADOS.inc(asientos)
+    RETRASO_BARRIDO.set(retraso)
+    DURACION_LOTE.observe(time.perf_counter() - inicio)
+    return {"reservas": len(filas), "asientos": asientos, "retraso": retraso}
@@ -1,3 +1,294 @@
-from django.test import TestCase
+import json
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import OperationalError, close_old_connections, connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from eventos.models import Evento
+from usuarios.models import Usuario
+
+from .models import ContadorAsientos, Reserva
+from .services import (
+    RETRASO_BARRIDO,
+    AsientosAgotados,
+    RetencionExpirada,
+    cancelar_reserva,
+    confirmar_reserva,
+    crear_seccion,
+    liberar_retenciones_expiradas,
+    repartir,
+    reservar_asientos,
+    retener_asientos,
+)
+
+
+def crear_evento():
+    organizador = Usuario.objects.create(
+        username="organiza", email="org@mail.com", tipo_usuario="organizador"
+    )
+    inicio = timezone.now() + timedelta(days=7)
+    return Evento.objects.create(
+        nombre="Concierto",
+        categoria="concierto",
+        recinto="Estadio",
+        ciudad="Madrid",
+        fecha_inicio=inicio,
+        fecha_fin=inicio + timedelta(hours=3),
+        capacidad=100,
+        organizador=organizador,
+    )
+
+
+class InventarioTests(TestCase):
+    def setUp(self):
+        self.evento = crear_evento()
+        self.usuario = Usuario.objects.create(username="comprador", email="c@mail.com")
+
+    def test_repartir(self):
+        self.assertEqual(repartir(10, 3), [4, 3, 3])
+        self.assertEqual(sum(repartir(1001, 8)), 1001)
+
+    def test_crear_seccion_reparte_capacidad(self):
+        seccion = crear_seccion(self.evento, "Pista", 10, num_shards=4)
+        self.assertEqual(seccion.contadores.count(), 4)
+        self.assertEqual(seccion.disponibles(), 10)
+
+    def test_reservar_descuenta_un_shard(self):
+        seccion = crear_seccion(self.evento, "Pista", 100, num_shards=4)
+
+        reserva = reservar_asientos(self.usuario.pk, seccion, 3)
+
+        self.assertEqual(len(reserva.asignacion), 1)
+        self.assertEqual(seccion.disponibles(), 97)
+
+    def test_reparto_entre_shards_cerca_del_agotamiento(self):
+        seccion = crear_seccion(self.evento, "Pista", 8, num_shards=4)
+
+        reserva = reservar_asientos(self.usuario.pk, seccion, 7)
+
+        self.assertEqual(sum(reserva.asignacion.values()), 7)
+        self.assertGreater(len(reserva.asignacion), 1)
+        self.assertEqual(seccion.disponibles(), 1)
+
+    def test_agotado(self):
+        seccion = crear_seccion(self.evento, "Pista", 5, num_shards=2)
+        reservar_asientos(self.usuario.pk, seccion, 5)
+
+        with self.assertRaises(AsientosAgotados):
+            reservar_asientos(self.usuario.pk, seccion, 1)
+        self.assertEqual(Reserva.objects.count(), 1)
+
+    def test_cancelar_devuelve_asientos_una_sola_vez(self):
+        seccion = crear_seccion(self.evento, "Pista", 8, num_shards=4)
+        reserva = reservar_asientos(self.usuario.pk, seccion, 7)
+
+        self.assertTrue(cancelar_reserva(reserva))
+        self.assertFalse(cancelar_reserva(reserva))
+        self.assertEqual(seccion.disponibles(), 8)
+
+
+class RetencionesTests(TestCase):
+    def setUp(self):
+        self.evento = crear_evento()
+        self.seccion = crear_seccion(self.evento, "Pista", 20, num_shards=4)
+        self.usuario = Usuario.objects.create(username="comprador", email="c@mail.com")
+
+    def _caducar(self, *reservas, hace=timedelta(minutes=1)):
+        Reserva.objects.filter(pk__in=[r.pk for r in reservas]).update(
+            expira_en=timezone.now() - hace
+        )
+
+    def test_retener_y_confirmar(self):
+        reserva = retener_asientos(self.usuario.pk, self.seccion, 2)
+        self.assertEqual(reserva.estado, "retenida")
+        self.assertGreater(reserva.expira_en, timezone.now())
+
+        confirmar_reserva(reserva)
+
+        reserva.refresh_from_db()
+        self.assertEqual(reserva.estado, "confirmada")
+        self.assertIsNone(reserva.expira_en)
+        self.assertEqual(liberar_retenciones_expiradas()["reservas"], 0)
+        self.assertEqual(self.seccion.disponibles(), 18)
+
+    def test_barrido_libera_retenciones_caducadas(self):
+        caducadas = [
+            retener_asientos(self.usuario.pk, self.seccion, 3) for _ in range(3)
+        ]
+        vigente = retener_asientos(self.usuario.pk, self.seccion, 1)
+        self._caducar(*caducadas, hace=timedelta(seconds=30))
+
+        resultado = liberar_retenciones_expiradas()
+
+        self.assertEqual(resultado["reservas"], 3)
+        self.assertEqual(resultado["asientos"], 9)
+        self.assertGreaterEqual(resultado["retraso"], 30)
+        self.assertEqual(RETRASO_BARRIDO.valor(), resultado["retraso"])
+        self.assertEqual(self.seccion.disponibles(), 19)
+        vigente.refresh_from_db()
+        self.assertEqual(vigente.estado, "retenida")
+
+    def test_barrido_por_lotes_acotados(self):
+        retenciones = [
+            retener_asientos(self.usuario.pk, self.seccion, 1) for _ in range(5)
+        ]
+        self._caducar(*retenciones)
+
+        self.assertEqual(liberar_retenciones_expiradas(lote=2)["reservas"], 2)
+        self.assertEqual(liberar_retenciones_expiradas(lote=2)["reservas"], 2)
+        self.assertEqual(liberar_retenciones_expiradas(lote=2)["reservas"], 1)
+        self.assertEqual(liberar_retenciones_expiradas(lote=2)["reservas"], 0)
+        self.assertEqual(self.seccion.disponibles(), 20)
+
+    def test_confirmar_retencion_caducada(self):
+        reserva = retener_asientos(self.usuario.pk, self.seccion, 2)
+        self._caducar(reserva)
+
+        with self.assertRaises(RetencionExpirada):
+            confirmar_reserva(reserva)
+
+    def test_comando_liberar_retenciones(self):
+        reserva = retener_asientos(self.usuario.pk, self.seccion, 4)
+        self._caducar(reserva)
+        salida = StringIO()
+
+        call_command("liberar_retenciones", "--lote", "10", stdout=salida)
+
+        self.assertIn("1 retenciones liberadas", salida.getvalue())
+        self.assertEqual(self.seccion.disponibles(), 20)
+
+
+class ReservaAPITests(APITestCase):
+    def setUp(self):
+        self.evento = crear_evento()
+        self.seccion = crear_seccion(self.evento, "Pista", 10, num_shards=2)
+        self.usuario = Usuario.objects.create(username="comprador", email="c@mail.com")
+        self.client.force_authenticate(user=self.usuario)
+
+    def test_reservar_y_cancelar(self):
+        response = self.client.post(
+            reverse("reserva-list"),
+            {"seccion": str(self.seccion.uuid), "cantidad": 4},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["estado"], "retenida")
+        self.assertEqual(self.seccion.disponibles(), 6)
+
+        confirmar = self.client.post(
+            reverse("reserva-confirmar", kwargs={"uuid": response.data["uuid"]})
+        )
+        self.assertEqual(confirmar.data["estado"], "confirmada")
+
+        cancelar = self.client.post(
+            reverse("reserva-cancelar", kwargs={"uuid": response.data["uuid"]})
+        )
+        self.assertEqual(cancelar.data["estado"], "cancelada")
+        self.assertEqual(self.seccion.disponibles(), 10)
+
+    def test_agotado_devuelve_409(self):
+        response = self.client.post(
+            reverse("reserva-list"),
+            {"seccion": str(self.seccion.uuid), "cantidad": 11},
+            format="json",
+        )
+        # 11 supera el máximo por compra: se valida antes de tocar el inventario.
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        reservar_asientos(self.usuario.pk, self.seccion, 9)
+        response = self.client.post(
+            reverse("reserva-list"),
+            {"seccion": str(self.seccion.uuid), "cantidad": 2},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_secciones_muestran_disponibilidad(self):
+        response = self.client.get(
+            reverse("seccion-list"), {"evento": str(self.evento.uuid)}
+        )
+        self.assertEqual(response.data[0]["disponibles"], 10)
+
+    def test_solo_ve_sus_reservas(self):
+        otro = Usuario.objects.create(username="otrouser", email="o@mail.com")
+        reservar_asientos(otro.pk, self.seccion, 1)
+        reservar_asientos(self.usuario.pk, self.seccion, 1)
+
+        response = self.client.get(reverse("reserva-list"))
+        self.assertEqual(len(response.data), 1)
+
+    def test_exportar_reservas(self):
+        reserva = reservar_asientos(self.usuario.pk, self.seccion, 2)
+        cancelar_reserva(reservar_asientos(self.usuario.pk, self.seccion, 1))
+        url = reverse("reserva-exportar")
+
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.usuario.is_staff = True
+        self.client.force_authenticate(user=self.usuario)
+        response = self.client.get(url, {"formato": "jsonl", "estado": "confirmada"})
+
+        lineas = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lineas), 1)
+        fila = json.loads(lineas[0])
+        self.assertEqual(fila["uuid"], str(reserva.uuid))
+        self.assertEqual(fila["usuario"], str(self.usuario.uuid))
+        self.assertEqual(fila["evento"], str(self.evento.uuid))
+        self.assertEqual(fila["cantidad"], 2)
+
+
+class ConcurrenciaTests(TransactionTestCase):
+    """
+    Prueba de estrés: muchos hilos compran a la vez en la misma sección y al
+    final no puede haberse vendido ni un asiento de más.
+    """
+
+    hilos = 16
+    capacidad = 300
+
+    def test_sin_sobreventa(self):
+        evento = crear_evento()
+        seccion = crear_seccion(evento, "Pista", self.capacidad, num_shards=4)
+        usuario = Usuario.objects.create(username="comprador", email="c@mail.com")
+        vendidos = []
+        errores = []
+        inicio = threading.Barrier(self.hilos)
+
+        def comprar():
+            inicio.wait()
+            try:
+                while True:
+                    try:
+                        reserva = reservar_asientos(usuario.pk, seccion, 2)
+                    except AsientosAgotados:
+                        return
+                    except OperationalError:
+                        # SQLite bloquea la base entera; en PostgreSQL el
+                        # UPDATE condicional espera al bloqueo de fila.
+                        time.sleep(0.001)
+                        continue
+                    vendidos.append(reserva.cantidad)
+            except Exception as exc:  # pragma: no cover - se reporta abajo
+                errores.append(exc)
+            finally:
+                close_old_connections()
+                connection.close()
+
+        hilos = [threading.Thread(target=comprar) for _ in range(self.hilos)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(errores, [])
+        self.assertEqual(sum(vendidos), self.capacidad)
+        self.assertEqual(seccion.disponibles(), 0)
+        self.assertFalse(ContadorAsientos.objects.filter(disponibles__lt=0).exists())
+        self.assertEqual(Reserva.objects.count(), self.capacidad // 2)
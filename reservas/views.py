@@ -1,3 +1,121 @@
-from django.shortcuts import render
+from django.db.models import Sum
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from core.exportacion import FORMATOS, respuesta_streaming
+from sala_espera.controlador import obtener_controlador
+from .exportacion import filas_reservas, queryset_exportacion
+from .models import Reserva, Seccion
+from .serializers import ReservaCreateSerializer, ReservaSerializer, SeccionSerializer
+from .services import cancelar_reserva, confirmar_reserva, retener_asientos
 
-# Create your views here.
+
+class SeccionViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Secciones de los eventos con su disponibilidad. Filtrar por evento con
+    ``?evento=<uuid>``.
+    """
+
+    queryset = Seccion.objects.select_related("evento").annotate(
+        disponibles=Sum("contadores__disponibles")
+    )
+    serializer_class = SeccionSerializer
+    permission_classes = [AllowAny]
+    lookup_field = "uuid"
+
+    def get_queryset(self):
+        queryset = super().get_queryset().filter(evento__is_active=True)
+        if evento := self.request.query_params.get("evento"):
+            queryset = queryset.filter(evento__uuid=evento)
+        return queryset
+
+
+class ReservaViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    API endpoint de reservas del usuario autenticado.
+
+    ``POST`` crea una retención que caduca a los ``RESERVAS_RETENCION_MINUTOS``;
+    ``confirmar`` la convierte en reserva firme una vez pagada.
+    """
+
+    queryset = Reserva.objects.select_related("seccion")
+    permission_classes = [IsAuthenticated]
+    lookup_field = "uuid"
+
+    def get_queryset(self):
+        return super().get_queryset().filter(usuario_id=self.request.user.pk)
+
+    def get_serializer_class(self):
+        if self.action == "create":
+            return ReservaCreateSerializer
+        return ReservaSerializer
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        seccion = serializer.validated_data["seccion"]
+        ticket = getattr(request._request, "ticket_espera", None)
+        if ticket is not None:
+            self._consumir_ticket(ticket, seccion)
+        try:
+            reserva = retener_asientos(
+                request.user.pk,
+                seccion,
+                serializer.validated_data["cantidad"],
+            )
+        except Exception:
+            if ticket is not None:
+                # La reserva no se hizo: el ticket sigue valiendo.
+                obtener_controlador().liberar(ticket)
+            raise
+        return Response(ReservaSerializer(reserva).data, status=status.HTTP_201_CREATED)
+
+    def _consumir_ticket(self, ticket, seccion):
+        """
+        Con la sala de espera activa el ticket sólo vale para su evento, para
+        el usuario que lo pidió y para una reserva.
+        """
+        if ticket["e"] != str(seccion.evento.uuid):
+            raise PermissionDenied("El ticket de la sala de espera es de otro evento.")
+        if ticket["u"] != self.request.user.pk:
+            raise PermissionDenied("El ticket de la sala de espera es de otro usuario.")
+        if not obtener_controlador().consumir(ticket):
+            raise PermissionDenied("El ticket de la sala de espera ya se ha usado.")
+
+    @action(detail=True, methods=["post"])
+    def confirmar(self, request, uuid=None):
+        reserva = confirmar_reserva(self.get_object())
+        return Response(ReservaSerializer(reserva).data)
+
+    @action(detail=True, methods=["post"])
+    def cancelar(self, request, uuid=None):
+        reserva = self.get_object()
+        cancelar_reserva(reserva)
+        return Response(ReservaSerializer(reserva).data)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[IsAuthenticated, IsAdminUser],
+    )
+    def exportar(self, request):
+        """
+        Descarga en streaming de todas las reservas (``?formato=csv|jsonl``,
+        filtros ``?estado=`` y ``?evento=<uuid>``). Sólo para staff.
+        """
+        formato = request.query_params.get("formato", "csv")
+        if formato not in FORMATOS:
+            raise ValidationError({"formato": f"Usa {' o '.join(FORMATOS)}."})
+        queryset = queryset_exportacion(
+            estado=request.query_params.get("estado"),
+            evento=request.query_params.get("evento"),
+        )
+        columnas, filas = filas_reservas(queryset)
+        return respuesta_streaming(formato, columnas, filas, "reservas")
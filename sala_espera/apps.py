@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class SalaEsperaConfig(AppConfig):
+    name = 'sala_espera'
+
+    def ready(self):
+        from . import signals  # noqa: F401
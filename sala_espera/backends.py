@@ -0,0 +1,151 @@
+"""
+Almacenamiento del estado de la sala de espera.
+
+Sólo se necesitan operaciones que Redis ofrece de forma atómica (``INCR``,
+``SET NX`` con caducidad, ``GET``/``SET``), de modo que hay dos
+implementaciones intercambiables:
+
+- ``MemoriaBackend``: diccionario en proceso, para desarrollo y tests.
+- ``CacheBackend``: cualquier alias de ``CACHES``. Con
+  ``django.core.cache.backends.redis.RedisCache`` el estado se comparte entre
+  todos los workers; con ``LocMemCache`` hace de sustituto local de Redis y
+  permite probar el mismo código sin servicios externos.
+"""
+
+import threading
+import time
+
+from django.core.cache import caches
+
+
+class BaseBackend:
+    def get(self, clave, default=None):
+        raise NotImplementedError
+
+    def get_many(self, claves):
+        return {clave: self.get(clave) for clave in claves}
+
+    def set(self, clave, valor, ttl):
+        raise NotImplementedError
+
+    def add(self, clave, valor, ttl):
+        """Guarda ``valor`` sólo si la clave no existe. Devuelve si lo guardó."""
+        raise NotImplementedError
+
+    def incr(self, clave, delta=1, ttl=None):
+        """Incremento atómico; una clave inexistente parte de 0."""
+        raise NotImplementedError
+
+    def delete(self, clave):
+        raise NotImplementedError
+
+
+class MemoriaBackend(BaseBackend):
+    """
+    Backend en proceso protegido por un lock. Las entradas caducadas se
+    barren al escribir, como mucho una vez por ``purga`` segundos, aunque
+    nadie vuelva a leerlas.
+    """
+
+    def __init__(self, purga=60, **opciones):
+        self._datos = {}
+        self._lock = threading.Lock()
+        self.purga = purga
+        self._proxima_purga = 0.0
+
+    def _purgar(self):
+        ahora = time.monotonic()
+        if ahora < self._proxima_purga:
+            return
+        self._proxima_purga = ahora + self.purga
+        for vieja in [
+            k
+            for k, (_, caduca) in self._datos.items()
+            if caduca is not None and caduca <= ahora
+        ]:
+            del self._datos[vieja]
+
+    def _vigente(self, clave):
+        entrada = self._datos.get(clave)
+        if entrada is None:
+            return None
+        caduca = entrada[1]
+        if caduca is not None and caduca <= time.monotonic():
+            del self._datos[clave]
+            return None
+        return entrada
+
+    @staticmethod
+    def _caducidad(ttl):
+        return None if ttl is None else time.monotonic() + ttl
+
+    def get(self, clave, default=None):
+        with self._lock:
+            entrada = self._vigente(clave)
+            return default if entrada is None else entrada[0]
+
+    def set(self, clave, valor, ttl):
+        with self._lock:
+            self._purgar()
+            self._datos[clave] = (valor, self._caducidad(ttl))
+
+    def add(self, clave, valor, ttl):
+        with self._lock:
+            self._purgar()
+            if self._vigente(clave) is not None:
+                return False
+            self._datos[clave] = (valor, self._caducidad(ttl))
+            return True
+
+    def incr(self, clave, delta=1, ttl=None):
+        with self._lock:
+            self._purgar()
+            entrada = self._vigente(clave)
+            if entrada is None:
+                valor, caduca = 0, self._caducidad(ttl)
+            else:
+                valor, caduca = entrada
+            valor += delta
+            self._datos[clave] = (valor, caduca)
+            return valor
+
+    def delete(self, clave):
+        with self._lock:
+            self._datos.pop(clave, None)
+
+
+class CacheBackend(BaseBackend):
+    """Backend sobre el framework de caché de Django (Redis en producción)."""
+
+    def __init__(self, alias="default", **opciones):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get(self, clave, default=None):
+        return self.cache.get(clave, default)
+
+    def get_many(self, claves):
+        encontrados = self.cache.get_many(claves)
+        return {clave: encontrados.get(clave) for clave in claves}
+
+    def set(self, clave, valor, ttl):
+        self.cache.set(clave, valor, timeout=ttl)
+
+    def add(self, clave, valor, ttl):
+        return self.cache.add(clave, valor, timeout=ttl)
+
+    def delete(self, clave):
+        self.cache.delete(clave)
+
+    def incr(self, clave, delta=1, ttl=None):
+        # add + incr: ambos atómicos en Redis, así que nunca se pierde un turno.
+        self.cache.add(clave, 0, timeout=ttl)
+        try:
+            return self.cache.incr(clave, delta)
+        except ValueError:
+            # La clave caducó entre add e incr.
+            self.cache.add(clave, 0, timeout=ttl)
+            return self.cache.incr(clave, delta)
@@ -0,0 +1,191 @@
+"""
+Controlador de admisión de la sala de espera.
+
+Cada evento tiene una cola numerada: el ticket ``n`` es el n-ésimo que se
+emitió. El controlador mantiene un puntero ``admitidos`` que avanza
+``tasa`` posiciones por segundo; un ticket entra cuando ``n <= admitidos``.
+
+- Emitir un ticket es un ``INCR`` en el backend y una firma. El ticket
+  lleva el pk del usuario que lo pidió y sólo sirve para una reserva:
+  ``consumir`` lo marca como usado (``SET NX``) y ``liberar`` lo devuelve si
+  la reserva no llega a hacerse.
+- Consultar la posición es verificar la firma y leer el puntero: nunca toca
+  la base de datos.
+- El puntero lo avanza como mucho un proceso por segundo y evento (elegido
+  con ``SET NX``), y nunca se adelanta más de ``rafaga`` posiciones a los
+  tickets emitidos, así que un periodo sin demanda no deja entrar de golpe
+  a todos los que lleguen después.
+"""
+
+import math
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.core.signals import setting_changed
+from django.utils.module_loading import import_string
+
+SALT = "sala_espera.ticket"
+
+CONFIG_POR_DEFECTO = {
+    "ACTIVA": False,
+    "BACKEND": "sala_espera.backends.MemoriaBackend",
+    "OPCIONES": {},
+    "TASA": 50,
+    "RAFAGA": 100,
+    "TTL_TICKET": 3600,
+    "TTL_EVENTOS": 30,
+    "PREFIJO": "sala_espera:",
+    "RUTAS_PROTEGIDAS": [],
+}
+
+
+def configuracion():
+    config = dict(CONFIG_POR_DEFECTO)
+    config.update(getattr(settings, "SALA_ESPERA", {}))
+    return config
+
+
+class TicketInvalido(Exception):
+    pass
+
+
+class ControladorAdmision:
+    def __init__(self, backend, tasa, rafaga, ttl_ticket, prefijo="sala_espera:"):
+        self.backend = backend
+        self.tasa = tasa
+        self.rafaga = rafaga
+        self.ttl_ticket = ttl_ticket
+        self.prefijo = prefijo
+
+    @classmethod
+    def desde_settings(cls):
+        config = configuracion()
+        backend = import_string(config["BACKEND"])(**config["OPCIONES"])
+        return cls(
+            backend,
+            tasa=config["TASA"],
+            rafaga=config["RAFAGA"],
+            ttl_ticket=config["TTL_TICKET"],
+            prefijo=config["PREFIJO"],
+        )
+
+    def _clave(self, nombre, evento):
+        return f"{self.prefijo}{nombre}:{evento}"
+
+    # -- Tickets ----------------------------------------------------------
+
+    def emitir(self, evento, usuario):
+        """
+        Pone a la cola al usuario ``usuario`` (pk) y devuelve su ticket
+        firmado y los datos que contiene.
+        """
+        evento = str(evento)
+        ahora = time.time()
+        # La primera emisión abre la cola: arranca el reloj del puntero.
+        self.backend.add(self._clave("admitidos", evento), self.rafaga, self.ttl_ticket)
+        self.backend.add(self._clave("reloj", evento), ahora, self.ttl_ticket)
+        numero = self.backend.incr(self._clave("emitidos", evento), ttl=self.ttl_ticket)
+        datos = {"e": evento, "n": numero, "u": usuario}
+        return signing.dumps(datos, salt=SALT), datos
+
+    def leer(self, ticket):
+        """Datos de un ticket firmado; ``TicketInvalido`` si no es válido."""
+        try:
+            datos = signing.loads(ticket, salt=SALT, max_age=self.ttl_ticket)
+        except signing.BadSignature as exc:
+            raise TicketInvalido(str(exc)) from exc
+        if not isinstance(datos, dict) or not {"e", "n", "u"} <= datos.keys():
+            raise TicketInvalido("Ticket mal formado.")
+        return datos
+
+    def _clave_uso(self, datos):
+        return self._clave("usado", f"{datos['e']}:{datos['n']}")
+
+    def usado(self, datos):
+        return self.backend.get(self._clave_uso(datos)) is not None
+
+    def consumir(self, datos):
+        """Marca el ticket como usado. ``False`` si ya lo estaba."""
+        return self.backend.add(self._clave_uso(datos), 1, self.ttl_ticket)
+
+    def liberar(self, datos):
+        """Devuelve un ticket consumido cuya reserva no se hizo."""
+        self.backend.delete(self._clave_uso(datos))
+
+    def estado(self, datos):
+        """Posición en la cola y espera estimada de un ticket ya verificado."""
+        evento = datos["e"]
+        admitidos = self.avanzar(evento)
+        posicion = max(0, datos["n"] - admitidos)
+        tasa = self.tasa_de(evento)
+        return {
+            "evento": evento,
+            "posicion": posicion,
+            "admitido": posicion == 0,
+            "espera": math.ceil(posicion / tasa) if tasa else None,
+        }
+
+    # -- Puntero de admisión ----------------------------------------------
+
+    def tasa_de(self, evento):
+        return self.backend.get(self._clave("tasa", evento), self.tasa)
+
+    def configurar_tasa(self, evento, tasa):
+        """Cambia la tasa de admisión (tickets/s) de un evento concreto."""
+        self.avanzar(evento, forzar=True)
+        self.backend.set(self._clave("tasa", evento), tasa, self.ttl_ticket)
+
+    def avanzar(self, evento, forzar=False):
+        """
+        Avanza el puntero según el tiempo transcurrido y devuelve su valor.
+        Sólo un proceso por segundo y evento hace la escritura.
+        """
+        evento = str(evento)
+        claves = [
+            self._clave(nombre, evento)
+            for nombre in ("admitidos", "reloj", "emitidos", "tasa")
+        ]
+        valores = self.backend.get_many(claves)
+        admitidos, reloj, emitidos, tasa = (valores[c] for c in claves)
+        if admitidos is None or reloj is None:
+            # Cola aún sin abrir: la ráfaga inicial entra directamente.
+            return self.rafaga
+        tasa = self.tasa if tasa is None else tasa
+
+        ahora = time.time()
+        nuevos = int((ahora - reloj) * tasa)
+        if nuevos <= 0:
+            return admitidos
+        if not forzar and not self.backend.add(self._clave("tick", evento), 1, 1):
+            return admitidos
+
+        tope = (emitidos or 0) + self.rafaga
+        if admitidos + nuevos >= tope:
+            # Sin demanda suficiente: no se acumulan admisiones para después.
+            admitidos, reloj = max(admitidos, tope), ahora
+        else:
+            # Se conserva la fracción de segundo no consumida.
+            admitidos, reloj = admitidos + nuevos, reloj + nuevos / tasa
+        self.backend.set(self._clave("admitidos", evento), admitidos, self.ttl_ticket)
+        self.backend.set(self._clave("reloj", evento), reloj, self.ttl_ticket)
+        return admitidos
+
+
+_controlador = None
+
+
+def obtener_controlador():
+    global _controlador
+    if _controlador is None:
+        _controlador = ControladorAdmision.desde_settings()
+    return _controlador
+
+
+def _reiniciar(*, setting, **kwargs):
+    global _controlador
+    if setting == "SALA_ESPERA":
+        _controlador = None
+
+
+setting_changed.connect(_reiniciar)
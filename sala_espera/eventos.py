@@ -0,0 +1,72 @@
+"""
+Eventos con la venta abierta (activos y sin empezar).
+
+La emisión de tickets sólo abre colas para ellos: un uuid inventado no crea
+estado en el backend. Cada proceso guarda los uuids en un conjunto que
+recarga con una consulta cada ``SALA_ESPERA["TTL_EVENTOS"]`` segundos, así
+que emitir un ticket sigue sin tocar la base de datos. Guardar o borrar un
+``Evento`` lo recarga en el proceso que lo hace; en el resto, el cambio
+llega al caducar.
+"""
+
+import threading
+import time
+
+from django.core.signals import setting_changed
+from django.utils import timezone
+
+from eventos.models import Evento
+
+from .controlador import configuracion
+
+
+class EventosEnVenta:
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._uuids = frozenset()
+        self._caduca = 0.0
+        self._lock = threading.Lock()
+
+    def __contains__(self, evento):
+        if time.monotonic() >= self._caduca:
+            self._recargar()
+        return str(evento) in self._uuids
+
+    def _recargar(self):
+        with self._lock:
+            if time.monotonic() < self._caduca:
+                return
+            self._uuids = frozenset(
+                str(uuid)
+                for uuid in Evento.objects.filter(
+                    is_active=True, fecha_inicio__gt=timezone.now()
+                ).values_list("uuid", flat=True)
+            )
+            self._caduca = time.monotonic() + self.ttl
+
+    def invalidar(self):
+        self._caduca = 0.0
+
+
+_eventos = None
+
+
+def eventos_en_venta():
+    global _eventos
+    if _eventos is None:
+        _eventos = EventosEnVenta(configuracion()["TTL_EVENTOS"])
+    return _eventos
+
+
+def invalidar_eventos():
+    if _eventos is not None:
+        _eventos.invalidar()
+
+
+def _reiniciar(*, setting, **kwargs):
+    global _eventos
+    if setting == "SALA_ESPERA":
+        _eventos = None
+
+
+setting_changed.connect(_reiniciar)
@@ -0,0 +1,76 @@
+import re
+
+from django.http import JsonResponse
+
+from .controlador import TicketInvalido, configuracion, obtener_controlador
+
+CABECERA_TICKET = "HTTP_X_TICKET_ESPERA"
+COOKIE_TICKET = "ticket_espera"
+
+
+def ticket_de(request):
+    """Ticket de la petición: cabecera ``X-Ticket-Espera`` o cookie."""
+    return request.META.get(CABECERA_TICKET) or request.COOKIES.get(COOKIE_TICKET)
+
+
+class SalaEsperaMiddleware:
+    """
+    Deja pasar a las rutas protegidas (``SALA_ESPERA["RUTAS_PROTEGIDAS"]``)
+    sólo a quien presenta un ticket ya admitido. El resto recibe un 429 con
+    su posición y un ``Retry-After`` sin que la petición llegue a la vista,
+    así que en un pico de demanda la base de datos sólo ve el tráfico que el
+    controlador va admitiendo.
+
+    Va justo después de ``SecurityMiddleware`` para que los rechazos no
+    paguen sesión ni autenticación.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        config = configuracion()
+        self.activa = config["ACTIVA"]
+        self.rutas = [
+            (metodo.upper(), re.compile(patron))
+            for metodo, patron in config["RUTAS_PROTEGIDAS"]
+        ]
+
+    def __call__(self, request):
+        if self.activa and self._protegida(request):
+            rechazo = self._admitir(request)
+            if rechazo is not None:
+                return rechazo
+        return self.get_response(request)
+
+    def _protegida(self, request):
+        return any(
+            metodo in ("*", request.method) and patron.match(request.path_info)
+            for metodo, patron in self.rutas
+        )
+
+    def _admitir(self, request):
+        ticket = ticket_de(request)
+        if not ticket:
+            return JsonResponse(
+                {"detail": "Se necesita un ticket de la sala de espera."}, status=428
+            )
+        controlador = obtener_controlador()
+        try:
+            datos = controlador.leer(ticket)
+        except TicketInvalido:
+            return JsonResponse(
+                {"detail": "Ticket de la sala de espera no válido."}, status=403
+            )
+        if controlador.usado(datos):
+            return JsonResponse(
+                {"detail": "El ticket de la sala de espera ya se ha usado."},
+                status=403,
+            )
+        estado = controlador.estado(datos)
+        if not estado["admitido"]:
+            response = JsonResponse(
+                {"detail": "Todavía no es tu turno.", **estado}, status=429
+            )
+            response["Retry-After"] = str(max(1, estado["espera"] or 1))
+            return response
+        request.ticket_espera = datos
+        return None
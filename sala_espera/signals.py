@@ -0,0 +1,13 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from eventos.models import Evento
+
+from .eventos import invalidar_eventos
+
+
+@receiver(post_save, sender=Evento, dispatch_uid="sala_espera_eventos_save")
+@receiver(post_delete, sender=Evento, dispatch_uid="sala_espera_eventos_delete")
+def recargar_eventos_en_venta(sender, instance, **kwargs):
+    """Un evento nuevo o cambiado abre (o cierra) su cola sin esperar al TTL."""
+    invalidar_eventos()
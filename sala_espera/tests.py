@@ -0,0 +1,241 @@
+import uuid
+from datetime import timedelta
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APITestCase
+from eventos.models import Evento
+from reservas.services import crear_seccion
+from reservas.tests import crear_evento
+from usuarios.models import Usuario
+from usuarios.serializers import CustomTokenObtainPairSerializer
+
+from .backends import CacheBackend, MemoriaBackend
+from .controlador import ControladorAdmision, TicketInvalido, obtener_controlador
+
+
+class ControladorTests(SimpleTestCase):
+    backend_class = MemoriaBackend
+
+    def setUp(self):
+        self.backend = self.backend_class()
+        self.controlador = ControladorAdmision(
+            self.backend, tasa=10, rafaga=2, ttl_ticket=60, prefijo=f"{uuid.uuid4()}:"
+        )
+        self.ahora = 1_000_000.0
+        reloj = mock.patch("sala_espera.controlador.time.time", lambda: self.ahora)
+        reloj.start()
+        self.addCleanup(reloj.stop)
+
+    def _emitir(self, n, evento="e1"):
+        return [self.controlador.emitir(evento, 1)[1] for _ in range(n)]
+
+    def test_rafaga_inicial_admitida(self):
+        primero, segundo, tercero = self._emitir(3)
+
+        self.assertTrue(self.controlador.estado(primero)["admitido"])
+        self.assertTrue(self.controlador.estado(segundo)["admitido"])
+        self.assertEqual(self.controlador.estado(tercero)["posicion"], 1)
+
+    def test_admite_a_la_tasa_configurada(self):
+        tickets = self._emitir(50)
+        self.assertEqual(self.controlador.estado(tickets[-1])["posicion"], 48)
+        self.assertEqual(self.controlador.estado(tickets[-1])["espera"], 5)
+
+        self.ahora += 2
+        self.assertEqual(self.controlador.estado(tickets[-1])["posicion"], 28)
+
+    def test_un_solo_avance_por_segundo(self):
+        tickets = self._emitir(50)
+        self.ahora += 0.5
+        self.assertEqual(self.controlador.avanzar("e1"), 7)
+        # El resto de llamadas en el mismo segundo no vuelven a escribir.
+        self.ahora += 0.5
+        self.assertEqual(self.controlador.avanzar("e1"), 7)
+        self.assertEqual(self.controlador.estado(tickets[-1])["posicion"], 43)
+
+    def test_inactividad_no_acumula_admisiones(self):
+        self._emitir(3)
+        self.ahora += 3600
+        self.controlador.avanzar("e1")
+        nuevos = self._emitir(10)
+
+        # Sólo la ráfaga entra sin esperar, aunque la cola llevara una hora parada.
+        admitidos = [t for t in nuevos if self.controlador.estado(t)["admitido"]]
+        self.assertEqual(len(admitidos), 2)
+
+    def test_tasa_por_evento(self):
+        lento = self._emitir(30, evento="lento")
+        rapido = self._emitir(30, evento="rapido")
+        self.controlador.configurar_tasa("rapido", 100)
+
+        self.ahora += 1
+        self.assertFalse(self.controlador.estado(lento[-1])["admitido"])
+        self.assertTrue(self.controlador.estado(rapido[-1])["admitido"])
+
+    def test_ticket_manipulado(self):
+        ticket, _ = self.controlador.emitir("e1", 1)
+        with self.assertRaises(TicketInvalido):
+            self.controlador.leer(ticket[:-2] + "xx")
+
+    def test_ticket_de_un_solo_uso(self):
+        ticket, datos = self.controlador.emitir("e1", 7)
+        self.assertEqual(self.controlador.leer(ticket)["u"], 7)
+
+        self.assertTrue(self.controlador.consumir(datos))
+        self.assertTrue(self.controlador.usado(datos))
+        self.assertFalse(self.controlador.consumir(datos))
+        # Una reserva fallida devuelve el ticket.
+        self.controlador.liberar(datos)
+        self.assertTrue(self.controlador.consumir(datos))
+
+
+class MemoriaBackendTests(SimpleTestCase):
+    def test_barre_las_claves_caducadas_sin_leerlas(self):
+        backend = MemoriaBackend(purga=60)
+        with mock.patch("sala_espera.backends.time.monotonic", return_value=0.0):
+            for i in range(100):
+                backend.incr(f"emitidos:{i}", ttl=10)
+        with mock.patch("sala_espera.backends.time.monotonic", return_value=61.0):
+            backend.set("otra", 1, 10)
+        self.assertEqual(list(backend._datos), ["otra"])
+
+
+class CacheBackendControladorTests(ControladorTests):
+    """El mismo controlador sobre la API de caché (Redis en producción)."""
+
+    backend_class = CacheBackend
+
+
+SALA_ACTIVA = {
+    "ACTIVA": True,
+    "TASA": 1,
+    "RAFAGA": 1,
+    "RUTAS_PROTEGIDAS": [("POST", r"^/api/reservas/$")],
+}
+
+
+@override_settings(SALA_ESPERA=SALA_ACTIVA)
+class SalaEsperaAPITests(APITestCase):
+    def setUp(self):
+        self.evento = crear_evento()
+        self.seccion = crear_seccion(self.evento, "Pista", 10, num_shards=2)
+        self.usuario = Usuario.objects.create(username="comprador", email="c@mail.com")
+        self._autenticar(self.usuario)
+
+    def _autenticar(self, usuario):
+        access = CustomTokenObtainPairSerializer.get_token(usuario).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+    def _pedir_ticket(self, evento):
+        return self.client.post(
+            reverse("sala_espera_ticket", kwargs={"evento": evento})
+        )
+
+    def _ticket(self, evento):
+        response = self._pedir_ticket(evento)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.json()
+
+    def _reservar(self, ticket=None):
+        cabeceras = {"HTTP_X_TICKET_ESPERA": ticket} if ticket else {}
+        self.client.cookies.clear()
+        return self.client.post(
+            reverse("reserva-list"),
+            {"seccion": str(self.seccion.uuid), "cantidad": 1},
+            format="json",
+            **cabeceras,
+        )
+
+    def test_reservar_sin_ticket(self):
+        self.assertEqual(self._reservar().status_code, 428)
+
+    def test_solo_pasan_los_admitidos(self):
+        primero = self._ticket(self.evento.uuid)
+        segundo = self._ticket(self.evento.uuid)
+        self.assertTrue(primero["admitido"])
+        self.assertEqual(segundo["posicion"], 1)
+
+        rechazada = self._reservar(segundo["ticket"])
+        self.assertEqual(rechazada.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(rechazada["Retry-After"], "1")
+
+        aceptada = self._reservar(primero["ticket"])
+        self.assertEqual(aceptada.status_code, status.HTTP_201_CREATED)
+
+    def test_ticket_de_otro_evento(self):
+        otro = Evento.objects.create(
+            nombre="Otro",
+            categoria="teatro",
+            recinto="Sala",
+            ciudad="Madrid",
+            fecha_inicio=self.evento.fecha_inicio,
+            fecha_fin=self.evento.fecha_fin,
+            capacidad=10,
+            organizador=self.evento.organizador,
+        )
+        ticket = self._ticket(otro.uuid)
+        self.assertEqual(self._reservar(ticket["ticket"]).status_code, 403)
+
+    @override_settings(SALA_ESPERA={**SALA_ACTIVA, "RAFAGA": 5})
+    def test_ticket_de_un_solo_uso_y_de_su_usuario(self):
+        ticket = self._ticket(self.evento.uuid)["ticket"]
+        self.assertEqual(self._reservar(ticket).status_code, 201)
+        self.assertEqual(self._reservar(ticket).status_code, 403)
+
+        ajeno = self._ticket(self.evento.uuid)["ticket"]
+        self._autenticar(Usuario.objects.create(username="bot", email="bot@mail.com"))
+        self.assertEqual(self._reservar(ajeno).status_code, 403)
+
+    def test_reserva_fallida_no_gasta_el_ticket(self):
+        ticket = self._ticket(self.evento.uuid)["ticket"]
+        with mock.patch(
+            "reservas.views.retener_asientos", side_effect=ValidationError("agotado")
+        ):
+            self.assertEqual(self._reservar(ticket).status_code, 400)
+        self.assertEqual(self._reservar(ticket).status_code, 201)
+
+    def test_ticket_exige_usuario_y_evento_en_venta(self):
+        self.client.credentials()
+        self.assertEqual(self._pedir_ticket(self.evento.uuid).status_code, 401)
+
+        self._autenticar(self.usuario)
+        self.assertEqual(self._pedir_ticket(uuid.uuid4()).status_code, 404)
+        self.evento.fecha_inicio = timezone.now() - timedelta(hours=1)
+        self.evento.save()
+        self.assertEqual(self._pedir_ticket(self.evento.uuid).status_code, 404)
+        # Sin abrir cola para ninguno de los dos.
+        self.assertFalse(obtener_controlador().backend._datos)
+
+    def test_emitir_no_consulta_la_base_de_datos(self):
+        self._ticket(self.evento.uuid)
+        with self.assertNumQueries(0):
+            self._ticket(self.evento.uuid)
+
+    def test_posicion_no_consulta_la_base_de_datos(self):
+        self._ticket(self.evento.uuid)
+        ticket = self._ticket(self.evento.uuid)["ticket"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                reverse("sala_espera_posicion"), {"ticket": ticket}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["posicion"], 1)
+
+    def test_ticket_se_guarda_en_cookie(self):
+        ticket = self._ticket(self.evento.uuid)["ticket"]
+        self.assertEqual(self.client.cookies["ticket_espera"].value, ticket)
+
+    def test_sala_inactiva_no_pide_ticket(self):
+        with override_settings(SALA_ESPERA={**SALA_ACTIVA, "ACTIVA": False}):
+            self.assertEqual(self._reservar().status_code, status.HTTP_201_CREATED)
+
+    def tearDown(self):
+        # El backend en memoria es del proceso: cada test empieza con colas vacías.
+        obtener_controlador().backend._datos.clear()
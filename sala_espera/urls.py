@@ -0,0 +1,8 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path("posicion/", views.posicion, name="sala_espera_posicion"),
+    path("<uuid:evento>/ticket/", views.emitir_ticket, name="sala_espera_ticket"),
+]
@@ -0,0 +1,68 @@
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework.exceptions import AuthenticationFailed
+
+from usuarios.authentication import StatelessJWTAuthentication
+
+from .controlador import TicketInvalido, obtener_controlador
+from .eventos import eventos_en_venta
+from .middleware import COOKIE_TICKET, ticket_de
+
+# Vistas Django planas, sin la pila de DRF ni sesión: en un pico de demanda se
+# llaman miles de veces por segundo y no deben tocar la base de datos. El
+# access token se valida sin consultarla (``StatelessJWTAuthentication``).
+
+
+def _usuario_jwt(request):
+    """pk del usuario del access token (sin consultar la BD) o ``None``."""
+    try:
+        autenticado = StatelessJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    return None if autenticado is None else autenticado[0].pk
+
+
+@csrf_exempt
+@require_POST
+def emitir_ticket(request, evento):
+    """
+    Pone al usuario autenticado en la cola del evento y le entrega su ticket,
+    que sólo vale para él y para una reserva.
+    """
+    usuario = _usuario_jwt(request)
+    if usuario is None:
+        return JsonResponse(
+            {"detail": "Se necesita un access token válido."}, status=401
+        )
+    if evento not in eventos_en_venta():
+        return JsonResponse({"detail": "Evento no encontrado o sin venta."}, status=404)
+    controlador = obtener_controlador()
+    ticket, datos = controlador.emitir(evento, usuario)
+    response = JsonResponse({"ticket": ticket, **controlador.estado(datos)}, status=201)
+    response.set_cookie(
+        COOKIE_TICKET,
+        ticket,
+        max_age=controlador.ttl_ticket,
+        httponly=True,
+        samesite="Lax",
+    )
+    return response
+
+
+@require_GET
+def posicion(request):
+    """Posición actual en la cola del ticket presentado."""
+    ticket = request.GET.get("ticket") or ticket_de(request)
+    if not ticket:
+        return JsonResponse({"detail": "Falta el ticket."}, status=400)
+    controlador = obtener_controlador()
+    try:
+        datos = controlador.leer(ticket)
+    except TicketInvalido:
+        return JsonResponse({"detail": "Ticket no válido."}, status=403)
+    estado = controlador.estado(datos)
+    response = JsonResponse(estado)
+    if not estado["admitido"]:
+        response["Retry-After"] = str(max(1, estado["espera"] or 1))
+    return response
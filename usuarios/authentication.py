@@ -0,0 +1,93 @@
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.models import TokenUser
+
+from .models import Usuario
+from .revocacion import aesta_revocado, esta_revocado
+
+
+class UsuarioToken(TokenUser):
+    """
+    Usuario ligero construido a partir de los claims del access token
+    (ver ``CustomTokenObtainPairSerializer.get_token``). No toca la base de
+    datos salvo que se pida el modelo completo mediante ``usuario``.
+    """
+
+    @cached_property
+    def id(self):
+        # simplejwt serializa el claim como cadena; se normaliza al tipo del pk
+        # para poder compararlo con instancias de Usuario.
+        return Usuario._meta.pk.to_python(super().id)
+
+    @cached_property
+    def uuid(self):
+        return self.token.get("uuid")
+
+    @cached_property
+    def email(self):
+        return self.token.get("email", "")
+
+    @cached_property
+    def tipo_usuario(self):
+        return self.token.get("tier")
+
+    @cached_property
+    def usuario(self):
+        """Instancia completa de ``Usuario`` (una consulta, cacheada)."""
+        try:
+            return Usuario.activos.get(pk=self.pk)
+        except Usuario.DoesNotExist:
+            raise AuthenticationFailed(
+                "Usuario no encontrado o inactivo.", code="user_not_found"
+            )
+
+    def __eq__(self, other):
+        if isinstance(other, Usuario):
+            return other.pk == self.pk
+        return super().__eq__(other)
+
+    __hash__ = TokenUser.__hash__
+
+
+def obtener_usuario(user):
+    """
+    Devuelve el ``Usuario`` de base de datos detrás de ``request.user``,
+    cargándolo sólo si la petición se autenticó con un ``UsuarioToken``.
+    """
+    if isinstance(user, UsuarioToken):
+        return user.usuario
+    return user
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    Autenticación JWT que reconstruye el usuario desde el token en lugar de
+    hacer un ``SELECT`` sobre ``usuarios`` en cada petición. Los usuarios
+    desactivados con ``Usuario.soft_delete`` se rechazan mediante el conjunto
+    de revocación (ver ``usuarios.revocacion``), igual que los tokens con un
+    ``tier`` que ya no es el del usuario.
+    """
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        if esta_revocado(user.pk, validated_token):
+            raise AuthenticationFailed("Usuario inactivo.", code="user_inactive")
+        return user
+
+    async def aauthenticate(self, request):
+        """
+        ``authenticate`` para las vistas asíncronas: el token se valida en el
+        event loop y sólo la consulta de revocación es asíncrona.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        user = super().get_user(validated_token)
+        if await aesta_revocado(user.pk, validated_token):
+            raise AuthenticationFailed("Usuario inactivo.", code="user_inactive")
+        return user, validated_token
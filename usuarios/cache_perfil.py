@@ -0,0 +1,252 @@
+"""
+Caché de lectura del detalle de usuario (``GET /api/usuarios/<uuid>/``).
+
+Dos niveles:
+
+- Un LRU en proceso (``USUARIOS_PERFIL_LRU`` entradas).
+- Una caché compartida (alias ``USUARIOS_PERFIL_CACHE`` de ``CACHES``; Redis
+  en producción). ``None`` la desactiva y deja sólo el LRU.
+
+Cada usuario tiene en la caché compartida una *versión* (un token aleatorio)
+que se renueva al invalidar. Las entradas se guardan bajo su versión, así
+que leer la versión basta para saber si la copia local sigue valiendo en
+todos los procesos, y una carga que compite con una escritura nunca deja
+datos viejos bajo la versión nueva. La versión es también el ``ETag`` de la
+respuesta.
+
+Las cargas leen siempre de la primaria (``core.replicas.en_primaria``): una
+réplica retrasada rellenaría la versión nueva con los datos viejos.
+
+La invalidación se dispara con ``post_save``/``post_delete`` de ``Usuario``
+(ver ``signals.py``), en ``UsuarioUpdateSerializer.update`` y en
+``Usuario.soft_delete``. Las actualizaciones con ``QuerySet.update()`` no
+emiten señales y deben llamar a ``invalidar_perfiles``.
+"""
+
+import threading
+import uuid
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.db import transaction
+
+from core.metrics import registro
+from core.replicas import en_primaria
+
+CONSULTAS = registro.counter(
+    "usuarios_perfil_cache_total",
+    "Lecturas del detalle de usuario por resultado de la caché.",
+    etiquetas=("resultado",),
+)
+
+PREFIJO = "usuarios:perfil:"
+
+# Las versiones duran más que las entradas: si una se pierde sólo cuesta un
+# fallo, pero así los perfiles populares no caducan todos a la vez.
+TTL_VERSION = 24 * 3600
+
+Entrada = namedtuple("Entrada", ["pk", "datos", "etag"])
+
+
+def _config():
+    return {
+        "cache": getattr(settings, "USUARIOS_PERFIL_CACHE", "default"),
+        "lru": getattr(settings, "USUARIOS_PERFIL_LRU", 1024),
+        "ttl": getattr(settings, "USUARIOS_PERFIL_TTL", 300),
+    }
+
+
+class LRU:
+    """Diccionario acotado que descarta la entrada usada hace más tiempo."""
+
+    def __init__(self, maximo):
+        self.maximo = maximo
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, clave):
+        with self._lock:
+            valor = self._datos.get(clave)
+            if valor is not None:
+                self._datos.move_to_end(clave)
+            return valor
+
+    def set(self, clave, valor):
+        if self.maximo <= 0:
+            return
+        with self._lock:
+            self._datos[clave] = valor
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.maximo:
+                self._datos.popitem(last=False)
+
+    def delete(self, clave):
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def clear(self):
+        with self._lock:
+            self._datos.clear()
+
+    def __len__(self):
+        return len(self._datos)
+
+
+class CachePerfil:
+    def __init__(self, alias="default", lru=1024, ttl=300):
+        self.alias = alias
+        self.ttl = ttl
+        self.local = LRU(lru)
+        # Sin caché compartida, las versiones viven en el propio proceso.
+        self._versiones = LRU(lru * 4) if alias is None else None
+
+    @property
+    def compartida(self):
+        return caches[self.alias]
+
+    # -- Versiones ----------------------------------------------------------
+
+    def version(self, clave):
+        """Versión vigente del perfil; se crea una si no existe."""
+        if self._versiones is not None:
+            version = self._versiones.get(clave)
+            if version is None:
+                version = uuid.uuid4().hex
+                self._versiones.set(clave, version)
+            return version
+
+        cache = self.compartida
+        version = cache.get(f"{PREFIJO}version:{clave}")
+        if version is None:
+            # Una versión perdida (expulsada de la caché) se sustituye por una
+            # nueva, lo que invalida cualquier copia local anterior.
+            cache.add(f"{PREFIJO}version:{clave}", uuid.uuid4().hex, TTL_VERSION)
+            version = cache.get(f"{PREFIJO}version:{clave}")
+        return version
+
+    async def aversion(self, clave):
+        if self._versiones is not None:
+            return self.version(clave)
+        cache = self.compartida
+        version = await cache.aget(f"{PREFIJO}version:{clave}")
+        if version is None:
+            await cache.aadd(f"{PREFIJO}version:{clave}", uuid.uuid4().hex, TTL_VERSION)
+            version = await cache.aget(f"{PREFIJO}version:{clave}")
+        return version
+
+    def invalidar(self, claves):
+        claves = [str(clave) for clave in claves]
+        for clave in claves:
+            self.local.delete(clave)
+        if self._versiones is not None:
+            for clave in claves:
+                self._versiones.delete(clave)
+            return
+        self.compartida.set_many(
+            {f"{PREFIJO}version:{clave}": uuid.uuid4().hex for clave in claves},
+            TTL_VERSION,
+        )
+
+    # -- Lectura ------------------------------------------------------------
+
+    def obtener(self, clave, cargar):
+        """
+        ``Entrada`` del perfil ``clave``. ``cargar()`` se llama sólo en un
+        fallo y devuelve ``(pk, datos)``; sus excepciones (p. ej. 404) se
+        propagan sin cachear nada.
+        """
+        clave = str(clave)
+        version = self.version(clave)
+
+        entrada = self.local.get(clave)
+        if entrada is not None and entrada[0] == version:
+            CONSULTAS.inc(resultado="local")
+            return entrada[1]
+
+        if self._versiones is None:
+            entrada = self.compartida.get(f"{PREFIJO}{clave}:{version}")
+            if entrada is not None:
+                CONSULTAS.inc(resultado="compartida")
+                self.local.set(clave, (version, entrada))
+                return entrada
+
+        CONSULTAS.inc(resultado="fallo")
+        with en_primaria():
+            pk, datos = cargar()
+        entrada = Entrada(pk, datos, f'"{version}"')
+        if self._versiones is None:
+            self.compartida.set(f"{PREFIJO}{clave}:{version}", entrada, self.ttl)
+        self.local.set(clave, (version, entrada))
+        return entrada
+
+    async def aobtener(self, clave, acargar):
+        """Versión asíncrona de ``obtener``; ``acargar`` es una corrutina."""
+        clave = str(clave)
+        version = await self.aversion(clave)
+
+        entrada = self.local.get(clave)
+        if entrada is not None and entrada[0] == version:
+            CONSULTAS.inc(resultado="local")
+            return entrada[1]
+
+        if self._versiones is None:
+            entrada = await self.compartida.aget(f"{PREFIJO}{clave}:{version}")
+            if entrada is not None:
+                CONSULTAS.inc(resultado="compartida")
+                self.local.set(clave, (version, entrada))
+                return entrada
+
+        CONSULTAS.inc(resultado="fallo")
+        with en_primaria():
+            pk, datos = await acargar()
+        entrada = Entrada(pk, datos, f'"{version}"')
+        if self._versiones is None:
+            await self.compartida.aset(f"{PREFIJO}{clave}:{version}", entrada, self.ttl)
+        self.local.set(clave, (version, entrada))
+        return entrada
+
+
+_cache = None
+_lock = threading.Lock()
+
+
+def cache_perfil():
+    global _cache
+    with _lock:
+        if _cache is None:
+            config = _config()
+            _cache = CachePerfil(config["cache"], config["lru"], config["ttl"])
+        return _cache
+
+
+def invalidar_perfiles(uuids):
+    """
+    Invalida el perfil cacheado de ``uuids``. Se repite al confirmar la
+    transacción: una lectura concurrente anterior al commit podría haber
+    cacheado los datos viejos con la versión nueva.
+    """
+    uuids = [str(u) for u in uuids]
+    if not uuids:
+        return
+    cache = cache_perfil()
+    cache.invalidar(uuids)
+    transaction.on_commit(lambda: cache.invalidar(uuids))
+
+
+def invalidar_perfil(uuid_usuario):
+    invalidar_perfiles([uuid_usuario])
+
+
+def _reiniciar(*, setting, **kwargs):
+    global _cache
+    if setting in (
+        "USUARIOS_PERFIL_CACHE",
+        "USUARIOS_PERFIL_LRU",
+        "USUARIOS_PERFIL_TTL",
+    ):
+        _cache = None
+
+
+setting_changed.connect(_reiniciar)
@@ -0,0 +1,344 @@
+"""
+Disponibilidad de username/email (``GET /api/usuarios/disponible/``).
+
+El formulario de registro pregunta en cada pulsación. Las respuestas salen de
+un filtro de Bloom en memoria con los usernames y emails normalizados (en
+minúsculas): si el valor no está en el filtro, seguro que está libre y no se
+toca la base de datos. Sólo los positivos (posible conflicto, con una tasa de
+falsos positivos de ``USUARIOS_DISPONIBLE_ERROR``) se confirman con la
+consulta única de ``unicidad.campos_ocupados``.
+
+El filtro nunca debe dar falsos negativos, así que:
+
+- Se construye en el primer uso recorriendo la tabla en streaming, o se carga
+  del fichero ``USUARIOS_DISPONIBLE_FICHERO`` si existe (arranque en
+  caliente; ``manage.py reconstruir_disponibilidad`` lo regenera).
+- ``post_save`` añade los valores nuevos del usuario guardado, también los
+  que ``soft_delete`` reescribe con el sufijo ``.inactiva.``. Los valores
+  que libera ``soft_delete`` siguen en el filtro (un Bloom no admite
+  borrados): sólo cuestan una consulta hasta la siguiente reconstrucción.
+- Cada ``USUARIOS_DISPONIBLE_REFRESCO`` segundos se añaden los usuarios
+  registrados desde la sincronización anterior: los creados por otros
+  procesos o sin señales (``bulk_create``, ``COPY`` de ``import_usuarios``).
+  No vale con los ``id`` mayores que el último visto: una transacción que
+  reservó un ``id`` menor puede confirmarse después. Se filtra por
+  ``fecha_registro`` (la pone la aplicación antes del ``INSERT``) desde el
+  inicio de la sincronización anterior menos ``USUARIOS_DISPONIBLE_SOLAPE``
+  segundos, que deben cubrir la transacción de alta más larga y el desfase
+  de relojes entre servidores. Volver a añadir un usuario ya visto no cambia
+  el filtro.
+
+``precargar()`` carga el fichero de arranque en caliente al arrancar el
+worker (``config/wsgi.py`` y ``config/asgi.py``) para que no lo pague la
+primera petición. Nunca recorre la tabla: sin fichero, el filtro se construye
+en el primer uso o con ``reconstruir_disponibilidad``.
+
+Los cambios de username o email de usuarios ya existentes hechos en otro
+proceso no llegan hasta la reconstrucción; el registro sigue validando la
+unicidad contra la base de datos, así que sólo afectan a la sugerencia.
+"""
+
+import hashlib
+import logging
+import math
+import os
+import struct
+import threading
+import time
+from datetime import UTC, datetime, timedelta
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import DatabaseError, connections
+from django.utils import timezone
+
+from core.metrics import registro
+
+from .models import Usuario
+from .unicidad import campos_ocupados
+
+logger = logging.getLogger(__name__)
+
+CONSULTAS = registro.counter(
+    "usuarios_disponibilidad_total",
+    "Comprobaciones de disponibilidad por origen de la respuesta.",
+    etiquetas=("resultado",),
+)
+
+MAGICO = b"BLM2"
+# magia, bits, funciones hash, elementos, marca de sincronización (µs UTC)
+CABECERA = struct.Struct("<4sQBQQ")
+EPOCA = datetime(1970, 1, 1, tzinfo=UTC)
+
+CHUNK_SIZE = 5000
+
+
+def _config():
+    return {
+        "capacidad": getattr(settings, "USUARIOS_DISPONIBLE_CAPACIDAD", 1_000_000),
+        "error": getattr(settings, "USUARIOS_DISPONIBLE_ERROR", 0.001),
+        "fichero": getattr(settings, "USUARIOS_DISPONIBLE_FICHERO", None),
+        "refresco": getattr(settings, "USUARIOS_DISPONIBLE_REFRESCO", 30),
+        "solape": getattr(settings, "USUARIOS_DISPONIBLE_SOLAPE", 300),
+    }
+
+
+def normalizar(campo, valor):
+    """Clave del filtro para ``valor``; los campos no se mezclan."""
+    return f"{campo[0]}:{valor.strip().lower()}"
+
+
+class FiltroBloom:
+    """Filtro de Bloom de ``bits`` posiciones y ``hashes`` funciones."""
+
+    def __init__(self, bits, hashes, datos=None, elementos=0):
+        self.bits = bits
+        self.hashes = hashes
+        self.datos = datos if datos is not None else bytearray((bits + 7) // 8)
+        self.elementos = elementos
+        self._lock = threading.Lock()
+
+    @classmethod
+    def para(cls, capacidad, error):
+        """Filtro dimensionado para ``capacidad`` elementos con tasa ``error``."""
+        capacidad = max(capacidad, 1)
+        bits = math.ceil(-capacidad * math.log(error) / math.log(2) ** 2)
+        hashes = max(1, round(bits / capacidad * math.log(2)))
+        return cls(bits, hashes)
+
+    def _posiciones(self, clave):
+        # Doble hashing (Kirsch-Mitzenmacher): h1 + i*h2 con un solo digest.
+        digest = hashlib.blake2b(clave.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    @property
+    def capacidad(self):
+        """Elementos que admite antes de superar la tasa de error prevista."""
+        return int(self.bits * math.log(2) / self.hashes)
+
+    def add(self, clave):
+        posiciones = self._posiciones(clave)
+        with self._lock:
+            nuevo = False
+            for p in posiciones:
+                mascara = 1 << (p & 7)
+                if not self.datos[p >> 3] & mascara:
+                    self.datos[p >> 3] |= mascara
+                    nuevo = True
+            # Volver a guardar un usuario no cuenta como elemento nuevo.
+            if nuevo:
+                self.elementos += 1
+
+    def __contains__(self, clave):
+        datos = self.datos
+        return all(datos[p >> 3] & (1 << (p & 7)) for p in self._posiciones(clave))
+
+    # -- Persistencia -------------------------------------------------------
+
+    def volcar(self, ruta, marca):
+        """Escribe el filtro y su ``marca`` (datetime) en ``ruta`` (atómico)."""
+        temporal = f"{ruta}.tmp"
+        microsegundos = (marca - EPOCA) // timedelta(microseconds=1)
+        with self._lock, open(temporal, "wb") as fichero:
+            fichero.write(
+                CABECERA.pack(
+                    MAGICO, self.bits, self.hashes, self.elementos, microsegundos
+                )
+            )
+            fichero.write(self.datos)
+        os.replace(temporal, ruta)
+
+    @classmethod
+    def cargar(cls, ruta):
+        """``(filtro, marca)`` leídos de ``ruta``; ``ValueError`` si no vale."""
+        with open(ruta, "rb") as fichero:
+            cabecera = fichero.read(CABECERA.size)
+            if len(cabecera) != CABECERA.size:
+                raise ValueError("Cabecera truncada.")
+            magico, bits, hashes, elementos, microsegundos = CABECERA.unpack(cabecera)
+            if magico != MAGICO:
+                raise ValueError("No es un filtro de disponibilidad.")
+            datos = bytearray(fichero.read())
+        if len(datos) != (bits + 7) // 8:
+            raise ValueError("Tamaño del filtro incorrecto.")
+        marca = EPOCA + timedelta(microseconds=microsegundos)
+        return cls(bits, hashes, datos, elementos), marca
+
+
+class Disponibilidad:
+    """El filtro de un proceso y lo necesario para mantenerlo al día."""
+
+    def __init__(self, capacidad, error, fichero=None, refresco=30, solape=300):
+        # ``capacidad`` en usuarios; el filtro guarda dos claves por usuario.
+        self.capacidad = capacidad
+        self.error = error
+        self.fichero = fichero
+        self.refresco = refresco
+        self.solape = timedelta(seconds=solape)
+        self.filtro = None
+        # Inicio de la última sincronización (o reconstrucción) completa.
+        self.marca = None
+        self._sincronizado = 0.0
+        self._durante_reconstruccion = None
+        self._lock = threading.Lock()
+
+    def _anadir_filas(self, filtro, filas):
+        for username, email in filas:
+            filtro.add(normalizar("username", username))
+            filtro.add(normalizar("email", email))
+
+    def reconstruir(self):
+        """Recorre la tabla en streaming y sustituye el filtro."""
+        marca = timezone.now()
+        filas = (
+            Usuario.objects.order_by()
+            .values_list("username", "email")
+            .iterator(chunk_size=CHUNK_SIZE)
+        )
+        # Cada usuario ocupa dos claves; se deja el doble de holgura para los
+        # registros que lleguen antes de la próxima reconstrucción.
+        total = Usuario.objects.count()
+        filtro = FiltroBloom.para(2 * max(self.capacidad, 2 * total), self.error)
+        # Los guardados durante el recorrido pueden no verse en él.
+        self._durante_reconstruccion = []
+        self._anadir_filas(filtro, filas)
+        pendientes, self._durante_reconstruccion = self._durante_reconstruccion, None
+        self._anadir_filas(filtro, pendientes)
+        self.filtro = filtro
+        self.marca = marca
+        self._sincronizado = time.monotonic()
+        if self.fichero:
+            filtro.volcar(self.fichero, marca)
+        return filtro
+
+    def _cargar_fichero(self):
+        if not self.fichero or not os.path.exists(self.fichero):
+            return False
+        try:
+            self.filtro, self.marca = FiltroBloom.cargar(self.fichero)
+        except (OSError, ValueError):
+            return False
+        # Lo registrado después del volcado se recupera en la sincronización.
+        self._sincronizado = 0.0
+        return True
+
+    def cargar(self):
+        """Carga el fichero si aún no hay filtro. Devuelve si hay filtro."""
+        if self.filtro is None:
+            with self._lock:
+                if self.filtro is None:
+                    self._cargar_fichero()
+        return self.filtro is not None
+
+    def preparar(self):
+        """Filtro listo para consultar (lo carga o construye si hace falta)."""
+        if self.filtro is None:
+            with self._lock:
+                if self.filtro is None and not self._cargar_fichero():
+                    self.reconstruir()
+        self.sincronizar()
+        return self.filtro
+
+    def sincronizar(self, forzar=False):
+        """Añade los usuarios registrados desde la sincronización anterior."""
+        if not forzar and time.monotonic() - self._sincronizado < self.refresco:
+            return
+        with self._lock:
+            self._sincronizado = time.monotonic()
+            filtro = self.filtro
+            if filtro is None:
+                return
+            if filtro.elementos > filtro.capacidad:
+                # Saturado: más falsos positivos de los previstos.
+                self.reconstruir()
+                return
+            marca = timezone.now()
+            # Sólo activos: las altas lo son y así lo sirve el índice parcial
+            # de ``fecha_registro``. Los valores que reescribe ``soft_delete``
+            # llegan por ``post_save`` o en la reconstrucción.
+            filas = (
+                Usuario.objects.filter(
+                    is_active=True, fecha_registro__gte=self.marca - self.solape
+                )
+                .order_by()
+                .values_list("username", "email")
+                .iterator(chunk_size=CHUNK_SIZE)
+            )
+            self._anadir_filas(filtro, filas)
+            self.marca = marca
+
+    def anotar(self, username, email):
+        """Añade los valores de un usuario guardado (si el filtro existe)."""
+        pendientes = self._durante_reconstruccion
+        if pendientes is not None:
+            pendientes.append((username, email))
+        filtro = self.filtro
+        if filtro is None:
+            return
+        filtro.add(normalizar("username", username))
+        filtro.add(normalizar("email", email))
+
+    def comprobar(self, username=None, email=None):
+        """
+        ``{campo: disponible}`` para los campos recibidos. Sólo consulta la
+        base de datos (una vez) si alguno puede estar ocupado.
+        """
+        filtro = self.preparar()
+        valores = {"username": username, "email": email}
+        dudosos = {
+            campo: valor
+            for campo, valor in valores.items()
+            if valor and normalizar(campo, valor) in filtro
+        }
+        if dudosos:
+            CONSULTAS.inc(resultado="bd")
+            ocupados = campos_ocupados(dudosos.get("username"), dudosos.get("email"))
+        else:
+            CONSULTAS.inc(resultado="filtro")
+            ocupados = set()
+        return {
+            campo: campo not in ocupados for campo, valor in valores.items() if valor
+        }
+
+
+_disponibilidad = None
+_lock = threading.Lock()
+
+
+def disponibilidad():
+    global _disponibilidad
+    with _lock:
+        if _disponibilidad is None:
+            _disponibilidad = Disponibilidad(**_config())
+        return _disponibilidad
+
+
+def precargar():
+    """
+    Carga el filtro de ``USUARIOS_DISPONIBLE_FICHERO`` al arrancar un worker
+    y lo pone al día con los registros posteriores al volcado. Sin fichero,
+    o si la base de datos no está disponible, se deja para el primer uso.
+    Cierra las conexiones que abre, por si el proceso hace ``fork`` después
+    (``gunicorn --preload``).
+    """
+    estado = disponibilidad()
+    if not estado.fichero:
+        return
+    try:
+        if estado.cargar():
+            estado.sincronizar(forzar=True)
+    except DatabaseError:
+        logger.warning("No se pudo precargar el filtro de disponibilidad.")
+    finally:
+        connections.close_all()
+
+
+def _reiniciar(*, setting, **kwargs):
+    global _disponibilidad
+    if setting.startswith("USUARIOS_DISPONIBLE_"):
+        _disponibilidad = None
+
+
+setting_changed.connect(_reiniciar)
@@ -0,0 +1,18 @@
+from .fast_serializers import UsuarioDetailFastSerializer
+from .models import Usuario
+from .pagination import UsuarioCursorPagination
+
+
+def queryset_exportacion():
+    """Mismo filtro que ``UsuarioViewSet.get_queryset``, en el orden del listado."""
+    return Usuario.activos.order_by(*UsuarioCursorPagination.ordering)
+
+
+def filas_usuarios(queryset, chunk_size=2000):
+    """
+    ``(columnas, filas)`` de la exportación de usuarios. Los campos son los de
+    ``UsuarioDetailSerializer``, así que se excluyen los mismos (password,
+    id, grupos y permisos).
+    """
+    serializer = UsuarioDetailFastSerializer.compilar()
+    return serializer.campos, serializer.iterar_queryset(queryset, chunk_size)
@@ -0,0 +1,150 @@
+from functools import lru_cache
+from operator import itemgetter
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+
+from core.instrumentacion import seccion
+
+from .models import componer_nombre_completo
+from .serializers import UsuarioDetailSerializer, UsuarioListSerializer
+
+
+def _identidad(valor):
+    return valor
+
+
+def _leer(indice, conversor):
+    """Lector de la columna ``indice`` de una fila, convertida si no es nula."""
+    if conversor is _identidad:
+        return itemgetter(indice)
+
+    def leer(fila):
+        valor = fila[indice]
+        return None if valor is None else conversor(valor)
+
+    return leer
+
+
+def _calcular(indices, funcion):
+    """Lector de un campo calculado a partir de las columnas ``indices``."""
+
+    def calcular(fila):
+        return funcion(*[fila[indice] for indice in indices])
+
+    return calcular
+
+
+class FastSerializer:
+    """
+    Serializer de sólo lectura "compilado" a partir de un ``ModelSerializer``.
+
+    Al construirse recorre una única vez los campos del serializer DRF de
+    referencia y prepara, por campo, una función que lee su valor de una
+    tupla de ``values_list`` ya con la representación final. Así se evita la
+    introspección por campo y por fila de DRF, manteniendo exactamente el
+    mismo orden de claves y las mismas representaciones.
+    """
+
+    serializer_class = None
+
+    # Campos que no son columnas: nombre -> (columnas, función).
+    calculados = {}
+
+    # Campos cuya representación DRF coincide con el valor que devuelve la BD.
+    campos_nativos = (
+        serializers.BooleanField,
+        serializers.CharField,
+        serializers.ChoiceField,
+        serializers.IntegerField,
+        serializers.ReadOnlyField,
+    )
+
+    def __init__(self, fields=None, extra_columns=()):
+        plantilla = self.serializer_class()
+        nombres = [
+            nombre
+            for nombre, campo in plantilla.fields.items()
+            if not campo.write_only and (fields is None or nombre in fields)
+        ]
+
+        self.campos = nombres
+        self.columnas = []
+        # (nombre, lector) en el orden de salida.
+        self._lectores = []
+        for nombre in nombres:
+            if nombre in self.calculados:
+                columnas, funcion = self.calculados[nombre]
+                lector = _calcular([self._columna(c) for c in columnas], funcion)
+            else:
+                campo = plantilla.fields[nombre]
+                if "." in campo.source or campo.source == "*":
+                    raise ImproperlyConfigured(
+                        f"{type(self).__name__}: el campo '{nombre}' no es una "
+                        "columna del modelo; decláralo en 'calculados'."
+                    )
+                lector = _leer(self._columna(campo.source), self._conversor(campo))
+            self._lectores.append((nombre, lector))
+
+        for columna in extra_columns:
+            self._columna(columna)
+
+    @classmethod
+    @lru_cache(maxsize=64)
+    def compilar(cls, fields=None, extra_columns=()):
+        """Instancia compilada y cacheada para un subconjunto de campos."""
+        return cls(fields=fields, extra_columns=extra_columns)
+
+    def _columna(self, nombre):
+        if nombre not in self.columnas:
+            self.columnas.append(nombre)
+        return self.columnas.index(nombre)
+
+    def _conversor(self, campo):
+        if isinstance(campo, serializers.UUIDField):
+            return str
+        if isinstance(campo, self.campos_nativos):
+            return _identidad
+        return campo.to_representation
+
+    def serializar_fila(self, fila):
+        """Diccionario de respuesta de una tupla de ``valores()``."""
+        return {nombre: lector(fila) for nombre, lector in self._lectores}
+
+    def valores(self, queryset):
+        """Queryset de tuplas con las columnas que necesita el serializer."""
+        return queryset.values_list(*self.columnas, named=True)
+
+    def serializar_filas(self, filas):
+        serializar_fila = self.serializar_fila
+        with seccion("serializacion"):
+            return [serializar_fila(fila) for fila in filas]
+
+    def serializar_queryset(self, queryset):
+        return self.serializar_filas(self.valores(queryset))
+
+    def iterar_queryset(self, queryset, chunk_size=2000):
+        """Como ``serializar_queryset`` pero fila a fila, en memoria constante."""
+        serializar_fila = self.serializar_fila
+        for fila in self.valores(queryset).iterator(chunk_size=chunk_size):
+            yield serializar_fila(fila)
+
+    def serializar_instancia(self, instancia):
+        with seccion("serializacion"):
+            return self.serializar_fila(
+                tuple(getattr(instancia, columna) for columna in self.columnas)
+            )
+
+
+class UsuarioListFastSerializer(FastSerializer):
+    """Equivalente compilado de ``UsuarioListSerializer``."""
+
+    serializer_class = UsuarioListSerializer
+    calculados = {"full_name": (("nombre", "apellido"), componer_nombre_completo)}
+
+
+class UsuarioDetailFastSerializer(FastSerializer):
+    """Equivalente compilado de ``UsuarioDetailSerializer``."""
+
+    serializer_class = UsuarioDetailSerializer
+    calculados = {"full_name": (("nombre", "apellido"), componer_nombre_completo)}
@@ -1,5 +1,5 @@
 from django import forms
-from .models import Usuario
+from .unicidad import campos_ocupados
 
 from django.contrib.auth.forms import AuthenticationForm
 
@@ -32,17 +32,10 @@ class RegistrationForm(forms.Form):
         widget=forms.PasswordInput(attrs={"placeholder": "Confirmar Contraseña"}),
     )
 
-    def clean_username(self):
-        username = self.cleaned_data.get("username")
-        if Usuario.objects.filter(username=username).exists():
-            raise forms.ValidationError("Este nombre de usuario ya está en uso.")
-        return username
-
-    def clean_email(self):
-        email = self.cleaned_data.get("email")
-        if Usuario.objects.filter(email=email).exists():
-            raise forms.ValidationError("Este correo electrónico ya está en uso.")
-        return email
+    mensajes_unicidad = {
+        "username": "Este nombre de usuario ya está en uso.",
+        "email": "Este correo electrónico ya está en uso.",
+    }
 
     def clean(self):
         cleaned_data = super().clean()
@@ -51,3 +44,11 @@ class RegistrationForm(forms.Form):
 
         if password and confirm_password and password != confirm_password:
             self.add_error("confirm_password", "Las contraseñas no coinciden.")
+
+        # Una sola consulta para username y email.
+        ocupados = campos_ocupados(
+            cleaned_data.get("username"), cleaned_data.get("email")
+        )
+        for campo in ocupados:
+            self.add_error(campo, self.mensajes_unicidad[campo])
+        return cleaned_data
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.contrib.auth.hashers import ScryptPasswordHasher
+
+
+class ConfigurableScryptPasswordHasher(ScryptPasswordHasher):
+    """
+    scrypt con parámetros leídos de ``settings.PASSWORD_SCRYPT``.
+
+    Mantiene el algoritmo ``scrypt`` de Django, así que los hashes existentes
+    siguen verificándose; si se cambian los parámetros, ``must_update``
+    detecta la diferencia y el hash se regenera en el siguiente login.
+    """
+
+    @property
+    def _parametros(self):
+        return getattr(settings, "PASSWORD_SCRYPT", {})
+
+    @property
+    def work_factor(self):
+        return self._parametros.get("N", ScryptPasswordHasher.work_factor)
+
+    @property
+    def block_size(self):
+        return self._parametros.get("R", ScryptPasswordHasher.block_size)
+
+    @property
+    def parallelism(self):
+        return self._parametros.get("P", ScryptPasswordHasher.parallelism)
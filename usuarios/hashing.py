@@ -0,0 +1,254 @@
+"""
+Cálculo y verificación de hashes de contraseña fuera del worker de Django.
+
+El hash de una contraseña es CPU puro y, en los picos de login que provoca la
+apertura de una venta, satura los workers. Aquí el trabajo se envía a un pool
+de procesos acotado (``settings.PASSWORD_HASHING``):
+
+- ``WORKERS``: procesos del pool; ``0`` calcula el hash en el propio hilo.
+- ``MAX_QUEUE``: peticiones de hash simultáneas admitidas (en curso más en
+  cola). Por encima se lanza ``HashingSaturado`` y la petición recibe un 503
+  con ``Retry-After`` en lugar de esperar indefinidamente.
+- ``TIMEOUT``: segundos máximos de espera por un resultado; al agotarse
+  también se responde con ``HashingSaturado``. El trabajo sigue ocupando su
+  hueco de ``MAX_QUEUE`` hasta que termina.
+- ``RETRY_AFTER``: valor de la cabecera ``Retry-After`` al rechazar.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.signals import setting_changed
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from core.metrics import registro
+
+COLA = registro.gauge(
+    "hashing_cola", "Operaciones de hash de contraseña en curso o en cola."
+)
+DURACION = registro.histogram(
+    "hashing_duracion_segundos",
+    "Latencia de las operaciones de hash de contraseña.",
+    etiquetas=("operacion",),
+)
+RECHAZOS = registro.counter(
+    "hashing_rechazos_total", "Operaciones de hash rechazadas por saturación."
+)
+
+
+class HashingSaturado(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Servicio saturado, inténtalo de nuevo en unos segundos."
+    default_code = "hashing_saturado"
+
+    def __init__(self, wait, detail=None, code=None):
+        super().__init__(detail, code)
+        # DRF añade Retry-After a partir de ``wait`` (igual que en Throttled).
+        self.wait = wait
+
+
+def _config():
+    config = {"WORKERS": 0, "MAX_QUEUE": 64, "TIMEOUT": 10.0, "RETRY_AFTER": 2}
+    config.update(getattr(settings, "PASSWORD_HASHING", {}))
+    return config
+
+
+def _contexto_procesos():
+    metodo = (
+        "forkserver"
+        if "forkserver" in multiprocessing.get_all_start_methods()
+        else "spawn"
+    )
+    return multiprocessing.get_context(metodo)
+
+
+class _Pool:
+    """Pool de procesos perezoso con admisión acotada por un semáforo."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._semaforo = None
+        self._config = None
+
+    def _preparar(self):
+        with self._lock:
+            if self._config is None:
+                self._config = _config()
+                self._semaforo = threading.BoundedSemaphore(
+                    max(self._config["MAX_QUEUE"], 1)
+                )
+            if self._config["WORKERS"] > 0 and self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._config["WORKERS"],
+                    mp_context=_contexto_procesos(),
+                )
+            return self._config
+
+    def _admitir(self, operacion):
+        """
+        Reserva un hueco y devuelve ``(config, liberar)``. ``liberar()``
+        devuelve el hueco cuando el trabajo termina de verdad, no cuando se
+        deja de esperarlo: un trabajo que ha agotado el ``TIMEOUT`` sigue
+        ocupando el pool y debe seguir contando para ``MAX_QUEUE``.
+        """
+        config = self._preparar()
+        semaforo = self._semaforo
+        if config["MAX_QUEUE"] <= 0 or not semaforo.acquire(blocking=False):
+            RECHAZOS.inc()
+            raise HashingSaturado(wait=config["RETRY_AFTER"])
+        COLA.inc()
+        inicio = time.perf_counter()
+
+        def liberar(*args):
+            DURACION.observe(time.perf_counter() - inicio, operacion=operacion)
+            COLA.dec()
+            semaforo.release()
+
+        return config, liberar
+
+    def _enviar(self, liberar, funcion, *args):
+        try:
+            futuro = self._executor.submit(funcion, *args)
+        except BaseException:
+            liberar()
+            raise
+        futuro.add_done_callback(liberar)
+        return futuro
+
+    def ejecutar(self, operacion, funcion, *args):
+        config, liberar = self._admitir(operacion)
+        if self._executor is None:
+            try:
+                return funcion(*args)
+            finally:
+                liberar()
+        futuro = self._enviar(liberar, funcion, *args)
+        try:
+            return futuro.result(timeout=config["TIMEOUT"])
+        except TimeoutError:
+            # ``concurrent.futures.TimeoutError`` es ``TimeoutError``. Si aún
+            # estaba en cola no llega a ejecutarse.
+            futuro.cancel()
+            RECHAZOS.inc()
+            raise HashingSaturado(wait=config["RETRY_AFTER"]) from None
+
+    async def aejecutar(self, operacion, funcion, *args):
+        """
+        Versión asíncrona de ``ejecutar`` para vistas ASGI: el event loop
+        espera al pool (o a un hilo, sin pool) en lugar de bloquearse.
+        """
+        config, liberar = self._admitir(operacion)
+        if self._executor is None:
+
+            def tarea():
+                try:
+                    return funcion(*args)
+                finally:
+                    liberar()
+
+            futuro = asyncio.get_running_loop().run_in_executor(None, tarea)
+        else:
+            futuro = asyncio.wrap_future(self._enviar(liberar, funcion, *args))
+        try:
+            return await asyncio.wait_for(futuro, timeout=config["TIMEOUT"])
+        except TimeoutError:
+            RECHAZOS.inc()
+            raise HashingSaturado(wait=config["RETRY_AFTER"]) from None
+
+    def cerrar(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._semaforo = None
+            self._config = None
+
+
+pool = _Pool()
+
+
+def _reiniciar_pool(*, setting, **kwargs):
+    if setting in ("PASSWORD_HASHING", "PASSWORD_HASHERS", "PASSWORD_SCRYPT"):
+        pool.cerrar()
+
+
+setting_changed.connect(_reiniciar_pool)
+
+
+# Funciones ejecutadas dentro del pool: deben ser importables a nivel de módulo.
+
+
+def _hashear(password):
+    return hashers.make_password(password)
+
+
+def _verificar(password, encoded):
+    return hashers.verify_password(password, encoded)
+
+
+def make_password(password):
+    """Equivalente a ``django.contrib.auth.hashers.make_password``."""
+    if password is None:
+        # Contraseña inutilizable: no hay hash que calcular.
+        return hashers.make_password(None)
+    return pool.ejecutar("hash", _hashear, password)
+
+
+def check_password(password, encoded, setter=None):
+    """
+    Equivalente a ``django.contrib.auth.hashers.check_password``. Si el hash
+    usa un algoritmo o parámetros distintos de los preferidos, ``setter``
+    lo regenera con el hasher actual (primero de ``PASSWORD_HASHERS``).
+    """
+    is_correct, must_update = pool.ejecutar("verificar", _verificar, password, encoded)
+    if setter and is_correct and must_update:
+        setter(password)
+    return is_correct
+
+
+async def amake_password(password):
+    if password is None:
+        return hashers.make_password(None)
+    return await pool.aejecutar("hash", _hashear, password)
+
+
+async def acheck_password(password, encoded, setter=None):
+    """Como ``check_password``; ``setter`` es una corrutina."""
+    is_correct, must_update = await pool.aejecutar(
+        "verificar", _verificar, password, encoded
+    )
+    if setter and is_correct and must_update:
+        await setter(password)
+    return is_correct
+
+
+def crear_executor(workers):
+    """Pool de procesos para hashear en lote (ver ``make_passwords``)."""
+    return ProcessPoolExecutor(max_workers=workers, mp_context=_contexto_procesos())
+
+
+def make_passwords(passwords, executor=None, chunksize=64):
+    """
+    Hashes de muchas contraseñas para procesos por lotes (importaciones), en
+    el mismo orden; ``None`` produce una contraseña inutilizable. Con
+    ``executor`` (``crear_executor``) el trabajo se reparte en un pool propio,
+    no en el de las peticiones web, así que no está sujeto a ``MAX_QUEUE``.
+    """
+    hashes = [hashers.make_password(None) if p is None else None for p in passwords]
+    pendientes = [i for i, password in enumerate(passwords) if password is not None]
+    if executor is None:
+        resultados = map(_hashear, (passwords[i] for i in pendientes))
+    else:
+        resultados = executor.map(
+            _hashear, [passwords[i] for i in pendientes], chunksize=chunksize
+        )
+    for i, encoded in zip(pendientes, resultados):
+        hashes[i] = encoded
+    return hashes
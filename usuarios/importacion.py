@@ -0,0 +1,289 @@
+"""
+Importación masiva de usuarios desde CSV o JSONL (``manage.py import_usuarios``).
+
+El fichero se lee en streaming y se procesa por lotes:
+
+1. Cada fila se valida con los mismos campos del modelo ``Usuario``
+   (``Field.clean``: regex del username, email, choices...).
+2. Los duplicados se detectan dentro del fichero con un conjunto en memoria
+   y contra la base de datos con una sola consulta por lote.
+3. Las contraseñas en claro se hashean en un pool de procesos; también se
+   admiten hashes ya calculados (columna ``password_hash``).
+4. El lote se inserta con ``COPY`` en PostgreSQL o con ``bulk_create`` en el
+   resto de motores, en una transacción.
+
+Tras cada lote se guarda un checkpoint con las filas consumidas, de modo que
+una importación interrumpida puede reanudarse donde se quedó.
+"""
+
+import csv
+import json
+import os
+import time
+import uuid
+
+from django.contrib.auth.hashers import identify_hasher
+from django.core.exceptions import ValidationError
+from django.db import connections, transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from .hashing import make_passwords
+from .models import Usuario
+
+# Columnas aceptadas en el fichero, además de ``password``/``password_hash``.
+CAMPOS = (
+    "username",
+    "email",
+    "nombre",
+    "apellido",
+    "telefono",
+    "fecha_nacimiento",
+    "tipo_usuario",
+    "is_verified",
+)
+
+
+def detectar_formato(ruta):
+    return "jsonl" if ruta.endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def leer_filas(ruta, formato=None):
+    """Genera ``(numero, fila)`` leyendo el fichero en streaming."""
+    formato = formato or detectar_formato(ruta)
+    with open(ruta, newline="", encoding="utf-8") as fichero:
+        if formato == "csv":
+            yield from enumerate(csv.DictReader(fichero), start=1)
+            return
+        for numero, linea in enumerate(fichero, start=1):
+            if not linea.strip():
+                continue
+            try:
+                yield numero, json.loads(linea)
+            except json.JSONDecodeError as exc:
+                yield numero, ValidationError(f"JSON no válido: {exc.msg}")
+
+
+class Checkpoint:
+    """Progreso de una importación guardado en un fichero JSON."""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+
+    def cargar(self):
+        try:
+            with open(self.ruta, encoding="utf-8") as fichero:
+                return json.load(fichero)
+        except FileNotFoundError:
+            return None
+
+    def guardar(self, estado):
+        # Escritura atómica: un corte a mitad nunca deja un checkpoint roto.
+        temporal = f"{self.ruta}.tmp"
+        with open(temporal, "w", encoding="utf-8") as fichero:
+            json.dump(estado, fichero)
+        os.replace(temporal, self.ruta)
+
+    def borrar(self):
+        try:
+            os.remove(self.ruta)
+        except FileNotFoundError:
+            pass
+
+
+class ImportadorUsuarios:
+    """
+    Valida e inserta usuarios por lotes. ``progreso`` se llama tras cada lote
+    con el estado acumulado; ``rechazo`` con ``(numero, fila, errores)``.
+    """
+
+    def __init__(
+        self,
+        lote=5000,
+        executor=None,
+        using="default",
+        checkpoint=None,
+        progreso=None,
+        rechazo=None,
+    ):
+        self.lote = lote
+        self.executor = executor
+        self.using = using
+        self.checkpoint = checkpoint
+        self.progreso = progreso or (lambda estado: None)
+        self.rechazo = rechazo or (lambda numero, fila, errores: None)
+        self.campos = {nombre: Usuario._meta.get_field(nombre) for nombre in CAMPOS}
+        self._vistos_username = set()
+        self._vistos_email = set()
+
+    # -- Validación ---------------------------------------------------------
+
+    def validar(self, fila):
+        """Devuelve ``(datos, password, encoded)`` o lanza ``ValidationError``."""
+        if isinstance(fila, ValidationError):
+            raise fila
+        errores = {}
+        datos = {}
+        for nombre, campo in self.campos.items():
+            valor = fila.get(nombre)
+            if valor in (None, ""):
+                if not campo.blank and not campo.has_default():
+                    errores[nombre] = ["Este campo es obligatorio."]
+                continue
+            try:
+                datos[nombre] = campo.clean(valor, None)
+            except ValidationError as exc:
+                errores[nombre] = exc.messages
+        if "email" in datos:
+            datos["email"] = Usuario.objects.normalize_email(datos["email"])
+
+        password = fila.get("password") or None
+        encoded = fila.get("password_hash") or None
+        if encoded:
+            try:
+                identify_hasher(encoded)
+            except ValueError:
+                errores["password_hash"] = ["Hash de contraseña no reconocido."]
+        if errores:
+            raise ValidationError(errores)
+        return datos, password, encoded
+
+    # -- Duplicados ---------------------------------------------------------
+
+    def _descartar_duplicados(self, validas):
+        """Quita del lote los usuarios repetidos en el fichero o en la BD."""
+        usernames = [datos["username"] for _, _, (datos, _, _) in validas]
+        # El email es único sin distinguir mayúsculas (usuarios_email_lower_uniq).
+        emails = [datos["email"].lower() for _, _, (datos, _, _) in validas]
+        existentes = (
+            Usuario.objects.using(self.using)
+            .annotate(email_ci=Lower("email"))
+            .filter(Q(username__in=usernames) | Q(email_ci__in=emails))
+        )
+        en_bd_username, en_bd_email = set(), set()
+        for username, email in existentes.values_list("username", "email_ci"):
+            en_bd_username.add(username)
+            en_bd_email.add(email)
+
+        unicas = []
+        for numero, fila, (datos, password, encoded) in validas:
+            errores = {}
+            username, email = datos["username"], datos["email"].lower()
+            if username in en_bd_username or username in self._vistos_username:
+                errores["username"] = ["Ya existe un usuario con este username."]
+            if email in en_bd_email or email in self._vistos_email:
+                errores["email"] = ["Ya existe un usuario con este email."]
+            self._vistos_username.add(username)
+            self._vistos_email.add(email)
+            if errores:
+                self.rechazo(numero, fila, errores)
+                continue
+            unicas.append((datos, password, encoded))
+        return unicas
+
+    # -- Inserción ----------------------------------------------------------
+
+    def _construir(self, unicas):
+        passwords = [password for _, password, encoded in unicas if not encoded]
+        hashes = iter(make_passwords(passwords, executor=self.executor))
+        ahora = timezone.now()
+        return [
+            Usuario(
+                uuid=uuid.uuid4(),
+                password=encoded or next(hashes),
+                fecha_registro=ahora,
+                **datos,
+            )
+            for datos, _, encoded in unicas
+        ]
+
+    def _insertar(self, usuarios):
+        conexion = connections[self.using]
+        if conexion.vendor != "postgresql":
+            Usuario.objects.using(self.using).bulk_create(usuarios)
+            return
+        campos = [
+            campo
+            for campo in Usuario._meta.concrete_fields
+            if campo is not Usuario._meta.pk
+        ]
+        columnas = ", ".join(conexion.ops.quote_name(c.column) for c in campos)
+        tabla = conexion.ops.quote_name(Usuario._meta.db_table)
+        with (
+            conexion.cursor() as cursor,
+            cursor.copy(f"COPY {tabla} ({columnas}) FROM STDIN") as copy,
+        ):
+            for usuario in usuarios:
+                copy.write_row(
+                    [
+                        campo.get_db_prep_save(
+                            campo.pre_save(usuario, add=True), conexion
+                        )
+                        for campo in campos
+                    ]
+                )
+
+    def _procesar(self, pendientes, estado):
+        validas = []
+        for numero, fila in pendientes:
+            try:
+                validas.append((numero, fila, self.validar(fila)))
+            except ValidationError as exc:
+                self.rechazo(numero, fila, exc.message_dict)
+        unicas = self._descartar_duplicados(validas) if validas else []
+        if unicas:
+            # Los hashes se calculan antes de abrir la transacción.
+            usuarios = self._construir(unicas)
+            with transaction.atomic(using=self.using):
+                self._insertar(usuarios)
+        estado["filas"] += len(pendientes)
+        estado["importados"] += len(unicas)
+        estado["rechazados"] += len(pendientes) - len(unicas)
+
+    # -- Bucle principal ----------------------------------------------------
+
+    def importar(self, filas, reanudar=True):
+        """
+        Importa ``filas`` (iterable de ``(numero, fila)``) y devuelve el estado
+        final: filas leídas, importadas, rechazadas, segundos y filas/s.
+        """
+        estado = {"filas": 0, "importados": 0, "rechazados": 0}
+        if self.checkpoint and reanudar:
+            estado.update(self.checkpoint.cargar() or {})
+        saltar = estado["filas"]
+
+        inicio = time.perf_counter()
+        procesadas = 0
+        pendientes = []
+        for i, (numero, fila) in enumerate(filas):
+            if i < saltar:
+                continue
+            pendientes.append((numero, fila))
+            if len(pendientes) >= self.lote:
+                self._procesar(pendientes, estado)
+                procesadas += len(pendientes)
+                pendientes = []
+                self._cerrar_lote(estado, procesadas, inicio)
+        if pendientes:
+            self._procesar(pendientes, estado)
+            procesadas += len(pendientes)
+            self._cerrar_lote(estado, procesadas, inicio)
+
+        if self.checkpoint:
+            self.checkpoint.borrar()
+        return self._resumen(estado, procesadas, inicio)
+
+    def _cerrar_lote(self, estado, procesadas, inicio):
+        if self.checkpoint:
+            self.checkpoint.guardar(estado)
+        self.progreso(self._resumen(estado, procesadas, inicio))
+
+    @staticmethod
+    def _resumen(estado, procesadas, inicio):
+        segundos = time.perf_counter() - inicio
+        return {
+            **estado,
+            "segundos": round(segundos, 3),
+            "filas_por_segundo": round(procesadas / segundos, 1) if segundos else 0.0,
+        }
@@ -0,0 +1,146 @@
+"""
+Operaciones de administración sobre lotes de usuarios
+(``POST /api/usuarios/desactivar-lote/`` y ``/actualizar-lote/``).
+
+- ``desactivar_usuarios`` hace el mismo borrado lógico que
+  ``Usuario.soft_delete`` con un único ``UPDATE``. El sufijo
+  ``.inactiva.<hex>`` se calcula en la base de datos a partir del ``uuid`` de
+  cada fila y de un valor aleatorio de la llamada.
+- ``actualizar_usuarios`` cambia ``tipo_usuario`` e ``is_verified`` de cada
+  usuario con ``bulk_update``.
+
+Ninguna de las dos emite ``post_save``, así que repiten a mano lo que hacen
+las señales y ``soft_delete``: revocar los access tokens, invalidar el
+perfil y los fragmentos HTML cacheados y anotar los valores nuevos en el
+filtro de disponibilidad. Un cambio de ``tipo_usuario`` invalida los access
+tokens con el ``tier`` anterior; el siguiente refresh ya emite el nuevo.
+
+Ambas devuelven un resultado por uuid, en el orden recibido.
+"""
+
+import uuid
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import MD5, Cast, Concat, Substr
+
+from core.cache_html import grupo_usuario, invalidar_html
+
+from .cache_perfil import invalidar_perfiles
+from .disponibilidad import disponibilidad
+from .models import Usuario
+from .revocacion import revocar_tier, revocar_usuarios
+
+# Campos que admite ``actualizar_usuarios``.
+CAMPOS_ACTUALIZABLES = ("tipo_usuario", "is_verified")
+
+DESACTIVADO = "desactivado"
+ACTUALIZADO = "actualizado"
+SIN_CAMBIOS = "sin_cambios"
+NO_ENCONTRADO = "no_encontrado"
+
+
+def maximo_por_lote():
+    return getattr(settings, "USUARIOS_LOTE_MAXIMO", 1000)
+
+
+def _sufijado(campo, semilla):
+    """``campo`` con el sufijo ``.inactiva.<hex>``, salvo si ya lo lleva."""
+    hexa = Substr(MD5(Concat(Cast("uuid", models.CharField()), Value(semilla))), 1, 8)
+    return Case(
+        When(**{f"{campo}__contains": ".inactiva."}, then=F(campo)),
+        default=Concat(
+            F(campo), Value(".inactiva."), hexa, output_field=models.CharField()
+        ),
+    )
+
+
+def desactivar_usuarios(uuids):
+    """
+    Borrado lógico de los usuarios activos de ``uuids``: tres consultas sea
+    cual sea el tamaño del lote. Devuelve ``[{"uuid", "resultado"}]``.
+    """
+    uuids = [str(u) for u in uuids]
+    with transaction.atomic():
+        activos = dict(
+            Usuario.activos.select_for_update()
+            .filter(uuid__in=uuids)
+            .values_list("uuid", "pk")
+        )
+        if activos:
+            semilla = uuid.uuid4().hex
+            Usuario.objects.filter(pk__in=activos.values()).update(
+                is_active=False,
+                email=_sufijado("email", semilla),
+                username=_sufijado("username", semilla),
+            )
+            # Los valores reescritos también cuentan como ocupados.
+            nuevos = list(
+                Usuario.objects.filter(pk__in=activos.values()).values_list(
+                    "username", "email"
+                )
+            )
+    if activos:
+        revocar_usuarios(activos.values())
+        invalidar_perfiles(activos)
+        invalidar_html(*(grupo_usuario(pk) for pk in activos.values()))
+        filtro = disponibilidad()
+        for username, email in nuevos:
+            filtro.anotar(username, email)
+
+    desactivados = {str(u) for u in activos}
+    return [
+        {"uuid": u, "resultado": DESACTIVADO if u in desactivados else NO_ENCONTRADO}
+        for u in uuids
+    ]
+
+
+def actualizar_usuarios(cambios):
+    """
+    Aplica ``cambios`` (``[{"uuid", "tipo_usuario"?, "is_verified"?}]``) a los
+    usuarios activos con un ``bulk_update`` de las columnas afectadas. Devuelve
+    ``[{"uuid", "resultado"}]``.
+    """
+    cambios = [{**cambio, "uuid": str(cambio["uuid"])} for cambio in cambios]
+    with transaction.atomic():
+        usuarios = {
+            str(u.uuid): u
+            for u in Usuario.activos.select_for_update()
+            .filter(uuid__in=[c["uuid"] for c in cambios])
+            .only("pk", "uuid", *CAMPOS_ACTUALIZABLES)
+        }
+        # Por pk: un uuid repetido en el lote se escribe una vez, con el último valor.
+        resultados, modificados, campos = [], {}, set()
+        for cambio in cambios:
+            usuario = usuarios.get(cambio["uuid"])
+            if usuario is None:
+                resultados.append({"uuid": cambio["uuid"], "resultado": NO_ENCONTRADO})
+                continue
+            distintos = [
+                campo
+                for campo in CAMPOS_ACTUALIZABLES
+                if campo in cambio and getattr(usuario, campo) != cambio[campo]
+            ]
+            for campo in distintos:
+                setattr(usuario, campo, cambio[campo])
+            if distintos:
+                modificados[usuario.pk] = usuario
+                campos.update(distintos)
+            resultados.append(
+                {
+                    "uuid": cambio["uuid"],
+                    "resultado": ACTUALIZADO if distintos else SIN_CAMBIOS,
+                }
+            )
+        if modificados:
+            Usuario.objects.bulk_update(
+                modificados.values(), sorted(campos), batch_size=maximo_por_lote()
+            )
+    if modificados:
+        invalidar_perfiles(u.uuid for u in modificados.values())
+        invalidar_html(*(grupo_usuario(pk) for pk in modificados))
+        if "tipo_usuario" in campos:
+            # Los tokens emitidos llevan el ``tier`` antiguo.
+            revocar_tier({pk: u.tipo_usuario for pk, u in modificados.items()})
+    return resultados
@@ -0,0 +1,249 @@
+import collections
+import itertools
+import json
+import random
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from core.benchmark import sembrar_usuarios
+from core.carga import ClienteEnProceso, ClienteHTTP, Peticion, comparar, ejecutar
+from usuarios.models import TokenRevocado, Usuario
+from usuarios.serializers import CustomTokenObtainPairSerializer
+
+PREFIJO = "benchapi"
+PASSWORD = "bench-pass"
+
+ESCENARIOS = (
+    "token",
+    "refresh",
+    "listado",
+    "detalle",
+    "actualizar",
+    "borrar",
+    "registro",
+)
+
+
+def _json(datos):
+    return json.dumps(datos).encode()
+
+
+def _bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark reproducible de la API: siembra N usuarios y mide token, "
+        "refresh, listado/detalle/actualización/borrado de usuarios y registro, "
+        "dentro del proceso (Client de Django) o por HTTP contra un servidor "
+        "local. Informa throughput, p50/p95/p99 y consultas por petición en "
+        "JSON y falla si empeora frente a una línea base."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--modo",
+            choices=["proceso", "http"],
+            default="proceso",
+            help="proceso: Client de Django, sin red. http: contra --url.",
+        )
+        parser.add_argument(
+            "--url",
+            default="http://127.0.0.1:8000",
+            help="Servidor del modo http. Debe usar la misma BD y SECRET_KEY.",
+        )
+        parser.add_argument(
+            "--escenarios", nargs="+", choices=ESCENARIOS, default=list(ESCENARIOS)
+        )
+        parser.add_argument("--usuarios", type=int, default=200)
+        parser.add_argument(
+            "--peticiones", type=int, default=500, help="Peticiones por escenario."
+        )
+        parser.add_argument(
+            "--calentamiento",
+            type=int,
+            default=20,
+            help="Peticiones sin medir al empezar cada escenario.",
+        )
+        parser.add_argument("--concurrencia", type=int, default=8)
+        parser.add_argument(
+            "--revocados",
+            type=int,
+            default=0,
+            help="Refresh tokens revocados vigentes a sembrar antes de medir "
+            "(simula meses de rotación).",
+        )
+        parser.add_argument("--semilla", type=int, default=0)
+        parser.add_argument("--salida", help="Escribe el resultado en este fichero.")
+        parser.add_argument(
+            "--linea-base", help="JSON de una ejecución anterior para comparar."
+        )
+        parser.add_argument(
+            "--guardar-linea-base",
+            action="store_true",
+            help="Guarda el resultado como --linea-base en vez de comparar.",
+        )
+        parser.add_argument(
+            "--tolerancia",
+            type=float,
+            default=0.25,
+            help="Empeoramiento admitido de latencias y throughput (0.25 = 25%%).",
+        )
+        parser.add_argument(
+            "--solo-consultas",
+            action="store_true",
+            help="Compara sólo consultas por petición y errores (p. ej. en CI, "
+            "con una línea base de otra máquina).",
+        )
+
+    def handle(self, *args, **options):
+        if options["guardar_linea_base"] and not options["linea_base"]:
+            raise CommandError("--guardar-linea-base necesita --linea-base.")
+        if options["modo"] == "http":
+            try:
+                atender = ClienteHTTP(options["url"])
+            except ValueError as exc:
+                raise CommandError(str(exc)) from exc
+        else:
+            atender = ClienteEnProceso()
+        self.random = random.Random(options["semilla"])
+
+        # Los usuarios se borran al terminar: con varios hilos (o un servidor
+        # aparte) no pueden vivir en una transacción que se deshace.
+        self._limpiar()
+        try:
+            self._sembrar(options)
+            if options["modo"] == "proceso":
+                # Como el test runner: el Host de las peticiones es "testserver".
+                with override_settings(
+                    ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]
+                ):
+                    escenarios = self._medir(atender, options)
+            else:
+                escenarios = self._medir(atender, options)
+        finally:
+            self._limpiar()
+
+        resultado = {
+            "modo": options["modo"],
+            "usuarios": options["usuarios"],
+            "peticiones": options["peticiones"],
+            "concurrencia": options["concurrencia"],
+            "escenarios": escenarios,
+        }
+        texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+        if options["salida"]:
+            with open(options["salida"], "w", encoding="utf-8") as fichero:
+                fichero.write(texto + "\n")
+        self.stdout.write(texto)
+
+        if not options["linea_base"]:
+            return
+        if options["guardar_linea_base"]:
+            with open(options["linea_base"], "w", encoding="utf-8") as fichero:
+                fichero.write(texto + "\n")
+            return
+        with open(options["linea_base"], encoding="utf-8") as fichero:
+            base = json.load(fichero)
+        regresiones = comparar(
+            resultado,
+            base,
+            tolerancia=options["tolerancia"],
+            solo_consultas=options["solo_consultas"],
+        )
+        if regresiones:
+            raise CommandError(
+                "Regresiones frente a la línea base:\n- " + "\n- ".join(regresiones)
+            )
+
+    # -- Datos ----------------------------------------------------------------
+
+    @staticmethod
+    def _limpiar():
+        Usuario.objects.filter(username__startswith=PREFIJO).delete()
+        TokenRevocado.objects.filter(jti__startswith=PREFIJO).delete()
+
+    def _sembrar(self, options):
+        expira = timezone.now() + api_settings.REFRESH_TOKEN_LIFETIME
+        TokenRevocado.objects.bulk_create(
+            (
+                TokenRevocado(jti=f"{PREFIJO}{i:012d}", expira=expira)
+                for i in range(options["revocados"])
+            ),
+            batch_size=5000,
+        )
+        sembrar_usuarios(options["usuarios"], prefijo=PREFIJO, password=PASSWORD)
+        self.usuarios = [
+            (u, str(CustomTokenObtainPairSerializer.get_token(u).access_token))
+            for u in Usuario.objects.filter(username__startswith=PREFIJO)
+        ]
+        # Cada borrado consume un usuario propio.
+        self.borrables = collections.deque()
+        if "borrar" in options["escenarios"]:
+            n = options["peticiones"] + options["calentamiento"]
+            sembrar_usuarios(n, prefijo=f"{PREFIJO}x")
+            self.borrables.extend(
+                (u.uuid, str(CustomTokenObtainPairSerializer.get_token(u).access_token))
+                for u in Usuario.objects.filter(username__startswith=f"{PREFIJO}x")
+            )
+        self.secuencia = itertools.count()
+
+    # -- Escenarios -----------------------------------------------------------
+
+    def _medir(self, atender, options):
+        return {
+            nombre: ejecutar(
+                getattr(self, f"_peticion_{nombre}"),
+                atender,
+                options["peticiones"],
+                concurrencia=options["concurrencia"],
+                calentamiento=options["calentamiento"],
+            )
+            for nombre in options["escenarios"]
+        }
+
+    def _peticion_token(self):
+        usuario, _ = self.random.choice(self.usuarios)
+        cuerpo = {"username": usuario.username, "password": PASSWORD}
+        return Peticion("POST", "/api/token/", {}, _json(cuerpo))
+
+    def _peticion_refresh(self):
+        # Un refresh nuevo por petición: con rotación cada uno se usa una vez.
+        usuario, _ = self.random.choice(self.usuarios)
+        refresh = CustomTokenObtainPairSerializer.get_token(usuario)
+        return Peticion(
+            "POST", "/api/token/refresh/", {}, _json({"refresh": str(refresh)})
+        )
+
+    def _peticion_listado(self):
+        _, access = self.random.choice(self.usuarios)
+        return Peticion("GET", "/api/usuarios/", _bearer(access), b"")
+
+    def _peticion_detalle(self):
+        usuario, access = self.random.choice(self.usuarios)
+        return Peticion("GET", f"/api/usuarios/{usuario.uuid}/", _bearer(access), b"")
+
+    def _peticion_actualizar(self):
+        usuario, access = self.random.choice(self.usuarios)
+        cuerpo = {"nombre": f"Bench {next(self.secuencia)}"}
+        return Peticion(
+            "PATCH", f"/api/usuarios/{usuario.uuid}/", _bearer(access), _json(cuerpo)
+        )
+
+    def _peticion_borrar(self):
+        uuid, access = self.borrables.popleft()
+        return Peticion("DELETE", f"/api/usuarios/{uuid}/", _bearer(access), b"")
+
+    def _peticion_registro(self):
+        n = next(self.secuencia)
+        cuerpo = {
+            "username": f"{PREFIJO}r{n}",
+            "email": f"{PREFIJO}r{n}@bench.local",
+            "password": "Bench.Pass.2024",
+        }
+        return Peticion("POST", "/api/usuarios/", {}, _json(cuerpo))
@@ -0,0 +1,255 @@
+import asyncio
+import io
+import json
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.test.utils import override_settings
+
+from core.benchmark import resumir, sembrar_usuarios
+from usuarios.models import Usuario
+from usuarios.serializers import CustomTokenObtainPairSerializer
+
+PREFIJO = "benchasgi"
+PASSWORD = "bench-pass"
+
+MODOS = {
+    # modo: (servidor, urlconf)
+    "wsgi": ("wsgi", "config.urls"),
+    "asgi-sync": ("asgi", "config.urls"),
+    "asgi": ("asgi", "config.urls_asgi"),
+}
+
+
+def _environ(metodo, ruta, cabeceras, cuerpo):
+    environ = {
+        "REQUEST_METHOD": metodo,
+        "PATH_INFO": ruta,
+        "QUERY_STRING": "",
+        "SERVER_NAME": "testserver",
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "REMOTE_ADDR": "127.0.0.1",
+        "CONTENT_TYPE": "application/json",
+        "CONTENT_LENGTH": str(len(cuerpo)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(cuerpo),
+        "wsgi.errors": io.StringIO(),
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for nombre, valor in cabeceras.items():
+        environ["HTTP_" + nombre.upper().replace("-", "_")] = valor
+    return environ
+
+
+def _scope(metodo, ruta, cabeceras, cuerpo):
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": metodo,
+        "scheme": "http",
+        "path": ruta,
+        "raw_path": ruta.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", b"testserver"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(cuerpo)).encode()),
+            *((k.lower().encode(), v.encode()) for k, v in cabeceras.items()),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara throughput y latencias (p50/p95/p99) de la API servida por "
+        "WSGI (hilos), ASGI con las vistas DRF síncronas y ASGI con las vistas "
+        "asíncronas, con N conexiones concurrentes, dentro del proceso."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--endpoint", choices=["detalle", "token", "registro"], default="detalle"
+        )
+        parser.add_argument(
+            "--modos", nargs="+", choices=list(MODOS), default=list(MODOS)
+        )
+        parser.add_argument("--concurrencia", type=int, default=1000)
+        parser.add_argument("--peticiones", type=int, default=5000)
+        parser.add_argument(
+            "--hilos", type=int, default=32, help="Hilos del servidor WSGI simulado."
+        )
+        parser.add_argument("--usuarios", type=int, default=200)
+        parser.add_argument("--json", action="store_true", help="Salida en JSON.")
+
+    def handle(self, *args, **options):
+        # Los servidores usan varias conexiones a la vez: los datos no pueden
+        # vivir en una transacción que se deshace, se borran al terminar.
+        sembrar_usuarios(options["usuarios"], prefijo=PREFIJO, password=PASSWORD)
+        try:
+            usuarios = list(Usuario.objects.filter(username__startswith=PREFIJO))
+            accesos = [
+                (u, str(CustomTokenObtainPairSerializer.get_token(u).access_token))
+                for u in usuarios
+            ]
+            resultados = []
+            for modo in options["modos"]:
+                self._registros = 0
+                servidor, urlconf = MODOS[modo]
+                # Como el test runner: el Host de las peticiones es "testserver".
+                with override_settings(
+                    ROOT_URLCONF=urlconf, ALLOWED_HOSTS=["testserver"]
+                ):
+                    if servidor == "wsgi":
+                        muestras, estados, segundos = self._wsgi(accesos, options)
+                    else:
+                        muestras, estados, segundos = asyncio.run(
+                            self._asgi(accesos, options)
+                        )
+                resultados.append(
+                    {
+                        "modo": modo,
+                        "peticiones_por_segundo": round(len(muestras) / segundos, 1),
+                        "estados": estados,
+                        **resumir(muestras),
+                    }
+                )
+        finally:
+            Usuario.objects.filter(username__startswith=PREFIJO).delete()
+
+        if options["json"]:
+            self.stdout.write(json.dumps(resultados, indent=2))
+            return
+        self.stdout.write(
+            f"endpoint={options['endpoint']} concurrencia={options['concurrencia']} "
+            f"peticiones={options['peticiones']}"
+        )
+        for r in resultados:
+            self.stdout.write(
+                f"{r['modo']:>10}: {r['peticiones_por_segundo']:>8} req/s  "
+                f"p50 {r['p50_ms']:>8} ms  p95 {r['p95_ms']:>8} ms  "
+                f"p99 {r['p99_ms']:>8} ms  estados {r['estados']}"
+            )
+
+    # -- Peticiones -----------------------------------------------------------
+
+    def _peticion(self, accesos, endpoint):
+        usuario, access = random.choice(accesos)
+        if endpoint == "detalle":
+            return (
+                "GET",
+                f"/api/usuarios/{usuario.uuid}/",
+                {"Authorization": f"Bearer {access}"},
+                b"",
+            )
+        if endpoint == "token":
+            cuerpo = {"username": usuario.username, "password": PASSWORD}
+            return "POST", "/api/token/", {}, json.dumps(cuerpo).encode()
+        self._registros += 1
+        n = f"{self._registros}{random.randrange(10**9)}"
+        cuerpo = {
+            "username": f"{PREFIJO}r{n}",
+            "email": f"{PREFIJO}r{n}@bench.local",
+            "password": "Bench.Pass.2024",
+        }
+        return "POST", "/api/usuarios/", {}, json.dumps(cuerpo).encode()
+
+    # -- WSGI: pool de hilos, como gunicorn --threads -------------------------
+
+    def _wsgi(self, accesos, options):
+        handler = WSGIHandler()
+
+        def atender(peticion):
+            metodo, ruta, cabeceras, cuerpo = peticion
+            estado = []
+            respuesta = handler(
+                _environ(metodo, ruta, cabeceras, cuerpo),
+                lambda status, headers, exc_info=None: estado.append(status),
+            )
+            b"".join(respuesta)
+            respuesta.close()
+            return int(estado[0].split()[0])
+
+        def atender_y_cerrar(peticion):
+            try:
+                return atender(peticion)
+            finally:
+                close_old_connections()
+
+        muestras, estados = [], {}
+        total = options["peticiones"]
+        enviadas = 0
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["hilos"]) as executor:
+            pendientes = {}
+
+            def enviar():
+                nonlocal enviadas
+                peticion = self._peticion(accesos, options["endpoint"])
+                futuro = executor.submit(atender_y_cerrar, peticion)
+                pendientes[futuro] = time.perf_counter()
+                enviadas += 1
+
+            # Cada conexión lanza otra petición en cuanto recibe respuesta;
+            # las que superan los hilos esperan en cola, como en el backlog.
+            for _ in range(min(options["concurrencia"], total)):
+                enviar()
+            while pendientes:
+                hechas, _ = wait(list(pendientes), return_when=FIRST_COMPLETED)
+                for futuro in hechas:
+                    muestras.append(time.perf_counter() - pendientes.pop(futuro))
+                    codigo = futuro.result()
+                    estados[codigo] = estados.get(codigo, 0) + 1
+                    if enviadas < total:
+                        enviar()
+        return muestras, estados, time.perf_counter() - inicio
+
+    # -- ASGI: un event loop con N conexiones ---------------------------------
+
+    async def _asgi(self, accesos, options):
+        handler = ASGIHandler()
+        muestras, estados = [], {}
+        restantes = options["peticiones"]
+
+        async def atender(peticion):
+            metodo, ruta, cabeceras, cuerpo = peticion
+            mensajes = [{"type": "http.request", "body": cuerpo, "more_body": False}]
+            estado = []
+
+            async def receive():
+                if mensajes:
+                    return mensajes.pop()
+                await asyncio.Event().wait()
+
+            async def send(mensaje):
+                if mensaje["type"] == "http.response.start":
+                    estado.append(mensaje["status"])
+
+            await handler(_scope(metodo, ruta, cabeceras, cuerpo), receive, send)
+            return estado[0]
+
+        async def conexion():
+            nonlocal restantes
+            while restantes > 0:
+                restantes -= 1
+                peticion = self._peticion(accesos, options["endpoint"])
+                inicio = time.perf_counter()
+                codigo = await atender(peticion)
+                muestras.append(time.perf_counter() - inicio)
+                estados[codigo] = estados.get(codigo, 0) + 1
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(conexion() for _ in range(options["concurrencia"])))
+        return muestras, estados, time.perf_counter() - inicio
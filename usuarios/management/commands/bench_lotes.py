@@ -0,0 +1,115 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.benchmark import revertir, sembrar_usuarios
+from usuarios.models import Usuario
+
+PREFIJO = "benchlote"
+
+
+class Command(BaseCommand):
+    help = (
+        "Throughput de las operaciones masivas de usuarios frente a una "
+        "petición por usuario: DELETE /api/usuarios/<uuid>/ contra "
+        "desactivar-lote, y PATCH de tipo_usuario contra actualizar-lote."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tamanos", type=int, nargs="+", default=[100, 1000])
+        parser.add_argument("--json", action="store_true", help="Salida en JSON.")
+
+    def handle(self, *args, **options):
+        resultados = []
+        # Como el test runner: el Host de las peticiones es "testserver".
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            for tamano in options["tamanos"]:
+                for operacion in ("desactivar", "actualizar"):
+                    resultados.append(
+                        {
+                            "operacion": operacion,
+                            "usuarios": tamano,
+                            "por_usuario": self._medir(operacion, tamano, False),
+                            "lote": self._medir(operacion, tamano, True),
+                        }
+                    )
+        for r in resultados:
+            r["aceleracion"] = round(
+                r["lote"]["usuarios_por_segundo"]
+                / r["por_usuario"]["usuarios_por_segundo"],
+                1,
+            )
+
+        if options["json"]:
+            self.stdout.write(json.dumps(resultados, indent=2))
+            return
+        for r in resultados:
+            self.stdout.write(
+                f"{r['operacion']:>10} {r['usuarios']:>6} usuarios  "
+                f"por usuario {r['por_usuario']['usuarios_por_segundo']:>9.0f}/s  "
+                f"lote {r['lote']['usuarios_por_segundo']:>9.0f}/s  "
+                f"x{r['aceleracion']}"
+            )
+
+    def _medir(self, operacion, tamano, lote):
+        with revertir():
+            admin = Usuario.objects.create(
+                username=f"{PREFIJO}admin",
+                email=f"{PREFIJO}admin@bench.local",
+                is_staff=True,
+            )
+            sembrar_usuarios(tamano, prefijo=PREFIJO)
+            uuids = [
+                str(u)
+                for u in Usuario.objects.filter(
+                    username__startswith=PREFIJO, is_staff=False
+                ).values_list("uuid", flat=True)
+            ]
+            client = APIClient()
+            client.force_authenticate(user=admin)
+
+            inicio = time.perf_counter()
+            if operacion == "desactivar" and lote:
+                respuestas = [
+                    client.post(
+                        reverse("usuario-desactivar-lote"),
+                        {"uuids": uuids},
+                        format="json",
+                    )
+                ]
+            elif operacion == "desactivar":
+                respuestas = [
+                    client.delete(reverse("usuario-detail", args=[u])) for u in uuids
+                ]
+            elif lote:
+                cambios = [{"uuid": u, "tipo_usuario": "organizador"} for u in uuids]
+                respuestas = [
+                    client.post(
+                        reverse("usuario-actualizar-lote"),
+                        {"usuarios": cambios},
+                        format="json",
+                    )
+                ]
+            else:
+                respuestas = [
+                    client.patch(
+                        reverse("usuario-detail", args=[u]),
+                        {"tipo_usuario": "organizador"},
+                        format="json",
+                    )
+                    for u in uuids
+                ]
+            segundos = time.perf_counter() - inicio
+
+            errores = sum(1 for r in respuestas if r.status_code >= 400)
+        return {
+            "segundos": round(segundos, 4),
+            "usuarios_por_segundo": round(tamano / segundos, 1),
+            "peticiones": len(respuestas),
+            "errores": errores,
+        }
@@ -0,0 +1,65 @@
+import json
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from core.benchmark import cronometrar, resumir, revertir, sembrar_usuarios
+from usuarios.fast_serializers import UsuarioListFastSerializer
+from usuarios.models import Usuario
+from usuarios.serializers import UsuarioListSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el ModelSerializer de DRF con el serializer compilado en el "
+        "listado de usuarios (consulta + serialización + render JSON)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--filas", type=int, nargs="+", default=[1_000, 10_000, 100_000]
+        )
+        parser.add_argument("--repeticiones", type=int, default=5)
+        parser.add_argument("--json", action="store_true", help="Salida en JSON.")
+
+    def handle(self, *args, **options):
+        renderer = JSONRenderer()
+        rapido = UsuarioListFastSerializer.compilar()
+        resultados = []
+
+        for filas in options["filas"]:
+            with revertir():
+                sembrar_usuarios(filas)
+                queryset = Usuario.objects.filter(is_active=True).order_by(
+                    "-fecha_registro", "-id"
+                )
+
+                def via_drf(queryset=queryset):
+                    data = UsuarioListSerializer(queryset.all(), many=True).data
+                    renderer.render(data)
+
+                def via_compilado(queryset=queryset):
+                    renderer.render(rapido.serializar_queryset(queryset.all()))
+
+                drf = resumir(cronometrar(via_drf, options["repeticiones"]))
+                compilado = resumir(cronometrar(via_compilado, options["repeticiones"]))
+
+            resultados.append(
+                {
+                    "filas": filas,
+                    "drf": drf,
+                    "compilado": compilado,
+                    "aceleracion": round(drf["p50_ms"] / compilado["p50_ms"], 2),
+                }
+            )
+
+        if options["json"]:
+            self.stdout.write(json.dumps(resultados, indent=2))
+            return
+
+        for r in resultados:
+            self.stdout.write(
+                f"{r['filas']:>8} filas  drf p50={r['drf']['p50_ms']:.1f}ms  "
+                f"compilado p50={r['compilado']['p50_ms']:.1f}ms  "
+                f"x{r['aceleracion']}"
+            )
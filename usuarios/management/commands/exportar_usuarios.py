@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from core.exportacion import CHUNK_SIZE, FORMATOS, volcar
+from usuarios.exportacion import filas_usuarios, queryset_exportacion
+
+
+class Command(BaseCommand):
+    help = (
+        "Exporta los usuarios activos a CSV o JSONL leyendo la tabla por "
+        "bloques, con memoria constante."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--formato", choices=list(FORMATOS), default="csv")
+        parser.add_argument("--salida", help="Fichero de destino (por defecto stdout).")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        columnas, filas = filas_usuarios(
+            queryset_exportacion(), chunk_size=options["chunk_size"]
+        )
+        if not options["salida"]:
+            volcar(self.stdout, options["formato"], columnas, filas)
+            return
+        with open(options["salida"], "w", newline="", encoding="utf-8") as salida:
+            total = volcar(salida, options["formato"], columnas, filas)
+        self.stderr.write(f"{total} usuarios exportados a {options['salida']}.")
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from usuarios.revocacion import purgar_revocados
+
+
+class Command(BaseCommand):
+    help = (
+        "Borra por lotes los refresh tokens revocados que ya han caducado "
+        "(ver usuarios.revocacion). Pensado para ejecutarse periódicamente."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            borrados = purgar_revocados(lote=options["lote"])
+            total += borrados
+            if options["verbosity"] >= 2 and borrados:
+                self.stdout.write(f"lote: {borrados} tokens")
+            if borrados < options["lote"]:
+                break
+        self.stdout.write(f"{total} tokens revocados purgados.")
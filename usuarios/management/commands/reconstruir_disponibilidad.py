@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from usuarios.disponibilidad import disponibilidad
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye el filtro de disponibilidad de username/email recorriendo "
+        "la tabla de usuarios y lo vuelca al fichero de arranque en caliente."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fichero",
+            help="Destino (por defecto USUARIOS_DISPONIBLE_FICHERO).",
+        )
+
+    def handle(self, *args, **options):
+        estado = disponibilidad()
+        if options["fichero"]:
+            estado.fichero = options["fichero"]
+        if not estado.fichero:
+            raise CommandError("Indica --fichero o define USUARIOS_DISPONIBLE_FICHERO.")
+
+        inicio = time.perf_counter()
+        filtro = estado.reconstruir()
+        segundos = time.perf_counter() - inicio
+        self.stdout.write(
+            f"{filtro.elementos} claves en {len(filtro.datos) / 2**20:.1f} MiB "
+            f"({filtro.hashes} hashes) volcadas a {estado.fichero} "
+            f"en {segundos:.2f} s."
+        )
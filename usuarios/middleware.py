@@ -0,0 +1,24 @@
+from django.http import HttpResponse
+
+from .hashing import HashingSaturado
+
+
+class HashingSaturadoMiddleware:
+    """
+    Convierte ``HashingSaturado`` en un 503 con ``Retry-After`` para las vistas
+    Django normales (login/registro HTML). Las vistas DRF ya lo resuelven en su
+    propio manejador de excepciones.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_exception(self, request, exception):
+        if not isinstance(exception, HashingSaturado):
+            return None
+        response = HttpResponse(str(exception.detail), status=exception.status_code)
+        response["Retry-After"] = str(exception.wait)
+        return response
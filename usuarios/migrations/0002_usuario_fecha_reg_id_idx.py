@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 13:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('usuarios', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usuario',
+            index=models.Index(fields=['-fecha_registro', '-id'], name='usuarios_fecha_reg_id_idx'),
+        ),
+    ]
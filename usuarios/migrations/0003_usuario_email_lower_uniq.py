@@ -0,0 +1,19 @@
+# Generated by Django 6.1.2 on 2026-10-18 13:33
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('usuarios', '0002_usuario_fecha_reg_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='usuario',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), name='usuarios_email_lower_uniq', violation_error_message='Ya existe un usuario con este email.'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.1.2 on 2026-10-18 14:09
+
+import core.operaciones
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CREATE/DROP INDEX CONCURRENTLY no puede ir en una transacción.
+    atomic = False
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('usuarios', '0004_token_revocado'),
+    ]
+
+    operations = [
+        core.operaciones.AddIndexConcurrently(
+            model_name='usuario',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-fecha_registro', '-id'], include=('uuid', 'username', 'email', 'nombre', 'apellido', 'tipo_usuario', 'is_active'), name='usuarios_activo_fecha_idx'),
+        ),
+        core.operaciones.RemoveIndexConcurrently(
+            model_name='usuario',
+            name='usuarios_fecha_reg_id_idx',
+        ),
+    ]
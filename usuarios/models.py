@@ -6,6 +6,14 @@ from django.contrib.auth.models import (
     BaseUserManager,
 )
 from django.core.validators import RegexValidator
+from django.db.models.functions import Lower
+
+
+def componer_nombre_completo(nombre, apellido):
+    """Nombre completo a partir de nombre y apellido (ver ``Usuario.full_name``)."""
+    if nombre and apellido:
+        return f"{nombre} {apellido}"
+    return nombre or ""
 
 
 class UsuarioManager(BaseUserManager):
@@ -102,6 +110,40 @@ class Usuario(AbstractBaseUser, PermissionsMixin):
         verbose_name = "Usuario"
         verbose_name_plural = "Usuarios"
         ordering = ["-fecha_registro"]
+        indexes = [
+            # Índice parcial: la API sólo lee usuarios activos, así que las
+            # filas dadas de baja con ``soft_delete`` no ocupan sitio en él y
+            # no frenan el listado aunque se acumulen. El detalle por uuid ya
+            # tiene el índice único de la columna.
+            #
+            # Paginación keyset del listado (fecha_registro, id). INCLUDE lleva
+            # las columnas de ``UsuarioListSerializer`` a las hojas del índice:
+            # una página se sirve con un Index Only Scan, sin leer la tabla
+            # (sólo PostgreSQL; en el resto de motores se ignora).
+            models.Index(
+                fields=["-fecha_registro", "-id"],
+                name="usuarios_activo_fecha_idx",
+                condition=models.Q(is_active=True),
+                include=[
+                    "uuid",
+                    "username",
+                    "email",
+                    "nombre",
+                    "apellido",
+                    "tipo_usuario",
+                    "is_active",
+                ],
+            ),
+        ]
+        constraints = [
+            # "Ana@mail.com" y "ana@mail.com" son el mismo buzón. El índice
+            # también sirve la búsqueda LOWER(email) de ``unicidad.py``.
+            models.UniqueConstraint(
+                Lower("email"),
+                name="usuarios_email_lower_uniq",
+                violation_error_message="Ya existe un usuario con este email.",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.username} ({self.get_full_name() or self.email})"
@@ -109,13 +151,50 @@ class Usuario(AbstractBaseUser, PermissionsMixin):
     @property
     def full_name(self):
         """Retorna el nombre completo del usuario"""
-        if self.nombre and self.apellido:
-            return f"{self.nombre} {self.apellido}"
-        return self.nombre or ""
+        return componer_nombre_completo(self.nombre, self.apellido)
 
     def get_full_name(self):
         return self.full_name
 
+    def set_password(self, raw_password):
+        """Como en ``AbstractBaseUser``, pero el hash se calcula en el pool."""
+        from .hashing import make_password
+
+        self.password = make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        """
+        Verifica la contraseña en el pool de hashing y, si el hash guardado
+        usa un esquema antiguo, lo regenera con el hasher preferido.
+        """
+        from .hashing import check_password
+
+        def setter(raw_password):
+            self.set_password(raw_password)
+            # Una actualización de hash no es un cambio de contraseña.
+            self._password = None
+            self.save(update_fields=["password"])
+
+        return check_password(raw_password, self.password, setter)
+
+    async def aset_password(self, raw_password):
+        from .hashing import amake_password
+
+        self.password = await amake_password(raw_password)
+        self._password = raw_password
+
+    async def acheck_password(self, raw_password):
+        """Versión asíncrona de ``check_password`` para las vistas ASGI."""
+        from .hashing import acheck_password
+
+        async def setter(raw_password):
+            await self.aset_password(raw_password)
+            self._password = None
+            await self.asave(update_fields=["password"])
+
+        return await acheck_password(raw_password, self.password, setter)
+
     def soft_delete(self):
         """
         Realiza un borrado lógico del usuario:
@@ -130,3 +209,29 @@ class Usuario(AbstractBaseUser, PermissionsMixin):
 
         self.is_active = False
         self.save(update_fields=["email", "username", "is_active"])
+
+        # Los access tokens ya emitidos no consultan la BD: hay que revocarlos.
+        from .cache_perfil import invalidar_perfil
+        from .revocacion import revocar_usuario
+
+        revocar_usuario(self.pk)
+        invalidar_perfil(self.uuid)
+
+
+class TokenRevocado(models.Model):
+    """
+    Refresh token revocado (rotado o invalidado), identificado por su ``jti``.
+    Sólo hace falta guardarlo hasta que caduca: después el token ya no pasa la
+    comprobación de ``exp``. Ver ``usuarios.revocacion``.
+    """
+
+    jti = models.CharField(max_length=64, primary_key=True)
+    expira = models.DateTimeField(db_index=True)
+
+    class Meta:
+        db_table = "usuarios_tokens_revocados"
+        verbose_name = "Token revocado"
+        verbose_name_plural = "Tokens revocados"
+
+    def __str__(self):
+        return self.jti
@@ -0,0 +1,11 @@
+from core.pagination import KeysetPagination
+
+
+class UsuarioCursorPagination(KeysetPagination):
+    """
+    Paginación del listado de usuarios. Sigue ``Usuario.Meta.ordering`` y usa
+    ``id`` como desempate; ambas columnas están cubiertas por el índice
+    parcial ``usuarios_activo_fecha_idx``.
+    """
+
+    ordering = ("-fecha_registro", "-id")
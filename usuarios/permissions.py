@@ -1,5 +1,7 @@
 from rest_framework import permissions
 
+from .authentication import obtener_usuario
+
 
 class IsOwnerOrAdmin(permissions.BasePermission):
     """
@@ -16,4 +18,22 @@ class IsOwnerOrAdmin(permissions.BasePermission):
         # Write permissions are only allowed to the owner of the user object (itself) or admin.
 
         # In this case of User model, the object IS the user.
-        return obj == request.user or request.user.is_staff
+        user = request.user
+        if request.method not in permissions.SAFE_METHODS:
+            # Las escrituras se comprueban contra el usuario de base de datos,
+            # no contra los claims del token (is_staff podría estar obsoleto).
+            user = obtener_usuario(user)
+        return obj.pk == user.pk or user.is_staff
+
+
+class IsDatabaseStaff(permissions.BasePermission):
+    """
+    Como ``IsAdminUser``, pero ``is_staff`` se lee de la base de datos: las
+    operaciones masivas no se autorizan con un claim que podría estar obsoleto.
+    """
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not (user and user.is_authenticated):
+            return False
+        return obtener_usuario(user).is_staff
@@ -0,0 +1,214 @@
+"""
+Revocación de tokens JWT.
+
+Usuarios revocados
+------------------
+
+``StatelessJWTAuthentication`` no consulta la tabla ``usuarios`` en cada
+petición, así que un access token emitido antes de un ``soft_delete`` seguiría
+siendo válido hasta expirar. Al desactivar un usuario se anota su id en la
+caché con un TTL igual a ``ACCESS_TOKEN_LIFETIME``: pasado ese tiempo ya no
+queda ningún access token vivo que revocar, y el refresh comprueba
+``is_active`` contra la base de datos.
+
+Un cambio de ``tipo_usuario`` hecho sin pasar por el login (``actualizar-lote``)
+deja en los tokens ya emitidos un claim ``tier`` antiguo. ``revocar_tier``
+anota el valor nuevo en la misma clave: los access tokens con otro ``tier``
+se rechazan y el cliente refresca. El refresh vuelve a leer los claims del
+usuario (``serializers.RefreshRotativoSerializer``), así que el token nuevo
+ya lleva el ``tier`` actual.
+
+Refresh tokens revocados
+------------------------
+Con ``ROTATE_REFRESH_TOKENS`` y ``BLACKLIST_AFTER_ROTATION`` cada refresh
+revoca el token usado. En lugar de las tablas de ``token_blacklist`` (una fila
+"outstanding" por token emitido más otra por token revocado, para siempre) se
+guarda sólo el ``jti`` de los revocados con su caducidad (``TokenRevocado``):
+
+- Revocar es un ``INSERT`` por clave primaria que además sirve de
+  comprobación: si el ``jti`` ya estaba, el token se había usado antes y el
+  refresh se rechaza, también cuando dos peticiones lo usan a la vez.
+- Una fila sólo importa hasta el ``exp`` del token (emisión más
+  ``REFRESH_TOKEN_LIFETIME``); ``purgar_tokens_revocados`` borra por lotes las
+  caducadas, así que la tabla no pasa de los refresh de un periodo de vida.
+- Los revocados por este proceso se recuerdan en memoria hasta su ``exp``
+  (como mucho ``USUARIOS_REVOCACION_MEMORIA``): reutilizar un token recién
+  rotado se rechaza sin tocar la base de datos.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .models import TokenRevocado
+
+PREFIJO = "usuarios:revocado:"
+
+
+def _cache():
+    return caches[getattr(settings, "USUARIOS_REVOCACION_CACHE", "default")]
+
+
+def _ttl():
+    return int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+
+
+def revocar_usuario(user_id):
+    """Invalida los access tokens vigentes del usuario ``user_id``."""
+    _cache().set(f"{PREFIJO}{user_id}", True, timeout=_ttl())
+
+
+def revocar_usuarios(user_ids):
+    _cache().set_many({f"{PREFIJO}{user_id}": True for user_id in user_ids}, _ttl())
+
+
+def revocar_tier(tiers):
+    """
+    Invalida los access tokens vigentes cuyo claim ``tier`` no coincide con el
+    nuevo ``tipo_usuario`` (``{user_id: tier}``).
+    """
+    _cache().set_many(
+        {f"{PREFIJO}{user_id}": {"tier": tier} for user_id, tier in tiers.items()},
+        _ttl(),
+    )
+
+
+def _revocado(valor, token):
+    if valor is None:
+        return False
+    if isinstance(valor, dict):
+        return token is None or token.get("tier") != valor["tier"]
+    return True
+
+
+def esta_revocado(user_id, token=None):
+    """Si se rechazan los access tokens de ``user_id`` (o sólo ``token``)."""
+    return _revocado(_cache().get(f"{PREFIJO}{user_id}"), token)
+
+
+async def aesta_revocado(user_id, token=None):
+    return _revocado(await _cache().aget(f"{PREFIJO}{user_id}"), token)
+
+
+# -- Refresh tokens --------------------------------------------------------
+
+
+class _RevocadosEnMemoria:
+    """``jti`` -> ``exp`` de los refresh revocados por este proceso."""
+
+    def __init__(self, maximo):
+        self.maximo = maximo
+        self._exp = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, jti):
+        exp = self._exp.get(jti)
+        return exp is not None and exp > time.time()
+
+    def anotar(self, jti, exp):
+        with self._lock:
+            self._exp[jti] = exp
+            if len(self._exp) > self.maximo:
+                self._podar()
+
+    def _podar(self):
+        ahora = time.time()
+        self._exp = {j: e for j, e in self._exp.items() if e > ahora}
+        # Siguen sin caber: se olvidan los más antiguos (la BD los conserva).
+        exceso = len(self._exp) - self.maximo
+        if exceso > 0:
+            for jti in list(self._exp)[:exceso]:
+                del self._exp[jti]
+
+
+_memoria = None
+
+
+def _revocados_en_memoria():
+    global _memoria
+    if _memoria is None:
+        _memoria = _RevocadosEnMemoria(
+            getattr(settings, "USUARIOS_REVOCACION_MEMORIA", 100_000)
+        )
+    return _memoria
+
+
+def revocar_refresh(jti, exp):
+    """
+    Revoca el refresh token ``jti`` (``exp`` en segundos epoch). Devuelve
+    ``False`` si ya estaba revocado.
+    """
+    memoria = _revocados_en_memoria()
+    if jti in memoria:
+        return False
+    try:
+        with transaction.atomic():
+            TokenRevocado.objects.create(jti=jti, expira=datetime_from_epoch(exp))
+    except IntegrityError:
+        memoria.anotar(jti, exp)
+        return False
+    memoria.anotar(jti, exp)
+    return True
+
+
+def refresh_revocado(jti):
+    return (
+        jti in _revocados_en_memoria() or TokenRevocado.objects.filter(jti=jti).exists()
+    )
+
+
+def purgar_revocados(lote=5000, ahora=None):
+    """Borra hasta ``lote`` revocados ya caducados y devuelve cuántos."""
+    ahora = ahora or timezone.now()
+    jtis = list(
+        TokenRevocado.objects.filter(expira__lte=ahora).values_list("jti", flat=True)[
+            :lote
+        ]
+    )
+    if not jtis:
+        return 0
+    borrados, _ = TokenRevocado.objects.filter(jti__in=jtis).delete()
+    return borrados
+
+
+class RefreshRevocable(RefreshToken):
+    """
+    ``RefreshToken`` con la revocación de este módulo en lugar de la app
+    ``token_blacklist`` (ver ``serializers.RefreshRotativoSerializer``).
+    """
+
+    def verify(self, *args, **kwargs):
+        super().verify(*args, **kwargs)
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION:
+            # El INSERT de ``blacklist()`` hará la comprobación completa.
+            revocado = jti in _revocados_en_memoria()
+        else:
+            revocado = refresh_revocado(jti)
+        if revocado:
+            raise TokenError("El token ha sido revocado.")
+
+    def blacklist(self):
+        # Lo llama TokenRefreshSerializer al rotar; el INSERT es la comprobación.
+        if not revocar_refresh(
+            self.payload[api_settings.JTI_CLAIM], self.payload["exp"]
+        ):
+            raise TokenError("El token ha sido revocado.")
+
+
+def _reiniciar(*, setting, **kwargs):
+    global _memoria
+    if setting == "USUARIOS_REVOCACION_MEMORIA":
+        _memoria = None
+
+
+setting_changed.connect(_reiniciar)
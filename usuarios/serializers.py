@@ -1,7 +1,46 @@
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from django.db import IntegrityError, transaction
+from rest_framework.utils.field_mapping import get_unique_error_message
+from rest_framework.validators import UniqueValidator
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from .cache_perfil import invalidar_perfil
+from .lotes import maximo_por_lote
 from .models import Usuario
+from .revocacion import RefreshRevocable
+from .unicidad import CAMPOS as CAMPOS_UNICOS
+from .unicidad import campo_en_conflicto, campos_ocupados
+
+
+class CamposDinamicosMixin:
+    """
+    Permite recortar los campos serializados (sparse fieldset) pasando
+    ``fields=[...]`` al construir el serializer.
+    """
+
+    # Columnas del modelo que necesita cada campo que no mapea 1:1.
+    columnas_por_campo = {"full_name": ("nombre", "apellido")}
+
+    def __init__(self, *args, **kwargs):
+        campos = kwargs.pop("fields", None)
+        super().__init__(*args, **kwargs)
+        if campos is not None:
+            for nombre in set(self.fields) - set(campos):
+                self.fields.pop(nombre)
+
+    @classmethod
+    def columnas_para(cls, campos):
+        """Columnas del modelo necesarias para serializar ``campos``."""
+        columnas = []
+        for campo in campos:
+            for columna in cls.columnas_por_campo.get(campo, (campo,)):
+                if columna not in columnas:
+                    columnas.append(columna)
+        return columnas
 
 
 class UsuarioBaseSerializer(serializers.ModelSerializer):
@@ -15,7 +54,7 @@ class UsuarioBaseSerializer(serializers.ModelSerializer):
         read_only_fields = ["uuid", "is_active"]
 
 
-class UsuarioListSerializer(UsuarioBaseSerializer):
+class UsuarioListSerializer(CamposDinamicosMixin, UsuarioBaseSerializer):
     """Serializer para listar usuarios (datos mínimos)."""
 
     class Meta(UsuarioBaseSerializer.Meta):
@@ -39,7 +78,61 @@ class UsuarioDetailSerializer(serializers.ModelSerializer):
         ]
 
 
-class UsuarioCreateSerializer(serializers.ModelSerializer):
+class UnicidadMixin:
+    """
+    Sustituye los ``UniqueValidator`` de ``username`` y ``email`` (una
+    consulta cada uno) por una sola consulta en ``validate``, con los mismos
+    mensajes. Si otra petición ocupa el valor antes del ``INSERT``, el
+    ``IntegrityError`` se devuelve como el mismo error de campo.
+
+    Con ``context={"unicidad": False}`` no se consulta nada: la vista
+    asíncrona hace la comprobación con el ORM asíncrono.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        for nombre in CAMPOS_UNICOS:
+            if nombre in fields:
+                fields[nombre].validators = [
+                    v
+                    for v in fields[nombre].validators
+                    if not isinstance(v, UniqueValidator)
+                ]
+        return fields
+
+    @staticmethod
+    def mensaje_unicidad(campo):
+        return get_unique_error_message(Usuario._meta.get_field(campo))
+
+    def error_unicidad(self, campos):
+        return serializers.ValidationError(
+            {campo: [self.mensaje_unicidad(campo)] for campo in sorted(campos)}
+        )
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        if self.context.get("unicidad", True):
+            ocupados = campos_ocupados(
+                attrs.get("username"),
+                attrs.get("email"),
+                excluir_pk=self.instance.pk if self.instance is not None else None,
+            )
+            if ocupados:
+                raise self.error_unicidad(ocupados)
+        return attrs
+
+    def guardar(self, usuario, **kwargs):
+        try:
+            with transaction.atomic():
+                usuario.save(**kwargs)
+        except IntegrityError as exc:
+            campo = campo_en_conflicto(exc)
+            if campo is None:
+                raise
+            raise self.error_unicidad([campo]) from exc
+
+
+class UsuarioCreateSerializer(UnicidadMixin, serializers.ModelSerializer):
     """Serializer para crear nuevos usuarios con password."""
 
     password = serializers.CharField(
@@ -63,11 +156,11 @@ class UsuarioCreateSerializer(serializers.ModelSerializer):
         password = validated_data.pop("password")
         usuario = Usuario(**validated_data)
         usuario.set_password(password)
-        usuario.save()
+        self.guardar(usuario)
         return usuario
 
 
-class UsuarioUpdateSerializer(serializers.ModelSerializer):
+class UsuarioUpdateSerializer(UnicidadMixin, serializers.ModelSerializer):
     """Serializer para actualizar usuarios."""
 
     password = serializers.CharField(
@@ -97,10 +190,51 @@ class UsuarioUpdateSerializer(serializers.ModelSerializer):
         if password:
             instance.set_password(password)
 
-        instance.save()
+        self.guardar(instance)
+        # post_save ya invalida; se repite por si save() se sustituye por un
+        # update() que no emite señales.
+        invalidar_perfil(instance.uuid)
         return instance
 
 
+def validar_tamano_lote(elementos):
+    maximo = maximo_por_lote()
+    if len(elementos) > maximo:
+        raise serializers.ValidationError(f"Como máximo {maximo} usuarios por lote.")
+    return elementos
+
+
+class LoteUuidsSerializer(serializers.Serializer):
+    """Cuerpo de ``desactivar-lote``: ``{"uuids": [...]}``."""
+
+    uuids = serializers.ListField(child=serializers.UUIDField(), allow_empty=False)
+
+    def validate_uuids(self, value):
+        return validar_tamano_lote(value)
+
+
+class CambioUsuarioSerializer(serializers.Serializer):
+    uuid = serializers.UUIDField()
+    tipo_usuario = serializers.ChoiceField(
+        choices=Usuario.TIPO_USUARIO_CHOICES, required=False
+    )
+    is_verified = serializers.BooleanField(required=False)
+
+    def validate(self, attrs):
+        if len(attrs) == 1:
+            raise serializers.ValidationError("Indica tipo_usuario o is_verified.")
+        return attrs
+
+
+class LoteCambiosSerializer(serializers.Serializer):
+    """Cuerpo de ``actualizar-lote``: ``{"usuarios": [{"uuid", ...}]}``."""
+
+    usuarios = CambioUsuarioSerializer(many=True, allow_empty=False)
+
+    def validate_usuarios(self, value):
+        return validar_tamano_lote(value)
+
+
 # Maintain compatibility or for generic usage if needed, though specific ones are better.
 class UsuarioSerializer(UsuarioDetailSerializer):
     """Serializer genérico de compatibilidad (alias de Detail)."""
@@ -116,24 +250,58 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
+        cls.anadir_claims(token, user)
+        return token
 
-        # Add custom claims
+    @staticmethod
+    def anadir_claims(token, user):
+        """Claims propios que ``UsuarioToken`` lee sin consultar la BD."""
         token["username"] = user.username
         token["email"] = user.email
         token["tier"] = user.tipo_usuario
         token["uuid"] = str(user.uuid)
-
-        return token
+        token["is_staff"] = user.is_staff
+
+    @staticmethod
+    def datos_usuario(user):
+        """Datos del usuario que acompañan al par de tokens."""
+        return {
+            "uuid": str(user.uuid),
+            "username": user.username,
+            "email": user.email,
+            "full_name": user.full_name,
+            "tipo_usuario": user.tipo_usuario,
+        }
 
     def validate(self, attrs):
         data = super().validate(attrs)
 
         # Add extra data to response
-        data["user"] = {
-            "uuid": str(self.user.uuid),
-            "username": self.user.username,
-            "email": self.user.email,
-            "full_name": self.user.full_name,
-            "tipo_usuario": self.user.tipo_usuario,
-        }
+        data["user"] = self.datos_usuario(self.user)
         return data
+
+
+class RefreshConClaimsActuales(RefreshRevocable):
+    """
+    Refresh que, una vez verificado, vuelve a tomar los claims del usuario de
+    la base de datos: el access token y el refresh rotado llevan el
+    ``tipo_usuario`` actual aunque haya cambiado desde el login (ver
+    ``revocacion.revocar_tier``).
+    """
+
+    def verify(self, *args, **kwargs):
+        super().verify(*args, **kwargs)
+        usuario = Usuario.activos.filter(
+            pk=self.payload.get(api_settings.USER_ID_CLAIM)
+        ).first()
+        if usuario is not None:
+            CustomTokenObtainPairSerializer.anadir_claims(self, usuario)
+
+
+class RefreshRotativoSerializer(TokenRefreshSerializer):
+    """
+    Refresh con rotación cuya revocación usa ``usuarios.revocacion`` en lugar
+    de la app ``token_blacklist`` (``SIMPLE_JWT["TOKEN_REFRESH_SERIALIZER"]``).
+    """
+
+    token_class = RefreshConClaimsActuales
@@ -0,0 +1,36 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.cache_html import grupo_usuario, invalidar_html
+
+from .cache_perfil import invalidar_perfil
+from .disponibilidad import disponibilidad
+from .models import Usuario
+
+
+@receiver(post_save, sender=Usuario, dispatch_uid="usuarios_invalidar_perfil_save")
+@receiver(post_delete, sender=Usuario, dispatch_uid="usuarios_invalidar_perfil_delete")
+def invalidar_perfil_cacheado(sender, instance, **kwargs):
+    """Cualquier escritura del usuario deja obsoleto su detalle cacheado."""
+    invalidar_perfil(instance.uuid)
+
+
+@receiver(post_save, sender=Usuario, dispatch_uid="usuarios_invalidar_html_save")
+@receiver(post_delete, sender=Usuario, dispatch_uid="usuarios_invalidar_html_delete")
+def invalidar_html_usuario(sender, instance, update_fields=None, **kwargs):
+    """
+    Los fragmentos con datos del usuario (su panel en la portada). El login
+    sólo escribe ``last_login``, que no se muestra: no invalida nada.
+    """
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    invalidar_html(grupo_usuario(instance.pk))
+
+
+@receiver(post_save, sender=Usuario, dispatch_uid="usuarios_anotar_disponibilidad")
+def anotar_disponibilidad(sender, instance, **kwargs):
+    """
+    El filtro de disponibilidad sólo crece: el username/email guardado (también
+    el reescrito por ``soft_delete``) pasa a contar como posible conflicto.
+    """
+    disponibilidad().anotar(instance.username, instance.email)
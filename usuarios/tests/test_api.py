@@ -24,9 +24,9 @@ class UsuarioAPITests(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         # 1 active created + 1 auth user = 2 active users
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data["results"]), 2)
         # Check usernames present
-        usernames = [u["username"] for u in response.data]
+        usernames = [u["username"] for u in response.data["results"]]
         self.assertIn("active", usernames)
         self.assertIn("authed", usernames)
 
@@ -153,7 +153,7 @@ class UsuarioAPITests(APITestCase):
         self.client.force_authenticate(user=self.auth_user)  # use other active user
         list_response = self.client.get(reverse("usuario-list"))
         # Using uuid for comparison as id is not in ListSerializer
-        uuids = [str(u["uuid"]) for u in list_response.data]
+        uuids = [str(u["uuid"]) for u in list_response.data["results"]]
         self.assertNotIn(str(user.uuid), uuids)
 
         # se puede re-crear con el mismo email/username original
@@ -0,0 +1,84 @@
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from usuarios.authentication import UsuarioToken
+from usuarios.models import Usuario
+
+
+class StatelessJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = Usuario.objects.create(username="jwtuser", email="jwt@mail.com")
+        self.user.set_password("jwtpass")
+        self.user.save()
+        self.token = self._obtener_token("jwtuser", "jwtpass")
+
+    def _obtener_token(self, username, password):
+        response = self.client.post(
+            reverse("token_obtain_pair"),
+            {"username": username, "password": password},
+            format="json",
+        )
+        return response.data["access"]
+
+    def _autenticar(self, token):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_read_requests_skip_user_lookup(self):
+        self._autenticar(self.token)
+
+        # Sólo la consulta del listado: ningún SELECT para reconstruir al usuario.
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("usuario-list"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response.wsgi_request.user, UsuarioToken)
+
+    def test_token_user_exposes_claims(self):
+        self._autenticar(self.token)
+        response = self.client.get(reverse("usuario-list"))
+
+        user = response.wsgi_request.user
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.uuid, str(self.user.uuid))
+        self.assertEqual(user.email, "jwt@mail.com")
+        self.assertEqual(user.tipo_usuario, "cliente")
+        self.assertFalse(user.is_staff)
+        self.assertEqual(user, self.user)
+
+    def test_owner_can_write_with_token_user(self):
+        self._autenticar(self.token)
+        response = self.client.patch(
+            reverse("usuario-detail", kwargs={"uuid": self.user.uuid}),
+            {"nombre": "Nuevo"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_write_on_other_user_is_forbidden(self):
+        otro = Usuario.objects.create(username="otro", email="otro@mail.com")
+        self._autenticar(self.token)
+        response = self.client.patch(
+            reverse("usuario-detail", kwargs={"uuid": otro.uuid}),
+            {"nombre": "Hacker"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_soft_deleted_user_token_is_revoked(self):
+        self._autenticar(self.token)
+        response = self.client.delete(
+            reverse("usuario-detail", kwargs={"uuid": self.user.uuid})
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        response = self.client.get(reverse("usuario-list"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_owner_can_retrieve_with_token_user(self):
+        self._autenticar(self.token)
+        response = self.client.get(
+            reverse("usuario-detail", kwargs={"uuid": self.user.uuid})
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,102 @@
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase
+
+from core.carga import comparar
+from usuarios.management.commands.bench_api import ESCENARIOS, PREFIJO
+from usuarios.models import Usuario
+
+
+def _escenario(**valores):
+    return {
+        "peticiones": 100,
+        "peticiones_por_segundo": 500.0,
+        "errores": 0,
+        "estados": {"200": 100},
+        "p50_ms": 2.0,
+        "p95_ms": 5.0,
+        "p99_ms": 9.0,
+        "consultas_por_peticion": 2.0,
+        **valores,
+    }
+
+
+class CompararTests(SimpleTestCase):
+    def test_sin_regresiones_dentro_de_la_tolerancia(self):
+        base = {"escenarios": {"detalle": _escenario()}}
+        actual = {"escenarios": {"detalle": _escenario(p95_ms=6.0, p99_ms=30.0)}}
+
+        self.assertEqual(comparar(actual, base, tolerancia=0.25), [])
+
+    def test_regresiones(self):
+        base = {"escenarios": {"detalle": _escenario(), "token": _escenario()}}
+        actual = {
+            "escenarios": {
+                "detalle": _escenario(consultas_por_peticion=3.0, p95_ms=8.0),
+                "token": _escenario(errores=5, peticiones_por_segundo=100.0),
+                "nuevo": _escenario(),
+            }
+        }
+
+        regresiones = comparar(actual, base, tolerancia=0.25)
+
+        self.assertEqual(len(regresiones), 4)
+        self.assertTrue(regresiones[0].startswith("detalle: consultas"))
+        self.assertEqual(
+            comparar(actual, base, solo_consultas=True),
+            [regresiones[0], regresiones[2]],
+        )
+
+
+class BenchApiTests(TestCase):
+    def _ejecutar(self, *args):
+        salida = io.StringIO()
+        call_command(
+            "bench_api",
+            "--usuarios",
+            "3",
+            "--peticiones",
+            "2",
+            "--calentamiento",
+            "0",
+            "--concurrencia",
+            "1",
+            *args,
+            stdout=salida,
+        )
+        return json.loads(salida.getvalue())
+
+    def test_todos_los_escenarios_en_proceso(self):
+        resultado = self._ejecutar()
+
+        self.assertEqual(list(resultado["escenarios"]), list(ESCENARIOS))
+        for nombre, medido in resultado["escenarios"].items():
+            self.assertEqual(medido["errores"], 0, (nombre, medido["estados"]))
+            self.assertGreater(medido["peticiones_por_segundo"], 0)
+            self.assertIsNotNone(medido["consultas_por_peticion"])
+        self.assertEqual(
+            resultado["escenarios"]["listado"]["consultas_por_peticion"], 1
+        )
+        self.assertFalse(Usuario.objects.filter(username__startswith=PREFIJO).exists())
+
+    def test_linea_base(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, "base.json")
+            self._ejecutar(
+                "--escenarios", "listado", "--linea-base", ruta, "--guardar-linea-base"
+            )
+            self._ejecutar(
+                "--escenarios", "listado", "--linea-base", ruta, "--solo-consultas"
+            )
+
+            with open(ruta) as fichero:
+                base = json.load(fichero)
+            base["escenarios"]["listado"]["consultas_por_peticion"] = 0
+            with open(ruta, "w") as fichero:
+                json.dump(base, fichero)
+            with self.assertRaisesMessage(CommandError, "listado: consultas"):
+                self._ejecutar("--escenarios", "listado", "--linea-base", ruta)
@@ -0,0 +1,128 @@
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from usuarios.cache_perfil import CONSULTAS, cache_perfil
+from usuarios.models import Usuario
+
+
+class CachePerfilTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        cache_perfil().local.clear()
+        self.user = Usuario.objects.create(username="perfil", email="perfil@mail.com")
+        self.url = reverse("usuario-detail", kwargs={"uuid": self.user.uuid})
+        self.client.force_authenticate(user=self.user)
+
+    def test_segunda_lectura_no_consulta_la_base_de_datos(self):
+        primera = self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            segunda = self.client.get(self.url)
+
+        self.assertEqual(segunda.status_code, status.HTTP_200_OK)
+        self.assertEqual(segunda.data, primera.data)
+        self.assertEqual(segunda["ETag"], primera["ETag"])
+
+    def test_if_none_match_devuelve_304(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        self.assertFalse(response.content)
+
+    def test_update_invalida(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        self.client.patch(self.url, {"nombre": "Nuevo"}, format="json")
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["nombre"], "Nuevo")
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_uuid_no_canonico_comparte_la_entrada(self):
+        mayusculas = reverse(
+            "usuario-detail", kwargs={"uuid": str(self.user.uuid).upper()}
+        )
+        sin_guiones = reverse("usuario-detail", kwargs={"uuid": self.user.uuid.hex})
+        self.client.get(mayusculas)
+
+        self.client.patch(self.url, {"nombre": "Nuevo"}, format="json")
+
+        for url in (mayusculas, sin_guiones):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data["nombre"], "Nuevo")
+
+    def test_uuid_invalido_404(self):
+        url = reverse("usuario-detail", kwargs={"uuid": "no-es-un-uuid"})
+
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_save_fuera_de_la_api_invalida(self):
+        self.client.get(self.url)
+
+        self.user.telefono = "600000000"
+        self.user.save()
+
+        self.assertEqual(self.client.get(self.url).data["telefono"], "600000000")
+
+    def test_soft_delete_invalida(self):
+        self.client.get(self.url)
+        admin = Usuario.objects.create(
+            username="admin", email="admin@mail.com", is_staff=True
+        )
+
+        self.user.soft_delete()
+        self.client.force_authenticate(user=admin)
+
+        self.assertEqual(
+            self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND
+        )
+
+    def test_otro_proceso_ve_la_invalidacion(self):
+        """Una copia local con versión antigua no se sirve."""
+        self.client.get(self.url)
+        # Otro proceso invalida: sólo cambia la versión en la caché compartida.
+        Usuario.objects.filter(pk=self.user.pk).update(nombre="Remoto")
+        cache_perfil().compartida.delete(f"usuarios:perfil:version:{self.user.uuid}")
+
+        self.assertEqual(self.client.get(self.url).data["nombre"], "Remoto")
+
+    def test_permisos_con_respuesta_cacheada(self):
+        self.client.get(self.url)
+        otro = Usuario.objects.create(username="otro", email="otro@mail.com")
+        self.client.force_authenticate(user=otro)
+
+        self.assertEqual(
+            self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN
+        )
+
+    def test_contadores(self):
+        antes = {
+            r: CONSULTAS.valor(resultado=r) for r in ("local", "compartida", "fallo")
+        }
+        self.client.get(self.url)
+        self.client.get(self.url)
+        cache_perfil().local.clear()
+        self.client.get(self.url)
+
+        self.assertEqual(CONSULTAS.valor(resultado="fallo") - antes["fallo"], 1)
+        self.assertEqual(CONSULTAS.valor(resultado="local") - antes["local"], 1)
+        self.assertEqual(
+            CONSULTAS.valor(resultado="compartida") - antes["compartida"], 1
+        )
+
+    @override_settings(USUARIOS_PERFIL_CACHE=None)
+    def test_solo_lru_en_proceso(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+        self.user.nombre = "Local"
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).data["nombre"], "Local")
@@ -0,0 +1,172 @@
+import io
+import os
+import tempfile
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import OperationalError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from usuarios.disponibilidad import (
+    Disponibilidad,
+    FiltroBloom,
+    disponibilidad,
+    precargar,
+)
+from usuarios.models import Usuario
+
+
+class FiltroBloomTests(TestCase):
+    def test_sin_falsos_negativos_y_tasa_de_error_acotada(self):
+        filtro = FiltroBloom.para(5000, 0.01)
+        for i in range(5000):
+            filtro.add(f"u:usuario{i}")
+
+        self.assertTrue(all(f"u:usuario{i}" in filtro for i in range(5000)))
+        falsos = sum(f"u:otro{i}" in filtro for i in range(10000))
+        self.assertLess(falsos / 10000, 0.03)
+
+    def test_volcar_y_cargar(self):
+        filtro = FiltroBloom.para(100, 0.01)
+        filtro.add("u:ana")
+        marca = timezone.now()
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, "filtro.bin")
+            filtro.volcar(ruta, marca)
+            cargado, marca_cargada = FiltroBloom.cargar(ruta)
+
+            with open(ruta, "wb") as fichero:
+                fichero.write(b"basura")
+            with self.assertRaises(ValueError):
+                FiltroBloom.cargar(ruta)
+
+        self.assertEqual(marca_cargada, marca)
+        self.assertIn("u:ana", cargado)
+        self.assertEqual(cargado.elementos, 1)
+        self.assertEqual(bytes(cargado.datos), bytes(filtro.datos))
+
+
+@override_settings(USUARIOS_DISPONIBLE_CAPACIDAD=1000, USUARIOS_DISPONIBLE_FICHERO=None)
+class DisponibleAPITests(APITestCase):
+    def setUp(self):
+        self.usuario = Usuario.objects.create(username="ocupado", email="Ocu@mail.com")
+        self.url = reverse("usuario-disponible")
+        disponibilidad().preparar()
+
+    def test_valores_libres_sin_consultar_la_bd(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                self.url, {"username": "libre", "email": "libre@mail.com"}
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {"username": True, "email": True})
+
+    def test_valores_ocupados_con_una_consulta(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                self.url, {"username": "ocupado", "email": "OCU@mail.com"}
+            )
+
+        self.assertEqual(response.data, {"username": False, "email": False})
+
+    def test_sin_parametros(self):
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+
+    def test_registro_y_soft_delete_mantienen_el_filtro(self):
+        self.client.post(
+            reverse("usuario-list"),
+            {
+                "username": "recien",
+                "email": "recien@mail.com",
+                "password": "Str0ngP@ss",
+            },
+            format="json",
+        )
+        self.assertEqual(
+            self.client.get(self.url, {"username": "recien"}).data,
+            {"username": False},
+        )
+
+        self.usuario.soft_delete()
+
+        # El valor liberado sigue en el filtro, pero la BD lo confirma libre.
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {"username": "ocupado"})
+        self.assertEqual(response.data, {"username": True})
+        self.assertIn(f"e:{self.usuario.email.lower()}", disponibilidad().filtro)
+
+    def test_altas_sin_senales_se_sincronizan(self):
+        Usuario.objects.bulk_create(
+            [Usuario(username="masivo", email="masivo@mail.com")]
+        )
+
+        disponibilidad().sincronizar(forzar=True)
+
+        self.assertEqual(
+            self.client.get(self.url, {"email": "masivo@mail.com"}).data,
+            {"email": False},
+        )
+
+    def test_altas_confirmadas_tarde_con_id_menor(self):
+        # Un alta que reservó su id antes que la última sincronizada pero se
+        # confirma después: tiene un id menor que el último visto.
+        hueco = Usuario.objects.create(username="hueco", email="hueco@mail.com")
+        Usuario.objects.filter(pk=hueco.pk).delete()
+        Usuario.objects.create(username="posterior", email="posterior@mail.com")
+        disponibilidad().sincronizar(forzar=True)
+
+        Usuario.objects.bulk_create(
+            [Usuario(pk=hueco.pk, username="tardio", email="tardio@mail.com")]
+        )
+        disponibilidad().sincronizar(forzar=True)
+
+        self.assertIn("u:tardio", disponibilidad().filtro)
+
+
+class ArranqueEnCalienteTests(TestCase):
+    def test_carga_el_fichero_y_recupera_los_nuevos(self):
+        Usuario.objects.create(username="antiguo", email="antiguo@mail.com")
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, "disponible.bin")
+            with override_settings(USUARIOS_DISPONIBLE_FICHERO=ruta):
+                call_command("reconstruir_disponibilidad", stdout=io.StringIO())
+            Usuario.objects.bulk_create(
+                [Usuario(username="posterior", email="posterior@mail.com")]
+            )
+
+            estado = Disponibilidad(capacidad=1000, error=0.001, fichero=ruta)
+            # Sin recorrer la tabla: sólo los usuarios posteriores al volcado.
+            with self.assertNumQueries(1):
+                filtro = estado.preparar()
+
+        self.assertIn("u:antiguo", filtro)
+        self.assertIn("u:posterior", filtro)
+
+    @mock.patch("usuarios.disponibilidad.connections.close_all")
+    def test_precargar_al_arrancar(self, close_all):
+        Usuario.objects.create(username="antiguo", email="antiguo@mail.com")
+        # Sin fichero, el arranque no recorre la tabla.
+        with override_settings(USUARIOS_DISPONIBLE_FICHERO=None):
+            with self.assertNumQueries(0):
+                precargar()
+            self.assertIsNone(disponibilidad().filtro)
+
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, "disponible.bin")
+            with override_settings(USUARIOS_DISPONIBLE_FICHERO=ruta):
+                call_command("reconstruir_disponibilidad", stdout=io.StringIO())
+                # Sólo los registros posteriores al volcado.
+                with self.assertNumQueries(1):
+                    precargar()
+                self.assertIn("u:antiguo", disponibilidad().filtro)
+                # Ninguna conexión abierta pasa a los procesos hijos de un fork.
+                close_all.assert_called_once_with()
+
+                fallo = mock.patch.object(
+                    Disponibilidad, "sincronizar", side_effect=OperationalError
+                )
+                with fallo, self.assertLogs("usuarios.disponibilidad", "WARNING"):
+                    precargar()
@@ -0,0 +1,93 @@
+import csv
+import io
+import json
+import tracemalloc
+
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from core.benchmark import sembrar_usuarios
+from usuarios.models import Usuario
+
+
+class ExportarUsuariosTests(APITestCase):
+    def setUp(self):
+        self.admin = Usuario.objects.create(
+            username="admin", email="admin@mail.com", is_staff=True
+        )
+        self.url = reverse("usuario-exportar")
+
+    def _contenido(self, response):
+        return b"".join(response.streaming_content).decode()
+
+    def test_solo_staff(self):
+        cliente = Usuario.objects.create(username="cliente", email="c@mail.com")
+        self.client.force_authenticate(user=cliente)
+        self.assertEqual(
+            self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN
+        )
+
+    def test_csv_con_los_campos_del_detalle(self):
+        sembrar_usuarios(3)
+        Usuario.objects.create(username="baja", email="baja@mail.com", is_active=False)
+        self.client.force_authenticate(user=self.admin)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertIn("usuarios.csv", response["Content-Disposition"])
+        filas = list(csv.DictReader(io.StringIO(self._contenido(response))))
+        self.assertEqual(len(filas), 4)
+        self.assertNotIn("baja", [f["username"] for f in filas])
+        for excluido in ("password", "id", "groups", "user_permissions"):
+            self.assertNotIn(excluido, filas[0])
+        self.assertIn("full_name", filas[0])
+
+    def test_jsonl(self):
+        sembrar_usuarios(2)
+        self.client.force_authenticate(user=self.admin)
+
+        response = self.client.get(self.url, {"formato": "jsonl"})
+
+        lineas = [json.loads(linea) for linea in self._contenido(response).splitlines()]
+        self.assertEqual(len(lineas), 3)
+        self.assertEqual(
+            {linea["username"] for linea in lineas}, {"admin", "bench0", "bench1"}
+        )
+
+    def test_formato_desconocido(self):
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(self.url, {"formato": "xml"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_comando(self):
+        sembrar_usuarios(5)
+        salida = io.StringIO()
+
+        call_command("exportar_usuarios", "--formato", "jsonl", stdout=salida)
+
+        self.assertEqual(len(salida.getvalue().splitlines()), 6)
+
+    def test_memoria_acotada(self):
+        """El pico de memoria no crece con el tamaño de la tabla."""
+        self.client.force_authenticate(user=self.admin)
+
+        def pico(n):
+            Usuario.objects.exclude(pk=self.admin.pk).delete()
+            sembrar_usuarios(n)
+            tracemalloc.start()
+            try:
+                response = self.client.get(self.url)
+                total = sum(len(bloque) for bloque in response.streaming_content)
+                return tracemalloc.get_traced_memory()[1], total
+            finally:
+                tracemalloc.stop()
+
+        pequeno, bytes_pequeno = pico(4_000)
+        grande, bytes_grande = pico(40_000)
+
+        # Diez veces más filas, mismo pico: el de un bloque de ``chunk_size``.
+        self.assertGreater(bytes_grande, bytes_pequeno * 9)
+        self.assertLess(grande, pequeno * 1.5)
@@ -0,0 +1,93 @@
+import datetime
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from usuarios.fast_serializers import (
+    UsuarioDetailFastSerializer,
+    UsuarioListFastSerializer,
+)
+from usuarios.models import Usuario
+from usuarios.serializers import UsuarioDetailSerializer, UsuarioListSerializer
+from usuarios.views_api import UsuarioViewSet
+
+
+def crear_usuarios():
+    Usuario.objects.create(
+        username="completo",
+        email="completo@mail.com",
+        nombre="Ana",
+        apellido="Pérez",
+        telefono="+34600000000",
+        fecha_nacimiento=datetime.date(1990, 1, 31),
+        last_login=timezone.now(),
+        is_verified=True,
+        tipo_usuario="organizador",
+    )
+    Usuario.objects.create(username="solonombre", email="solo@mail.com", nombre="Luis")
+    Usuario.objects.create(username="vacio", email="vacio@mail.com", is_staff=True)
+
+
+class FastSerializerTests(TestCase):
+    def setUp(self):
+        crear_usuarios()
+        self.queryset = Usuario.objects.order_by("-fecha_registro", "-id")
+
+    def assertMismoJSON(self, rapido, drf):
+        renderer = JSONRenderer()
+        self.assertEqual(renderer.render(rapido), renderer.render(drf))
+
+    def test_list_output_is_byte_identical(self):
+        drf = UsuarioListSerializer(self.queryset, many=True).data
+        rapido = UsuarioListFastSerializer.compilar().serializar_queryset(self.queryset)
+        self.assertMismoJSON(rapido, drf)
+
+    def test_detail_output_is_byte_identical(self):
+        for usuario in self.queryset:
+            drf = UsuarioDetailSerializer(usuario).data
+            rapido = UsuarioDetailFastSerializer.compilar().serializar_instancia(
+                usuario
+            )
+            self.assertMismoJSON(rapido, drf)
+
+    def test_sparse_fields_keep_serializer_order(self):
+        campos = ("full_name", "uuid")
+        drf = UsuarioListSerializer(self.queryset, many=True, fields=campos).data
+        rapido = UsuarioListFastSerializer.compilar(fields=campos).serializar_queryset(
+            self.queryset
+        )
+        self.assertMismoJSON(rapido, drf)
+
+    def test_extra_columns_are_fetched_but_not_rendered(self):
+        serializer = UsuarioListFastSerializer.compilar(
+            fields=("username",), extra_columns=("fecha_registro", "id")
+        )
+        fila = serializer.valores(self.queryset).first()
+        self.assertEqual(set(serializer.serializar_fila(fila)), {"username"})
+        self.assertIsNotNone(fila.fecha_registro)
+
+
+class FastSerializerAPITests(APITestCase):
+    def setUp(self):
+        crear_usuarios()
+        self.admin = Usuario.objects.get(username="vacio")
+        self.client.force_authenticate(user=self.admin)
+
+    def _get_ambos(self, url):
+        rapido = self.client.get(url)
+        with mock.patch.object(UsuarioViewSet, "fast_serializer_actions", ()):
+            drf = self.client.get(url)
+        return rapido, drf
+
+    def test_list_response_matches_drf_path(self):
+        rapido, drf = self._get_ambos(reverse("usuario-list"))
+        self.assertEqual(rapido.content, drf.content)
+
+    def test_retrieve_response_matches_drf_path(self):
+        rapido, drf = self._get_ambos(
+            reverse("usuario-detail", kwargs={"uuid": self.admin.uuid})
+        )
+        self.assertEqual(rapido.content, drf.content)
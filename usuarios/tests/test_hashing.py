@@ -0,0 +1,111 @@
+import asyncio
+import time
+
+from django.contrib.auth.hashers import make_password as django_make_password
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from usuarios import hashing
+from usuarios.models import Usuario
+
+
+class PasswordHashingTests(TestCase):
+    def test_new_passwords_use_preferred_scheme(self):
+        u = Usuario(username="scrypt", email="scrypt@mail.com")
+        u.set_password("secret")
+        self.assertTrue(u.password.startswith("scrypt$"))
+        self.assertTrue(u.check_password("secret"))
+
+    def test_legacy_hash_is_upgraded_on_login(self):
+        u = Usuario.objects.create(
+            username="legacy",
+            email="legacy@mail.com",
+            password=django_make_password("secret", hasher="pbkdf2_sha256"),
+        )
+
+        self.assertTrue(u.check_password("secret"))
+
+        u.refresh_from_db()
+        self.assertTrue(u.password.startswith("scrypt$"))
+        self.assertTrue(u.check_password("secret"))
+
+    def test_wrong_password_does_not_upgrade(self):
+        legacy = django_make_password("secret", hasher="pbkdf2_sha256")
+        u = Usuario.objects.create(
+            username="legacy", email="legacy@mail.com", password=legacy
+        )
+
+        self.assertFalse(u.check_password("otra"))
+        u.refresh_from_db()
+        self.assertEqual(u.password, legacy)
+
+    def test_metrics_record_latency(self):
+        antes = hashing.DURACION.contar(operacion="hash")
+        Usuario(username="metrica", email="m@mail.com").set_password("secret")
+        self.assertEqual(hashing.DURACION.contar(operacion="hash"), antes + 1)
+
+    @override_settings(PASSWORD_HASHING={"WORKERS": 1})
+    def test_process_pool(self):
+        u = Usuario(username="pool", email="pool@mail.com")
+        u.set_password("secret")
+        self.assertTrue(u.check_password("secret"))
+        self.assertFalse(u.check_password("otra"))
+
+
+class TimeoutTests(TestCase):
+    """Un trabajo que agota el ``TIMEOUT`` da 503 y sigue ocupando su hueco."""
+
+    def _esperar_hueco(self):
+        limite = time.monotonic() + 10
+        while hashing.COLA.valor() and time.monotonic() < limite:
+            time.sleep(0.05)
+        self.assertEqual(hashing.COLA.valor(), 0)
+
+    @override_settings(PASSWORD_HASHING={"WORKERS": 1, "MAX_QUEUE": 1, "TIMEOUT": 0.2})
+    def test_timeout_del_pool(self):
+        with self.assertRaises(hashing.HashingSaturado):
+            hashing.pool.ejecutar("hash", time.sleep, 1.0)
+        # El trabajo sigue en el pool: el hueco no se ha liberado.
+        with self.assertRaises(hashing.HashingSaturado):
+            hashing.pool.ejecutar("hash", time.sleep, 0)
+
+        self._esperar_hueco()
+        self.assertIsNone(hashing.pool.ejecutar("hash", time.sleep, 0))
+
+    @override_settings(PASSWORD_HASHING={"MAX_QUEUE": 1, "TIMEOUT": 0.2})
+    def test_timeout_asincrono(self):
+        async def pedir():
+            with self.assertRaises(hashing.HashingSaturado):
+                await hashing.pool.aejecutar("hash", time.sleep, 1.0)
+            with self.assertRaises(hashing.HashingSaturado):
+                await hashing.pool.aejecutar("hash", time.sleep, 0)
+            await asyncio.to_thread(self._esperar_hueco)
+            return await hashing.pool.aejecutar("hash", time.sleep, 0)
+
+        self.assertIsNone(asyncio.run(pedir()))
+
+
+@override_settings(PASSWORD_HASHING={"MAX_QUEUE": 0, "RETRY_AFTER": 7})
+class LoadSheddingTests(APITestCase):
+    def setUp(self):
+        # Creado con el hasher de Django para no pasar por el pool saturado.
+        Usuario.objects.create(
+            username="burst", email="burst@mail.com", password=django_make_password("x")
+        )
+
+    def test_token_endpoint_returns_503(self):
+        response = self.client.post(
+            reverse("token_obtain_pair"),
+            {"username": "burst", "password": "x"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response["Retry-After"], "7")
+
+    def test_login_view_returns_503(self):
+        response = self.client.post(
+            reverse("login"), {"username": "burst", "password": "x"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response["Retry-After"], "7")
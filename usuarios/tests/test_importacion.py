@@ -0,0 +1,123 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.test import TestCase
+from usuarios.importacion import Checkpoint, ImportadorUsuarios, leer_filas
+from usuarios.models import Usuario
+
+
+class ImportUsuariosTests(TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def _fichero(self, nombre, contenido):
+        ruta = os.path.join(self.dir.name, nombre)
+        with open(ruta, "w", encoding="utf-8") as fichero:
+            fichero.write(contenido)
+        return ruta
+
+    def _jsonl(self, filas):
+        return self._fichero(
+            "usuarios.jsonl", "".join(json.dumps(fila) + "\n" for fila in filas)
+        )
+
+    def test_importa_csv(self):
+        ruta = self._fichero(
+            "usuarios.csv",
+            "username,email,nombre,password\n"
+            "csvuno,uno@mail.com,Uno,clave123\n"
+            "csvdos,dos@MAIL.COM,,\n",
+        )
+        salida = StringIO()
+
+        call_command("import_usuarios", ruta, stdout=salida)
+
+        uno = Usuario.objects.get(username="csvuno")
+        self.assertEqual(uno.nombre, "Uno")
+        self.assertTrue(uno.check_password("clave123"))
+        dos = Usuario.objects.get(username="csvdos")
+        self.assertEqual(dos.email, "dos@mail.com")
+        self.assertFalse(dos.has_usable_password())
+        self.assertIn("Importados 2 usuarios", salida.getvalue())
+        self.assertIn("filas/s", salida.getvalue())
+        self.assertFalse(os.path.exists(f"{ruta}.checkpoint"))
+
+    def test_valida_con_las_reglas_del_modelo(self):
+        Usuario.objects.create(username="existente", email="existe@mail.com")
+        ruta = self._jsonl(
+            [
+                {"username": "valido1", "email": "v1@mail.com"},
+                {"username": "no valido", "email": "v2@mail.com"},
+                {"username": "valido3", "email": "no-es-email"},
+                {"username": "valido1", "email": "otro@mail.com"},
+                {"username": "nuevo5", "email": "existe@mail.com"},
+                {"username": "valido6", "email": "v6@mail.com", "tipo_usuario": "rey"},
+                {"username": "valido7", "email": "v7@mail.com", "password_hash": "x"},
+            ]
+        )
+        rechazos = {}
+        importador = ImportadorUsuarios(
+            rechazo=lambda numero, fila, errores: rechazos.update({numero: errores})
+        )
+
+        resultado = importador.importar(leer_filas(ruta))
+
+        self.assertEqual(resultado["importados"], 1)
+        self.assertEqual(resultado["rechazados"], 6)
+        self.assertEqual(
+            {n: sorted(e) for n, e in rechazos.items()},
+            {
+                2: ["username"],
+                3: ["email"],
+                4: ["username"],
+                5: ["email"],
+                6: ["tipo_usuario"],
+                7: ["password_hash"],
+            },
+        )
+
+    def test_hashes_importados_y_consultas_por_lote(self):
+        encoded = make_password("importada")
+        filas = [
+            {
+                "username": f"lote{i}",
+                "email": f"lote{i}@mail.com",
+                "password_hash": encoded,
+            }
+            for i in range(250)
+        ]
+        importador = ImportadorUsuarios(lote=100)
+
+        # Por lote: comprobación de duplicados e inserción (más savepoints).
+        with self.assertNumQueries(3 * 4):
+            resultado = importador.importar(enumerate(filas, start=1))
+
+        self.assertEqual(resultado["importados"], 250)
+        self.assertTrue(
+            Usuario.objects.get(username="lote7").check_password("importada")
+        )
+
+    def test_reanuda_desde_el_checkpoint(self):
+        filas = [
+            {"username": f"reanuda{i}", "email": f"r{i}@mail.com"} for i in range(10)
+        ]
+        ruta = self._jsonl(filas)
+        checkpoint = Checkpoint(f"{ruta}.checkpoint")
+        # Simula una importación que se cortó tras un lote de 4 filas.
+        ImportadorUsuarios(lote=4).importar(enumerate(filas[:4], start=1))
+        checkpoint.guardar({"filas": 4, "importados": 4, "rechazados": 0})
+        salida = StringIO()
+
+        call_command("import_usuarios", ruta, "--lote", "3", stdout=salida)
+
+        self.assertIn("Reanudando tras 4 filas", salida.getvalue())
+        self.assertIn("Importados 10 usuarios (0 rechazados)", salida.getvalue())
+        self.assertEqual(
+            Usuario.objects.filter(username__startswith="reanuda").count(), 10
+        )
+        self.assertIsNone(checkpoint.cargar())
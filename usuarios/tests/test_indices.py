@@ -0,0 +1,108 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.benchmark import sembrar_usuarios
+from usuarios.cache_perfil import cache_perfil
+from usuarios.models import Usuario
+
+
+def _nodos(plan):
+    yield plan
+    for hijo in plan.get("Plans", ()):
+        yield from _nodos(hijo)
+
+
+@skipUnless(
+    connection.vendor == "postgresql", "Los planes de EXPLAIN son de PostgreSQL."
+)
+class IndicesParcialesTests(TransactionTestCase):
+    """
+    Planes de las lecturas de la API con la mayoría de usuarios dados de baja.
+    TransactionTestCase: ``VACUUM`` no puede ejecutarse en una transacción y
+    sin él el planificador no sabe que el índice basta (Index Only Scan).
+    """
+
+    ACTIVOS = 300
+    INACTIVOS = 3000
+
+    def setUp(self):
+        sembrar_usuarios(self.ACTIVOS + self.INACTIVOS)
+        baja = Usuario.objects.order_by("id").values("id")[: self.INACTIVOS]
+        Usuario.objects.filter(id__in=baja).update(is_active=False)
+        self.usuario = Usuario.activos.order_by("id").first()
+        self.usuario.is_staff = True
+        self.usuario.save(update_fields=["is_staff"])
+        with connection.cursor() as cursor:
+            cursor.execute("VACUUM ANALYZE usuarios")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.usuario)
+
+    def _planes(self, url):
+        """``(response, [plan])`` de las consultas a ``usuarios`` de un GET."""
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        planes = []
+        with connection.cursor() as cursor:
+            for consulta in ctx.captured_queries:
+                if 'FROM "usuarios"' not in consulta["sql"]:
+                    continue
+                cursor.execute(
+                    "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + consulta["sql"]
+                )
+                # psycopg devuelve el json ya decodificado.
+                (plan,) = cursor.fetchone()
+                planes.append(plan[0]["Plan"])
+        self.assertTrue(planes)
+        return response, planes
+
+    def _escaneo(self, plan):
+        nodos = list(_nodos(plan))
+        tipos = {nodo["Node Type"] for nodo in nodos}
+        self.assertNotIn("Seq Scan", tipos)
+        self.assertNotIn("Bitmap Heap Scan", tipos)
+        return next(n for n in nodos if n.get("Relation Name") == "usuarios")
+
+    def test_listado_index_only_scan_sin_ordenar(self):
+        response, (plan,) = self._planes(reverse("usuario-list"))
+
+        escaneo = self._escaneo(plan)
+        self.assertEqual(escaneo["Node Type"], "Index Only Scan")
+        self.assertEqual(escaneo["Index Name"], "usuarios_activo_fecha_idx")
+        self.assertEqual(escaneo["Heap Fetches"], 0)
+        self.assertNotIn("Sort", {n["Node Type"] for n in _nodos(plan)})
+
+        # La página siguiente entra en el índice por el cursor.
+        _, (plan,) = self._planes(response.data["next"])
+        escaneo = self._escaneo(plan)
+        self.assertEqual(escaneo["Node Type"], "Index Only Scan")
+        self.assertEqual(escaneo["Index Name"], "usuarios_activo_fecha_idx")
+        self.assertIn("fecha_registro", escaneo["Index Cond"])
+
+    def test_campos_dispersos_tambien_index_only(self):
+        _, (plan,) = self._planes(reverse("usuario-list") + "?fields=uuid,full_name")
+        self.assertEqual(self._escaneo(plan)["Node Type"], "Index Only Scan")
+
+    def test_detalle_por_uuid(self):
+        cache_perfil().invalidar([self.usuario.uuid])
+        _, (plan,) = self._planes(
+            reverse("usuario-detail", kwargs={"uuid": self.usuario.uuid})
+        )
+        escaneo = self._escaneo(plan)
+        self.assertEqual(escaneo["Node Type"], "Index Scan")
+        # El índice único de la columna; no hace falta uno parcial.
+        self.assertEqual(escaneo["Index Name"], "usuarios_uuid_key")
+
+    def test_el_indice_parcial_no_crece_con_las_bajas(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class "
+                "WHERE relname = 'usuarios_activo_fecha_idx'"
+            )
+            (tuplas,) = cursor.fetchone()
+        self.assertEqual(tuplas, self.ACTIVOS)
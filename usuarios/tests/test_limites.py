@@ -0,0 +1,114 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from core.limitador import limitador
+from usuarios.models import Usuario
+
+LIMITES = {
+    "ACTIVO": True,
+    "BACKEND": "core.limitador.MemoriaBackend",
+    "OPCIONES": {"shards": 4},
+    "REGLAS": {
+        "login": {"ip": "3/min", "username": "2/min"},
+        "registro": {"ip": "2/min"},
+    },
+}
+
+
+class LimitesMixin:
+    def setUp(self):
+        super().setUp()
+        limitador().backend.limpiar()
+        self.usuario = Usuario.objects.create(username="limitado", email="l@mail.com")
+        self.usuario.set_password("secreto")
+        self.usuario.save()
+
+
+@override_settings(LIMITES=LIMITES)
+class LimitesAPITests(LimitesMixin, APITestCase):
+    def _token(self, username="limitado", ip="1.1.1.1"):
+        return self.client.post(
+            reverse("token_obtain_pair"),
+            {"username": username, "password": "mala"},
+            format="json",
+            REMOTE_ADDR=ip,
+        )
+
+    def test_token_por_username_antes_de_calcular_hashes(self):
+        estados = [self._token(ip=f"1.1.1.{i}").status_code for i in range(2)]
+        with (
+            mock.patch("usuarios.hashing.check_password") as check_password,
+            self.assertNumQueries(0),
+        ):
+            rechazada = self._token(ip="1.1.1.9")
+
+        self.assertEqual(estados, [401, 401])
+        self.assertEqual(rechazada.status_code, 429)
+        self.assertIn("Retry-After", rechazada)
+        check_password.assert_not_called()
+
+    def test_token_por_ip(self):
+        estados = [self._token(username=f"u{i}").status_code for i in range(4)]
+
+        self.assertEqual(estados, [401, 401, 401, 429])
+        self.assertEqual(self._token(username="u9", ip="2.2.2.2").status_code, 401)
+
+    def test_solo_el_registro_del_viewset(self):
+        datos = {
+            "username": "nuevo{}",
+            "email": "nuevo{}@mail.com",
+            "password": "Str0ngP@ss",
+        }
+        estados = [
+            self.client.post(
+                reverse("usuario-list"),
+                {k: v.format(i) for k, v in datos.items()},
+                format="json",
+            ).status_code
+            for i in range(3)
+        ]
+        self.client.force_authenticate(user=self.usuario)
+
+        self.assertEqual(estados, [201, 201, 429])
+        self.assertEqual(self.client.get(reverse("usuario-list")).status_code, 200)
+
+
+@override_settings(LIMITES=LIMITES)
+class LimitesVistasDjangoTests(LimitesMixin, TestCase):
+    def test_login_html(self):
+        url = reverse("login")
+        for _ in range(2):
+            self.client.post(url, {"username": "limitado", "password": "mala"})
+
+        response = self.client.post(url, {"username": "Limitado", "password": "mala"})
+
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+        # Mostrar el formulario no cuenta.
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    @override_settings(ROOT_URLCONF="config.urls_asgi")
+    async def test_vistas_asincronas(self):
+        for i in range(2):
+            await self.async_client.post(
+                "/api/usuarios/",
+                {
+                    "username": f"a{i}",
+                    "email": f"a{i}@mail.com",
+                    "password": "Str0ngP@ss",
+                },
+                content_type="application/json",
+            )
+
+        response = await self.async_client.post(
+            "/api/usuarios/",
+            {"username": "a9", "email": "a9@mail.com", "password": "Str0ngP@ss"},
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("detail", response.json())
+        self.assertIn("Retry-After", response)
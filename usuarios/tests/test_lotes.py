@@ -0,0 +1,224 @@
+import uuid
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from core.benchmark import sembrar_usuarios
+from usuarios.cache_perfil import cache_perfil
+from usuarios.disponibilidad import disponibilidad
+from usuarios.models import Usuario
+from usuarios.revocacion import esta_revocado
+from usuarios.serializers import CustomTokenObtainPairSerializer
+
+
+class DesactivarLoteTests(APITestCase):
+    def setUp(self):
+        self.admin = Usuario.objects.create(
+            username="admin", email="admin@mail.com", is_staff=True
+        )
+        self.url = reverse("usuario-desactivar-lote")
+
+    def _desactivar(self, uuids):
+        self.client.force_authenticate(user=self.admin)
+        return self.client.post(
+            self.url, {"uuids": [str(u) for u in uuids]}, format="json"
+        )
+
+    def test_solo_staff(self):
+        cliente = Usuario.objects.create(username="cliente", email="c@mail.com")
+        self.client.force_authenticate(user=cliente)
+        response = self.client.post(self.url, {"uuids": [str(cliente.uuid)]})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        cliente.refresh_from_db()
+        self.assertTrue(cliente.is_active)
+
+    def test_resultado_por_uuid_como_soft_delete(self):
+        sembrar_usuarios(3)
+        usuarios = list(
+            Usuario.objects.filter(username__startswith="bench").order_by("id")
+        )
+        baja = Usuario.objects.create(
+            username="baja", email="baja@mail.com", is_active=False
+        )
+        desconocido = uuid.uuid4()
+
+        response = self._desactivar(
+            [usuarios[0].uuid, desconocido, baja.uuid, usuarios[1].uuid]
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [r["resultado"] for r in response.data["resultados"]],
+            ["desactivado", "no_encontrado", "no_encontrado", "desactivado"],
+        )
+        self.assertEqual(response.data["resultados"][1]["uuid"], str(desconocido))
+        for usuario in usuarios[:2]:
+            usuario.refresh_from_db()
+            self.assertFalse(usuario.is_active)
+            self.assertRegex(usuario.username, r"^bench\d\.inactiva\.[0-9a-f]{8}$")
+            sufijo = usuario.username[usuario.username.index(".inactiva.") :]
+            self.assertTrue(usuario.email.endswith(sufijo))
+            self.assertTrue(esta_revocado(usuario.pk))
+        self.assertNotEqual(usuarios[0].username[-8:], usuarios[1].username[-8:])
+        usuarios[2].refresh_from_db()
+        self.assertTrue(usuarios[2].is_active)
+        # Los valores liberados vuelven a estar disponibles para el registro.
+        self.assertFalse(Usuario.objects.filter(username__in=["bench0", "bench1"]))
+
+    def test_no_duplica_el_sufijo(self):
+        usuario = Usuario.objects.create(
+            username="reactivada", email="x@mail.com.inactiva.abcd1234"
+        )
+        self._desactivar([usuario.uuid])
+        usuario.refresh_from_db()
+        self.assertEqual(usuario.email, "x@mail.com.inactiva.abcd1234")
+        self.assertIn(".inactiva.", usuario.username)
+
+    def test_consultas_constantes(self):
+        sembrar_usuarios(60)
+        uuids = list(
+            Usuario.objects.filter(username__startswith="bench").values_list(
+                "uuid", flat=True
+            )
+        )
+        self.client.force_authenticate(user=self.admin)
+
+        def consultas(lote):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.post(
+                    self.url, {"uuids": [str(u) for u in lote]}, format="json"
+                )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(ctx)
+
+        self.assertEqual(consultas(uuids[:5]), consultas(uuids[5:]))
+
+    def test_invalida_perfil_y_anota_disponibilidad(self):
+        usuario = Usuario.objects.create(username="perfil", email="perfil@mail.com")
+        version = cache_perfil().version(usuario.uuid)
+        filtro = disponibilidad().preparar()
+
+        self._desactivar([usuario.uuid])
+
+        self.assertNotEqual(cache_perfil().version(usuario.uuid), version)
+        usuario.refresh_from_db()
+        self.assertIn(f"e:{usuario.email}", filtro)
+
+    @override_settings(USUARIOS_LOTE_MAXIMO=2)
+    def test_maximo_por_lote(self):
+        response = self._desactivar([uuid.uuid4() for _ in range(3)])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("uuids", response.data)
+
+    def test_uuid_no_valido(self):
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.post(self.url, {"uuids": ["nope"]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ActualizarLoteTests(APITestCase):
+    def setUp(self):
+        self.admin = Usuario.objects.create(
+            username="admin", email="admin@mail.com", is_staff=True
+        )
+        self.url = reverse("usuario-actualizar-lote")
+        self.client.force_authenticate(user=self.admin)
+
+    def test_bulk_update_por_uuid(self):
+        sembrar_usuarios(3)
+        a, b, c = Usuario.objects.filter(username__startswith="bench").order_by("id")
+        version = cache_perfil().version(a.uuid)
+        desconocido = str(uuid.uuid4())
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(
+                self.url,
+                {
+                    "usuarios": [
+                        {"uuid": str(a.uuid), "tipo_usuario": "organizador"},
+                        {"uuid": str(b.uuid), "is_verified": True},
+                        {"uuid": str(c.uuid), "tipo_usuario": "cliente"},
+                        {"uuid": desconocido, "is_verified": True},
+                    ]
+                },
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["resultados"],
+            [
+                {"uuid": str(a.uuid), "resultado": "actualizado"},
+                {"uuid": str(b.uuid), "resultado": "actualizado"},
+                {"uuid": str(c.uuid), "resultado": "sin_cambios"},
+                {"uuid": desconocido, "resultado": "no_encontrado"},
+            ],
+        )
+        a.refresh_from_db()
+        b.refresh_from_db()
+        self.assertEqual((a.tipo_usuario, a.is_verified), ("organizador", False))
+        self.assertEqual((b.tipo_usuario, b.is_verified), ("cliente", True))
+        self.assertNotEqual(cache_perfil().version(a.uuid), version)
+        updates = [q for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+
+    def test_cambio_de_tipo_invalida_los_tokens_emitidos(self):
+        usuario = Usuario.objects.create(username="tier", email="tier@mail.com")
+        otro = Usuario.objects.create(username="igual", email="igual@mail.com")
+        refresh = CustomTokenObtainPairSerializer.get_token(usuario)
+        refresh_otro = CustomTokenObtainPairSerializer.get_token(otro)
+
+        self.client.post(
+            self.url,
+            {
+                "usuarios": [
+                    {"uuid": str(usuario.uuid), "tipo_usuario": "organizador"},
+                    {"uuid": str(otro.uuid), "is_verified": True},
+                ]
+            },
+            format="json",
+        )
+        self.client.force_authenticate(user=None)
+        detalle = reverse("usuario-detail", kwargs={"uuid": usuario.uuid})
+
+        def get(access, url=detalle):
+            self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+            return self.client.get(url)
+
+        # El access token con el tier antiguo se rechaza; el de quien no
+        # cambió de tipo sigue valiendo.
+        self.assertEqual(
+            get(refresh.access_token).status_code, status.HTTP_401_UNAUTHORIZED
+        )
+        url_otro = reverse("usuario-detail", kwargs={"uuid": otro.uuid})
+        self.assertEqual(
+            get(refresh_otro.access_token, url_otro).status_code, status.HTTP_200_OK
+        )
+
+        # El refresh emite tokens con el tier nuevo, que sí valen.
+        self.client.credentials()
+        renovado = self.client.post(
+            reverse("token_refresh"), {"refresh": str(refresh)}, format="json"
+        ).data
+        for token in (
+            AccessToken(renovado["access"]),
+            RefreshToken(renovado["refresh"]),
+        ):
+            self.assertEqual(token["tier"], "organizador")
+        self.assertEqual(get(renovado["access"]).status_code, status.HTTP_200_OK)
+
+    def test_validacion(self):
+        usuario = Usuario.objects.create(username="otro", email="otro@mail.com")
+        for cuerpo in (
+            {"usuarios": []},
+            {"usuarios": [{"uuid": str(usuario.uuid)}]},
+            {"usuarios": [{"uuid": str(usuario.uuid), "tipo_usuario": "rey"}]},
+        ):
+            response = self.client.post(self.url, cuerpo, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        usuario.refresh_from_db()
+        self.assertEqual(usuario.tipo_usuario, "cliente")
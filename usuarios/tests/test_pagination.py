@@ -0,0 +1,82 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from usuarios.models import Usuario
+
+
+class UsuarioPaginationTests(APITestCase):
+    def setUp(self):
+        self.admin = Usuario.objects.create(
+            username="admin", email="admin@mail.com", is_staff=True
+        )
+        Usuario.objects.bulk_create(
+            Usuario(username=f"user{i:03d}", email=f"user{i:03d}@mail.com")
+            for i in range(25)
+        )
+        self.client.force_authenticate(user=self.admin)
+        self.url = reverse("usuario-list")
+
+    def _recorrer(self, url):
+        vistos = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            vistos.extend(u["username"] for u in response.data["results"])
+            url = response.data["next"]
+        return vistos
+
+    def test_pages_follow_ordering_without_gaps(self):
+        vistos = self._recorrer(f"{self.url}?page_size=7")
+
+        esperado = list(
+            Usuario.objects.filter(is_active=True)
+            .order_by("-fecha_registro", "-id")
+            .values_list("username", flat=True)
+        )
+        self.assertEqual(vistos, esperado)
+
+    def test_ties_on_fecha_registro_are_broken_by_id(self):
+        # Todas las filas con la misma fecha: sólo el id desempata.
+        Usuario.objects.update(fecha_registro=timezone.now())
+
+        vistos = self._recorrer(f"{self.url}?page_size=4")
+
+        self.assertEqual(len(vistos), 26)
+        self.assertEqual(len(set(vistos)), 26)
+
+    def test_previous_link_returns_prior_page(self):
+        primera = self.client.get(f"{self.url}?page_size=5").data
+        self.assertIsNone(primera["previous"])
+
+        segunda = self.client.get(primera["next"]).data
+        anterior = self.client.get(segunda["previous"]).data
+
+        self.assertEqual(anterior["results"], primera["results"])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(f"{self.url}?cursor=no-es-un-cursor")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_sparse_fieldset(self):
+        response = self.client.get(f"{self.url}?fields=uuid,username")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for usuario in response.data["results"]:
+            self.assertEqual(set(usuario), {"uuid", "username"})
+
+    def test_sparse_fieldset_pushed_down_to_only(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(f"{self.url}?fields=username")
+
+        sql = next(q["sql"] for q in ctx.captured_queries if "LIMIT" in q["sql"])
+        self.assertIn('"username"', sql)
+        self.assertNotIn('"email"', sql)
+        self.assertNotIn('"telefono"', sql)
+
+    def test_sparse_fieldset_unknown_field(self):
+        response = self.client.get(f"{self.url}?fields=username,password")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("fields", response.data)
@@ -0,0 +1,97 @@
+import io
+import time
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from usuarios.models import TokenRevocado, Usuario
+from usuarios.revocacion import _RevocadosEnMemoria, purgar_revocados
+from usuarios.serializers import CustomTokenObtainPairSerializer
+
+
+class RefreshRotativoTests(APITestCase):
+    def setUp(self):
+        self.usuario = Usuario.objects.create(username="rota", email="rota@mail.com")
+        self.url = reverse("token_refresh")
+
+    def _refresh(self, token):
+        return self.client.post(self.url, {"refresh": str(token)}, format="json")
+
+    def test_rotacion_revoca_el_token_usado(self):
+        token = CustomTokenObtainPairSerializer.get_token(self.usuario)
+
+        primera = self._refresh(token)
+        reutilizado = self._refresh(token)
+        siguiente = self._refresh(primera.data["refresh"])
+
+        self.assertEqual(primera.status_code, status.HTTP_200_OK)
+        self.assertIn("access", primera.data)
+        self.assertEqual(reutilizado.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(siguiente.status_code, status.HTTP_200_OK)
+        self.assertEqual(TokenRevocado.objects.count(), 2)
+
+    def test_reutilizacion_en_otro_proceso(self):
+        token = CustomTokenObtainPairSerializer.get_token(self.usuario)
+        self._refresh(token)
+
+        # Memoria vacía, como en otro worker: la clave primaria lo rechaza.
+        with override_settings(USUARIOS_REVOCACION_MEMORIA=10):
+            response = self._refresh(token)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_consultas_constantes_con_la_tabla_llena(self):
+        with CaptureQueriesContext(connection) as vacia:
+            self._refresh(CustomTokenObtainPairSerializer.get_token(self.usuario))
+        expira = timezone.now() + timedelta(days=1)
+        TokenRevocado.objects.bulk_create(
+            TokenRevocado(jti=f"relleno{i}", expira=expira) for i in range(2000)
+        )
+
+        with CaptureQueriesContext(connection) as llena:
+            response = self._refresh(
+                CustomTokenObtainPairSerializer.get_token(self.usuario)
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(llena), len(vacia))
+
+    def test_purga_por_lotes_solo_los_caducados(self):
+        ahora = timezone.now()
+        TokenRevocado.objects.bulk_create(
+            [
+                TokenRevocado(jti=f"viejo{i}", expira=ahora - timedelta(hours=1))
+                for i in range(7)
+            ]
+            + [TokenRevocado(jti="vigente", expira=ahora + timedelta(hours=1))]
+        )
+
+        self.assertEqual(purgar_revocados(lote=5), 5)
+        salida = io.StringIO()
+        call_command("purgar_tokens_revocados", "--lote", "5", stdout=salida)
+
+        self.assertIn("2 tokens revocados purgados", salida.getvalue())
+        self.assertEqual(
+            list(TokenRevocado.objects.values_list("jti", flat=True)), ["vigente"]
+        )
+
+
+class RevocadosEnMemoriaTests(SimpleTestCase):
+    def test_caducidad_y_limite(self):
+        memoria = _RevocadosEnMemoria(maximo=3)
+        ahora = time.time()
+        memoria.anotar("caducado", ahora - 1)
+        for jti in ("a", "b", "c", "d"):
+            memoria.anotar(jti, ahora + 60)
+
+        self.assertNotIn("caducado", memoria)
+        # Al podar se descarta el caducado y, aun así, el más antiguo.
+        self.assertNotIn("a", memoria)
+        self.assertTrue(all(jti in memoria for jti in ("b", "c", "d")))
@@ -0,0 +1,147 @@
+from unittest import mock
+
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from usuarios.forms import RegistrationForm
+from usuarios.models import Usuario
+from usuarios.unicidad import campo_en_conflicto, campos_ocupados
+
+
+def _consultas_sql(contexto):
+    """Consultas capturadas sin los SAVEPOINT del ``atomic`` del test."""
+    return [q["sql"] for q in contexto.captured_queries if "SAVEPOINT" not in q["sql"]]
+
+
+class CamposOcupadosTests(TestCase):
+    def setUp(self):
+        Usuario.objects.create(username="ocupado", email="Ocupado@mail.com")
+
+    def test_una_sola_consulta_para_los_dos_campos(self):
+        with self.assertNumQueries(1):
+            ocupados = campos_ocupados("ocupado", "ocupado@MAIL.com")
+        self.assertEqual(ocupados, {"username", "email"})
+
+    def test_campos_libres_y_exclusion_del_propio_usuario(self):
+        propio = Usuario.objects.get(username="ocupado")
+
+        self.assertEqual(campos_ocupados("libre", "libre@mail.com"), set())
+        self.assertEqual(
+            campos_ocupados("ocupado", "ocupado@mail.com", excluir_pk=propio.pk),
+            set(),
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(campos_ocupados(None, None), set())
+
+    def test_indice_unico_de_email_sin_mayusculas(self):
+        with self.assertRaises(IntegrityError) as ctx, transaction.atomic():
+            Usuario.objects.create(username="otro", email="OCUPADO@mail.com")
+        self.assertEqual(campo_en_conflicto(ctx.exception), "email")
+
+
+class RegistroAPITests(APITestCase):
+    def setUp(self):
+        self.datos = {
+            "username": "nuevo",
+            "email": "nuevo@mail.com",
+            "password": "Str0ngP@ss",
+        }
+
+    def test_registro_con_una_consulta_antes_del_insert(self):
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.client.post(
+                reverse("usuario-list"), self.datos, format="json"
+            )
+
+        self.assertEqual(response.status_code, 201)
+        consultas = _consultas_sql(contexto)
+        self.assertEqual(len(consultas), 2)
+        self.assertTrue(consultas[0].startswith("SELECT"))
+        self.assertTrue(consultas[1].startswith("INSERT"))
+
+    def test_duplicados_con_los_mensajes_de_siempre(self):
+        Usuario.objects.create(username="nuevo", email="NUEVO@mail.com")
+
+        response = self.client.post(reverse("usuario-list"), self.datos, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["username"], ["Usuario with this username already exists."]
+        )
+        self.assertEqual(
+            response.data["email"], ["Usuario with this email already exists."]
+        )
+
+    def test_carrera_con_el_insert_se_traduce_a_error_de_campo(self):
+        Usuario.objects.create(username="otro", email="nuevo@mail.com")
+
+        # Otra petición ocupa el email entre la validación y el INSERT.
+        with mock.patch("usuarios.serializers.campos_ocupados", return_value=set()):
+            response = self.client.post(
+                reverse("usuario-list"), self.datos, format="json"
+            )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["email"], ["Usuario with this email already exists."]
+        )
+
+    def test_actualizar_conserva_los_valores_propios(self):
+        usuario = Usuario.objects.create(username="propio", email="propio@mail.com")
+        Usuario.objects.create(username="ajeno", email="ajeno@mail.com")
+        self.client.force_authenticate(user=usuario)
+        url = reverse("usuario-detail", kwargs={"uuid": usuario.uuid})
+
+        propio = self.client.patch(url, {"email": "PROPIO@mail.com"}, format="json")
+        ajeno = self.client.patch(url, {"username": "ajeno"}, format="json")
+
+        self.assertEqual(propio.status_code, 200)
+        self.assertEqual(ajeno.status_code, 400)
+        self.assertIn("username", ajeno.data)
+
+
+class RegistroFormularioTests(TestCase):
+    def _form(self, **datos):
+        return RegistrationForm(
+            data={
+                "username": "nuevo",
+                "email": "nuevo@mail.com",
+                "password": "secreta",
+                "confirm_password": "secreta",
+                **datos,
+            }
+        )
+
+    def test_una_consulta_y_mensajes_de_campo(self):
+        Usuario.objects.create(username="nuevo", email="Nuevo@Mail.com")
+        form = self._form()
+
+        with self.assertNumQueries(1):
+            self.assertFalse(form.is_valid())
+        self.assertEqual(
+            form.errors["username"], ["Este nombre de usuario ya está en uso."]
+        )
+        self.assertEqual(
+            form.errors["email"], ["Este correo electrónico ya está en uso."]
+        )
+
+    def test_registro_web(self):
+        response = self.client.post(reverse("register"), self._form().data)
+
+        self.assertRedirects(response, reverse("login"), fetch_redirect_response=False)
+        self.assertTrue(Usuario.objects.filter(username="nuevo").exists())
+
+    def test_carrera_en_el_registro_web(self):
+        Usuario.objects.create(username="nuevo", email="otro@mail.com")
+
+        with mock.patch("usuarios.forms.campos_ocupados", return_value=set()):
+            response = self.client.post(reverse("register"), self._form().data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFormError(
+            response.context["form"],
+            "username",
+            "Este nombre de usuario ya está en uso.",
+        )
@@ -0,0 +1,114 @@
+import asyncio
+import json
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from usuarios.cache_perfil import cache_perfil
+from usuarios.models import Usuario
+from usuarios.views_async import usuario_detalle
+
+
+@override_settings(ROOT_URLCONF="config.urls_asgi")
+class VistasAsincronasTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        cache_perfil().local.clear()
+        self.user = Usuario.objects.create(username="asyncuser", email="a@mail.com")
+        self.user.set_password("asyncpass")
+        self.user.save()
+
+    async def _token(self, username="asyncuser", password="asyncpass"):
+        return await self.async_client.post(
+            "/api/token/",
+            {"username": username, "password": password},
+            content_type="application/json",
+        )
+
+    def test_las_vistas_son_corrutinas(self):
+        self.assertTrue(asyncio.iscoroutinefunction(usuario_detalle))
+
+    async def test_token(self):
+        response = await self._token()
+
+        self.assertEqual(response.status_code, 200)
+        datos = response.json()
+        self.assertIn("access", datos)
+        self.assertIn("refresh", datos)
+        self.assertEqual(datos["user"]["username"], "asyncuser")
+
+    async def test_token_credenciales_incorrectas(self):
+        for username, password in (("asyncuser", "otra"), ("noexiste", "asyncpass")):
+            response = await self._token(username, password)
+            self.assertEqual(response.status_code, 401)
+            self.assertEqual(response.json()["detail"].split()[0], "No")
+
+        response = await self.async_client.post(
+            "/api/token/", {}, content_type="application/json"
+        )
+        self.assertEqual(sorted(response.json()), ["password", "username"])
+
+    async def test_detalle_con_etag(self):
+        access = (await self._token()).json()["access"]
+        url = f"/api/usuarios/{self.user.uuid}/"
+        cabeceras = {"Authorization": f"Bearer {access}"}
+
+        response = await self.async_client.get(url, headers=cabeceras)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["username"], "asyncuser")
+        self.assertNotIn("id", response.json())
+
+        no_modificado = await self.async_client.get(
+            url, headers={"If-None-Match": response["ETag"], **cabeceras}
+        )
+        self.assertEqual(no_modificado.status_code, 304)
+
+    async def test_detalle_sin_token_y_de_otro_usuario(self):
+        otro = await Usuario.objects.acreate(username="otrouser", email="o@mail.com")
+        access = (await self._token()).json()["access"]
+
+        sin_token = await self.async_client.get(f"/api/usuarios/{otro.uuid}/")
+        ajeno = await self.async_client.get(
+            f"/api/usuarios/{otro.uuid}/", headers={"Authorization": f"Bearer {access}"}
+        )
+
+        self.assertEqual(sin_token.status_code, 401)
+        self.assertIn("Bearer", sin_token["WWW-Authenticate"])
+        self.assertEqual(ajeno.status_code, 403)
+
+    async def test_registro(self):
+        datos = {
+            "username": "nuevoasync",
+            "email": "nuevo@mail.com",
+            "password": "UnaClave.Segura99",
+        }
+
+        response = await self.async_client.post(
+            "/api/usuarios/", datos, content_type="application/json"
+        )
+        duplicado = await self.async_client.post(
+            "/api/usuarios/", datos, content_type="application/json"
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn("password", response.json())
+        usuario = await Usuario.objects.aget(username="nuevoasync")
+        self.assertTrue(await usuario.acheck_password("UnaClave.Segura99"))
+        self.assertEqual(duplicado.status_code, 400)
+        self.assertEqual(sorted(duplicado.json()), ["email", "username"])
+
+    async def test_resto_de_metodos_se_delegan_al_viewset(self):
+        access = (await self._token()).json()["access"]
+
+        response = await self.async_client.patch(
+            f"/api/usuarios/{self.user.uuid}/",
+            json.dumps({"nombre": "Parcheado"}),
+            content_type="application/json",
+            headers={"Authorization": f"Bearer {access}"},
+        )
+        listado = await self.async_client.get(
+            "/api/usuarios/", headers={"Authorization": f"Bearer {access}"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["nombre"], "Parcheado")
+        self.assertEqual(len(listado.json()["results"]), 1)
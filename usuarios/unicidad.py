@@ -0,0 +1,79 @@
+"""
+Comprobación de unicidad de ``username`` y ``email`` en una sola consulta.
+
+El registro (formulario web, API y vista asíncrona) pregunta por los dos
+campos a la vez con ``WHERE username = %s OR LOWER(email) = %s``, que
+PostgreSQL resuelve con los dos índices únicos (``usuarios_username_key`` y
+el funcional ``usuarios_email_lower_uniq``). Entre la comprobación y el
+``INSERT`` otra petición puede ocupar el valor: en ese caso las
+restricciones únicas hacen de árbitro y ``campo_en_conflicto`` traduce el
+``IntegrityError`` al mismo error de campo.
+"""
+
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+from .models import Usuario
+
+CAMPOS = ("username", "email")
+
+# Nombres de las restricciones únicas que pueden fallar al insertar.
+RESTRICCIONES = {
+    "username": ("usuarios_username_key", "usuarios.username"),
+    "email": ("usuarios_email_key", "usuarios.email", "usuarios_email_lower_uniq"),
+}
+
+
+def _consulta(username, email, excluir_pk):
+    condicion = Q()
+    if username:
+        condicion |= Q(username=username)
+    if email:
+        condicion |= Q(email_ci=email.lower())
+    if not condicion:
+        return None
+    queryset = (
+        Usuario.objects.annotate(email_ci=Lower("email"))
+        .filter(condicion)
+        .values_list("username", "email_ci")
+    )
+    if excluir_pk is not None:
+        queryset = queryset.exclude(pk=excluir_pk)
+    return queryset
+
+
+def _ocupados(filas, username, email):
+    ocupados = set()
+    for username_bd, email_bd in filas:
+        if username and username_bd == username:
+            ocupados.add("username")
+        if email and email_bd == email.lower():
+            ocupados.add("email")
+    return ocupados
+
+
+def campos_ocupados(username=None, email=None, excluir_pk=None):
+    """
+    Campos (``"username"``, ``"email"``) cuyo valor ya usa otro usuario. El
+    email se compara sin distinguir mayúsculas.
+    """
+    queryset = _consulta(username, email, excluir_pk)
+    if queryset is None:
+        return set()
+    return _ocupados(queryset, username, email)
+
+
+async def acampos_ocupados(username=None, email=None, excluir_pk=None):
+    queryset = _consulta(username, email, excluir_pk)
+    if queryset is None:
+        return set()
+    return _ocupados([fila async for fila in queryset], username, email)
+
+
+def campo_en_conflicto(exc):
+    """Campo cuya restricción única ha roto el ``IntegrityError`` ``exc``."""
+    mensaje = str(exc)
+    for campo in CAMPOS:
+        if any(nombre in mensaje for nombre in RESTRICCIONES[campo]):
+            return campo
+    return None
@@ -0,0 +1,15 @@
+from django.urls import path
+
+from . import views_async
+
+# Rutas de la API servidas por vistas asíncronas; ``config/urls_asgi.py`` las
+# monta bajo ``api/``, delante del resto, cuando ``API_ASYNC`` está activo.
+urlpatterns = [
+    path("token/", views_async.token_obtener, name="token_obtain_pair_async"),
+    path("usuarios/", views_async.usuarios, name="usuario-list-async"),
+    path(
+        "usuarios/<uuid:uuid>/",
+        views_async.usuario_detalle,
+        name="usuario-detail-async",
+    ),
+]
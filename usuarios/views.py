@@ -1,10 +1,14 @@
 from django.contrib.auth import login, logout
 from django.shortcuts import render, redirect
 from django.contrib import messages
+from django.db import IntegrityError, transaction
+from core.limitador import limitar
 from .forms import LoginForm, RegistrationForm
 from .models import Usuario
+from .unicidad import campo_en_conflicto
 
 
+@limitar("login")
 def login_view(request):
     if request.method == "POST":
         form = LoginForm(request, data=request.POST)
@@ -28,6 +32,7 @@ def logout_view(request):
     return redirect("login")
 
 
+@limitar("registro")
 def register_view(request):
     if request.method == "POST":
         form = RegistrationForm(request.POST)
@@ -38,10 +43,20 @@ def register_view(request):
                 email=form.cleaned_data["email"],
             )
             user.set_password(form.cleaned_data["password"])
-            user.save()
-
-            messages.success(request, "¡Registro exitoso! Por favor, inicia sesión.")
-            return redirect("login")
+            try:
+                with transaction.atomic():
+                    user.save()
+            except IntegrityError as exc:
+                # Otro registro ha ocupado el valor tras la validación.
+                campo = campo_en_conflicto(exc)
+                if campo is None:
+                    raise
+                form.add_error(campo, form.mensajes_unicidad[campo])
+            else:
+                messages.success(
+                    request, "¡Registro exitoso! Por favor, inicia sesión."
+                )
+                return redirect("login")
     else:
         form = RegistrationForm()
 
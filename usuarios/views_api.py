@@ -1,6 +1,16 @@
-from rest_framework import viewsets
-from rest_framework.permissions import AllowAny, IsAuthenticated
+import uuid
+
+from django.http import Http404
+from django.utils.http import parse_etags
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework_simplejwt.views import TokenObtainPairView
+from core.exportacion import FORMATOS, respuesta_streaming
+from core.limitador import LimiteThrottle
 from .models import Usuario
 from .serializers import (
     UsuarioSerializer,
@@ -9,8 +19,16 @@ from .serializers import (
     UsuarioCreateSerializer,
     UsuarioUpdateSerializer,
     CustomTokenObtainPairSerializer,
+    LoteCambiosSerializer,
+    LoteUuidsSerializer,
 )
-from .permissions import IsOwnerOrAdmin
+from .cache_perfil import cache_perfil
+from .disponibilidad import disponibilidad
+from .exportacion import filas_usuarios
+from .fast_serializers import UsuarioDetailFastSerializer, UsuarioListFastSerializer
+from .lotes import actualizar_usuarios, desactivar_usuarios
+from .pagination import UsuarioCursorPagination
+from .permissions import IsDatabaseStaff, IsOwnerOrAdmin
 
 
 class CustomTokenObtainPairView(TokenObtainPairView):
@@ -19,6 +37,9 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     """
 
     serializer_class = CustomTokenObtainPairSerializer
+    # Antes de validar: un pico de intentos no llega a calcular hashes.
+    throttle_classes = [LimiteThrottle]
+    limite_ambito = "login"
 
 
 class UsuarioViewSet(viewsets.ModelViewSet):
@@ -29,16 +50,180 @@ class UsuarioViewSet(viewsets.ModelViewSet):
     queryset = Usuario.objects.all()
     serializer_class = UsuarioSerializer
     lookup_field = "uuid"
+    pagination_class = UsuarioCursorPagination
+    fields_query_param = "fields"
+    limite_ambito = "registro"
+
+    # Acciones servidas por el serializer compilado (ver fast_serializers.py).
+    # Quitar una acción de la tupla la devuelve al ModelSerializer de DRF.
+    fast_serializer_actions = ("list", "retrieve")
+    fast_serializer_classes = {
+        "list": UsuarioListFastSerializer,
+        "retrieve": UsuarioDetailFastSerializer,
+    }
 
     def get_queryset(self):
-        return Usuario.objects.filter(is_active=True)
+        queryset = Usuario.activos.all()
+        if self.action == "list":
+            campos = self.get_campos_solicitados()
+            if campos is not None:
+                columnas = UsuarioListSerializer.columnas_para(campos)
+                orden = [campo.lstrip("-") for campo in self.paginator.ordering]
+                queryset = queryset.only(*columnas, *orden)
+        return queryset
+
+    def get_campos_solicitados(self):
+        """
+        Campos pedidos vía ``?fields=uuid,username`` (sparse fieldset) o
+        ``None`` si el cliente no ha restringido la respuesta.
+        """
+        valor = self.request.query_params.get(self.fields_query_param)
+        if not valor:
+            return None
+
+        campos = [campo.strip() for campo in valor.split(",") if campo.strip()]
+        desconocidos = [
+            campo for campo in campos if campo not in UsuarioListSerializer.Meta.fields
+        ]
+        if desconocidos:
+            raise ValidationError(
+                {
+                    self.fields_query_param: f"Campos no válidos: {', '.join(desconocidos)}"
+                }
+            )
+        return campos
+
+    def get_fast_serializer(self):
+        """Serializer compilado para la acción actual, o ``None`` si no aplica."""
+        if self.action not in self.fast_serializer_actions:
+            return None
+        clase = self.fast_serializer_classes.get(self.action)
+        if clase is None:
+            return None
+
+        if self.action == "list":
+            campos = self.get_campos_solicitados()
+            orden = tuple(campo.lstrip("-") for campo in self.paginator.ordering)
+            return clase.compilar(
+                fields=tuple(campos) if campos is not None else None,
+                extra_columns=orden,
+            )
+        return clase.compilar()
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.get_fast_serializer()
+        if serializer is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = serializer.valores(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.serializar_filas(page))
+        return Response(serializer.serializar_filas(queryset))
+
+    def retrieve(self, request, *args, **kwargs):
+        serializer = self.get_fast_serializer()
+        if serializer is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        # La forma canónica: la invalidación usa ``str(instance.uuid)``, y un
+        # uuid en mayúsculas o sin guiones tendría su propia entrada.
+        valor = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        try:
+            lookup = str(uuid.UUID(valor))
+        except ValueError:
+            raise Http404 from None
+
+        def cargar():
+            queryset = self.filter_queryset(self.get_queryset())
+            usuario = get_object_or_404(queryset, **{self.lookup_field: lookup})
+            return usuario.pk, serializer.serializar_instancia(usuario)
+
+        entrada = cache_perfil().obtener(lookup, cargar)
+        # Los permisos de objeto sólo miran la pk: no hace falta la fila.
+        self.check_object_permissions(request, Usuario(pk=entrada.pk))
+
+        etags = parse_etags(request.headers.get("If-None-Match", ""))
+        if entrada.etag in etags or "*" in etags:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(entrada.datos)
+        response["ETag"] = entrada.etag
+        return response
+
+    @action(detail=False, methods=["get"])
+    def exportar(self, request):
+        """
+        Descarga en streaming de los usuarios activos (``?formato=csv|jsonl``)
+        con los campos del detalle. Sólo para staff.
+        """
+        formato = request.query_params.get("formato", "csv")
+        if formato not in FORMATOS:
+            raise ValidationError({"formato": f"Usa {' o '.join(FORMATOS)}."})
+        queryset = self.filter_queryset(self.get_queryset()).order_by(
+            *self.paginator.ordering
+        )
+        columnas, filas = filas_usuarios(queryset)
+        return respuesta_streaming(formato, columnas, filas, "usuarios")
+
+    @action(detail=False, methods=["get"])
+    def disponible(self, request):
+        """
+        ``?username=...&email=...`` → ``{"username": bool, "email": bool}``.
+        Los valores libres se resuelven con el filtro en memoria, sin consultar
+        la base de datos (ver disponibilidad.py).
+        """
+        valores = {
+            campo: request.query_params.get(campo, "").strip()
+            for campo in ("username", "email")
+        }
+        if not any(valores.values()):
+            raise ValidationError({"detail": "Indica username o email."})
+        return Response(
+            disponibilidad().comprobar(
+                valores["username"] or None, valores["email"] or None
+            )
+        )
+
+    @action(detail=False, methods=["post"], url_path="desactivar-lote")
+    def desactivar_lote(self, request):
+        """
+        Borrado lógico de ``{"uuids": [...]}`` en un solo ``UPDATE`` (ver
+        lotes.py). Responde un resultado por uuid. Sólo para staff.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(
+            {"resultados": desactivar_usuarios(serializer.validated_data["uuids"])}
+        )
+
+    @action(detail=False, methods=["post"], url_path="actualizar-lote")
+    def actualizar_lote(self, request):
+        """
+        ``{"usuarios": [{"uuid", "tipo_usuario"?, "is_verified"?}]}`` aplicado
+        con un ``bulk_update``. Responde un resultado por uuid. Sólo para staff.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(
+            {"resultados": actualizar_usuarios(serializer.validated_data["usuarios"])}
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action == "list":
+            kwargs.setdefault("fields", self.get_campos_solicitados())
+        return super().get_serializer(*args, **kwargs)
 
     def get_permissions(self):
         """
         Instantiates and returns the list of permissions that this view requires.
         """
-        if self.action == "create":
+        if self.action in ("create", "disponible"):
             permission_classes = [AllowAny]
+        elif self.action == "exportar":
+            permission_classes = [IsAuthenticated, IsAdminUser]
+        elif self.action in ("desactivar_lote", "actualizar_lote"):
+            permission_classes = [IsAuthenticated, IsDatabaseStaff]
         else:
             permission_classes = [
                 IsAuthenticated,
@@ -46,6 +231,11 @@ class UsuarioViewSet(viewsets.ModelViewSet):
             ]  # Or use default from settings (which is IsAuth)
         return [permission() for permission in permission_classes]
 
+    def get_throttles(self):
+        if self.action == "create":
+            return [LimiteThrottle()]
+        return super().get_throttles()
+
     def get_serializer_class(self):
         if self.action == "list":
             return UsuarioListSerializer
@@ -55,6 +245,10 @@ class UsuarioViewSet(viewsets.ModelViewSet):
             return UsuarioCreateSerializer
         elif self.action in ["update", "partial_update"]:
             return UsuarioUpdateSerializer
+        elif self.action == "desactivar_lote":
+            return LoteUuidsSerializer
+        elif self.action == "actualizar_lote":
+            return LoteCambiosSerializer
         return UsuarioDetailSerializer
 
     def perform_destroy(self, instance):
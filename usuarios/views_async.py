@@ -0,0 +1,213 @@
+"""
+Vistas asíncronas de los endpoints más llamados (token, registro y detalle
+de usuario) para servir la API bajo ASGI (uvicorn, daphne...).
+
+DRF es síncrono: bajo ASGI cada petición a un ``ViewSet`` salta a un hilo con
+``sync_to_async``. Estas vistas son corrutinas de Django que usan el ORM
+asíncrono (``aget``, ``acreate``...) y esperan al pool de hashing
+sin bloquear el event loop. Responden exactamente igual que sus equivalentes
+DRF; los métodos que no cubren (listado, edición, borrado) se delegan en el
+``UsuarioViewSet``.
+
+Se montan en las rutas habituales con ``API_ASYNC=True`` (ver
+``config/urls_asgi.py``); bajo WSGI conviene dejarlas desactivadas, porque
+cada corrutina necesitaría su propio event loop.
+"""
+
+import functools
+import json
+
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError
+from django.http import HttpResponseNotModified, JsonResponse
+from django.utils import timezone
+from django.utils.http import parse_etags
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+from rest_framework.fields import Field
+from rest_framework_simplejwt.serializers import TokenObtainSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from core.limitador import ip_de, limitador
+
+from .authentication import StatelessJWTAuthentication
+from .cache_perfil import cache_perfil
+from .fast_serializers import UsuarioDetailFastSerializer
+from .hashing import amake_password
+from .models import Usuario
+from .serializers import CustomTokenObtainPairSerializer, UsuarioCreateSerializer
+from .unicidad import acampos_ocupados, campo_en_conflicto
+from .views_api import UsuarioViewSet
+
+_coleccion_sync = UsuarioViewSet.as_view({"get": "list", "post": "create"})
+_detalle_sync = UsuarioViewSet.as_view(
+    {
+        "get": "retrieve",
+        "put": "update",
+        "patch": "partial_update",
+        "delete": "destroy",
+    }
+)
+
+
+def _respuesta_error(exc):
+    response = JsonResponse(
+        exc.detail if isinstance(exc.detail, dict | list) else {"detail": exc.detail},
+        status=exc.status_code,
+        safe=False,
+    )
+    if isinstance(exc, exceptions.NotAuthenticated | exceptions.AuthenticationFailed):
+        response["WWW-Authenticate"] = StatelessJWTAuthentication().authenticate_header(
+            None
+        )
+    if getattr(exc, "wait", None):
+        response["Retry-After"] = str(exc.wait)
+    return response
+
+
+def api_async(vista):
+    """Convierte las ``APIException`` en la misma respuesta JSON que DRF."""
+
+    @csrf_exempt
+    @functools.wraps(vista)
+    async def envoltorio(request, *args, **kwargs):
+        try:
+            return await vista(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return _respuesta_error(exc)
+
+    return envoltorio
+
+
+async def _limitar(request, ambito, datos):
+    """Como ``LimiteThrottle``: rechaza antes de tocar la BD o el pool de hashing."""
+    limites = limitador()
+    if limites is None:
+        return
+    username = datos.get("username")
+    espera = await limites.acomprobar(
+        ambito,
+        ip=ip_de(request),
+        username=username if isinstance(username, str) else None,
+    )
+    if espera is not None:
+        raise exceptions.Throttled(espera)
+
+
+def _datos_json(request):
+    try:
+        datos = json.loads(request.body or b"{}")
+    except ValueError as exc:
+        raise exceptions.ParseError(f"JSON parse error - {exc}") from exc
+    if not isinstance(datos, dict):
+        raise exceptions.ParseError("Se esperaba un objeto JSON.")
+    return datos
+
+
+@api_async
+async def token_obtener(request):
+    """Equivalente asíncrono de ``CustomTokenObtainPairView``."""
+    if request.method != "POST":
+        raise exceptions.MethodNotAllowed(request.method)
+    datos = _datos_json(request)
+    await _limitar(request, "login", datos)
+    errores = {
+        campo: [Field.default_error_messages["required"]]
+        for campo in ("username", "password")
+        if not datos.get(campo)
+    }
+    if errores:
+        raise exceptions.ValidationError(errores)
+
+    password = datos["password"]
+    try:
+        usuario = await Usuario.objects.aget(username=datos["username"])
+    except Usuario.DoesNotExist:
+        # Como ModelBackend: se calcula un hash igualmente para no revelar
+        # por el tiempo de respuesta qué usuarios existen.
+        await amake_password(password)
+        usuario = None
+
+    if (
+        usuario is None
+        or not await usuario.acheck_password(password)
+        or not usuario.is_active
+    ):
+        raise exceptions.AuthenticationFailed(
+            TokenObtainSerializer.default_error_messages["no_active_account"],
+            "no_active_account",
+        )
+
+    if api_settings.UPDATE_LAST_LOGIN:
+        usuario.last_login = timezone.now()
+        await usuario.asave(update_fields=["last_login"])
+
+    refresh = CustomTokenObtainPairSerializer.get_token(usuario)
+    return JsonResponse(
+        {
+            "refresh": str(refresh),
+            "access": str(refresh.access_token),
+            "user": CustomTokenObtainPairSerializer.datos_usuario(usuario),
+        }
+    )
+
+
+@api_async
+async def usuarios(request):
+    """``POST`` registra un usuario; el listado sigue en el ``ViewSet``."""
+    if request.method != "POST":
+        return await sync_to_async(_coleccion_sync)(request)
+
+    datos = _datos_json(request)
+    await _limitar(request, "registro", datos)
+    # La unicidad se comprueba con el ORM asíncrono, en una sola consulta.
+    serializer = UsuarioCreateSerializer(data=datos, context={"unicidad": False})
+    serializer.is_valid(raise_exception=True)
+    datos = dict(serializer.validated_data)
+
+    ocupados = await acampos_ocupados(datos["username"], datos["email"])
+    if ocupados:
+        raise serializer.error_unicidad(ocupados)
+
+    password = await amake_password(datos.pop("password"))
+    try:
+        usuario = await Usuario.objects.acreate(password=password, **datos)
+    except IntegrityError as exc:
+        campo = campo_en_conflicto(exc)
+        if campo is None:
+            raise
+        raise serializer.error_unicidad([campo]) from exc
+    serializer.instance = usuario
+    return JsonResponse(serializer.data, status=status.HTTP_201_CREATED)
+
+
+@api_async
+async def usuario_detalle(request, uuid):
+    """``GET`` asíncrono con la caché de perfiles; el resto, al ``ViewSet``."""
+    if request.method != "GET":
+        return await sync_to_async(_detalle_sync)(request, uuid=str(uuid))
+
+    autenticacion = await StatelessJWTAuthentication().aauthenticate(request)
+    if autenticacion is None:
+        raise exceptions.NotAuthenticated()
+    user, _ = autenticacion
+
+    serializer = UsuarioDetailFastSerializer.compilar(extra_columns=("id",))
+
+    async def acargar():
+        fila = await serializer.valores(Usuario.activos.filter(uuid=uuid)).afirst()
+        if fila is None:
+            raise exceptions.NotFound()
+        return fila.id, serializer.serializar_fila(fila)
+
+    entrada = await cache_perfil().aobtener(uuid, acargar)
+    if not (entrada.pk == user.pk or user.is_staff):
+        raise exceptions.PermissionDenied()
+
+    etags = parse_etags(request.headers.get("If-None-Match", ""))
+    if entrada.etag in etags or "*" in etags:
+        response = HttpResponseNotModified()
+    else:
+        response = JsonResponse(entrada.datos)
+    response["ETag"] = entrada.etag
+    return response